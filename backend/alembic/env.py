@@ -18,10 +18,18 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 from app.models.opportunity import Opportunity, OpportunityLineItem
 from app.models.config import OpportunityCategory, ServiceLineStageEffort
-from app.models.resources import OpportunityResourceTimeline
+from app.models.resources import OpportunityResourceTimeline, PortfolioFteDaily
+from app.models.imports import ImportJob
 from sqlmodel import SQLModel
 target_metadata = SQLModel.metadata
 
+
+def include_name(name, type_, parent_names):
+    """Leave the FTS5 search index and its shadow tables out of autogenerate."""
+    if type_ == "table" and name.startswith("opportunity_fts"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -44,6 +52,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -67,7 +76,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,52 @@
+"""Add import_job table for persistent import progress
+
+Revision ID: 5b8e2f4c9a17
+Revises: ec6e4fb75d09
+Create Date: 2026-10-16 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4c9a17'
+down_revision: Union[str, Sequence[str], None] = 'ec6e4fb75d09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Import jobs are shared between API workers and the import worker processes
+    op.create_table('import_job',
+        sa.Column('task_id', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=False),
+        sa.Column('import_type', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('file_path', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('message', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('total_rows', sa.Integer(), nullable=False),
+        sa.Column('processed_rows', sa.Integer(), nullable=False),
+        sa.Column('successful_rows', sa.Integer(), nullable=False),
+        sa.Column('failed_rows', sa.Integer(), nullable=False),
+        sa.Column('warnings_count', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.Text(), nullable=False),
+        sa.Column('start_time', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('end_time', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index('ix_import_job_status', 'import_job', ['status'], unique=False)
+    op.create_index('ix_import_job_updated_at', 'import_job', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_import_job_updated_at', table_name='import_job')
+    op.drop_index('ix_import_job_status', table_name='import_job')
+    op.drop_table('import_job')
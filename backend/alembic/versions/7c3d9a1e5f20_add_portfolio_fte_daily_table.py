@@ -0,0 +1,38 @@
+"""Add portfolio_fte_daily aggregate table
+
+Revision ID: 7c3d9a1e5f20
+Revises: 5b8e2f4c9a17
+Create Date: 2026-10-16 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9a1e5f20'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f4c9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled from existing timelines by the application on its next startup
+    op.create_table('portfolio_fte_daily',
+        sa.Column('bucket_date', sa.Date(), nullable=False),
+        sa.Column('service_line', sqlmodel.sql.sqltypes.AutoString(length=10), nullable=False),
+        sa.Column('category', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('stage_name', sqlmodel.sql.sqltypes.AutoString(length=10), nullable=False),
+        sa.Column('resource_status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('fte', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket_date', 'service_line', 'category', 'stage_name', 'resource_status')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('portfolio_fte_daily')
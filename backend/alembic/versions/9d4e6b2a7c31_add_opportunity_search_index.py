@@ -0,0 +1,59 @@
+"""Add opportunity_fts full-text search index
+
+Revision ID: 9d4e6b2a7c31
+Revises: 7c3d9a1e5f20
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e6b2a7c31'
+down_revision: Union[str, Sequence[str], None] = '7c3d9a1e5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "opportunity_name, opportunity_id, account_name, lead_offering_l1, sales_org_l1"
+NEW_VALUES = "new.opportunity_name, new.opportunity_id, new.account_name, new.lead_offering_l1, new.sales_org_l1"
+OLD_VALUES = "old.opportunity_name, old.opportunity_id, old.account_name, old.lead_offering_l1, old.sales_org_l1"
+CHANGED = " OR ".join(
+    f"old.{name} IS NOT new.{name}"
+    for name in ("id", "opportunity_name", "opportunity_id", "account_name", "lead_offering_l1", "sales_org_l1")
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # External-content FTS5 index over the searchable opportunity columns
+    op.execute(
+        f"CREATE VIRTUAL TABLE opportunity_fts USING fts5("
+        f"{COLUMNS}, content='opportunity', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        f"CREATE TRIGGER opportunity_fts_insert AFTER INSERT ON opportunity BEGIN "
+        f"INSERT INTO opportunity_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER opportunity_fts_delete AFTER DELETE ON opportunity BEGIN "
+        f"INSERT INTO opportunity_fts(opportunity_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER opportunity_fts_update AFTER UPDATE OF id, {COLUMNS} ON opportunity "
+        f"WHEN {CHANGED} BEGIN "
+        f"INSERT INTO opportunity_fts(opportunity_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); "
+        f"INSERT INTO opportunity_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    # Index the opportunities that already exist
+    op.execute("INSERT INTO opportunity_fts(opportunity_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS opportunity_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS opportunity_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS opportunity_fts_insert")
+    op.execute("DROP TABLE IF EXISTS opportunity_fts")
@@ -0,0 +1,51 @@
+"""Replace single-column timeline indexes with composite covering indexes
+
+Revision ID: a3f1c8e2d4b6
+Revises: 9d4e6b2a7c31
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c8e2d4b6'
+down_revision: Union[str, Sequence[str], None] = '9d4e6b2a7c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'opportunity_resource_timeline'
+
+# Single-column indexes that no query can use better than the composites
+SINGLE_COLUMN_INDEXES = [
+    'category', 'opportunity_id', 'service_line', 'stage_end_date', 'stage_name',
+    'stage_start_date', 'last_updated', 'resource_category', 'resource_status',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_opportunity_resource_timeline_window', TABLE,
+        ['service_line', 'stage_start_date', 'stage_end_date', 'stage_name', 'category',
+         'opportunity_id', 'total_effort_weeks', 'fte_required', 'duration_weeks'],
+        unique=False
+    )
+    op.create_index(
+        'ix_opportunity_resource_timeline_opportunity_status', TABLE,
+        ['opportunity_id', 'resource_status'], unique=False
+    )
+    for column in SINGLE_COLUMN_INDEXES:
+        op.drop_index(f'ix_{TABLE}_{column}', table_name=TABLE)
+    # Give the planner statistics for the new indexes
+    op.execute(f'ANALYZE {TABLE}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SINGLE_COLUMN_INDEXES:
+        op.create_index(f'ix_{TABLE}_{column}', TABLE, [column], unique=False)
+    op.drop_index('ix_opportunity_resource_timeline_opportunity_status', table_name=TABLE)
+    op.drop_index('ix_opportunity_resource_timeline_window', table_name=TABLE)
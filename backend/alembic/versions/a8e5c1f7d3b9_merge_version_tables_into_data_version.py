@@ -0,0 +1,45 @@
+"""Merge config_version and timeline_data_version into the named data_version table
+
+Revision ID: a8e5c1f7d3b9
+Revises: f4d1b8e6a2c7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e5c1f7d3b9'
+down_revision: Union[str, Sequence[str], None] = 'f4d1b8e6a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Single-row version table -> data_version name
+VERSION_TABLES = {'config_version': 'config', 'timeline_data_version': 'timeline_data'}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('data_version',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    for table, name in VERSION_TABLES.items():
+        op.execute(f"INSERT INTO data_version (name, version) SELECT '{name}', version FROM {table} WHERE id = 1")
+        op.drop_table(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, name in VERSION_TABLES.items():
+        op.create_table(table,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.execute(f"INSERT INTO {table} (id, version) SELECT 1, version FROM data_version WHERE name = '{name}'")
+    op.drop_table('data_version')
@@ -0,0 +1,37 @@
+"""Add unique natural key index to opportunity line items
+
+Revision ID: b7e2d5a9c4f1
+Revises: a3f1c8e2d4b6
+Create Date: 2026-10-17 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d5a9c4f1'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c8e2d4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'opportunitylineitem'
+NATURAL_KEY = "opportunity_id, coalesce(product_name, ''), coalesce(lead_offering_l2, '')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Earlier imports could store duplicates; keep the item they updated (lowest id)
+    op.execute(
+        f'DELETE FROM {TABLE} WHERE id NOT IN '
+        f'(SELECT min(id) FROM {TABLE} GROUP BY {NATURAL_KEY})'
+    )
+    op.execute(f'CREATE UNIQUE INDEX ux_{TABLE}_natural_key ON {TABLE} ({NATURAL_KEY})')
+    # Superseded by the leading column of the natural key (only on create_all databases)
+    op.execute(f'DROP INDEX IF EXISTS ix_{TABLE}_opportunity_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(f'ux_{TABLE}_natural_key', table_name=TABLE)
@@ -0,0 +1,40 @@
+"""Add import fingerprints and change counts
+
+Revision ID: c5a9e3f7b1d2
+Revises: b7e2d5a9c4f1
+Create Date: 2026-10-17 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a9e3f7b1d2'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d5a9c4f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = ['inserted_rows', 'updated_rows', 'unchanged_rows']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows have no fingerprint, so the next import rewrites them once
+    for table in ('opportunity', 'opportunitylineitem'):
+        op.add_column(table, sa.Column('import_hash', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=True))
+    for column in COUNT_COLUMNS:
+        op.add_column('import_job', sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('import_job', sa.Column('changed_ids', sa.Text(), nullable=False, server_default='[]'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('import_job', 'changed_ids')
+    for column in reversed(COUNT_COLUMNS):
+        op.drop_column('import_job', column)
+    for table in ('opportunitylineitem', 'opportunity'):
+        op.drop_column(table, 'import_hash')
@@ -0,0 +1,39 @@
+"""Add composite opportunity indexes for stage and TCV filters sorted by decision date
+
+Revision ID: c9f2a6d4e8b1
+Revises: a8e5c1f7d3b9
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f2a6d4e8b1'
+down_revision: Union[str, Sequence[str], None] = 'a8e5c1f7d3b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = 'opportunity'
+
+# Previously created by optimize_database.py, so they may already exist
+COMPOSITE_INDEXES = {
+    'idx_opportunity_stage_forecast': ['sales_stage', 'in_forecast'],
+    'idx_opportunity_stage_decision_date': ['sales_stage', 'decision_date'],
+    'idx_opportunity_tcv_decision_date': ['tcv_millions', 'decision_date'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, columns in COMPOSITE_INDEXES.items():
+        op.create_index(name, TABLE, columns, unique=False, if_not_exists=True)
+    op.execute(f'ANALYZE {TABLE}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name=TABLE)
@@ -0,0 +1,47 @@
+"""Add timeline_recalculation_job table for incremental timeline recalculation
+
+Revision ID: d8b4f2c6e9a3
+Revises: c5a9e3f7b1d2
+Create Date: 2026-10-17 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4f2c6e9a3'
+down_revision: Union[str, Sequence[str], None] = 'c5a9e3f7b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNT_COLUMNS = ['requested', 'processed', 'regenerated', 'removed', 'protected', 'skipped', 'errors']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('timeline_recalculation_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('trigger', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('detail', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('opportunity_ids', sa.Text(), nullable=False),
+        *[sa.Column(column, sa.Integer(), nullable=False) for column in COUNT_COLUMNS],
+        sa.Column('message', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_timeline_recalculation_job_status', 'timeline_recalculation_job', ['status'], unique=False)
+    op.create_index('ix_timeline_recalculation_job_updated_at', 'timeline_recalculation_job', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_timeline_recalculation_job_updated_at', table_name='timeline_recalculation_job')
+    op.drop_index('ix_timeline_recalculation_job_status', table_name='timeline_recalculation_job')
+    op.drop_table('timeline_recalculation_job')
@@ -0,0 +1,33 @@
+"""Add config_version table for cross-process configuration snapshot invalidation
+
+Revision ID: e2c7a4f9b3d8
+Revises: d8b4f2c6e9a3
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7a4f9b3d8'
+down_revision: Union[str, Sequence[str], None] = 'd8b4f2c6e9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    config_version = op.create_table('config_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(config_version, [{'id': 1, 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('config_version')
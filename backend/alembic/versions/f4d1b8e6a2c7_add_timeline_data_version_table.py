@@ -0,0 +1,33 @@
+"""Add timeline_data_version table for cross-process missing timeline invalidation
+
+Revision ID: f4d1b8e6a2c7
+Revises: e2c7a4f9b3d8
+Create Date: 2026-10-18 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4d1b8e6a2c7'
+down_revision: Union[str, Sequence[str], None] = 'e2c7a4f9b3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    timeline_data_version = op.create_table('timeline_data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(timeline_data_version, [{'id': 1, 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('timeline_data_version')
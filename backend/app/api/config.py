@@ -25,7 +25,7 @@ def get_session():
 
 # Opportunity Categories
 @router.get("/categories", response_model=List[OpportunityCategoryRead])
-async def get_categories(session: Session = Depends(get_session)):
+def get_categories(session: Session = Depends(get_session)):
     """Get all opportunity categories."""
     categories = session.exec(select(OpportunityCategory)).all()
     logger.info("Retrieved categories", count=len(categories))
@@ -33,7 +33,7 @@ async def get_categories(session: Session = Depends(get_session)):
 
 
 @router.post("/categories", response_model=OpportunityCategoryRead)
-async def create_category(
+def create_category(
     category: OpportunityCategoryCreate,
     session: Session = Depends(get_session)
 ):
@@ -48,7 +48,7 @@ async def create_category(
 
 
 @router.put("/categories/{category_id}", response_model=OpportunityCategoryRead)
-async def update_category(
+def update_category(
     category_id: int,
     category: OpportunityCategoryUpdate,
     session: Session = Depends(get_session)
@@ -71,7 +71,7 @@ async def update_category(
 
 
 @router.delete("/categories/{category_id}")
-async def delete_category(
+def delete_category(
     category_id: int,
     session: Session = Depends(get_session)
 ):
@@ -89,7 +89,7 @@ async def delete_category(
 
 # Service Line Categories (Service-line-specific TCV thresholds)
 @router.get("/service-line-categories", response_model=List[ServiceLineCategoryRead])
-async def get_service_line_categories(
+def get_service_line_categories(
     service_line: str = None,
     session: Session = Depends(get_session)
 ):
@@ -104,7 +104,7 @@ async def get_service_line_categories(
 
 
 @router.post("/service-line-categories", response_model=ServiceLineCategoryRead)
-async def create_service_line_category(
+def create_service_line_category(
     category: ServiceLineCategoryCreate,
     session: Session = Depends(get_session)
 ):
@@ -136,7 +136,7 @@ async def create_service_line_category(
 
 
 @router.put("/service-line-categories/{category_id}", response_model=ServiceLineCategoryRead)
-async def update_service_line_category(
+def update_service_line_category(
     category_id: int,
     category: ServiceLineCategoryUpdate,
     session: Session = Depends(get_session)
@@ -162,7 +162,7 @@ async def update_service_line_category(
 
 
 @router.delete("/service-line-categories/{category_id}")
-async def delete_service_line_category(
+def delete_service_line_category(
     category_id: int,
     session: Session = Depends(get_session)
 ):
@@ -197,7 +197,7 @@ async def delete_service_line_category(
 
 # Service Line Stage Efforts
 @router.get("/service-line-stage-efforts", response_model=List[ServiceLineStageEffortRead])
-async def get_service_line_stage_efforts(
+def get_service_line_stage_efforts(
     service_line: str = None,
     service_line_category_id: int = None,
     session: Session = Depends(get_session)
@@ -218,7 +218,7 @@ async def get_service_line_stage_efforts(
 
 
 @router.post("/service-line-stage-efforts", response_model=ServiceLineStageEffortRead)
-async def create_service_line_stage_effort(
+def create_service_line_stage_effort(
     effort: ServiceLineStageEffortCreate,
     session: Session = Depends(get_session)
 ):
@@ -251,7 +251,7 @@ async def create_service_line_stage_effort(
 
 
 @router.put("/service-line-stage-efforts/{effort_id}", response_model=ServiceLineStageEffortRead)
-async def update_service_line_stage_effort(
+def update_service_line_stage_effort(
     effort_id: int,
     effort: ServiceLineStageEffortUpdate,
     session: Session = Depends(get_session)
@@ -277,7 +277,7 @@ async def update_service_line_stage_effort(
 
 
 @router.delete("/service-line-stage-efforts/{effort_id}")
-async def delete_service_line_stage_effort(
+def delete_service_line_stage_effort(
     effort_id: int,
     session: Session = Depends(get_session)
 ):
@@ -294,7 +294,7 @@ async def delete_service_line_stage_effort(
 
 
 @router.post("/service-line-stage-efforts/bulk", response_model=List[ServiceLineStageEffortRead])
-async def bulk_create_service_line_stage_efforts(
+def bulk_create_service_line_stage_efforts(
     efforts: List[ServiceLineStageEffortCreate],
     session: Session = Depends(get_session)
 ):
@@ -327,7 +327,7 @@ async def bulk_create_service_line_stage_efforts(
 
 # Service Line Offering Thresholds
 @router.get("/service-line-offering-thresholds", response_model=List[ServiceLineOfferingThresholdRead])
-async def get_service_line_offering_thresholds(
+def get_service_line_offering_thresholds(
     service_line: str = None,
     stage_name: str = None,
     session: Session = Depends(get_session)
@@ -346,7 +346,7 @@ async def get_service_line_offering_thresholds(
 
 
 @router.post("/service-line-offering-thresholds", response_model=ServiceLineOfferingThresholdRead)
-async def create_service_line_offering_threshold(
+def create_service_line_offering_threshold(
     threshold: ServiceLineOfferingThresholdCreate,
     session: Session = Depends(get_session)
 ):
@@ -372,7 +372,7 @@ async def create_service_line_offering_threshold(
 
 
 @router.put("/service-line-offering-thresholds/{threshold_id}", response_model=ServiceLineOfferingThresholdRead)
-async def update_service_line_offering_threshold(
+def update_service_line_offering_threshold(
     threshold_id: int,
     threshold: ServiceLineOfferingThresholdUpdate,
     session: Session = Depends(get_session)
@@ -407,7 +407,7 @@ async def update_service_line_offering_threshold(
 
 
 @router.delete("/service-line-offering-thresholds/{threshold_id}")
-async def delete_service_line_offering_threshold(
+def delete_service_line_offering_threshold(
     threshold_id: int,
     session: Session = Depends(get_session)
 ):
@@ -424,7 +424,7 @@ async def delete_service_line_offering_threshold(
 
 
 @router.post("/service-line-offering-thresholds/bulk", response_model=List[ServiceLineOfferingThresholdRead])
-async def bulk_create_service_line_offering_thresholds(
+def bulk_create_service_line_offering_thresholds(
     thresholds: List[ServiceLineOfferingThresholdCreate],
     session: Session = Depends(get_session)
 ):
@@ -456,7 +456,7 @@ async def bulk_create_service_line_offering_thresholds(
 
 # Service Line Offering Mappings (Consolidated)
 @router.get("/service-line-offering-mappings", response_model=List[ServiceLineOfferingMappingRead])
-async def get_service_line_offering_mappings(
+def get_service_line_offering_mappings(
     service_line: str = None,
     session: Session = Depends(get_session)
 ):
@@ -472,7 +472,7 @@ async def get_service_line_offering_mappings(
 
 
 @router.post("/service-line-offering-mappings", response_model=ServiceLineOfferingMappingRead)
-async def create_service_line_offering_mapping(
+def create_service_line_offering_mapping(
     mapping: ServiceLineOfferingMappingCreate,
     session: Session = Depends(get_session)
 ):
@@ -503,7 +503,7 @@ async def create_service_line_offering_mapping(
 
 
 @router.put("/service-line-offering-mappings/{mapping_id}", response_model=ServiceLineOfferingMappingRead)
-async def update_service_line_offering_mapping(
+def update_service_line_offering_mapping(
     mapping_id: int,
     mapping: ServiceLineOfferingMappingUpdate,
     session: Session = Depends(get_session)
@@ -543,7 +543,7 @@ async def update_service_line_offering_mapping(
 
 
 @router.delete("/service-line-offering-mappings/{mapping_id}")
-async def delete_service_line_offering_mapping(
+def delete_service_line_offering_mapping(
     mapping_id: int,
     session: Session = Depends(get_session)
 ):
@@ -564,7 +564,7 @@ async def delete_service_line_offering_mapping(
 
 
 @router.get("/service-line-offering-options")
-async def get_service_line_offering_options(
+def get_service_line_offering_options(
     service_line: str = None,
     session: Session = Depends(get_session)
 ):
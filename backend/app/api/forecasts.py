@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session, select, or_
+from sqlalchemy import case, false
+from sqlmodel import Session, func, select, or_
 from typing import Dict, List, Optional, Union
 import structlog
 
 from app.models.database import engine
 from app.models.opportunity import Opportunity, OpportunityLineItem
 from app.models.config import OpportunityCategory
+from app.services.config_snapshot import get_config_snapshot
+from app.services.tcv_tiers import TierCategoriser
 
 # Helper function to calculate opportunity category based on TCV using database categories
 def get_opportunity_category(tcv_millions: float, categories: List[OpportunityCategory]) -> str:
@@ -31,6 +34,15 @@ def get_opportunity_category(tcv_millions: float, categories: List[OpportunityCa
     
     return 'Unknown'
 
+
+def compile_opportunity_categoriser(categories: List[OpportunityCategory]) -> TierCategoriser:
+    """Compile get_opportunity_category for the given categories into a vectorised lookup."""
+    sorted_categories = sorted(categories, key=lambda x: x.min_tcv)
+    return TierCategoriser.compile(
+        sorted_categories, lambda tcv_millions: get_opportunity_category(tcv_millions, sorted_categories)
+    )
+
+
 logger = structlog.get_logger()
 router = APIRouter()
 
@@ -51,8 +63,56 @@ def parse_multi_param(param: Optional[Union[str, List[str]]]) -> List[str]:
     return param
 
 
+# Revenue column of each service line
+SERVICE_LINE_COLUMNS = {
+    "CES": Opportunity.ces_millions,
+    "INS": Opportunity.ins_millions,
+    "BPS": Opportunity.bps_millions,
+    "SEC": Opportunity.sec_millions,
+    "ITOC": Opportunity.itoc_millions,
+    "MW": Opportunity.mw_millions,
+}
+
+
+def build_opportunity_filters(
+    session: Session,
+    stages: List[str],
+    categories_list: List[str],
+    service_lines: List[str],
+    lead_offerings: List[str]
+) -> list:
+    """
+    Compile the forecast filters into SQL conditions on Opportunity.
+    
+    - stages: sales_stage is one of the values
+    - categories_list: the TCV category (see category_expression) is one of the values
+    - service_lines: revenue > 0 in any of the service lines
+    - lead_offerings: lead_offering_l1 is one of the values
+    """
+    conditions = []
+    if stages:
+        conditions.append(Opportunity.sales_stage.in_(stages))
+    if categories_list:
+        conditions.append(category_expression(session).in_(categories_list))
+    if service_lines:
+        revenue_conditions = [
+            SERVICE_LINE_COLUMNS[sl] > 0 for sl in service_lines if sl in SERVICE_LINE_COLUMNS
+        ]
+        conditions.append(or_(*revenue_conditions) if revenue_conditions else false())
+    if lead_offerings:
+        conditions.append(Opportunity.lead_offering_l1.in_(lead_offerings))
+    return conditions
+
+
+def category_expression(session: Session):
+    """SQL CASE computing get_opportunity_category over the configured categories."""
+    categories = get_config_snapshot(session).opportunity_categories
+    categoriser = compile_opportunity_categoriser(list(categories))
+    return categoriser.case_expression(func.coalesce(Opportunity.tcv_millions, 0))
+
+
 @router.get("/summary")
-async def get_forecast_summary(
+def get_forecast_summary(
     session: Session = Depends(get_session),
     stage: Optional[Union[str, List[str]]] = Query(None),
     category: Optional[Union[str, List[str]]] = Query(None),
@@ -71,112 +131,51 @@ async def get_forecast_summary(
         "service_lines": service_lines, "lead_offerings": lead_offerings
     })
     
-    # Fetch categories from database
-    categories_statement = select(OpportunityCategory)
-    categories = session.exec(categories_statement).all()
-    
-    statement = select(Opportunity)
-    
-    if stages:
-        statement = statement.where(Opportunity.sales_stage.in_(stages))
-    
-    opportunities = session.exec(statement).all()
-    
-    # Apply category filter after fetching opportunities (since category is calculated)
-    if categories_list:
-        filtered_opportunities = []
-        for opp in opportunities:
-            opp_category = get_opportunity_category(opp.tcv_millions or 0, categories)
-            if opp_category in categories_list:
-                filtered_opportunities.append(opp)
-        opportunities = filtered_opportunities
-    
-    # Apply service line filter after fetching all opportunities
-    if service_lines:
-        # Filter opportunities that have revenue in any of the specified service lines
-        filtered_opportunities = []
-        for opp in opportunities:
-            has_matching_service_line = False
-            for sl in service_lines:
-                service_line_value = 0
-                if sl == "CES":
-                    service_line_value = opp.ces_millions or 0
-                elif sl == "INS":
-                    service_line_value = opp.ins_millions or 0
-                elif sl == "BPS":
-                    service_line_value = opp.bps_millions or 0
-                elif sl == "SEC":
-                    service_line_value = opp.sec_millions or 0
-                elif sl == "ITOC":
-                    service_line_value = opp.itoc_millions or 0
-                elif sl == "MW":
-                    service_line_value = opp.mw_millions or 0
-                
-                if service_line_value > 0:
-                    has_matching_service_line = True
-                    break
-            
-            if has_matching_service_line:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
-    
-    # Apply lead offering filter after fetching all opportunities
-    if lead_offerings:
-        filtered_opportunities = []
-        for opp in opportunities:
-            if opp.lead_offering_l1 in lead_offerings:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
+    # Filters and breakdowns run in SQL; only aggregate rows are fetched
+    conditions = build_opportunity_filters(session, stages, categories_list, service_lines, lead_offerings)
+    tcv = func.coalesce(Opportunity.tcv_millions, 0)
     
-    total_opportunities = len(opportunities)
-    total_value = sum(opp.tcv_millions or 0 for opp in opportunities)
+    total_opportunities, total_value = session.exec(
+        select(func.count(), func.coalesce(func.sum(tcv), 0)).where(*conditions)
+    ).one()
     avg_value = total_value / total_opportunities if total_opportunities > 0 else 0
     
     STAGE_ORDER = ['01', '02', '03', '04A', '04B', '05A', '05B']
     
-    # Build category order from database categories
+    # Build category order from configured categories
+    categories = get_config_snapshot(session).opportunity_categories
     sorted_categories = sorted(categories, key=lambda x: x.min_tcv, reverse=True)
     CATEGORY_ORDER = [cat.name for cat in sorted_categories]
     # Add 'Uncategorized' as it's not in the database but we calculate it for negative TCVs
     CATEGORY_ORDER.append('Uncategorized')
     
     # Group by stage (use database format directly)
-    stage_breakdown = {}
-    stage_counts = {}
-    for opp in opportunities:
-        stage = opp.sales_stage
-        if stage:
-            stage_breakdown[stage] = stage_breakdown.get(stage, 0) + (opp.tcv_millions or 0)
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
+    stage_rows = session.exec(
+        select(Opportunity.sales_stage, func.sum(tcv), func.count())
+        .where(*conditions, Opportunity.sales_stage.in_(STAGE_ORDER))
+        .group_by(Opportunity.sales_stage)
+    ).all()
+    stage_totals = {stage: (value, count) for stage, value, count in stage_rows}
     
     # Sort stage breakdown by proper order
-    stage_breakdown = {stage: stage_breakdown.get(stage, 0) for stage in STAGE_ORDER if stage in stage_breakdown}
-    stage_counts = {stage: stage_counts.get(stage, 0) for stage in STAGE_ORDER if stage in stage_counts}
-    
-    # Group by category (calculate from TCV using database categories)
+    stage_breakdown = {stage: stage_totals[stage][0] for stage in STAGE_ORDER if stage in stage_totals}
+    stage_counts = {stage: stage_totals[stage][1] for stage in STAGE_ORDER if stage in stage_totals}
+    
+    # Group by category (calculated from TCV using configured categories)
+    category_column = category_expression(session).label("category")
+    category_rows = session.exec(
+        select(category_column, func.sum(tcv), func.count())
+        .where(*conditions)
+        .group_by(category_column)
+    ).all()
+    category_totals = {cat: (value, count) for cat, value, count in category_rows}
+    
+    # Sort category breakdown by proper order, then any remaining categories
     category_breakdown = {}
     category_counts = {}
-    for opp in opportunities:
-        cat = get_opportunity_category(opp.tcv_millions or 0, categories)
-        category_breakdown[cat] = category_breakdown.get(cat, 0) + (opp.tcv_millions or 0)
-        category_counts[cat] = category_counts.get(cat, 0) + 1
-    
-    # Sort category breakdown by proper order  
-    sorted_category_breakdown = {}
-    sorted_category_counts = {}
-    for category in CATEGORY_ORDER:
-        if category in category_breakdown:
-            sorted_category_breakdown[category] = category_breakdown[category]
-            sorted_category_counts[category] = category_counts[category]
-    # Add any remaining categories not in the predefined order
-    for category, value in category_breakdown.items():
-        if category not in sorted_category_breakdown:
-            sorted_category_breakdown[category] = value
-            sorted_category_counts[category] = category_counts[category]
-    category_breakdown = sorted_category_breakdown
-    category_counts = sorted_category_counts
+    for category in CATEGORY_ORDER + sorted(set(category_totals) - set(CATEGORY_ORDER)):
+        if category in category_totals:
+            category_breakdown[category], category_counts[category] = category_totals[category]
     
     summary = {
         "total_opportunities": total_opportunities,
@@ -193,7 +192,7 @@ async def get_forecast_summary(
 
 
 @router.get("/service-lines")
-async def get_service_line_forecast(
+def get_service_line_forecast(
     session: Session = Depends(get_session),
     stage: Optional[Union[str, List[str]]] = Query(None),
     category: Optional[Union[str, List[str]]] = Query(None),
@@ -212,83 +211,18 @@ async def get_service_line_forecast(
         "service_lines": service_lines, "lead_offerings": lead_offerings
     })
     
-    # Fetch categories from database
-    categories_statement = select(OpportunityCategory)
-    categories = session.exec(categories_statement).all()
-    
-    statement = select(Opportunity)
-    
-    if stages:
-        statement = statement.where(Opportunity.sales_stage.in_(stages))
-    
-    opportunities = session.exec(statement).all()
-    
-    # Apply category filter after fetching opportunities (since category is calculated)
-    if categories_list:
-        filtered_opportunities = []
-        for opp in opportunities:
-            opp_category = get_opportunity_category(opp.tcv_millions or 0, categories)
-            if opp_category in categories_list:
-                filtered_opportunities.append(opp)
-        opportunities = filtered_opportunities
-    
-    # Apply service line filter after fetching all opportunities
-    if service_lines:
-        # Filter opportunities that have revenue in any of the specified service lines
-        filtered_opportunities = []
-        for opp in opportunities:
-            has_matching_service_line = False
-            for sl in service_lines:
-                service_line_value = 0
-                if sl == "CES":
-                    service_line_value = opp.ces_millions or 0
-                elif sl == "INS":
-                    service_line_value = opp.ins_millions or 0
-                elif sl == "BPS":
-                    service_line_value = opp.bps_millions or 0
-                elif sl == "SEC":
-                    service_line_value = opp.sec_millions or 0
-                elif sl == "ITOC":
-                    service_line_value = opp.itoc_millions or 0
-                elif sl == "MW":
-                    service_line_value = opp.mw_millions or 0
-                
-                if service_line_value > 0:
-                    has_matching_service_line = True
-                    break
-            
-            if has_matching_service_line:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
-    
-    # Apply lead offering filter after fetching all opportunities
-    if lead_offerings:
-        filtered_opportunities = []
-        for opp in opportunities:
-            if opp.lead_offering_l1 in lead_offerings:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
+    # Revenue totals and counts of opportunities with revenue, per service line, in one query
+    conditions = build_opportunity_filters(session, stages, categories_list, service_lines, lead_offerings)
+    aggregates = []
+    for column in SERVICE_LINE_COLUMNS.values():
+        aggregates.append(func.coalesce(func.sum(func.coalesce(column, 0)), 0))
+        aggregates.append(func.coalesce(func.sum(case((column > 0, 1), else_=0)), 0))
+    row = session.exec(select(*aggregates).where(*conditions)).one()
     
-    service_line_totals = {
-        "CES": sum(opp.ces_millions or 0 for opp in opportunities),
-        "INS": sum(opp.ins_millions or 0 for opp in opportunities),
-        "BPS": sum(opp.bps_millions or 0 for opp in opportunities),
-        "SEC": sum(opp.sec_millions or 0 for opp in opportunities),
-        "ITOC": sum(opp.itoc_millions or 0 for opp in opportunities),
-        "MW": sum(opp.mw_millions or 0 for opp in opportunities)
-    }
+    service_line_totals = {line: row[2 * i] for i, line in enumerate(SERVICE_LINE_COLUMNS)}
     
     # Calculate opportunity counts per service line
-    service_line_counts = {
-        "CES": sum(1 for opp in opportunities if (opp.ces_millions or 0) > 0),
-        "INS": sum(1 for opp in opportunities if (opp.ins_millions or 0) > 0),
-        "BPS": sum(1 for opp in opportunities if (opp.bps_millions or 0) > 0),
-        "SEC": sum(1 for opp in opportunities if (opp.sec_millions or 0) > 0),
-        "ITOC": sum(1 for opp in opportunities if (opp.itoc_millions or 0) > 0),
-        "MW": sum(1 for opp in opportunities if (opp.mw_millions or 0) > 0)
-    }
+    service_line_counts = {line: row[2 * i + 1] for i, line in enumerate(SERVICE_LINE_COLUMNS)}
     
     # Calculate average deal sizes per service line
     service_line_avg_deal_size = {
@@ -339,9 +273,8 @@ async def get_service_line_forecast(
     logger.info("Generated service line forecast", forecast=forecast)
     return forecast
 
-
 @router.get("/active-service-lines")
-async def get_active_service_lines(
+def get_active_service_lines(
     session: Session = Depends(get_session)
 ):
     """Get count and details of service lines with revenue > 0."""
@@ -382,7 +315,7 @@ async def get_active_service_lines(
 
 
 @router.get("/lead-offerings")
-async def get_lead_offering_forecast(
+def get_lead_offering_forecast(
     session: Session = Depends(get_session),
     stage: Optional[Union[str, List[str]]] = Query(None),
     category: Optional[Union[str, List[str]]] = Query(None),
@@ -401,79 +334,20 @@ async def get_lead_offering_forecast(
         "service_lines": service_lines, "lead_offerings": lead_offerings
     })
     
-    # Fetch categories from database
-    categories_statement = select(OpportunityCategory)
-    categories = session.exec(categories_statement).all()
-    
-    statement = select(Opportunity)
-    
-    if stages:
-        statement = statement.where(Opportunity.sales_stage.in_(stages))
-    
-    opportunities = session.exec(statement).all()
-    
-    # Apply category filter after fetching opportunities (since category is calculated)
-    if categories_list:
-        filtered_opportunities = []
-        for opp in opportunities:
-            opp_category = get_opportunity_category(opp.tcv_millions or 0, categories)
-            if opp_category in categories_list:
-                filtered_opportunities.append(opp)
-        opportunities = filtered_opportunities
-    
-    # Apply service line filter after fetching all opportunities
-    if service_lines:
-        # Filter opportunities that have revenue in any of the specified service lines
-        filtered_opportunities = []
-        for opp in opportunities:
-            has_matching_service_line = False
-            for sl in service_lines:
-                service_line_value = 0
-                if sl == "CES":
-                    service_line_value = opp.ces_millions or 0
-                elif sl == "INS":
-                    service_line_value = opp.ins_millions or 0
-                elif sl == "BPS":
-                    service_line_value = opp.bps_millions or 0
-                elif sl == "SEC":
-                    service_line_value = opp.sec_millions or 0
-                elif sl == "ITOC":
-                    service_line_value = opp.itoc_millions or 0
-                elif sl == "MW":
-                    service_line_value = opp.mw_millions or 0
-                
-                if service_line_value > 0:
-                    has_matching_service_line = True
-                    break
-            
-            if has_matching_service_line:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
-    
-    # Apply lead offering filter after fetching all opportunities
-    if lead_offerings:
-        filtered_opportunities = []
-        for opp in opportunities:
-            if opp.lead_offering_l1 in lead_offerings:
-                filtered_opportunities.append(opp)
-        
-        opportunities = filtered_opportunities
-    
-    # Group by lead offering and calculate totals
-    lead_offering_totals = {}
-    lead_offering_counts = {}
-    lead_offering_deals = {}
-    
-    for opp in opportunities:
-        lead_off = opp.lead_offering_l1
-        if lead_off:
-            tcv = opp.tcv_millions or 0
-            lead_offering_totals[lead_off] = lead_offering_totals.get(lead_off, 0) + tcv
-            lead_offering_counts[lead_off] = lead_offering_counts.get(lead_off, 0) + 1
-            if lead_off not in lead_offering_deals:
-                lead_offering_deals[lead_off] = []
-            lead_offering_deals[lead_off].append(tcv)
+    # Group by lead offering and calculate totals, in order of first appearance
+    conditions = build_opportunity_filters(session, stages, categories_list, service_lines, lead_offerings)
+    lead_offering_rows = session.exec(
+        select(
+            Opportunity.lead_offering_l1,
+            func.sum(func.coalesce(Opportunity.tcv_millions, 0)),
+            func.count(),
+        )
+        .where(*conditions, Opportunity.lead_offering_l1.is_not(None), Opportunity.lead_offering_l1 != "")
+        .group_by(Opportunity.lead_offering_l1)
+        .order_by(func.min(Opportunity.id))
+    ).all()
+    lead_offering_totals = {lead_off: revenue for lead_off, revenue, _ in lead_offering_rows}
+    lead_offering_counts = {lead_off: count for lead_off, _, count in lead_offering_rows}
     
     total_revenue = sum(lead_offering_totals.values())
     
@@ -481,7 +355,6 @@ async def get_lead_offering_forecast(
     lead_offering_data = {}
     for lead_off, revenue in lead_offering_totals.items():
         count = lead_offering_counts.get(lead_off, 0)
-        deals = lead_offering_deals.get(lead_off, [])
         avg_deal_size = revenue / count if count > 0 else 0
         
         lead_offering_data[lead_off] = {
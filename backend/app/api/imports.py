@@ -1,10 +1,8 @@
-from fastapi import APIRouter, Depends, File, UploadFile, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
 from sqlmodel import Session
-from typing import Dict, BinaryIO
+from typing import BinaryIO
 import structlog
 import uuid
-import pandas as pd
-from datetime import datetime
 from pathlib import Path
 import os
 
@@ -16,18 +14,18 @@ except ImportError:
     HAS_MAGIC = False
     magic = None
 
+from app.config import settings
 from app.models.database import engine
 from app.models.opportunity import Opportunity, OpportunityLineItem
-from app.services.excel_import import ImportTask, import_excel_background, import_line_items_background
+from app.services.excel_reader import read_excel_headers
+from app.services.import_jobs import create_import_job, get_import_task, submit_import_job
 
 logger = structlog.get_logger()
 router = APIRouter()
 
-# In-memory task store (use Redis/DB for production)
-import_tasks: Dict[str, ImportTask] = {}
-
 # File validation settings
-MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_FILE_SIZE = settings.max_upload_size_mb * 1024 * 1024
+UPLOAD_COPY_BUFFER_SIZE = 1024 * 1024  # Stream uploads to disk in 1MB blocks
 ALLOWED_EXTENSIONS = {'.xlsx', '.xls'}
 ALLOWED_MIME_TYPES = {
     'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',  # .xlsx
@@ -126,9 +124,9 @@ def validate_file_content(file_path: str) -> None:
         
         # Try to validate Excel file structure
         try:
-            # Test if pandas can read the file (basic structure validation)
-            df = pd.read_excel(file_path, nrows=0)  # Read only headers
-            logger.info("Excel file structure validated", columns=len(df.columns))
+            # Read only the header row (basic structure validation)
+            headers = read_excel_headers(file_path)
+            logger.info("Excel file structure validated", columns=len(headers))
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -169,28 +167,33 @@ def save_uploaded_file(file: UploadFile) -> str:
     file_path = f"/tmp/{safe_filename}"
     
     try:
-        # Read file content and validate size
-        content = file.file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
+        # Copy the upload to disk in blocks, enforcing the size limit as we go
+        size_bytes = 0
+        with open(file_path, "wb") as buffer:
+            while block := file.file.read(UPLOAD_COPY_BUFFER_SIZE):
+                size_bytes += len(block)
+                if size_bytes > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                buffer.write(block)
         
-        if len(content) == 0:
+        if size_bytes == 0:
             raise HTTPException(status_code=400, detail="File is empty")
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        
         # Validate saved file content
         validate_file_content(file_path)
         
-        logger.info("File saved and validated", file_path=file_path, size_bytes=len(content))
+        logger.info("File saved and validated", file_path=file_path, size_bytes=size_bytes)
         return file_path
         
     except HTTPException:
+        # Remove partially written uploads; validate_file_content cleans up after itself
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass
         raise
     except Exception as e:
         # Clean up file if saving fails
@@ -202,8 +205,7 @@ def save_uploaded_file(file: UploadFile) -> str:
 
 
 @router.post("/excel")
-async def import_excel(
-    background_tasks: BackgroundTasks,
+def import_excel(
     file: UploadFile = File(...),
     session: Session = Depends(get_session)
 ):
@@ -215,18 +217,10 @@ async def import_excel(
         # Save and validate file content
         file_path = save_uploaded_file(file)
         
-        # Create task
-        task_id = str(uuid.uuid4())
-        import_tasks[task_id] = ImportTask(
-            task_id=task_id,
-            status="pending",
-            progress=0,
-            message="Excel import queued",
-            start_time=datetime.now().isoformat()
-        )
-        
-        # Start background task
-        background_tasks.add_task(import_excel_background, file_path, task_id, import_tasks)
+        # Record the job, then hand it to the import worker pool
+        task = create_import_job(session, "opportunities", file_path, "Excel import queued")
+        task_id = task.task_id
+        submit_import_job(task_id)
         
         logger.info("Started Excel import", task_id=task_id, filename=file.filename, 
                    file_size=os.path.getsize(file_path))
@@ -240,8 +234,7 @@ async def import_excel(
 
 
 @router.post("/line-items")
-async def import_line_items(
-    background_tasks: BackgroundTasks,
+def import_line_items(
     file: UploadFile = File(...),
     session: Session = Depends(get_session)
 ):
@@ -253,18 +246,10 @@ async def import_line_items(
         # Save and validate file content
         file_path = save_uploaded_file(file)
         
-        # Create task
-        task_id = str(uuid.uuid4())
-        import_tasks[task_id] = ImportTask(
-            task_id=task_id,
-            status="pending", 
-            progress=0,
-            message="Line items import queued",
-            start_time=datetime.now().isoformat()
-        )
-        
-        # Start background task
-        background_tasks.add_task(import_line_items_background, file_path, task_id, import_tasks)
+        # Record the job, then hand it to the import worker pool
+        task = create_import_job(session, "line_items", file_path, "Line items import queued")
+        task_id = task.task_id
+        submit_import_job(task_id)
         
         logger.info("Started line items import", task_id=task_id, filename=file.filename,
                    file_size=os.path.getsize(file_path))
@@ -278,10 +263,11 @@ async def import_line_items(
 
 
 @router.get("/status/{task_id}")
-async def get_import_status(task_id: str):
-    """Get import task status."""
-    task = import_tasks.get(task_id)
+def get_import_status(task_id: str, session: Session = Depends(get_session)):
+    """Get import task status from the shared job store."""
+    task = get_import_task(session, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return task.dict()
\ No newline at end of file
+    # Changed ids are for downstream processing; the polled status only carries their count
+    return {**task.dict(exclude={"changed_ids"}), "changed_count": len(task.changed_ids)}
\ No newline at end of file
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, func, select, or_
 from typing import List, Optional, Union
+from datetime import datetime
 import structlog
 import re
 
@@ -11,15 +13,39 @@ from app.models.opportunity import (
 )
 from app.models.config import OpportunityCategory
 from app.exceptions import (
-    ResourceNotFoundError, ValidationError, DatabaseError, 
+    BusinessLogicError, ResourceNotFoundError, ValidationError, DatabaseError, 
     handle_database_error, ErrorMessages
 )
 from app.logging_utils import log_safely, log_user_action, sanitize_dict
 from app.config import settings
+from app.services.excel_import import OPPORTUNITY_IMPORT_FIELDS
+from app.services.opportunity_export import (
+    COLUMNAR_FORMATS, EXPORT_FORMATS, HAS_PYARROW, export_columns, stream_export
+)
+from app.services.opportunity_search import search_condition, search_opportunities
+from app.services.pagination import (
+    decode_cursor, keyset_condition, keyset_order, next_cursor, parse_sort
+)
 
 logger = structlog.get_logger()
 router = APIRouter()
 
+# Columns the opportunity list can be sorted by; all are indexed so keyset
+# pages stay cheap
+SORTABLE_COLUMNS = {
+    "id": Opportunity.id,
+    "opportunity_id": Opportunity.opportunity_id,
+    "opportunity_name": Opportunity.opportunity_name,
+    "account_name": Opportunity.account_name,
+    "tcv_millions": Opportunity.tcv_millions,
+    "sales_stage": Opportunity.sales_stage,
+    "decision_date": Opportunity.decision_date,
+    "in_forecast": Opportunity.in_forecast,
+    "opportunity_owner": Opportunity.opportunity_owner,
+    "lead_offering_l1": Opportunity.lead_offering_l1,
+    "sales_org_l1": Opportunity.sales_org_l1,
+}
+
 
 def sanitize_search_input(search: str) -> str:
     """
@@ -80,44 +106,18 @@ def parse_multi_param(param: Optional[Union[str, List[str]]]) -> List[str]:
     return param
 
 
-@router.get("/", response_model=List[OpportunityRead])
-async def get_opportunities(
-    session: Session = Depends(get_session),
-    skip: int = Query(0, ge=0),
-    limit: Optional[int] = Query(None, ge=1, le=50000),
-    stage: Optional[Union[str, List[str]]] = Query(None),
-    status: Optional[Union[str, List[str]]] = Query(None),
-    category: Optional[Union[str, List[str]]] = Query(None),
-    search: Optional[str] = Query(None),
-    service_line: Optional[Union[str, List[str]]] = Query(None),
-    custom_tracking_field_2: Optional[Union[str, List[str]]] = Query(None)
-):
-    """Get opportunities with optional filtering."""
-    # Parse multi-select parameters
-    stages = parse_multi_param(stage)
-    statuses = parse_multi_param(status)
-    categories = parse_multi_param(category)
-    service_lines = parse_multi_param(service_line)
-    tracking_colors = parse_multi_param(custom_tracking_field_2)
-    
-    # Use safe logging to avoid exposing sensitive search terms
-    log_safely(
-        logger, "info", "Fetching opportunities",
-        mask_financial=settings.mask_financial_data,
-        skip=skip, 
-        limit=limit, 
-        filters={
-            "stages": stages, 
-            "statuses": statuses, 
-            "categories": categories, 
-            "search": search,  # Will be sanitized if contains sensitive patterns
-            "service_lines": service_lines,
-            "tracking_colors": tracking_colors
-        }
-    )
-    
-    statement = select(Opportunity)
-    
+def build_opportunity_conditions(
+    session: Session,
+    stages: List[str],
+    statuses: List[str],
+    categories: List[str],
+    service_lines: List[str],
+    tracking_colors: List[str],
+    search: Optional[str]
+) -> list:
+    """Build the WHERE conditions for the opportunity list filters."""
+    conditions = []
+
     # Add service line filtering based on opportunity table service line totals
     if service_lines:
         service_line_conditions = []
@@ -136,10 +136,10 @@ async def get_opportunities(
                 service_line_conditions.append(Opportunity.mw_millions > 0)
         
         if service_line_conditions:
-            statement = statement.where(or_(*service_line_conditions))
+            conditions.append(or_(*service_line_conditions))
     
     if stages:
-        statement = statement.where(Opportunity.sales_stage.in_(stages))
+        conditions.append(Opportunity.sales_stage.in_(stages))
     
     if statuses:
         status_conditions = []
@@ -150,7 +150,7 @@ async def get_opportunities(
                 status_conditions.append(Opportunity.in_forecast == 'N')
         
         if status_conditions:
-            statement = statement.where(or_(*status_conditions))
+            conditions.append(or_(*status_conditions))
     
     if categories:
         category_conditions = []
@@ -178,39 +178,195 @@ async def get_opportunities(
                 )
         
         if category_conditions:
-            statement = statement.where(or_(*category_conditions))
+            conditions.append(or_(*category_conditions))
     
     if tracking_colors:
-        statement = statement.where(Opportunity.custom_tracking_field_2.in_(tracking_colors))
+        conditions.append(Opportunity.custom_tracking_field_2.in_(tracking_colors))
     
     if search:
         # Sanitize search input to prevent SQL injection
         sanitized_search = sanitize_search_input(search)
         if sanitized_search:  # Only search if sanitized input is not empty
-            statement = statement.where(
-                (Opportunity.opportunity_name.contains(sanitized_search)) | 
-                (Opportunity.opportunity_id.contains(sanitized_search)) |
-                (Opportunity.account_name.contains(sanitized_search)) |
-                (Opportunity.lead_offering_l1.contains(sanitized_search)) |
-                (Opportunity.sales_org_l1.contains(sanitized_search))
-            )
+            condition = search_condition(session, sanitized_search)
+            if condition is not None:
+                conditions.append(condition)
+
+    return conditions
+
+
+@router.get("/", response_model=List[OpportunityRead])
+def get_opportunities(
+    response: Response,
+    session: Session = Depends(get_session),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=50000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query("id", description="Sort column, prefixed with '-' for descending"),
+    include_total: bool = Query(False, description="Return the filtered row count in X-Total-Count"),
+    stage: Optional[Union[str, List[str]]] = Query(None),
+    status: Optional[Union[str, List[str]]] = Query(None),
+    category: Optional[Union[str, List[str]]] = Query(None),
+    search: Optional[str] = Query(None),
+    service_line: Optional[Union[str, List[str]]] = Query(None),
+    custom_tracking_field_2: Optional[Union[str, List[str]]] = Query(None)
+):
+    """
+    Get opportunities with optional filtering.
+
+    Results are ordered by (sort, id). When more rows follow, the X-Next-Cursor
+    response header holds a cursor; pass it back as `cursor` with the same
+    filters and sort to fetch the next page. `skip` is still honoured for
+    older clients but costs a scan of every skipped row.
+    """
+    sort_spec = parse_sort(sort, SORTABLE_COLUMNS)
+    sort_column = SORTABLE_COLUMNS[sort_spec.key]
+    position = decode_cursor(cursor, sort_spec) if cursor else None
+
+    # Parse multi-select parameters
+    stages = parse_multi_param(stage)
+    statuses = parse_multi_param(status)
+    categories = parse_multi_param(category)
+    service_lines = parse_multi_param(service_line)
+    tracking_colors = parse_multi_param(custom_tracking_field_2)
+    
+    # Use safe logging to avoid exposing sensitive search terms
+    log_safely(
+        logger, "info", "Fetching opportunities",
+        mask_financial=settings.mask_financial_data,
+        skip=skip, 
+        limit=limit, 
+        sort=sort_spec.token,
+        paged_by_cursor=position is not None,
+        filters={
+            "stages": stages, 
+            "statuses": statuses, 
+            "categories": categories, 
+            "search": search,  # Will be sanitized if contains sensitive patterns
+            "service_lines": service_lines,
+            "tracking_colors": tracking_colors
+        }
+    )
     
-    statement = statement.offset(skip)
+    conditions = build_opportunity_conditions(
+        session, stages, statuses, categories, service_lines, tracking_colors, search
+    )
+
+    if include_total:
+        total = session.exec(
+            select(func.count()).select_from(Opportunity).where(*conditions)
+        ).one()
+        response.headers["X-Total-Count"] = str(total)
+
+    statement = select(Opportunity).where(*conditions)
+    if position is not None:
+        statement = statement.where(keyset_condition(sort_column, Opportunity.id, sort_spec, position))
+    elif skip:
+        statement = statement.offset(skip)
+    statement = statement.order_by(*keyset_order(sort_column, Opportunity.id, sort_spec))
     if limit is not None:
-        statement = statement.limit(limit)
+        # One extra row tells whether another page follows
+        statement = statement.limit(limit + 1)
     opportunities = session.exec(statement).all()
+
+    next_page = next_cursor(opportunities, limit, sort_spec)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+        opportunities = opportunities[:limit]
     
     log_safely(
         logger, "info", "Retrieved opportunities", 
         mask_financial=settings.mask_financial_data,
         count=len(opportunities),
+        has_next_page=next_page is not None,
         total_tcv_millions=sum(opp.tcv_millions or 0 for opp in opportunities)
     )
     return opportunities
 
 
+@router.get("/search", response_model=List[OpportunityRead])
+def search_opportunities_ranked(
+    session: Session = Depends(get_session),
+    q: str = Query(..., min_length=1, description="Words to match as prefixes"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """Get the opportunities best matching a search, most relevant first (for typeahead)."""
+    sanitized_search = sanitize_search_input(q)
+    if not sanitized_search:
+        return []
+    return search_opportunities(session, sanitized_search, limit)
+
+
+@router.get("/export")
+def export_opportunities(
+    session: Session = Depends(get_session),
+    format: str = Query("csv", description="csv, parquet, arrow or xlsx"),
+    sort: str = Query("id", description="Sort column, prefixed with '-' for descending"),
+    stage: Optional[Union[str, List[str]]] = Query(None),
+    status: Optional[Union[str, List[str]]] = Query(None),
+    category: Optional[Union[str, List[str]]] = Query(None),
+    search: Optional[str] = Query(None),
+    service_line: Optional[Union[str, List[str]]] = Query(None),
+    custom_tracking_field_2: Optional[Union[str, List[str]]] = Query(None)
+):
+    """
+    Stream every opportunity matching the list filters as a downloadable file.
+
+    Takes the same filters and sort as the opportunity list, without paging.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValidationError(
+            f"Unsupported export format '{format}'", field="format", value=format,
+            details={"allowed": sorted(EXPORT_FORMATS)}
+        )
+    if format in COLUMNAR_FORMATS and not HAS_PYARROW:
+        raise BusinessLogicError(
+            f"{format} export requires the pyarrow package",
+            error_code="EXPORT_FORMAT_UNAVAILABLE",
+            details={"format": format},
+            status_code=501
+        )
+    sort_spec = parse_sort(sort, SORTABLE_COLUMNS)
+
+    stages = parse_multi_param(stage)
+    statuses = parse_multi_param(status)
+    categories = parse_multi_param(category)
+    service_lines = parse_multi_param(service_line)
+    tracking_colors = parse_multi_param(custom_tracking_field_2)
+    log_safely(
+        logger, "info", "Exporting opportunities",
+        mask_financial=settings.mask_financial_data,
+        format=format,
+        sort=sort_spec.token,
+        filters={
+            "stages": stages,
+            "statuses": statuses,
+            "categories": categories,
+            "search": search,
+            "service_lines": service_lines,
+            "tracking_colors": tracking_colors
+        }
+    )
+
+    conditions = build_opportunity_conditions(
+        session, stages, statuses, categories, service_lines, tracking_colors, search
+    )
+    statement = (
+        select(*export_columns())
+        .where(*conditions)
+        .order_by(*keyset_order(SORTABLE_COLUMNS[sort_spec.key], Opportunity.id, sort_spec))
+    )
+
+    export = EXPORT_FORMATS[format]
+    filename = f"opportunities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export['extension']}"
+    return StreamingResponse(
+        stream_export(session, statement, format),
+        media_type=export["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{opportunity_id}", response_model=OpportunityRead)
-async def get_opportunity(opportunity_id: int, session: Session = Depends(get_session)):
+def get_opportunity(opportunity_id: int, session: Session = Depends(get_session)):
     """Get a specific opportunity by ID."""
     try:
         opportunity = session.get(Opportunity, opportunity_id)
@@ -226,7 +382,7 @@ async def get_opportunity(opportunity_id: int, session: Session = Depends(get_se
 
 
 @router.put("/{opportunity_id}", response_model=OpportunityRead)
-async def update_opportunity(
+def update_opportunity(
     opportunity_id: int,
     opportunity_update: OpportunityUpdate,
     session: Session = Depends(get_session)
@@ -244,6 +400,9 @@ async def update_opportunity(
         
         for field, value in update_data.items():
             setattr(opportunity, field, value)
+        if set(OPPORTUNITY_IMPORT_FIELDS).intersection(update_data):
+            # Edited imported fields are restored by the next import, even if its row is unchanged
+            opportunity.import_hash = None
         
         session.add(opportunity)
         session.commit()
@@ -259,7 +418,7 @@ async def update_opportunity(
 
 
 @router.get("/{opportunity_id}/line-items", response_model=List[OpportunityLineItemRead])
-async def get_opportunity_line_items(
+def get_opportunity_line_items(
     opportunity_id: int,
     session: Session = Depends(get_session)
 ):
@@ -278,7 +437,7 @@ async def get_opportunity_line_items(
 
 
 @router.get("/{opportunity_id}/quarterly-revenue")
-async def get_opportunity_quarterly_revenue(
+def get_opportunity_quarterly_revenue(
     opportunity_id: int,
     session: Session = Depends(get_session)
 ):
@@ -1,6 +1,7 @@
 """
 Reports API endpoints for generating pre-defined business reports.
 """
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, Query, HTTPException
@@ -9,6 +10,9 @@ from app.models.database import engine
 from app.models.opportunity import Opportunity, OpportunityLineItem
 from app.models.resources import OpportunityResourceTimeline
 from app.models.config import OpportunityCategory, ServiceLineStageEffort, ServiceLineCategory
+from app.services.config_snapshot import CategoryTier, ConfigSnapshot, get_config_snapshot
+from app.services.report_workers import report_endpoint
+from app.services.resource_calculation import calculate_offering_multiplier
 import structlog
 
 logger = structlog.get_logger()
@@ -23,7 +27,8 @@ def get_session():
 
 
 @router.get("/resource-utilization")
-async def get_resource_utilization_report(
+@report_endpoint
+def get_resource_utilization_report(
     session: Session = Depends(get_session),
     start_date: Optional[datetime] = Query(None, description="Start date for report period"),
     end_date: Optional[datetime] = Query(None, description="End date for report period"),
@@ -118,7 +123,8 @@ async def get_resource_utilization_report(
 
 
 @router.get("/opportunity-pipeline")
-async def get_opportunity_pipeline_report(
+@report_endpoint
+def get_opportunity_pipeline_report(
     session: Session = Depends(get_session),
     service_line: Optional[str] = Query(None, description="Filter by service line"),
     stage: Optional[str] = Query(None, description="Filter by sales stage")
@@ -239,7 +245,8 @@ async def get_opportunity_pipeline_report(
 
 
 @router.get("/service-line-performance")
-async def get_service_line_performance_report(
+@report_endpoint
+def get_service_line_performance_report(
     session: Session = Depends(get_session),
     period_months: int = Query(12, description="Analysis period in months")
 ) -> Dict[str, Any]:
@@ -345,7 +352,8 @@ async def get_service_line_performance_report(
 
 
 @router.get("/stage-duration-analysis")
-async def get_stage_duration_analysis_report(
+@report_endpoint
+def get_stage_duration_analysis_report(
     session: Session = Depends(get_session),
     service_line: Optional[str] = Query(None, description="Filter by service line"),
     category: Optional[str] = Query(None, description="Filter by category")
@@ -476,7 +484,8 @@ async def get_stage_duration_analysis_report(
 
 
 @router.get("/resource-gap-analysis")
-async def get_resource_gap_analysis_report(
+@report_endpoint
+def get_resource_gap_analysis_report(
     session: Session = Depends(get_session),
     forecast_months: int = Query(6, description="Forecast period in months")
 ) -> Dict[str, Any]:
@@ -608,7 +617,8 @@ async def get_resource_gap_analysis_report(
 
 
 @router.get("/service-line-activity-timeline")
-async def get_service_line_activity_timeline_report(
+@report_endpoint
+def get_service_line_activity_timeline_report(
     session: Session = Depends(get_session),
     start_date: Optional[datetime] = Query(None, description="Start date for service line activity"),
     end_date: Optional[datetime] = Query(None, description="End date for service line activity"),
@@ -841,7 +851,8 @@ async def get_service_line_activity_timeline_report(
 
 
 @router.get("/configuration-summary")
-async def get_configuration_summary_report(
+@report_endpoint
+def get_configuration_summary_report(
     session: Session = Depends(get_session)
 ) -> Dict[str, Any]:
     """
@@ -889,55 +900,27 @@ async def get_configuration_summary_report(
         # Get diverse sample opportunities for calculation examples
         # Get opportunities across different categories and scenarios
         
-        # Get one opportunity from each category range
-        diverse_opportunities = []
-        
-        # Sub $5M opportunity
-        sub_5m_opp = session.exec(
-            select(Opportunity).where(
+        # Get one opportunity from each configured category, in category order;
+        # SQLite categorises and returns at most one id per category
+        config = get_config_snapshot(session)
+        category_column = config.timeline_categoriser.case_expression(Opportunity.tcv_millions).label("category")
+        first_by_category = dict(session.exec(
+            select(category_column, func.min(Opportunity.id)).where(
                 Opportunity.tcv_millions.isnot(None),
-                Opportunity.tcv_millions < 5.0,
-                Opportunity.decision_date.isnot(None),
-                Opportunity.sales_stage.isnot(None)
-            ).limit(1)
-        ).first()
-        if sub_5m_opp:
-            diverse_opportunities.append(sub_5m_opp)
-        
-        # Cat C opportunity (5M - 20M)
-        cat_c_opp = session.exec(
-            select(Opportunity).where(
-                Opportunity.tcv_millions >= 5.0,
-                Opportunity.tcv_millions <= 20.0,
-                Opportunity.decision_date.isnot(None),
-                Opportunity.sales_stage.isnot(None)
-            ).limit(1)
-        ).first()
-        if cat_c_opp:
-            diverse_opportunities.append(cat_c_opp)
-        
-        # Cat B opportunity (20M - 100M)
-        cat_b_opp = session.exec(
-            select(Opportunity).where(
-                Opportunity.tcv_millions >= 20.0,
-                Opportunity.tcv_millions <= 100.0,
-                Opportunity.decision_date.isnot(None),
-                Opportunity.sales_stage.isnot(None)
-            ).limit(1)
-        ).first()
-        if cat_b_opp:
-            diverse_opportunities.append(cat_b_opp)
-        
-        # Cat A opportunity (100M+)
-        cat_a_opp = session.exec(
-            select(Opportunity).where(
-                Opportunity.tcv_millions >= 100.0,
                 Opportunity.decision_date.isnot(None),
                 Opportunity.sales_stage.isnot(None)
-            ).limit(1)
-        ).first()
-        if cat_a_opp:
-            diverse_opportunities.append(cat_a_opp)
+            ).group_by(category_column)
+        ).all())
+        first_by_category.pop(None, None)
+        samples = {
+            opp.id: opp for opp in session.exec(
+                select(Opportunity).where(Opportunity.id.in_(list(first_by_category.values())))
+            ).all()
+        }
+        diverse_opportunities = []
+        for cat in opportunity_categories:
+            if cat.name in first_by_category:
+                diverse_opportunities.append(samples[first_by_category.pop(cat.name)])
         
         # Get an opportunity with both MW and ITOC service line TCV
         multi_service_line_opp = session.exec(
@@ -1207,8 +1190,215 @@ async def get_configuration_summary_report(
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
 
+def _prefetch_by_opportunity(session: Session, model, opportunity_ids, *order_by) -> Dict[str, list]:
+    """
+    Load the rows of a per-opportunity table for many opportunities in one query.
+
+    Args:
+        session: Database session
+        model: Table model with an opportunity_id column
+        opportunity_ids: Opportunity IDs, or a select of them
+        order_by: Ordering of the rows within each opportunity
+
+    Returns:
+        Dictionary of opportunity_id -> rows
+    """
+    rows = session.exec(
+        select(model).where(model.opportunity_id.in_(opportunity_ids)).order_by(model.opportunity_id, *order_by)
+    ).all()
+    rows_by_opportunity = defaultdict(list)
+    for row in rows:
+        rows_by_opportunity[row.opportunity_id].append(row)
+    return rows_by_opportunity
+
+
+def _build_service_line_revenue(opportunity: Opportunity, line_items: List[OpportunityLineItem]) -> Dict[str, Dict[str, Any]]:
+    """Build the per service line revenue breakdown of an opportunity and its line items."""
+    service_line_revenue = {
+        "CES": {"opportunity_tcv": opportunity.ces_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
+        "INS": {"opportunity_tcv": opportunity.ins_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
+        "BPS": {"opportunity_tcv": opportunity.bps_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
+        "SEC": {"opportunity_tcv": opportunity.sec_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
+        "ITOC": {"opportunity_tcv": opportunity.itoc_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
+        "MW": {"opportunity_tcv": opportunity.mw_millions or 0, "line_items_tcv": 0, "line_items_count": 0}
+    }
+    
+    # Calculate line items TCV by service line mapping
+    for item in line_items:
+        tcv = item.offering_tcv or 0
+        if item.internal_service:
+            # Map internal service to service line
+            service_line_key = None
+            internal_service_lower = item.internal_service.lower()
+            
+            if any(term in internal_service_lower for term in ["modern workplace", "mw", "workplace", "collaboration", "endpoint"]):
+                service_line_key = "MW"
+            elif any(term in internal_service_lower for term in ["infrastructure", "itoc", "cloud", "data center", "network", "platform"]):
+                service_line_key = "ITOC"
+            elif any(term in internal_service_lower for term in ["ces", "consulting", "enterprise", "strategy"]):
+                service_line_key = "CES"
+            elif any(term in internal_service_lower for term in ["ins", "industry", "sector"]):
+                service_line_key = "INS"
+            elif any(term in internal_service_lower for term in ["bps", "business", "process"]):
+                service_line_key = "BPS"
+            elif any(term in internal_service_lower for term in ["sec", "security", "cyber"]):
+                service_line_key = "SEC"
+            
+            if service_line_key and service_line_key in service_line_revenue:
+                service_line_revenue[service_line_key]["line_items_tcv"] += tcv
+                service_line_revenue[service_line_key]["line_items_count"] += 1
+    
+    return service_line_revenue
+
+
+def _build_stage_timeline(timelines: List[OpportunityResourceTimeline]):
+    """
+    Build the stage timeline of an opportunity with headcount details.
+
+    Returns:
+        Tuple of (stage timeline list, stage timeline grouped by service line)
+    """
+    stage_timeline = []
+    timeline_by_service_line = {}
+    
+    for timeline in timelines:
+        stage_info = {
+            "stage_name": timeline.stage_name,
+            "service_line": timeline.service_line,
+            "fte_required": float(timeline.fte_required),
+            "duration_weeks": float(timeline.duration_weeks),
+            "total_effort_weeks": float(timeline.total_effort_weeks),
+            "stage_start_date": timeline.stage_start_date.isoformat(),
+            "stage_end_date": timeline.stage_end_date.isoformat(),
+            "resource_category": timeline.resource_category,
+            "category": timeline.category
+        }
+        stage_timeline.append(stage_info)
+        
+        # Group by service line for timeline visualization
+        if timeline.service_line not in timeline_by_service_line:
+            timeline_by_service_line[timeline.service_line] = []
+        timeline_by_service_line[timeline.service_line].append(stage_info)
+    
+    return stage_timeline, timeline_by_service_line
+
+
+def _build_mapped_offerings(
+    line_items: List[OpportunityLineItem],
+    timelines: List[OpportunityResourceTimeline],
+    config: ConfigSnapshot
+):
+    """
+    Build the deduplicated offerings of an opportunity with mapping and usage indicators.
+
+    Args:
+        line_items: Line items of the opportunity that have an internal service
+        timelines: Resource timelines of the opportunity
+        config: Configuration snapshot
+
+    Returns:
+        Tuple of (mapped offerings list, mapped offerings grouped by service line)
+    """
+    internal_service_to_sl = config.internal_service_lines
+    # Valid (internal_service, simplified_offering) combinations from ServiceLineOfferingMapping
+    valid_combinations = set().union(*config.offering_mappings.values())
+    
+    mapped_offerings = []
+    service_line_offerings = {}
+    offering_used_in_calculation = set()
+    
+    # Identify which offerings are used in timeline calculations
+    active_service_lines = set(timeline.service_line for timeline in timelines)
+    for item in line_items:
+        if item.internal_service in internal_service_to_sl:
+            sl = internal_service_to_sl[item.internal_service]
+            if sl in active_service_lines:
+                offering_used_in_calculation.add(item.internal_service)
+    
+    # Show ALL offerings but mark which ones are mapped/used in calculations
+    offerings_by_simplified = {}
+    for item in line_items:
+        simplified = item.simplified_offering or "N/A"
+        internal_service = item.internal_service
+        
+        # Check if this exact combination is mapped for calculations
+        is_mapped = (internal_service, simplified) in valid_combinations
+        
+        if simplified not in offerings_by_simplified:
+            # Determine if this simplified offering is used based on its internal service
+            is_used = is_mapped and internal_service in offering_used_in_calculation
+            service_line = internal_service_to_sl.get(internal_service, "Unmapped") if is_mapped else "Unmapped"
+            
+            offerings_by_simplified[simplified] = {
+                "simplified_offering": simplified,
+                "internal_services": set(),
+                "total_tcv": 0,
+                "line_item_count": 0,
+                "used_in_calculation": is_used,
+                "mapped_service_line": service_line,
+                "is_mapped": is_mapped
+            }
+        
+        # Aggregate data
+        offerings_by_simplified[simplified]["total_tcv"] += float(item.offering_tcv) if item.offering_tcv else 0
+        offerings_by_simplified[simplified]["line_item_count"] += 1
+        offerings_by_simplified[simplified]["internal_services"].add(internal_service)
+        
+        # Update usage status if any internal service for this simplified offering is used AND mapped
+        if is_mapped and internal_service in offering_used_in_calculation:
+            offerings_by_simplified[simplified]["used_in_calculation"] = True
+            offerings_by_simplified[simplified]["is_mapped"] = True
+            # Update service line to the one that's actually used in calculation
+            offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
+        
+        # Track if this offering has any mapped internal services (even if not used in timeline)
+        if is_mapped:
+            offerings_by_simplified[simplified]["is_mapped"] = True
+            if offerings_by_simplified[simplified]["mapped_service_line"] == "Unmapped":
+                offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
+    
+    # Convert to final format
+    for simplified_offering, data in offerings_by_simplified.items():
+        # Create internal services list for reference
+        internal_services_list = sorted(list(data["internal_services"]))
+        
+        offering_info = {
+            "simplified_offering": simplified_offering,
+            "internal_services": internal_services_list,
+            "offering_tcv": data["total_tcv"],
+            "line_item_count": data["line_item_count"],
+            "used_in_calculation": data["used_in_calculation"],
+            "mapped_service_line": data["mapped_service_line"],
+            "is_mapped": data.get("is_mapped", False)
+        }
+        mapped_offerings.append(offering_info)
+        
+        # Group by service line
+        sl = data["mapped_service_line"]
+        if sl not in service_line_offerings:
+            service_line_offerings[sl] = []
+        service_line_offerings[sl].append(offering_info)
+    
+    return mapped_offerings, service_line_offerings
+
+
+def _find_report_service_line_category(
+    config: ConfigSnapshot,
+    service_line: str,
+    service_line_tcv: float
+) -> Optional[CategoryTier]:
+    """Find the service line category with the highest min_tcv at or below the service line TCV."""
+    sl_category = None
+    for tier in config.service_line_categories.get(service_line, ()):
+        if tier.min_tcv is not None and tier.min_tcv <= service_line_tcv:
+            if sl_category is None or tier.min_tcv > sl_category.min_tcv:
+                sl_category = tier
+    return sl_category
+
+
 @router.get("/top-average-headcount")
-async def get_top_average_headcount_report(
+@report_endpoint
+def get_top_average_headcount_report(
     session: Session = Depends(get_session)
 ) -> Dict[str, Any]:
     """
@@ -1250,340 +1440,172 @@ async def get_top_average_headcount_report(
 
         results = session.exec(query).all()
 
-        # Group by category and get top 10 for each
-        category_data = {}
+        # Top 10 per category by average headcount (results are ordered by category, then headcount)
+        top_results = []
+        category_counts = {}
         for result in results:
+            if category_counts.get(result.category, 0) < 10:
+                category_counts[result.category] = category_counts.get(result.category, 0) + 1
+                top_results.append(result)
+
+        # Prefetch details of all selected opportunities in one query per table
+        opportunity_ids = list({result.opportunity_id for result in top_results})
+        opportunities = {
+            opp.opportunity_id: opp
+            for opp in session.exec(
+                select(Opportunity).where(Opportunity.opportunity_id.in_(opportunity_ids))
+            ).all()
+        }
+        timelines_by_opportunity = _prefetch_by_opportunity(
+            session, OpportunityResourceTimeline, opportunity_ids,
+            OpportunityResourceTimeline.service_line, OpportunityResourceTimeline.stage_name, OpportunityResourceTimeline.id
+        )
+        line_items_by_opportunity = _prefetch_by_opportunity(
+            session, OpportunityLineItem, opportunity_ids, OpportunityLineItem.id
+        )
+        config = get_config_snapshot(session)
+
+        category_data = {}
+        for result in top_results:
             category = result.category
             if category not in category_data:
                 category_data[category] = []
             
-            if len(category_data[category]) < 10:  # Top 10 per category
-                # Get detailed timeline and offering data for this opportunity
-                timeline_query = select(OpportunityResourceTimeline).where(
-                    OpportunityResourceTimeline.opportunity_id == result.opportunity_id
-                ).order_by(OpportunityResourceTimeline.service_line, OpportunityResourceTimeline.stage_name)
-                
-                timelines = session.exec(timeline_query).all()
-                
-                # Get the full opportunity record for additional details
-                opp_query = select(Opportunity).where(Opportunity.opportunity_id == result.opportunity_id)
-                full_opp = session.exec(opp_query).first()
-                
-                # Get line items to identify mapped offerings
-                line_items_query = select(OpportunityLineItem).where(
-                    OpportunityLineItem.opportunity_id == result.opportunity_id,
-                    OpportunityLineItem.internal_service.isnot(None)
-                )
-                line_items = session.exec(line_items_query).all()
-                
-                # Get ALL line items for service line revenue breakdown
-                all_line_items_query = select(OpportunityLineItem).where(
-                    OpportunityLineItem.opportunity_id == result.opportunity_id
-                )
-                all_line_items = session.exec(all_line_items_query).all()
-                
-                # Build service line revenue breakdown
-                service_line_revenue = {
-                    "CES": {"opportunity_tcv": full_opp.ces_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                    "INS": {"opportunity_tcv": full_opp.ins_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                    "BPS": {"opportunity_tcv": full_opp.bps_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                    "SEC": {"opportunity_tcv": full_opp.sec_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                    "ITOC": {"opportunity_tcv": full_opp.itoc_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                    "MW": {"opportunity_tcv": full_opp.mw_millions or 0, "line_items_tcv": 0, "line_items_count": 0}
-                }
-                
-                # Calculate line items TCV by service line mapping
-                for item in all_line_items:
-                    tcv = item.offering_tcv or 0
-                    if item.internal_service:
-                        # Map internal service to service line
-                        service_line_key = None
-                        internal_service_lower = item.internal_service.lower()
-                        
-                        if any(term in internal_service_lower for term in ["modern workplace", "mw", "workplace", "collaboration", "endpoint"]):
-                            service_line_key = "MW"
-                        elif any(term in internal_service_lower for term in ["infrastructure", "itoc", "cloud", "data center", "network", "platform"]):
-                            service_line_key = "ITOC"
-                        elif any(term in internal_service_lower for term in ["ces", "consulting", "enterprise", "strategy"]):
-                            service_line_key = "CES"
-                        elif any(term in internal_service_lower for term in ["ins", "industry", "sector"]):
-                            service_line_key = "INS"
-                        elif any(term in internal_service_lower for term in ["bps", "business", "process"]):
-                            service_line_key = "BPS"
-                        elif any(term in internal_service_lower for term in ["sec", "security", "cyber"]):
-                            service_line_key = "SEC"
-                        
-                        if service_line_key and service_line_key in service_line_revenue:
-                            service_line_revenue[service_line_key]["line_items_tcv"] += tcv
-                            service_line_revenue[service_line_key]["line_items_count"] += 1
-
-                # Build stage timeline with headcount and enhanced details
-                stage_timeline = []
-                timeline_by_service_line = {}
-                
-                for timeline in timelines:
-                    stage_info = {
-                        "stage_name": timeline.stage_name,
-                        "service_line": timeline.service_line,
-                        "fte_required": float(timeline.fte_required),
-                        "duration_weeks": float(timeline.duration_weeks),
-                        "total_effort_weeks": float(timeline.total_effort_weeks),
-                        "stage_start_date": timeline.stage_start_date.isoformat(),
-                        "stage_end_date": timeline.stage_end_date.isoformat(),
-                        "resource_category": timeline.resource_category,
-                        "category": timeline.category
-                    }
-                    stage_timeline.append(stage_info)
-                    
-                    # Group by service line for timeline visualization
-                    if timeline.service_line not in timeline_by_service_line:
-                        timeline_by_service_line[timeline.service_line] = []
-                    timeline_by_service_line[timeline.service_line].append(stage_info)
-                
-                # Get service line offering mappings for filtering
-                from app.models.config import ServiceLineOfferingMapping
-                offering_mappings = session.exec(
-                    select(ServiceLineOfferingMapping)
-                ).all()
-                
-                # Create mapping dictionary for quick lookup
-                internal_service_to_sl = {}
-                for mapping in offering_mappings:
-                    internal_service_to_sl[mapping.internal_service] = mapping.service_line
-
-                # Build deduplicated mapped offerings list with usage indicators
-                mapped_offerings = []
-                service_line_offerings = {}
-                offering_used_in_calculation = set()
-                
-                # Identify which offerings are used in timeline calculations
-                active_service_lines = set(timeline.service_line for timeline in timelines)
-                for item in line_items:
-                    if item.internal_service in internal_service_to_sl:
-                        sl = internal_service_to_sl[item.internal_service]
-                        if sl in active_service_lines:
-                            offering_used_in_calculation.add(item.internal_service)
-                
-                # Build set of valid (internal_service, simplified_offering) combinations from ServiceLineOfferingMapping
-                # This will be used to determine which offerings are used in calculations
-                from app.models.config import ServiceLineOfferingMapping
-                all_mappings = session.exec(select(ServiceLineOfferingMapping)).all()
-                
-                valid_combinations = set()
-                for mapping in all_mappings:
-                    valid_combinations.add((mapping.internal_service, mapping.simplified_offering))
+            timelines = timelines_by_opportunity.get(result.opportunity_id, [])
+            full_opp = opportunities.get(result.opportunity_id)
+            all_line_items = line_items_by_opportunity.get(result.opportunity_id, [])
+            # Line items with an internal service identify mapped offerings
+            line_items = [item for item in all_line_items if item.internal_service is not None]
+            
+            service_line_revenue = _build_service_line_revenue(full_opp, all_line_items)
+            stage_timeline, timeline_by_service_line = _build_stage_timeline(timelines)
+            mapped_offerings, service_line_offerings = _build_mapped_offerings(line_items, timelines, config)
+
+            # Calculate comprehensive breakdown by service line
+            calculation_breakdown = {}
+            for timeline in timelines:
+                sl = timeline.service_line
+                stage = timeline.stage_name
                 
-                # Show ALL offerings but mark which ones are mapped/used in calculations
-                offerings_by_simplified = {}
-                for item in line_items:
-                    simplified = item.simplified_offering or "N/A"
-                    internal_service = item.internal_service
-                    
-                    # Check if this exact combination is mapped for calculations
-                    is_mapped = (internal_service, simplified) in valid_combinations
+                if sl not in calculation_breakdown:
+                    # Get service line TCV from opportunity
+                    if sl == "MW":
+                        sl_tcv = full_opp.mw_millions or 0
+                    elif sl == "ITOC":
+                        sl_tcv = full_opp.itoc_millions or 0
+                    else:
+                        sl_tcv = 0
                     
-                    if simplified not in offerings_by_simplified:
-                        # Determine if this simplified offering is used based on its internal service
-                        is_used = is_mapped and internal_service in offering_used_in_calculation
-                        service_line = internal_service_to_sl.get(internal_service, "Unmapped") if is_mapped else "Unmapped"
-                        
-                        offerings_by_simplified[simplified] = {
-                            "simplified_offering": simplified,
-                            "internal_services": set(),
-                            "total_tcv": 0,
-                            "line_item_count": 0,
-                            "used_in_calculation": is_used,
-                            "mapped_service_line": service_line,
-                            "is_mapped": is_mapped
-                        }
+                    sl_category = _find_report_service_line_category(config, sl, sl_tcv)
                     
-                    # Aggregate data
-                    offerings_by_simplified[simplified]["total_tcv"] += float(item.offering_tcv) if item.offering_tcv else 0
-                    offerings_by_simplified[simplified]["line_item_count"] += 1
-                    offerings_by_simplified[simplified]["internal_services"].add(internal_service)
+                    # Use the same offering multiplier calculation as timeline generation
+                    offering_multiplier = calculate_offering_multiplier(
+                        full_opp.opportunity_id, sl, stage, session,
+                        config=config, line_items=all_line_items
+                    )
                     
-                    # Update usage status if any internal service for this simplified offering is used AND mapped
-                    if is_mapped and internal_service in offering_used_in_calculation:
-                        offerings_by_simplified[simplified]["used_in_calculation"] = True
-                        offerings_by_simplified[simplified]["is_mapped"] = True
-                        # Update service line to the one that's actually used in calculation
-                        offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
+                    # Get unique offerings count for display (but use the actual multiplier calculation above)
+                    unique_offerings_used = len([
+                        off for off in service_line_offerings.get(sl, [])
+                        if off["used_in_calculation"]
+                    ])
                     
-                    # Track if this offering has any mapped internal services (even if not used in timeline)
-                    if is_mapped:
-                        offerings_by_simplified[simplified]["is_mapped"] = True
-                        if offerings_by_simplified[simplified]["mapped_service_line"] == "Unmapped":
-                            offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
-                
-                # Convert to final format
-                for simplified_offering, data in offerings_by_simplified.items():
-                    # Create internal services list for reference
-                    internal_services_list = sorted(list(data["internal_services"]))
+                    # Get threshold data for display
+                    threshold = config.offering_thresholds.get((sl, stage))
+                    threshold_data = (
+                        {"threshold_count": threshold.threshold_count, "increment_multiplier": threshold.increment_multiplier}
+                        if threshold else {"threshold_count": 4, "increment_multiplier": 0.2}
+                    )
                     
-                    offering_info = {
-                        "simplified_offering": simplified_offering,
-                        "internal_services": internal_services_list,
-                        "offering_tcv": data["total_tcv"],
-                        "line_item_count": data["line_item_count"],
-                        "used_in_calculation": data["used_in_calculation"],
-                        "mapped_service_line": data["mapped_service_line"],
-                        "is_mapped": data.get("is_mapped", False)
+                    calculation_breakdown[sl] = {
+                        "service_line_tcv": sl_tcv,
+                        "resource_category": sl_category.name if sl_category else "Unknown",
+                        "resource_category_range": f"${sl_category.min_tcv}M{' - $' + str(sl_category.max_tcv) + 'M' if sl_category and sl_category.max_tcv else '+'}" if sl_category else "N/A",
+                        "total_base_fte": 0,
+                        "total_final_fte": 0,
+                        "total_effort_weeks": 0,
+                        "unique_offerings_count": unique_offerings_used,
+                        "offering_threshold": threshold_data["threshold_count"],
+                        "increment_multiplier": threshold_data["increment_multiplier"],
+                        "offering_multiplier": offering_multiplier,
+                        "calculation_steps": [],
+                        "stages": []
                     }
-                    mapped_offerings.append(offering_info)
                     
-                    # Group by service line
-                    sl = data["mapped_service_line"]
-                    if sl not in service_line_offerings:
-                        service_line_offerings[sl] = []
-                    service_line_offerings[sl].append(offering_info)
+                # Get base FTE for this stage from configuration
+                configured_fte = config.first_stage_fte.get((sl, stage))
                 
-                # Get offering thresholds for comprehensive calculation explanation
-                from app.models.config import ServiceLineOfferingThreshold
-                offering_thresholds = session.exec(
-                    select(ServiceLineOfferingThreshold)
-                ).all()
+                final_fte = float(timeline.fte_required)
+                duration = float(timeline.duration_weeks)
+                effort_weeks = final_fte * duration
                 
-                # Create threshold mapping
-                threshold_map = {}
-                for threshold in offering_thresholds:
-                    key = f"{threshold.service_line}_{threshold.stage_name}"
-                    threshold_map[key] = {
-                        "threshold_count": threshold.threshold_count,
-                        "increment_multiplier": threshold.increment_multiplier
-                    }
-
-                # Calculate comprehensive breakdown by service line
-                calculation_breakdown = {}
-                for timeline in timelines:
-                    sl = timeline.service_line
-                    stage = timeline.stage_name
-                    
-                    if sl not in calculation_breakdown:
-                        # Get service line TCV from opportunity
-                        if sl == "MW":
-                            sl_tcv = full_opp.mw_millions or 0
-                        elif sl == "ITOC":
-                            sl_tcv = full_opp.itoc_millions or 0
-                        else:
-                            sl_tcv = 0
-                        
-                        # Get service line category and base FTE configuration
-                        from app.models.config import ServiceLineCategory, ServiceLineStageEffort
-                        sl_category_query = select(ServiceLineCategory).where(
-                            ServiceLineCategory.service_line == sl,
-                            ServiceLineCategory.min_tcv <= sl_tcv
-                        ).order_by(ServiceLineCategory.min_tcv.desc())
-                        sl_category = session.exec(sl_category_query).first()
-                        
-                        # Use the same offering multiplier calculation as timeline generation
-                        from app.services.resource_calculation import calculate_offering_multiplier
-                        offering_multiplier = calculate_offering_multiplier(
-                            full_opp.opportunity_id, sl, stage, session
-                        )
-                        
-                        # Get unique offerings count for display (but use the actual multiplier calculation above)
-                        unique_offerings_used = len([
-                            off for off in service_line_offerings.get(sl, [])
-                            if off["used_in_calculation"]
-                        ])
-                        
-                        # Get threshold data for display
-                        threshold_key = f"{sl}_{stage}"
-                        threshold_data = threshold_map.get(threshold_key, {"threshold_count": 4, "increment_multiplier": 0.2})
-                        
-                        calculation_breakdown[sl] = {
-                            "service_line_tcv": sl_tcv,
-                            "resource_category": sl_category.name if sl_category else "Unknown",
-                            "resource_category_range": f"${sl_category.min_tcv}M{' - $' + str(sl_category.max_tcv) + 'M' if sl_category and sl_category.max_tcv else '+'}" if sl_category else "N/A",
-                            "total_base_fte": 0,
-                            "total_final_fte": 0,
-                            "total_effort_weeks": 0,
-                            "unique_offerings_count": unique_offerings_used,
-                            "offering_threshold": threshold_data["threshold_count"],
-                            "increment_multiplier": threshold_data["increment_multiplier"],
-                            "offering_multiplier": offering_multiplier,
-                            "calculation_steps": [],
-                            "stages": []
-                        }
-                    
-                    # Get base FTE for this stage from configuration
-                    stage_effort_query = select(ServiceLineStageEffort).where(
-                        ServiceLineStageEffort.service_line == sl,
-                        ServiceLineStageEffort.stage_name == stage
-                    )
-                    stage_effort = session.exec(stage_effort_query).first()
-                    
-                    final_fte = float(timeline.fte_required)
-                    duration = float(timeline.duration_weeks)
-                    effort_weeks = final_fte * duration
-                    
-                    # Calculate base FTE correctly
-                    multiplier = calculation_breakdown[sl]["offering_multiplier"]
-                    if stage_effort and stage_effort.fte_required > 0:
-                        # Use configured base FTE
-                        base_fte = float(stage_effort.fte_required)
-                        # Verify: base_fte * multiplier should equal final_fte
-                        expected_final = base_fte * multiplier
-                        if abs(expected_final - final_fte) > 0.1:  # Allow small rounding differences
-                            # If there's a significant difference, use reverse calculation
-                            base_fte = final_fte / multiplier if multiplier > 0 else final_fte
-                    else:
-                        # Reverse calculate from final FTE
+                # Calculate base FTE correctly
+                multiplier = calculation_breakdown[sl]["offering_multiplier"]
+                if configured_fte is not None and configured_fte > 0:
+                    # Use configured base FTE
+                    base_fte = float(configured_fte)
+                    # Verify: base_fte * multiplier should equal final_fte
+                    expected_final = base_fte * multiplier
+                    if abs(expected_final - final_fte) > 0.1:  # Allow small rounding differences
+                        # If there's a significant difference, use reverse calculation
                         base_fte = final_fte / multiplier if multiplier > 0 else final_fte
-                    
-                    # Add calculation step explanation
-                    step_explanation = {
-                        "stage": stage,
-                        "base_fte_configured": base_fte,
-                        "offering_multiplier_applied": multiplier,
-                        "final_fte_calculated": final_fte,
-                        "duration_weeks": duration,
-                        "total_effort_weeks": effort_weeks,
-                        "formula": f"{base_fte:.1f} FTE × {multiplier:.2f} multiplier × {duration} weeks = {effort_weeks:.1f} effort weeks"
-                    }
-                    calculation_breakdown[sl]["calculation_steps"].append(step_explanation)
-                    
-                    # Add stage details
-                    calculation_breakdown[sl]["stages"].append({
-                        "stage_name": stage,
-                        "base_fte": base_fte,
-                        "final_fte": final_fte,
-                        "duration_weeks": duration,
-                        "total_effort_weeks": effort_weeks
-                    })
-                    
-                    # Update totals
-                    calculation_breakdown[sl]["total_base_fte"] += base_fte
-                    calculation_breakdown[sl]["total_final_fte"] += final_fte
-                    calculation_breakdown[sl]["total_effort_weeks"] += effort_weeks
-
-                # Calculate total ITOC + MW revenue for sorting (the service lines with resource planning)
-                itoc_mw_total_revenue = (
-                    service_line_revenue.get("ITOC", {}).get("opportunity_tcv", 0) +
-                    service_line_revenue.get("MW", {}).get("opportunity_tcv", 0)
-                )
-
-                category_data[category].append({
-                    "opportunity_id": result.opportunity_id,
-                    "opportunity_name": result.opportunity_name,
-                    "account_name": result.account_name,
-                    "sales_stage": result.sales_stage,
-                    "tcv_millions": float(result.tcv_millions) if result.tcv_millions else 0,
-                    "decision_date": result.decision_date.isoformat() if result.decision_date else None,
-                    "close_date": full_opp.decision_date.isoformat() if full_opp and full_opp.decision_date else None,
-                    "opportunity_owner": result.opportunity_owner,
-                    "opportunity_category": result.category,
-                    "lead_offering_l1": full_opp.lead_offering_l1 if full_opp else None,
-                    "avg_headcount": float(result.avg_headcount),
-                    "total_effort_weeks": float(result.total_effort),
-                    "category": result.category,
-                    "itoc_mw_total_revenue": itoc_mw_total_revenue,
-                    "service_line_revenue": service_line_revenue,
-                    "stage_timeline": stage_timeline,
-                    "timeline_by_service_line": timeline_by_service_line,
-                    "mapped_offerings": mapped_offerings,
-                    "calculation_breakdown": calculation_breakdown
+                else:
+                    # Reverse calculate from final FTE
+                    base_fte = final_fte / multiplier if multiplier > 0 else final_fte
+                
+                # Add calculation step explanation
+                step_explanation = {
+                    "stage": stage,
+                    "base_fte_configured": base_fte,
+                    "offering_multiplier_applied": multiplier,
+                    "final_fte_calculated": final_fte,
+                    "duration_weeks": duration,
+                    "total_effort_weeks": effort_weeks,
+                    "formula": f"{base_fte:.1f} FTE × {multiplier:.2f} multiplier × {duration} weeks = {effort_weeks:.1f} effort weeks"
+                }
+                calculation_breakdown[sl]["calculation_steps"].append(step_explanation)
+                
+                # Add stage details
+                calculation_breakdown[sl]["stages"].append({
+                    "stage_name": stage,
+                    "base_fte": base_fte,
+                    "final_fte": final_fte,
+                    "duration_weeks": duration,
+                    "total_effort_weeks": effort_weeks
                 })
+                
+                # Update totals
+                calculation_breakdown[sl]["total_base_fte"] += base_fte
+                calculation_breakdown[sl]["total_final_fte"] += final_fte
+                calculation_breakdown[sl]["total_effort_weeks"] += effort_weeks
+
+            # Calculate total ITOC + MW revenue for sorting (the service lines with resource planning)
+            itoc_mw_total_revenue = (
+                service_line_revenue.get("ITOC", {}).get("opportunity_tcv", 0) +
+                service_line_revenue.get("MW", {}).get("opportunity_tcv", 0)
+            )
+
+            category_data[category].append({
+                "opportunity_id": result.opportunity_id,
+                "opportunity_name": result.opportunity_name,
+                "account_name": result.account_name,
+                "sales_stage": result.sales_stage,
+                "tcv_millions": float(result.tcv_millions) if result.tcv_millions else 0,
+                "decision_date": result.decision_date.isoformat() if result.decision_date else None,
+                "close_date": full_opp.decision_date.isoformat() if full_opp and full_opp.decision_date else None,
+                "opportunity_owner": result.opportunity_owner,
+                "opportunity_category": result.category,
+                "lead_offering_l1": full_opp.lead_offering_l1 if full_opp else None,
+                "avg_headcount": float(result.avg_headcount),
+                "total_effort_weeks": float(result.total_effort),
+                "category": result.category,
+                "itoc_mw_total_revenue": itoc_mw_total_revenue,
+                "service_line_revenue": service_line_revenue,
+                "stage_timeline": stage_timeline,
+                "timeline_by_service_line": timeline_by_service_line,
+                "mapped_offerings": mapped_offerings,
+                "calculation_breakdown": calculation_breakdown
+            })
 
         # Sort each category by ITOC + MW total revenue descending (the service lines with resource planning), then take top 10
         for category in category_data:
@@ -1628,7 +1650,8 @@ async def get_top_average_headcount_report(
 
 
 @router.get("/top-itoc-mw-revenue-with-status")
-async def get_top_itoc_mw_revenue_with_status_report(
+@report_endpoint
+def get_top_itoc_mw_revenue_with_status_report(
     session: Session = Depends(get_session)
 ) -> Dict[str, Any]:
     """
@@ -1639,7 +1662,7 @@ async def get_top_itoc_mw_revenue_with_status_report(
     try:
         # Get ALL opportunities with RED, AMBER, or GREEN status from any sales stage
         # Include both opportunities with and without calculated timelines
-        base_query = select(Opportunity).where(
+        rag_status_filter = (
             # FILTER: Only include opportunities with RED, AMBER, or GREEN status
             Opportunity.custom_tracking_field_2.isnot(None),
             (
@@ -1648,7 +1671,8 @@ async def get_top_itoc_mw_revenue_with_status_report(
                 (Opportunity.custom_tracking_field_2.ilike('%GREEN%')) |
                 (Opportunity.custom_tracking_field_2.ilike('%YELLOW%'))  # YELLOW maps to AMBER
             )
-        ).order_by(Opportunity.tcv_millions.desc())
+        )
+        base_query = select(Opportunity).where(*rag_status_filter).order_by(Opportunity.tcv_millions.desc())
 
         opportunities = session.exec(base_query).all()
 
@@ -1679,30 +1703,32 @@ async def get_top_itoc_mw_revenue_with_status_report(
                 "generated_at": datetime.utcnow().isoformat()
             }
 
-        # Process each opportunity and determine category
+        # Prefetch timelines and line items of all matched opportunities, grouped by opportunity_id
+        matched_ids = select(Opportunity.opportunity_id).where(*rag_status_filter)
+        timelines_by_opportunity = _prefetch_by_opportunity(
+            session, OpportunityResourceTimeline, matched_ids,
+            OpportunityResourceTimeline.service_line, OpportunityResourceTimeline.stage_name, OpportunityResourceTimeline.id
+        )
+        line_items_by_opportunity = _prefetch_by_opportunity(
+            session, OpportunityLineItem, matched_ids, OpportunityLineItem.id
+        )
+        config = get_config_snapshot(session)
+
+        # Determine categories from TCV with the configured timeline tiers (same logic as timeline generation)
+        opportunity_categories = config.timeline_categories_for(
+            [opp.tcv_millions or None for opp in opportunities]
+        )
+        
+        # Process each opportunity
         category_data = {}
-        for opp in opportunities:
-            # Determine category based on TCV (same logic as timeline generation)
-            category = "Unknown"
-            if opp.tcv_millions:
-                if opp.tcv_millions >= 25:
-                    category = "Cat A"
-                elif opp.tcv_millions >= 5:
-                    category = "Cat B"
-                elif opp.tcv_millions >= 1:
-                    category = "Cat C"
-                else:
-                    category = "Sub $5M"
+        for opp, category in zip(opportunities, opportunity_categories):
+            category = category or "Unknown"
             
             if category not in category_data:
                 category_data[category] = []
             
-            # Get detailed timeline data for this opportunity (may be empty)
-            timeline_query = select(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-            ).order_by(OpportunityResourceTimeline.service_line, OpportunityResourceTimeline.stage_name)
-            
-            timelines = session.exec(timeline_query).all()
+            # Detailed timeline data for this opportunity (may be empty)
+            timelines = timelines_by_opportunity.get(opp.opportunity_id, [])
             
             # Calculate average headcount and total effort from timelines (if any)
             avg_headcount = 0
@@ -1711,172 +1737,14 @@ async def get_top_itoc_mw_revenue_with_status_report(
                 avg_headcount = sum(float(t.fte_required) for t in timelines) / len(timelines)
                 total_effort = sum(float(t.total_effort_weeks) for t in timelines)
             
-            # Get line items to identify mapped offerings
-            line_items_query = select(OpportunityLineItem).where(
-                OpportunityLineItem.opportunity_id == opp.opportunity_id,
-                OpportunityLineItem.internal_service.isnot(None)
-            )
-            line_items = session.exec(line_items_query).all()
-            
-            # Get ALL line items for service line revenue breakdown
-            all_line_items_query = select(OpportunityLineItem).where(
-                OpportunityLineItem.opportunity_id == opp.opportunity_id
-            )
-            all_line_items = session.exec(all_line_items_query).all()
-            
-            # Build service line revenue breakdown
-            service_line_revenue = {
-                "CES": {"opportunity_tcv": opp.ces_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                "INS": {"opportunity_tcv": opp.ins_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                "BPS": {"opportunity_tcv": opp.bps_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                "SEC": {"opportunity_tcv": opp.sec_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                "ITOC": {"opportunity_tcv": opp.itoc_millions or 0, "line_items_tcv": 0, "line_items_count": 0},
-                "MW": {"opportunity_tcv": opp.mw_millions or 0, "line_items_tcv": 0, "line_items_count": 0}
-            }
-            
-            # Calculate line items TCV by service line mapping (same as original report)
-            for item in all_line_items:
-                tcv = item.offering_tcv or 0
-                if item.internal_service:
-                    # Map internal service to service line
-                    service_line_key = None
-                    internal_service_lower = item.internal_service.lower()
-                    
-                    if any(term in internal_service_lower for term in ["modern workplace", "mw", "workplace", "collaboration", "endpoint"]):
-                        service_line_key = "MW"
-                    elif any(term in internal_service_lower for term in ["infrastructure", "itoc", "cloud", "data center", "network", "platform"]):
-                        service_line_key = "ITOC"
-                    elif any(term in internal_service_lower for term in ["ces", "consulting", "enterprise", "strategy"]):
-                        service_line_key = "CES"
-                    elif any(term in internal_service_lower for term in ["ins", "industry", "sector"]):
-                        service_line_key = "INS"
-                    elif any(term in internal_service_lower for term in ["bps", "business", "process"]):
-                        service_line_key = "BPS"
-                    elif any(term in internal_service_lower for term in ["sec", "security", "cyber"]):
-                        service_line_key = "SEC"
-                    
-                    if service_line_key and service_line_key in service_line_revenue:
-                        service_line_revenue[service_line_key]["line_items_tcv"] += tcv
-                        service_line_revenue[service_line_key]["line_items_count"] += 1
-
-            # Build stage timeline with headcount and enhanced details (same as original report)
-            stage_timeline = []
-            timeline_by_service_line = {}
-            
-            for timeline in timelines:
-                stage_info = {
-                    "stage_name": timeline.stage_name,
-                    "service_line": timeline.service_line,
-                    "fte_required": float(timeline.fte_required),
-                    "duration_weeks": float(timeline.duration_weeks),
-                    "total_effort_weeks": float(timeline.total_effort_weeks),
-                    "stage_start_date": timeline.stage_start_date.isoformat(),
-                    "stage_end_date": timeline.stage_end_date.isoformat(),
-                    "resource_category": timeline.resource_category,
-                    "category": timeline.category
-                }
-                stage_timeline.append(stage_info)
-                
-                # Group by service line for timeline visualization
-                if timeline.service_line not in timeline_by_service_line:
-                    timeline_by_service_line[timeline.service_line] = []
-                timeline_by_service_line[timeline.service_line].append(stage_info)
-            
-            # Get service line offering mappings for filtering (same as original report)
-            from app.models.config import ServiceLineOfferingMapping
-            offering_mappings = session.exec(
-                select(ServiceLineOfferingMapping)
-            ).all()
-            
-            # Create mapping dictionary for quick lookup
-            internal_service_to_sl = {}
-            for mapping in offering_mappings:
-                internal_service_to_sl[mapping.internal_service] = mapping.service_line
-
-            # Build deduplicated mapped offerings list with usage indicators (same as original report)
-            mapped_offerings = []
-            service_line_offerings = {}
-            offering_used_in_calculation = set()
-            
-            # Identify which offerings are used in timeline calculations
-            active_service_lines = set(timeline.service_line for timeline in timelines)
-            for item in line_items:
-                if item.internal_service in internal_service_to_sl:
-                    sl = internal_service_to_sl[item.internal_service]
-                    if sl in active_service_lines:
-                        offering_used_in_calculation.add(item.internal_service)
-            
-            # Build set of valid combinations from ServiceLineOfferingMapping
-            from app.models.config import ServiceLineOfferingMapping
-            all_mappings = session.exec(select(ServiceLineOfferingMapping)).all()
+            all_line_items = line_items_by_opportunity.get(opp.opportunity_id, [])
+            # Line items with an internal service identify mapped offerings
+            line_items = [item for item in all_line_items if item.internal_service is not None]
             
-            valid_combinations = set()
-            for mapping in all_mappings:
-                valid_combinations.add((mapping.internal_service, mapping.simplified_offering))
-            
-            # Show ALL offerings but mark which ones are mapped/used in calculations
-            offerings_by_simplified = {}
-            for item in line_items:
-                simplified = item.simplified_offering or "N/A"
-                internal_service = item.internal_service
-                
-                # Check if this exact combination is mapped for calculations
-                is_mapped = (internal_service, simplified) in valid_combinations
-                
-                if simplified not in offerings_by_simplified:
-                    # Determine if this simplified offering is used based on its internal service
-                    is_used = is_mapped and internal_service in offering_used_in_calculation
-                    service_line = internal_service_to_sl.get(internal_service, "Unmapped") if is_mapped else "Unmapped"
-                    
-                    offerings_by_simplified[simplified] = {
-                        "simplified_offering": simplified,
-                        "internal_services": set(),
-                        "total_tcv": 0,
-                        "line_item_count": 0,
-                        "used_in_calculation": is_used,
-                        "mapped_service_line": service_line,
-                        "is_mapped": is_mapped
-                    }
-                
-                # Aggregate data
-                offerings_by_simplified[simplified]["total_tcv"] += float(item.offering_tcv) if item.offering_tcv else 0
-                offerings_by_simplified[simplified]["line_item_count"] += 1
-                offerings_by_simplified[simplified]["internal_services"].add(internal_service)
-                
-                # Update usage status if any internal service for this simplified offering is used AND mapped
-                if is_mapped and internal_service in offering_used_in_calculation:
-                    offerings_by_simplified[simplified]["used_in_calculation"] = True
-                    offerings_by_simplified[simplified]["is_mapped"] = True
-                    # Update service line to the one that's actually used in calculation
-                    offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
-                
-                # Track if this offering has any mapped internal services (even if not used in timeline)
-                if is_mapped:
-                    offerings_by_simplified[simplified]["is_mapped"] = True
-                    if offerings_by_simplified[simplified]["mapped_service_line"] == "Unmapped":
-                        offerings_by_simplified[simplified]["mapped_service_line"] = internal_service_to_sl.get(internal_service, "Unmapped")
-            
-            # Convert to final format
-            for simplified_offering, data in offerings_by_simplified.items():
-                # Create internal services list for reference
-                internal_services_list = sorted(list(data["internal_services"]))
-                
-                offering_info = {
-                    "simplified_offering": simplified_offering,
-                    "internal_services": internal_services_list,
-                    "offering_tcv": data["total_tcv"],
-                    "line_item_count": data["line_item_count"],
-                    "used_in_calculation": data["used_in_calculation"],
-                    "mapped_service_line": data["mapped_service_line"],
-                    "is_mapped": data.get("is_mapped", False)
-                }
-                mapped_offerings.append(offering_info)
-                
-                # Group by service line
-                sl = data["mapped_service_line"]
-                if sl not in service_line_offerings:
-                    service_line_offerings[sl] = []
-                service_line_offerings[sl].append(offering_info)
+            # Same breakdowns as the original report
+            service_line_revenue = _build_service_line_revenue(opp, all_line_items)
+            stage_timeline, timeline_by_service_line = _build_stage_timeline(timelines)
+            mapped_offerings, service_line_offerings = _build_mapped_offerings(line_items, timelines, config)
             
             # Get calculation breakdown (same as original report)
             calculation_breakdown = {}
@@ -1893,18 +1761,12 @@ async def get_top_itoc_mw_revenue_with_status_report(
                     else:
                         sl_tcv = 0
                     
-                    # Get service line category and base FTE configuration
-                    from app.models.config import ServiceLineCategory, ServiceLineStageEffort
-                    sl_category_query = select(ServiceLineCategory).where(
-                        ServiceLineCategory.service_line == sl,
-                        ServiceLineCategory.min_tcv <= sl_tcv
-                    ).order_by(ServiceLineCategory.min_tcv.desc())
-                    sl_category = session.exec(sl_category_query).first()
+                    sl_category = _find_report_service_line_category(config, sl, sl_tcv)
                     
                     # Use the same offering multiplier calculation as timeline generation
-                    from app.services.resource_calculation import calculate_offering_multiplier
                     offering_multiplier = calculate_offering_multiplier(
-                        opp.opportunity_id, sl, stage, session
+                        opp.opportunity_id, sl, stage, session,
+                        config=config, line_items=all_line_items
                     )
                     
                     # Get unique offerings count for display
@@ -1932,19 +1794,13 @@ async def get_top_itoc_mw_revenue_with_status_report(
                 effort_weeks = final_fte * duration
                 
                 # Get base FTE from service line stage effort configuration
-                stage_effort = session.exec(
-                    select(ServiceLineStageEffort).where(
-                        ServiceLineStageEffort.service_line == sl,
-                        ServiceLineStageEffort.stage_name == stage,
-                        ServiceLineStageEffort.service_line_category_id == (sl_category.id if sl_category else None)
-                    )
-                ).first()
+                configured_fte = config.stage_fte.get((sl, sl_category.name, stage)) if sl_category else None
                 
                 # Calculate base FTE correctly
                 multiplier = calculation_breakdown[sl]["offering_multiplier"]
-                if stage_effort and stage_effort.fte_required > 0:
+                if configured_fte is not None and configured_fte > 0:
                     # Use configured base FTE
-                    base_fte = float(stage_effort.fte_required)
+                    base_fte = float(configured_fte)
                     # Verify: base_fte * multiplier should equal final_fte
                     expected_final = base_fte * multiplier
                     if abs(expected_final - final_fte) > 0.1:  # Allow small rounding differences
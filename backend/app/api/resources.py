@@ -2,11 +2,13 @@
 Resource forecasting API endpoints for FTE timeline calculations.
 """
 from datetime import datetime, timedelta
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from collections import defaultdict
+import time
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, select, delete, func
 from pydantic import BaseModel
+import structlog
 
 from app.models.database import engine
 from app.models.resources import (
@@ -19,9 +21,26 @@ from app.models.opportunity import Opportunity, OpportunityLineItem
 from app.services.resource_calculation import (
     calculate_opportunity_resource_timeline,
     aggregate_portfolio_resource_forecast,
+    is_opportunity_eligible,
     SUPPORTED_SERVICE_LINES,
     SALES_STAGES_ORDER
 )
+from app.services.config_snapshot import ConfigSnapshot, get_config_snapshot
+from app.services.interval_sweep import day_index_range, period_peak_stages
+from app.services.missing_timelines import count_missing_timelines
+from app.services.parallel_timelines import compute_timelines
+from app.services.portfolio_aggregate import load_daily_fte, portfolio_aggregate_update
+from app.services.timeline_generation import (
+    count_timeline_status,
+    load_eligibility_profiles,
+    load_line_items_by_opportunity,
+    load_opportunities_for_generation,
+    load_timeline_status,
+    replace_timelines,
+)
+from app.services.timeline_recalculation import get_recalculation_status
+
+logger = structlog.get_logger()
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
@@ -81,49 +100,51 @@ def calculate_and_store_timeline(
         if total_fte == 0:
             raise ValueError("Cannot create timeline with zero FTE requirements across all stages")
         
-        # Clear existing timeline data for this opportunity (using string opportunity_id from timeline_data)
-        session.exec(
-            delete(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.opportunity_id == timeline_data["opportunity_id"]
+        # Keep the portfolio aggregate in step with the replaced rows
+        with portfolio_aggregate_update(session, [timeline_data["opportunity_id"]]):
+            # Clear existing timeline data for this opportunity (using string opportunity_id from timeline_data)
+            session.exec(
+                delete(OpportunityResourceTimeline).where(
+                    OpportunityResourceTimeline.opportunity_id == timeline_data["opportunity_id"]
+                )
             )
-        )
-        
-        # Store new timeline data
-        total_effort_weeks = 0
-        earliest_start_date = None
-        service_lines = []
-        
-        for service_line, stages in timeline_data["service_line_timelines"].items():
-            service_lines.append(service_line)
             
-            # Get resource category for this service line
-            resource_category = None
-            if "service_line_categories" in timeline_data and service_line in timeline_data["service_line_categories"]:
-                resource_category = timeline_data["service_line_categories"][service_line]["resource_category"]
+            # Store new timeline data
+            total_effort_weeks = 0
+            earliest_start_date = None
+            service_lines = []
             
-            for stage_data in stages:
-                timeline_record = OpportunityResourceTimeline(
-                    opportunity_id=timeline_data["opportunity_id"],
-                    service_line=service_line,
-                    stage_name=stage_data["stage_name"],
-                    stage_start_date=stage_data["stage_start_date"],
-                    stage_end_date=stage_data["stage_end_date"],
-                    duration_weeks=stage_data["duration_weeks"],
-                    fte_required=stage_data["fte_required"],
-                    total_effort_weeks=stage_data["total_effort_weeks"],
-                    opportunity_name=timeline_data["opportunity_name"],
-                    category=timeline_data["category"],
-                    resource_category=resource_category or stage_data.get("resource_category"),
-                    tcv_millions=timeline_data["tcv_millions"],
-                    decision_date=timeline_data["decision_date"],
-                    calculated_date=datetime.utcnow()
-                )
-                session.add(timeline_record)
+            for service_line, stages in timeline_data["service_line_timelines"].items():
+                service_lines.append(service_line)
                 
-                # Track summary metrics
-                total_effort_weeks += stage_data["total_effort_weeks"]
-                if earliest_start_date is None or stage_data["stage_start_date"] < earliest_start_date:
-                    earliest_start_date = stage_data["stage_start_date"]
+                # Get resource category for this service line
+                resource_category = None
+                if "service_line_categories" in timeline_data and service_line in timeline_data["service_line_categories"]:
+                    resource_category = timeline_data["service_line_categories"][service_line]["resource_category"]
+                
+                for stage_data in stages:
+                    timeline_record = OpportunityResourceTimeline(
+                        opportunity_id=timeline_data["opportunity_id"],
+                        service_line=service_line,
+                        stage_name=stage_data["stage_name"],
+                        stage_start_date=stage_data["stage_start_date"],
+                        stage_end_date=stage_data["stage_end_date"],
+                        duration_weeks=stage_data["duration_weeks"],
+                        fte_required=stage_data["fte_required"],
+                        total_effort_weeks=stage_data["total_effort_weeks"],
+                        opportunity_name=timeline_data["opportunity_name"],
+                        category=timeline_data["category"],
+                        resource_category=resource_category or stage_data.get("resource_category"),
+                        tcv_millions=timeline_data["tcv_millions"],
+                        decision_date=timeline_data["decision_date"],
+                        calculated_date=datetime.utcnow()
+                    )
+                    session.add(timeline_record)
+                    
+                    # Track summary metrics
+                    total_effort_weeks += stage_data["total_effort_weeks"]
+                    if earliest_start_date is None or stage_data["stage_start_date"] < earliest_start_date:
+                        earliest_start_date = stage_data["stage_start_date"]
         
         session.commit()
         
@@ -246,11 +267,12 @@ def delete_opportunity_timeline(
         raise HTTPException(status_code=404, detail="Opportunity not found")
     
     # Delete timeline records using string opportunity_id
-    result = session.exec(
-        delete(OpportunityResourceTimeline).where(
-            OpportunityResourceTimeline.opportunity_id == opportunity.opportunity_id
+    with portfolio_aggregate_update(session, [opportunity.opportunity_id]):
+        result = session.exec(
+            delete(OpportunityResourceTimeline).where(
+                OpportunityResourceTimeline.opportunity_id == opportunity.opportunity_id
+            )
         )
-    )
     
     session.commit()
     
@@ -306,11 +328,12 @@ def update_resource_timeline_status(
     
     # Update status and last_updated timestamp
     updated_count = 0
-    for record in timeline_records:
-        record.resource_status = status_update.resource_status
-        record.last_updated = datetime.utcnow()
-        session.add(record)
-        updated_count += 1
+    with portfolio_aggregate_update(session, [opportunity.opportunity_id]):
+        for record in timeline_records:
+            record.resource_status = status_update.resource_status
+            record.last_updated = datetime.utcnow()
+            session.add(record)
+            updated_count += 1
     
     session.commit()
     
@@ -354,15 +377,16 @@ def update_resource_timeline_data(
         raise HTTPException(status_code=404, detail="Timeline record not found")
     
     # Update the record
-    timeline_record.stage_start_date = timeline_update.stage_start_date
-    timeline_record.stage_end_date = timeline_update.stage_end_date
-    timeline_record.duration_weeks = timeline_update.duration_weeks
-    timeline_record.fte_required = timeline_update.fte_required
-    timeline_record.total_effort_weeks = timeline_update.duration_weeks * timeline_update.fte_required
-    timeline_record.resource_status = timeline_update.resource_status
-    timeline_record.last_updated = datetime.utcnow()
-    
-    session.add(timeline_record)
+    with portfolio_aggregate_update(session, [opportunity.opportunity_id]):
+        timeline_record.stage_start_date = timeline_update.stage_start_date
+        timeline_record.stage_end_date = timeline_update.stage_end_date
+        timeline_record.duration_weeks = timeline_update.duration_weeks
+        timeline_record.fte_required = timeline_update.fte_required
+        timeline_record.total_effort_weeks = timeline_update.duration_weeks * timeline_update.fte_required
+        timeline_record.resource_status = timeline_update.resource_status
+        timeline_record.last_updated = datetime.utcnow()
+        
+        session.add(timeline_record)
     session.commit()
     
     return {
@@ -389,100 +413,76 @@ def get_portfolio_resource_forecast(
     service_line: List[str] = Query(default=[], description="Filter by service lines"),
     category: List[str] = Query(default=[], description="Filter by categories"), 
     stage: List[str] = Query(default=[], description="Filter by stages"),
-    limit: int = Query(100, description="Maximum opportunities to process"),
+    limit: int = Query(100, description="Deprecated: the forecast always covers every stored timeline"),
     session: Session = Depends(get_session)
 ):
     """
     Get aggregated resource forecast across portfolio of opportunities.
     
     This endpoint aggregates stored timeline data to provide portfolio-level
-    resource requirements over time periods.
+    resource requirements over time periods. Summary totals are grouped in SQL
+    and the time series is a date range read of the portfolio_fte_daily aggregate.
     """
-    # Build query for timeline records
-    query = select(OpportunityResourceTimeline)
-    
-    # Apply date filters (ensure timezone handling)
-    if start_date:
-        # Remove timezone info for SQLite comparison
-        start_date_naive = start_date.replace(tzinfo=None) if start_date.tzinfo else start_date
-        query = query.where(OpportunityResourceTimeline.stage_end_date >= start_date_naive)
-    if end_date:
-        # Remove timezone info for SQLite comparison
-        end_date_naive = end_date.replace(tzinfo=None) if end_date.tzinfo else end_date
-        query = query.where(OpportunityResourceTimeline.stage_start_date <= end_date_naive)
-    
-    # Use the list parameters directly (FastAPI handles multiple query params as lists)
-    service_line_filters = service_line
-    category_filters = category
-    stage_filters = stage
-    
-    # Get all timeline records (don't apply business logic filters yet for time period forecast)
-    timeline_records = session.exec(query.limit(limit * 10)).all()
+    # Remove timezone info for SQLite comparison
+    start_date_naive = start_date.replace(tzinfo=None) if start_date and start_date.tzinfo else start_date
+    end_date_naive = end_date.replace(tzinfo=None) if end_date and end_date.tzinfo else end_date
+    
+    # Summary stats over every stored stage overlapping the date range
+    filters = []
+    if start_date_naive:
+        filters.append(OpportunityResourceTimeline.stage_end_date >= start_date_naive)
+    if end_date_naive:
+        filters.append(OpportunityResourceTimeline.stage_start_date <= end_date_naive)
+    if service_line:
+        filters.append(OpportunityResourceTimeline.service_line.in_(service_line))
+    if category:
+        filters.append(OpportunityResourceTimeline.category.in_(category))
+    if stage:
+        filters.append(OpportunityResourceTimeline.stage_name.in_(stage))
     
-    # Apply all filters for non-time-series aggregations
-    filtered_timeline_records = timeline_records
-    if service_line_filters:
-        filtered_timeline_records = [r for r in filtered_timeline_records if r.service_line in service_line_filters]
-    if category_filters:
-        filtered_timeline_records = [r for r in filtered_timeline_records if r.category in category_filters]
-    if stage_filters:
-        filtered_timeline_records = [r for r in filtered_timeline_records if r.stage_name in stage_filters]
+    effort_rows = session.exec(
+        select(
+            OpportunityResourceTimeline.service_line,
+            OpportunityResourceTimeline.stage_name,
+            OpportunityResourceTimeline.category,
+            func.sum(OpportunityResourceTimeline.total_effort_weeks)
+        )
+        .where(*filters)
+        .group_by(
+            OpportunityResourceTimeline.service_line,
+            OpportunityResourceTimeline.stage_name,
+            OpportunityResourceTimeline.category
+        )
+    ).all()
+    opportunity_count = session.exec(
+        select(func.count(func.distinct(OpportunityResourceTimeline.opportunity_id))).where(*filters)
+    ).one()
     
-    # Aggregate data using filtered records for summary stats
     total_effort_weeks = 0
     service_line_totals = {sl: 0 for sl in SUPPORTED_SERVICE_LINES}
-    stage_totals = {stage: 0 for stage in SALES_STAGES_ORDER}
+    stage_totals = {stage_name: 0 for stage_name in SALES_STAGES_ORDER}
     category_totals = {}
-    opportunity_ids = set()
-    
-    for record in filtered_timeline_records:
-        # Apply date filtering at record level for more precise control
-        if start_date:
-            start_date_naive = start_date.replace(tzinfo=None) if start_date.tzinfo else start_date
-            if record.stage_end_date < start_date_naive:
-                continue
-        if end_date:
-            end_date_naive = end_date.replace(tzinfo=None) if end_date.tzinfo else end_date
-            if record.stage_start_date > end_date_naive:
-                continue
-            
-        effort = record.total_effort_weeks
+    for row_service_line, row_stage, row_category, effort in effort_rows:
         total_effort_weeks += effort
-        
-        service_line_totals[record.service_line] += effort
-        stage_totals[record.stage_name] += effort
-        
-        if record.category not in category_totals:
-            category_totals[record.category] = 0
-        category_totals[record.category] += effort
-        
-        opportunity_ids.add(record.opportunity_id)
-    
-    # Generate time period forecast if date range provided, or use defaults
-    time_period_forecast = None
-    if start_date and end_date:
-        # Ensure dates are timezone-naive for consistency
-        start_date_naive = start_date.replace(tzinfo=None) if start_date.tzinfo else start_date
-        end_date_naive = end_date.replace(tzinfo=None) if end_date.tzinfo else end_date
-        time_period_forecast = _generate_time_period_forecast(
-            timeline_records, start_date_naive, end_date_naive, time_period, 
-            service_line, category, stage
-        )
+        service_line_totals[row_service_line] = service_line_totals.get(row_service_line, 0) + effort
+        stage_totals[row_stage] = stage_totals.get(row_stage, 0) + effort
+        category_totals[row_category] = category_totals.get(row_category, 0) + effort
+    
+    # Time period forecast from the materialised daily aggregate; use a broad
+    # default range to capture timeline data when no dates are given
+    if start_date_naive and end_date_naive:
+        forecast_start, forecast_end = start_date_naive, end_date_naive
     else:
-        # Provide default date range for time period forecast based on actual data
-        from datetime import datetime, timedelta
-        
-        # Use broad default range to ensure we capture timeline data
-        default_start = datetime(2024, 1, 1)  # Start of 2024
-        default_end = datetime(2027, 12, 31)   # End of 2027
-            
-        time_period_forecast = _generate_time_period_forecast(
-            timeline_records, default_start, default_end, time_period, 
-            service_line, category, stage
-        )
+        forecast_start, forecast_end = datetime(2024, 1, 1), datetime(2027, 12, 31)
+    grid_start, service_lines, daily_fte = load_daily_fte(
+        session, forecast_start, forecast_end, service_line, category, stage
+    )
+    time_period_forecast = _generate_time_period_forecast(
+        service_lines, daily_fte, grid_start, forecast_end, time_period
+    )
     
     return PortfolioEffortPrediction(
-        total_opportunities_processed=len(opportunity_ids),
+        total_opportunities_processed=opportunity_count,
         total_effort_weeks=total_effort_weeks,
         service_line_breakdown=service_line_totals,
         stage_breakdown=stage_totals,
@@ -490,7 +490,7 @@ def get_portfolio_resource_forecast(
         forecast_period={
             "start_date": start_date.isoformat() if start_date else None,
             "end_date": end_date.isoformat() if end_date else None,
-            "timeline_opportunities": len(opportunity_ids),
+            "timeline_opportunities": opportunity_count,
             "missing_timelines": _calculate_missing_timelines_count(session, service_line, category)
         },
         monthly_forecast=time_period_forecast,
@@ -584,21 +584,20 @@ def get_stage_effort_breakdown(
 
 
 def _generate_time_period_forecast(
-    timeline_records: List[OpportunityResourceTimeline],
+    service_lines: List[str],
+    daily_fte,
     start_date: datetime,
     end_date: datetime,
-    time_period: str = "month",
-    service_line_filter: List[str] = None,
-    category_filter: List[str] = None,
-    stage_filter: List[str] = None
+    time_period: str = "month"
 ) -> List[dict]:
     """
     Generate resource forecast using mean concurrent headcount for accurate capacity planning.
-    Calculates daily concurrent FTE requirements and averages within time periods to ensure
+    Averages daily concurrent FTE requirements within time periods to ensure
     consistent peak numbers regardless of time period granularity.
     
     Args:
-        timeline_records: Timeline records to aggregate
+        service_lines: Service lines of the daily_fte rows
+        daily_fte: Daily concurrent FTE per service line, day 0 being start_date
         start_date: Start date for forecast
         end_date: End date for forecast
         time_period: "week", "month", or "quarter"
@@ -606,52 +605,8 @@ def _generate_time_period_forecast(
     import calendar
     from collections import defaultdict
     
-    # Apply filters to get the relevant records
-    filtered_records = timeline_records
-    if service_line_filter:
-        filtered_records = [r for r in filtered_records if r.service_line in service_line_filter]
-    if category_filter:
-        filtered_records = [r for r in filtered_records if r.category in category_filter]
-    if stage_filter:
-        filtered_records = [r for r in filtered_records if r.stage_name in stage_filter]
-    
-    # Group records by opportunity + service line for sequential stage handling
-    opportunity_service_groups = defaultdict(list)
-    for record in filtered_records:
-        group_key = f"{record.opportunity_id}_{record.service_line}"
-        opportunity_service_groups[group_key].append(record)
-    
-    # Calculate daily concurrent FTE for the entire date range
-    current_date = start_date
-    daily_fte = {}
-    
-    while current_date <= end_date:
-        daily_fte[current_date] = {
-            "total_fte": 0.0,
-            "service_line_breakdown": defaultdict(float)
-        }
-        
-        # For each opportunity+service line group, find concurrent FTE on this day
-        for group_key, group_records in opportunity_service_groups.items():
-            # Find the stage that is active on this date (sequential stages, not concurrent)
-            active_stage = None
-            for record in group_records:
-                record_start = record.stage_start_date.replace(tzinfo=None) if record.stage_start_date.tzinfo else record.stage_start_date
-                record_end = record.stage_end_date.replace(tzinfo=None) if record.stage_end_date.tzinfo else record.stage_end_date
-                current_date_naive = current_date.replace(tzinfo=None) if current_date.tzinfo else current_date
-                
-                # Check if this stage is active on current_date
-                if record_start <= current_date_naive <= record_end and record.duration_weeks > 0:
-                    # Take the stage with highest FTE if multiple overlap (edge case)
-                    if active_stage is None or record.fte_required > active_stage.fte_required:
-                        active_stage = record
-            
-            # Add the active stage's FTE to daily totals
-            if active_stage:
-                daily_fte[current_date]["total_fte"] += active_stage.fte_required
-                daily_fte[current_date]["service_line_breakdown"][active_stage.service_line] += active_stage.fte_required
-        
-        current_date += timedelta(days=1)
+    days = daily_fte.shape[1]
+    daily_total_fte = daily_fte.sum(axis=0)
     
     # Generate time periods and calculate mean FTE for each period
     period_totals = {}
@@ -732,28 +687,23 @@ def _generate_time_period_forecast(
     
     # Calculate mean FTE for each period using daily data
     for period_key, period_data in period_totals.items():
-        period_start = period_data["period_start"]
-        period_end = period_data["period_end"]
-        
-        # Sum daily FTE values for this period
-        total_daily_fte = 0.0
-        service_line_daily_totals = defaultdict(float)
-        days_in_period = 0
-        
-        current_day = max(period_start, start_date)
-        while current_day <= min(period_end, end_date):
-            if current_day in daily_fte:
-                total_daily_fte += daily_fte[current_day]["total_fte"]
-                for sl, fte in daily_fte[current_day]["service_line_breakdown"].items():
-                    service_line_daily_totals[sl] += fte
-                days_in_period += 1
-            current_day += timedelta(days=1)
+        first_day, last_day = day_index_range(
+            max(period_data["period_start"], start_date),
+            min(period_data["period_end"], end_date),
+            start_date,
+            days
+        )
+        days_in_period = max(last_day - first_day + 1, 0)
         
         # Calculate mean FTE for the period
         if days_in_period > 0:
-            period_data["total_fte"] = total_daily_fte / days_in_period
+            period_data["total_fte"] = float(daily_total_fte[first_day:last_day + 1].sum() / days_in_period)
             for sl in ["CES", "INS", "BPS", "SEC", "ITOC", "MW"]:
-                period_data["service_line_breakdown"][sl] = service_line_daily_totals[sl] / days_in_period
+                if sl in service_lines:
+                    sl_fte = float(daily_fte[service_lines.index(sl), first_day:last_day + 1].sum() / days_in_period)
+                else:
+                    sl_fte = 0.0
+                period_data["service_line_breakdown"][sl] = sl_fte
         
         period_data["days_count"] = days_in_period
     
@@ -805,6 +755,7 @@ class TimelineGenerationResult(BaseModel):
     message: str
     stats: TimelineGenerationStats
     processed_opportunities: List[ProcessedOpportunity]
+    timings: Optional[Dict[str, float]] = None  # Phase -> seconds (load, compute, write, total)
 
 
 @router.get("/timeline-generation/stats", response_model=TimelineGenerationStats)
@@ -823,42 +774,17 @@ def get_timeline_generation_stats(
     if custom_tracking_filter:
         tracking_values = [v.strip() for v in custom_tracking_filter.split(',') if v.strip()]
     
-    # Get opportunities based on custom tracking filter
-    query = select(Opportunity)
-    if tracking_values:
-        query = query.where(Opportunity.custom_tracking_field_2.in_(tracking_values))
-    
-    opportunities = session.exec(query).all()
-    total_opportunities = len(opportunities)
+    config = get_config_snapshot(session)
     
+    # Eligibility is evaluated once per distinct combination of deciding columns
+    total_opportunities = 0
     eligible_count = 0
-    existing_timelines = 0
-    predicted_timelines = 0
+    for profile in load_eligibility_profiles(session, tracking_values):
+        total_opportunities += profile.opportunity_count
+        if is_opportunity_eligible(profile, config):
+            eligible_count += profile.opportunity_count
     
-    for opp in opportunities:
-        # Check if eligible for timeline generation
-        is_eligible = _is_opportunity_eligible_for_generation(opp, session)
-        if is_eligible:
-            eligible_count += 1
-            
-        # Check existing timeline
-        existing_timeline = session.exec(
-            select(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-            ).limit(1)
-        ).first()
-        
-        if existing_timeline:
-            existing_timelines += 1
-            # Check if any timeline records are in Predicted status
-            predicted_records = session.exec(
-                select(OpportunityResourceTimeline).where(
-                    OpportunityResourceTimeline.opportunity_id == opp.opportunity_id,
-                    OpportunityResourceTimeline.resource_status == "Predicted"
-                ).limit(1)
-            ).first()
-            if predicted_records:
-                predicted_timelines += 1
+    existing_timelines, predicted_timelines = count_timeline_status(session, tracking_values)
     
     return TimelineGenerationStats(
         total_opportunities=total_opportunities,
@@ -868,18 +794,70 @@ def get_timeline_generation_stats(
     )
 
 
+class TimelineRecalculationJobSummary(BaseModel):
+    """One incremental recalculation job."""
+    id: int
+    trigger: str
+    detail: str
+    status: str
+    requested: int
+    processed: int
+    regenerated: int
+    removed: int
+    protected: int
+    skipped: int
+    errors: int
+    message: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class TimelineRecalculationStatus(BaseModel):
+    """Response model for the incremental recalculation queue."""
+    mode: str
+    pending_jobs: int
+    processing_jobs: int
+    queued_opportunities: int
+    recent_jobs: List[TimelineRecalculationJobSummary]
+
+
+@router.get("/timeline-recalculation/status", response_model=TimelineRecalculationStatus)
+def get_timeline_recalculation_status(
+    limit: int = Query(10, ge=1, le=100, description="Number of recent jobs to return"),
+    session: Session = Depends(get_session)
+):
+    """
+    Get the state of incremental timeline recalculation: queued jobs and
+    opportunities, and the most recent jobs with their outcome counts.
+    """
+    status = get_recalculation_status(session, limit)
+    return TimelineRecalculationStatus(
+        **{**status, "recent_jobs": [
+            TimelineRecalculationJobSummary(**job.model_dump(exclude={"opportunity_ids", "updated_at"}))
+            for job in status["recent_jobs"]
+        ]}
+    )
+
+
 @router.delete("/timeline-generation/clear-predicted")
 def clear_all_predicted_timelines(session: Session = Depends(get_session)):
     """
     Clear all timeline records with 'Predicted' status across all opportunities.
     """
     try:
+        affected_ids = session.exec(
+            select(OpportunityResourceTimeline.opportunity_id)
+            .where(OpportunityResourceTimeline.resource_status == "Predicted")
+            .distinct()
+        ).all()
+        
         # Delete all timeline records with Predicted status
-        result = session.exec(
-            delete(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.resource_status == "Predicted"
+        with portfolio_aggregate_update(session, affected_ids):
+            result = session.exec(
+                delete(OpportunityResourceTimeline).where(
+                    OpportunityResourceTimeline.resource_status == "Predicted"
+                )
             )
-        )
         
         session.commit()
         deleted_count = result.rowcount
@@ -906,16 +884,22 @@ def generate_bulk_timelines(
     - regenerateAll: If True, regenerates timelines for opportunities with 'Predicted' status
     - If False, only generates timelines for opportunities without existing timelines
     - customTrackingFilter: If provided, only processes opportunities with matching custom_tracking_field_2 values
+    
+    Runs set-based: opportunities, timeline status and line items are loaded with a
+    few grouped queries, timelines are computed in worker processes for large runs
+    (see app.services.parallel_timelines) and written with bulk DELETE/INSERT
+    statements. Per-phase timings are returned in `timings`.
     """
     regenerate_all = request_data.get("regenerateAll", False)
     custom_tracking_filter = request_data.get("customTrackingFilter", [])
     
-    # Get opportunities based on custom tracking filter
-    query = select(Opportunity)
-    if custom_tracking_filter:
-        query = query.where(Opportunity.custom_tracking_field_2.in_(custom_tracking_filter))
+    timings = {}
+    run_start = phase_start = time.perf_counter()
     
-    opportunities = session.exec(query).all()
+    # Load phase: opportunities, existing timeline status and configuration
+    opportunities = load_opportunities_for_generation(session, custom_tracking_filter)
+    timeline_status = load_timeline_status(session, custom_tracking_filter)
+    config = get_config_snapshot(session)
     
     stats = TimelineGenerationStats(
         total_opportunities=len(opportunities),
@@ -924,303 +908,183 @@ def generate_bulk_timelines(
         predicted_timelines=0
     )
     
-    processed_opportunities = []
+    # Results are kept in opportunity order; entries for opportunities that
+    # need a timeline are filled in after the compute phase
+    processed_opportunities: List[Optional[ProcessedOpportunity]] = [None] * len(opportunities)
+    to_generate = []
     
-    for opp in opportunities:
-        try:
-            # Check if eligible for timeline generation
-            is_eligible = _is_opportunity_eligible_for_generation(opp, session)
-            if is_eligible:
-                stats.eligible_for_generation += 1
-                
-            # Check existing timeline
-            existing_timeline = session.exec(
-                select(OpportunityResourceTimeline).where(
-                    OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-                ).limit(1)
-            ).first()
+    for index, opp in enumerate(opportunities):
+        is_eligible = is_opportunity_eligible(opp, config)
+        if is_eligible:
+            stats.eligible_for_generation += 1
+        
+        if opp.opportunity_id in timeline_status:
+            stats.existing_timelines += 1
             
-            if existing_timeline:
-                stats.existing_timelines += 1
+            if timeline_status[opp.opportunity_id]:
+                stats.predicted_timelines += 1
                 
-                # Check if in Predicted status for regeneration
-                has_predicted = session.exec(
-                    select(OpportunityResourceTimeline).where(
-                        OpportunityResourceTimeline.opportunity_id == opp.opportunity_id,
-                        OpportunityResourceTimeline.resource_status == "Predicted"
-                    ).limit(1)
-                ).first()
-                
-                if has_predicted:
-                    stats.predicted_timelines += 1
-                    
-                    if regenerate_all and is_eligible:
-                        # Regenerate timeline - check if it actually creates records
-                        try:
-                            _generate_timeline_for_opportunity(opp, session)
-                            # Check if timeline was actually created (not skipped due to zero FTE)
-                            updated_timeline = session.exec(
-                                select(OpportunityResourceTimeline).where(
-                                    OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-                                ).limit(1)
-                            ).first()
-                            
-                            if updated_timeline:
-                                stats.updated += 1
-                                processed_opportunities.append(ProcessedOpportunity(
-                                    id=opp.opportunity_id,
-                                    name=opp.opportunity_name,
-                                    action="updated",
-                                    reason="Regenerated Predicted timeline"
-                                ))
-                            else:
-                                stats.skipped += 1
-                                processed_opportunities.append(ProcessedOpportunity(
-                                    id=opp.opportunity_id,
-                                    name=opp.opportunity_name,
-                                    action="skipped",
-                                    reason="Timeline regeneration skipped due to zero FTE requirements"
-                                ))
-                        except Exception as e:
-                            stats.errors += 1
-                            processed_opportunities.append(ProcessedOpportunity(
-                                id=opp.opportunity_id,
-                                name=opp.opportunity_name,
-                                action="error",
-                                reason=f"Regeneration error: {str(e)}"
-                            ))
-                    else:
-                        stats.skipped += 1
-                        processed_opportunities.append(ProcessedOpportunity(
-                            id=opp.opportunity_id,
-                            name=opp.opportunity_name,
-                            action="skipped",
-                            reason="Has non-Predicted timeline" if not regenerate_all else "Not eligible"
-                        ))
+                if regenerate_all and is_eligible:
+                    to_generate.append((index, opp, "updated"))
                 else:
-                    # Has timeline but not in Predicted status
                     stats.skipped += 1
-                    processed_opportunities.append(ProcessedOpportunity(
+                    processed_opportunities[index] = ProcessedOpportunity(
                         id=opp.opportunity_id,
                         name=opp.opportunity_name,
                         action="skipped",
-                        reason="Timeline exists with non-Predicted status"
-                    ))
+                        reason="Has non-Predicted timeline" if not regenerate_all else "Not eligible"
+                    )
             else:
-                # No existing timeline
-                if is_eligible:
-                    # Generate new timeline - check if it actually creates records
-                    try:
-                        _generate_timeline_for_opportunity(opp, session)
-                        # Check if timeline was actually created (not skipped due to zero FTE)
-                        created_timeline = session.exec(
-                            select(OpportunityResourceTimeline).where(
-                                OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-                            ).limit(1)
-                        ).first()
-                        
-                        if created_timeline:
-                            stats.generated += 1
-                            processed_opportunities.append(ProcessedOpportunity(
-                                id=opp.opportunity_id,
-                                name=opp.opportunity_name,
-                                action="generated",
-                                reason="Created new timeline"
-                            ))
-                        else:
-                            stats.skipped += 1
-                            processed_opportunities.append(ProcessedOpportunity(
-                                id=opp.opportunity_id,
-                                name=opp.opportunity_name,
-                                action="skipped",
-                                reason="Timeline skipped due to zero FTE requirements"
-                            ))
-                    except Exception as e:
-                        stats.errors += 1
-                        processed_opportunities.append(ProcessedOpportunity(
-                            id=opp.opportunity_id,
-                            name=opp.opportunity_name,
-                            action="error",
-                            reason=f"Generation error: {str(e)}"
-                        ))
-                else:
-                    stats.skipped += 1
-                    processed_opportunities.append(ProcessedOpportunity(
-                        id=opp.opportunity_id,
-                        name=opp.opportunity_name,
-                        action="skipped",
-                        reason="Not eligible for timeline generation"
-                    ))
-                    
-        except Exception as e:
+                # Has timeline but not in Predicted status
+                stats.skipped += 1
+                processed_opportunities[index] = ProcessedOpportunity(
+                    id=opp.opportunity_id,
+                    name=opp.opportunity_name,
+                    action="skipped",
+                    reason="Timeline exists with non-Predicted status"
+                )
+        elif is_eligible:
+            to_generate.append((index, opp, "generated"))
+        else:
+            stats.skipped += 1
+            processed_opportunities[index] = ProcessedOpportunity(
+                id=opp.opportunity_id,
+                name=opp.opportunity_name,
+                action="skipped",
+                reason="Not eligible for timeline generation"
+            )
+    
+    line_items = load_line_items_by_opportunity(
+        session, [opp.opportunity_id for _, opp, _ in to_generate]
+    )
+    timings["load"] = time.perf_counter() - phase_start
+    
+    # Compute phase: timelines are calculated from the preloaded data, across
+    # CPU cores for large runs; rows are merged here for a single writer
+    phase_start = time.perf_counter()
+    calculated_date = datetime.utcnow()
+    replaced_ids = []
+    new_rows = []
+    results = compute_timelines(
+        [opp for _, opp, _ in to_generate], line_items, config, "Predicted", calculated_date
+    )
+    
+    for (index, opp, action), result in zip(to_generate, results):
+        if result.error is not None:
             stats.errors += 1
-            processed_opportunities.append(ProcessedOpportunity(
+            error_prefix = "Regeneration error" if action == "updated" else "Generation error"
+            processed_opportunities[index] = ProcessedOpportunity(
                 id=opp.opportunity_id,
                 name=opp.opportunity_name,
                 action="error",
-                reason=f"Error: {str(e)}"
-            ))
+                reason=f"{error_prefix}: Failed to generate timeline for opportunity: {result.error}"
+            )
+            continue
+        
+        rows = result.rows
+        
+        # Skip creating timeline if total FTE is 0
+        if sum(row["fte_required"] for row in rows) == 0:
+            stats.skipped += 1
+            processed_opportunities[index] = ProcessedOpportunity(
+                id=opp.opportunity_id,
+                name=opp.opportunity_name,
+                action="skipped",
+                reason="Timeline regeneration skipped due to zero FTE requirements" if action == "updated"
+                       else "Timeline skipped due to zero FTE requirements"
+            )
+            continue
+        
+        replaced_ids.append(opp.opportunity_id)
+        new_rows.extend(rows)
+        
+        if action == "updated":
+            stats.updated += 1
+            reason = "Regenerated Predicted timeline"
+        else:
+            stats.generated += 1
+            reason = "Created new timeline"
+        processed_opportunities[index] = ProcessedOpportunity(
+            id=opp.opportunity_id,
+            name=opp.opportunity_name,
+            action=action,
+            reason=reason
+        )
+    timings["compute"] = time.perf_counter() - phase_start
     
-    session.commit()
+    # Write phase: one bulk DELETE and one executemany INSERT per chunk
+    phase_start = time.perf_counter()
+    try:
+        with portfolio_aggregate_update(session, replaced_ids):
+            replace_timelines(session, replaced_ids, new_rows)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error("Bulk timeline write failed", error=str(e), opportunities=len(replaced_ids))
+        raise HTTPException(status_code=500, detail=f"Error writing generated timelines: {str(e)}")
+    timings["write"] = time.perf_counter() - phase_start
+    timings["total"] = time.perf_counter() - run_start
+    timings = {phase: round(seconds, 4) for phase, seconds in timings.items()}
     
     success_count = stats.generated + stats.updated
     total_processed = stats.generated + stats.updated + stats.skipped + stats.errors
     
+    logger.info("Bulk timeline generation completed",
+                opportunities=stats.total_opportunities,
+                written=success_count,
+                timeline_rows=len(new_rows),
+                **{f"{phase}_seconds": seconds for phase, seconds in timings.items()})
+    
     return TimelineGenerationResult(
         success=stats.errors == 0,
         message=f"Processed {total_processed} opportunities: {stats.generated} generated, {stats.updated} updated, {stats.skipped} skipped, {stats.errors} errors",
         stats=stats,
-        processed_opportunities=processed_opportunities
+        processed_opportunities=[result for result in processed_opportunities if result is not None],
+        timings=timings
     )
 
 
 def _calculate_missing_timelines_count(session: Session, 
-                                     service_line_filter: Optional[str] = None,
-                                     category_filter: Optional[str] = None) -> int:
+                                     service_line_filter: Optional[List[str]] = None,
+                                     category_filter: Optional[List[str]] = None) -> int:
     """
     Calculate how many opportunities are eligible for timeline generation but don't have timelines.
     
     Returns count of opportunities that:
-    - Are eligible for timeline generation (_is_opportunity_eligible_for_generation)
+    - Are eligible for timeline generation (is_opportunity_eligible)
     - Do NOT have existing OpportunityResourceTimeline records
-    - Match any provided filters
-    """
-    from app.models.config import OpportunityCategory
-    
-    # Get all opportunities
-    opportunities = session.exec(select(Opportunity)).all()
-    
-    missing_count = 0
-    for opp in opportunities:
-        # Check eligibility first
-        if not _is_opportunity_eligible_for_generation(opp, session):
-            continue
-            
-        # Check if timeline already exists
-        existing_timeline = session.exec(
-            select(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.opportunity_id == opp.opportunity_id
-            ).limit(1)
-        ).first()
-        
-        if existing_timeline:
-            continue  # Has timeline, not missing
-            
-        # Apply filters if provided
-        if service_line_filter or category_filter:
-            # Check if this opportunity would generate timeline for filtered service line/category
-            if category_filter:
-                # Get opportunity category
-                categories = session.exec(select(OpportunityCategory)).all()
-                opp_category = None
-                for cat in categories:
-                    if cat.min_tcv <= (opp.tcv_millions or 0) <= (cat.max_tcv or float('inf')):
-                        opp_category = cat.name
-                        break
-                
-                if opp_category != category_filter:
-                    continue
-                    
-            if service_line_filter:
-                # Check which service lines this opportunity would process
-                service_lines_to_process = []
-                if opp.mw_millions and opp.mw_millions > 0:
-                    service_lines_to_process.append("MW")
-                if opp.itoc_millions and opp.itoc_millions > 0:
-                    service_lines_to_process.append("ITOC")
-                if not service_lines_to_process and opp.lead_offering_l1 in SUPPORTED_SERVICE_LINES:
-                    service_lines_to_process.append(opp.lead_offering_l1)
-                    
-                if service_line_filter not in service_lines_to_process:
-                    continue
-        
-        missing_count += 1
+    - Are in one of the filtered categories and generate one of the filtered service lines
     
-    return missing_count
+    Reads the cached missing timeline index, which is rebuilt only after
+    opportunity, timeline, configuration or import changes.
+    """
+    return count_missing_timelines(session, service_line_filter, category_filter)
 
 
-def _is_opportunity_eligible_for_generation(opportunity: Opportunity, session: Session) -> bool:
+def _is_opportunity_eligible_for_generation(
+    opportunity: Opportunity,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None
+) -> bool:
     """
     Check if an opportunity is eligible for timeline generation.
     
-    Criteria:
-    - Has TCV and decision date
-    - Has timeline category (determined from total TCV)
-    - Has service line revenue (mw_millions or itoc_millions > 0) OR lead_offering_l1 in supported service lines
-    - Service line can determine resource category from its TCV
-    - Service line stage effort configuration exists
+    See is_opportunity_eligible for the criteria.
     """
-    # Check basic requirements
-    if not opportunity.tcv_millions or not opportunity.decision_date:
-        return False
-    
-    from app.models.config import ServiceLineStageEffort, OpportunityCategory, ServiceLineCategory
-    from app.services.resource_calculation import determine_opportunity_category, determine_service_line_resource_category
-    
-    # Get timeline category from total TCV
-    timeline_category = determine_opportunity_category(opportunity.tcv_millions, session)
-    if not timeline_category:
-        return False
-    
-    # Determine which service lines to check (matching calculate_opportunity_resource_timeline logic)
-    service_lines_to_check = []
-    
-    # Check MW service line
-    if opportunity.mw_millions and opportunity.mw_millions > 0:
-        service_lines_to_check.append(("MW", opportunity.mw_millions))
-    
-    # Check ITOC service line  
-    if opportunity.itoc_millions and opportunity.itoc_millions > 0:
-        service_lines_to_check.append(("ITOC", opportunity.itoc_millions))
-    
-    # Fallback to lead offering if no service line revenue
-    if not service_lines_to_check and opportunity.lead_offering_l1:
-        if opportunity.lead_offering_l1 in SUPPORTED_SERVICE_LINES:
-            # Use a default small amount for resource category when no specific revenue
-            service_lines_to_check.append((opportunity.lead_offering_l1, 1.0))
-    
-    if not service_lines_to_check:
-        return False
-    
-    # Check if at least one service line is eligible
-    for service_line, service_line_tcv in service_lines_to_check:
-        # Determine resource category based on service line TCV
-        resource_category = determine_service_line_resource_category(service_line, service_line_tcv, session)
-        if not resource_category:
-            continue
-            
-        # Find the resource category record to get its ID
-        category_record = session.exec(
-            select(ServiceLineCategory).where(
-                ServiceLineCategory.service_line == service_line,
-                ServiceLineCategory.name == resource_category
-            )
-        ).first()
-        
-        if not category_record:
-            continue
-        
-        # Check if stage effort configuration exists for this service line + resource category
-        stage_effort = session.exec(
-            select(ServiceLineStageEffort).where(
-                ServiceLineStageEffort.service_line == service_line,
-                ServiceLineStageEffort.service_line_category_id == category_record.id
-            ).limit(1)
-        ).first()
-        
-        if stage_effort:
-            return True
-    
-    return False
+    return is_opportunity_eligible(opportunity, config or get_config_snapshot(session))
 
 
-def _generate_timeline_for_opportunity(opportunity: Opportunity, session: Session):
+def _generate_timeline_for_opportunity(
+    opportunity: Opportunity,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None
+):
     """
     Generate timeline for a single opportunity using the existing calculation service.
     """
     try:
         # Use the existing calculate_opportunity_resource_timeline service
-        timeline_data = calculate_opportunity_resource_timeline(opportunity.id, session)
+        timeline_data = calculate_opportunity_resource_timeline(opportunity.id, session, config)
         
         # Calculate total FTE across all stages and service lines
         total_fte = 0
@@ -1232,39 +1096,40 @@ def _generate_timeline_for_opportunity(opportunity: Opportunity, session: Sessio
         if total_fte == 0:
             return
         
-        # Clear existing timeline data
-        session.exec(
-            delete(OpportunityResourceTimeline).where(
-                OpportunityResourceTimeline.opportunity_id == opportunity.opportunity_id
-            )
-        )
-        
-        # Store new timeline data
-        for service_line, stages in timeline_data["service_line_timelines"].items():
-            # Get resource category for this service line
-            resource_category = None
-            if "service_line_categories" in timeline_data and service_line in timeline_data["service_line_categories"]:
-                resource_category = timeline_data["service_line_categories"][service_line]["resource_category"]
-                
-            for stage_data in stages:
-                timeline_record = OpportunityResourceTimeline(
-                    opportunity_id=timeline_data["opportunity_id"],
-                    service_line=service_line,
-                    stage_name=stage_data["stage_name"],
-                    stage_start_date=stage_data["stage_start_date"],
-                    stage_end_date=stage_data["stage_end_date"],
-                    duration_weeks=stage_data["duration_weeks"],
-                    fte_required=stage_data["fte_required"],
-                    total_effort_weeks=stage_data["total_effort_weeks"],
-                    opportunity_name=timeline_data["opportunity_name"],
-                    category=timeline_data["category"],
-                    resource_category=resource_category or stage_data.get("resource_category"),
-                    tcv_millions=timeline_data["tcv_millions"],
-                    decision_date=timeline_data["decision_date"],
-                    calculated_date=datetime.utcnow(),
-                    resource_status="Predicted"  # Set as Predicted for bulk generation
+        with portfolio_aggregate_update(session, [opportunity.opportunity_id]):
+            # Clear existing timeline data
+            session.exec(
+                delete(OpportunityResourceTimeline).where(
+                    OpportunityResourceTimeline.opportunity_id == opportunity.opportunity_id
                 )
-                session.add(timeline_record)
+            )
+            
+            # Store new timeline data
+            for service_line, stages in timeline_data["service_line_timelines"].items():
+                # Get resource category for this service line
+                resource_category = None
+                if "service_line_categories" in timeline_data and service_line in timeline_data["service_line_categories"]:
+                    resource_category = timeline_data["service_line_categories"][service_line]["resource_category"]
+                    
+                for stage_data in stages:
+                    timeline_record = OpportunityResourceTimeline(
+                        opportunity_id=timeline_data["opportunity_id"],
+                        service_line=service_line,
+                        stage_name=stage_data["stage_name"],
+                        stage_start_date=stage_data["stage_start_date"],
+                        stage_end_date=stage_data["stage_end_date"],
+                        duration_weeks=stage_data["duration_weeks"],
+                        fte_required=stage_data["fte_required"],
+                        total_effort_weeks=stage_data["total_effort_weeks"],
+                        opportunity_name=timeline_data["opportunity_name"],
+                        category=timeline_data["category"],
+                        resource_category=resource_category or stage_data.get("resource_category"),
+                        tcv_millions=timeline_data["tcv_millions"],
+                        decision_date=timeline_data["decision_date"],
+                        calculated_date=datetime.utcnow(),
+                        resource_status="Predicted"  # Set as Predicted for bulk generation
+                    )
+                    session.add(timeline_record)
                 
     except Exception as e:
         # Re-raise with more context for debugging
@@ -1387,45 +1252,37 @@ def get_stage_resource_timeline(
         group_key = f"{timeline_record.opportunity_id}_{timeline_record.service_line}"
         opportunity_service_groups[group_key].append((timeline_record, opportunity))
     
+    # Per-period FTE of each group: stages are sequential, not concurrent, so the
+    # highest-FTE overlapping stage counts (not the sum) and names the period's
+    # service line + stage. Zero-duration stages are skipped. Each stage's periods
+    # are found by binary search on the period edges, not by scanning every period.
+    periods = list(period_data.values())
+    active_stages = [
+        timeline_record
+        for group_records in opportunity_service_groups.values()
+        for timeline_record, _ in group_records
+        if timeline_record.duration_weeks > 0
+    ]
+    period_indexes, stage_indexes = period_peak_stages(
+        [
+            (f"{record.opportunity_id}_{record.service_line}", record.stage_start_date,
+             record.stage_end_date, record.fte_required)
+            for record in active_stages
+        ],
+        [period_info["period_start"] for period_info in periods],
+        [period_info["period_end"] for period_info in periods],
+    )
+    for period_index, stage_index in zip(period_indexes.tolist(), stage_indexes.tolist()):
+        representative_stage = active_stages[stage_index]
+        period_info = periods[period_index]
+        service_stage_key = f"{representative_stage.service_line}_{representative_stage.stage_name}"
+        period_info["service_line_stage_breakdown"][service_stage_key] += representative_stage.fte_required
+        period_info["total_fte"] += representative_stage.fte_required
+    
     for group_key, group_records in opportunity_service_groups.items():
         # Get current opportunity stage from first record
         current_stage = group_records[0][1].sales_stage or "01"
         
-        # For each period, find the maximum FTE needed within this opportunity+service line group
-        for period_key, period_info in period_data.items():
-            period_start = period_info["period_start"]
-            period_end = period_info["period_end"]
-            
-            # Make sure all dates are timezone-naive for comparison
-            period_start = period_start.replace(tzinfo=None) if period_start.tzinfo else period_start
-            period_end = period_end.replace(tzinfo=None) if period_end.tzinfo else period_end
-            
-            # Find all stages within this group that overlap with this period
-            overlapping_stages = []
-            for timeline_record, opportunity in group_records:
-                record_start = timeline_record.stage_start_date.replace(tzinfo=None) if timeline_record.stage_start_date.tzinfo else timeline_record.stage_start_date
-                record_end = timeline_record.stage_end_date.replace(tzinfo=None) if timeline_record.stage_end_date.tzinfo else timeline_record.stage_end_date
-                
-                # Check if timeline record overlaps with this period
-                if (record_start <= period_end and record_end >= period_start):
-                    # Skip zero-duration stages
-                    if timeline_record.duration_weeks > 0:
-                        overlapping_stages.append(timeline_record)
-            
-            # Take maximum FTE from overlapping stages (not sum) - stages are sequential, not concurrent
-            if overlapping_stages:
-                max_fte = max(stage.fte_required for stage in overlapping_stages)
-                
-                # For display purposes, use the stage with the highest FTE for this period
-                # (In practice, FTE should be the same for sequential stages, but this handles edge cases)
-                representative_stage = max(overlapping_stages, key=lambda s: s.fte_required)
-                
-                # Create key for service line + actual stage combination
-                service_stage_key = f"{representative_stage.service_line}_{representative_stage.stage_name}"
-                
-                period_info["service_line_stage_breakdown"][service_stage_key] += max_fte
-                period_info["total_fte"] += max_fte
-        
         # Track overall statistics (use first record from group for stats)
         first_record = group_records[0][0]
         total_opportunities_processed.add(first_record.opportunity_id)
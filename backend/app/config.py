@@ -20,6 +20,18 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./database.db"
+    db_pool_size: int = 10          # Pooled connections kept open per API process
+    db_max_overflow: int = 30       # Extra connections under load (pool_size + overflow >= api_threadpool_size)
+    db_pool_timeout: int = 30       # Seconds to wait for a free pooled connection
+    
+    # SQLite connection tuning - applied to every new pooled connection
+    sqlite_check_same_thread: bool = False  # Sessions are used across threadpool workers
+    sqlite_busy_timeout_ms: int = 5000      # Wait for locks instead of failing with "database is locked"
+    sqlite_journal_mode: str = "WAL"        # Readers and the import writer do not block each other
+    sqlite_synchronous: str = "NORMAL"      # Durable with WAL; fsyncs only at checkpoints
+    sqlite_cache_size_kib: int = 65536      # Page cache per connection
+    sqlite_mmap_size: int = 268435456       # Memory-mapped I/O (256MB)
+    sqlite_temp_store: str = "MEMORY"       # Sorts and temp tables in memory
     
     # CORS - restrictive for production, permissive for development
     cors_origins: list[str] = [
@@ -30,6 +42,7 @@ class Settings(BaseSettings):
     cors_allow_credentials: bool = True
     cors_allow_methods: list[str] = ["GET", "POST", "PUT", "DELETE", "PATCH"]
     cors_allow_headers: list[str] = ["Authorization", "Content-Type", "X-API-Key"]
+    cors_expose_headers: list[str] = ["X-Next-Cursor", "X-Total-Count", "Server-Timing"]
     
     # Environment
     environment: str = "development"
@@ -39,6 +52,28 @@ class Settings(BaseSettings):
     api_key: Optional[str] = None  # Set via RFOT_API_KEY environment variable
     auth_enabled: bool = False     # Disabled for development - set to True for production
     
+    # Imports - Excel files are streamed in chunks, so memory does not grow with file size
+    max_upload_size_mb: int = 200
+    import_worker_processes: int = 2  # Import worker pool size per API process
+    
+    # Timeline recalculation after imports, opportunity edits and config changes:
+    # "background" (import worker pool), "inline" (in the committing thread) or "off"
+    timeline_recalculation_mode: str = "background"
+    
+    # Parallel timeline computation for bulk generation
+    timeline_worker_processes: Optional[int] = None  # Compute pool size; None uses every CPU core
+    parallel_timeline_min_opportunities: int = 2000  # Smaller runs compute in-process
+    
+    # API request handling - sync endpoints run in a bounded worker threadpool
+    api_threadpool_size: int = 40  # Max concurrent sync endpoint calls per API process
+    report_worker_processes: int = 2  # Report worker pool size per API process; 0 builds reports in the threadpool
+    
+    # Query profiling - per-request query counts and DB time in Server-Timing and the performance log
+    query_profiling_enabled: bool = True
+    slow_query_ms: float = 200.0              # Statements at least this slow are logged individually
+    request_query_budget: Optional[int] = 100  # Queries per request before a budget warning
+    enforce_query_budget: bool = False         # Fail the request instead of warning (enabled in tests)
+    
     # Logging
     log_level: str = "INFO"
     mask_financial_data: bool = True  # Mask financial data in logs for production
@@ -1,4 +1,5 @@
 from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,8 +7,14 @@ import structlog
 
 from app.config import settings
 from app.api import opportunities, forecasts, config as config_api, imports, resources, reports
-from app.middleware import APIKeyAuthMiddleware
+from app.middleware import APIKeyAuthMiddleware, QueryProfilerMiddleware
 from app.exception_handlers import register_exception_handlers, ErrorContextMiddleware
+from app.services.import_jobs import recover_import_jobs, shutdown_import_executor
+from app.models.database import report_database_settings
+from app.services.parallel_timelines import shutdown_timeline_executor
+from app.services.portfolio_aggregate import ensure_portfolio_aggregate
+from app.services.report_workers import shutdown_report_executor
+from app.services.timeline_recalculation import recover_recalculation_jobs
 
 # Configure structured logging with production-ready processors
 def configure_logging():
@@ -47,9 +54,31 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Application starting", app=settings.app_name, version=settings.app_version)
+    # Database-bound endpoints are sync and run in this threadpool, off the event
+    # loop; CPU-bound reports run in the report worker pool instead
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.api_threadpool_size
+    try:
+        report_database_settings()
+    except Exception as e:
+        logger.warning("Database settings check skipped", error=str(e))
+    try:
+        recover_import_jobs()
+    except Exception as e:
+        logger.warning("Import job recovery skipped", error=str(e))
+    try:
+        recover_recalculation_jobs()
+    except Exception as e:
+        logger.warning("Timeline recalculation recovery skipped", error=str(e))
+    try:
+        ensure_portfolio_aggregate()
+    except Exception as e:
+        logger.warning("Portfolio aggregate backfill skipped", error=str(e))
     yield
     # Shutdown
     logger.info("Application shutting down")
+    shutdown_import_executor()
+    shutdown_timeline_executor()
+    shutdown_report_executor()
 
 app = FastAPI(
     title=settings.app_name,
@@ -61,6 +90,9 @@ app = FastAPI(
 # Register exception handlers
 register_exception_handlers(app)
 
+# Per-request query counts and database time
+app.add_middleware(QueryProfilerMiddleware)
+
 # Add error context middleware
 app.add_middleware(ErrorContextMiddleware)
 
@@ -78,6 +110,7 @@ app.add_middleware(
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
+    expose_headers=settings.cors_expose_headers,
 )
 
 logger.info("CORS configured", 
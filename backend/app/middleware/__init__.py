@@ -3,5 +3,13 @@ Middleware modules for the Resource Forecasting & Opportunity Tracker API.
 """
 
 from .auth import APIKeyAuthMiddleware, get_api_key, generate_api_key
+from .query_profiler import QueryBudgetExceeded, QueryProfilerMiddleware, current_query_stats
 
-__all__ = ["APIKeyAuthMiddleware", "get_api_key", "generate_api_key"]
\ No newline at end of file
+__all__ = [
+    "APIKeyAuthMiddleware",
+    "get_api_key",
+    "generate_api_key",
+    "QueryBudgetExceeded",
+    "QueryProfilerMiddleware",
+    "current_query_stats",
+]
\ No newline at end of file
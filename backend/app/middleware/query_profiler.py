@@ -0,0 +1,179 @@
+"""
+Per-request database query profiling.
+
+SQLAlchemy cursor events on every Engine record the statements executed while
+a request is being handled: the query count, total database time and the
+slowest statements. The middleware reports them in a ``Server-Timing``
+response header (visible in browser dev tools) and on the ``performance``
+logger, and warns when a request exceeds its query budget, the typical sign
+of an N+1 loop.
+
+With ``enforce_query_budget`` enabled (the test suite does this) the
+statement that goes over the budget raises QueryBudgetExceeded, so the
+offending endpoint fails instead of only logging a warning.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import heapq
+import re
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import structlog
+
+from app.config import settings
+from app.logging_utils import create_performance_logger, log_database_operation
+
+logger = structlog.get_logger()
+performance_logger = create_performance_logger()
+
+# Slowest statements kept per request
+SLOWEST_STATEMENTS = 3
+STATEMENT_LOG_LENGTH = 300
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)', re.IGNORECASE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when a request runs more queries than its budget allows."""
+
+
+@dataclass
+class QueryStats:
+    """Database activity of one request."""
+    label: str
+    budget: Optional[int] = None
+    enforce_budget: bool = False
+    count: int = 0
+    total_ms: float = 0.0
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+
+    def record(self, duration_ms: float, statement: str) -> None:
+        self.total_ms += duration_ms
+        entry = (duration_ms, statement)
+        if len(self.slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif duration_ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def slowest_statements(self) -> List[Tuple[float, str]]:
+        """Slowest statements, slowest first."""
+        return sorted(self.slowest, reverse=True)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Return the query stats of the request being handled, if any."""
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.count += 1
+    if stats.enforce_budget and stats.over_budget:
+        raise QueryBudgetExceeded(
+            f"{stats.label} exceeded its budget of {stats.budget} queries: {statement[:STATEMENT_LOG_LENGTH]}"
+        )
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    start_times = conn.info.get("query_start_times")
+    if stats is None or not start_times:
+        return
+    stats.record((time.perf_counter() - start_times.pop()) * 1000, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_statement(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_times"):
+        connection.info["query_start_times"].pop()
+
+
+def server_timing(stats: QueryStats, duration_ms: float) -> str:
+    """Format request timings as a Server-Timing header value."""
+    return (
+        f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", '
+        f"app;dur={duration_ms:.1f}"
+    )
+
+
+class QueryProfilerMiddleware:
+    """Record query count, database time and slow statements for every request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.query_profiling_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(
+            label=f"{scope['method']} {scope['path']}",
+            budget=settings.request_query_budget,
+            enforce_budget=settings.enforce_query_budget,
+        )
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                duration_ms = (time.perf_counter() - start) * 1000
+                headers.append((b"server-timing", server_timing(stats, duration_ms).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._report(stats, status_code, (time.perf_counter() - start) * 1000)
+
+    def _report(self, stats: QueryStats, status_code: int, duration_ms: float) -> None:
+        slowest = stats.slowest_statements()
+        summary = {
+            "request": stats.label,
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 1),
+            "query_count": stats.count,
+            "db_ms": round(stats.total_ms, 1),
+            "slowest_queries": [
+                {"duration_ms": round(ms, 1), "statement": statement[:STATEMENT_LOG_LENGTH]}
+                for ms, statement in slowest
+            ],
+        }
+        if stats.over_budget:
+            performance_logger.warning("Request exceeded query budget", budget=stats.budget, **summary)
+        else:
+            performance_logger.info("Request database usage", **summary)
+
+        for ms, statement in slowest:
+            if ms >= settings.slow_query_ms:
+                match = TABLE_PATTERN.search(statement)
+                log_database_operation(
+                    performance_logger,
+                    operation=statement.lstrip().split(None, 1)[0].upper(),
+                    table=match.group(1) if match else "unknown",
+                    duration_ms=round(ms, 1),
+                    request=stats.label,
+                    statement=statement[:STATEMENT_LOG_LENGTH],
+                )
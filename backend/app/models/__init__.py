@@ -1,6 +1,7 @@
 from .opportunity import Opportunity, OpportunityLineItem
 from .config import OpportunityCategory, ServiceLineStageEffort
-from .resources import OpportunityResourceTimeline
+from .resources import OpportunityResourceTimeline, PortfolioFteDaily
+from .imports import ImportJob
 from .database import engine, create_db_and_tables
 
 __all__ = [
@@ -9,6 +10,8 @@ __all__ = [
     "OpportunityCategory",
     "ServiceLineStageEffort",
     "OpportunityResourceTimeline",
+    "PortfolioFteDaily",
+    "ImportJob",
     "engine",
     "create_db_and_tables"
 ]
\ No newline at end of file
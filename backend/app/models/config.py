@@ -267,4 +267,4 @@ class ServiceLineOfferingMappingRead(ServiceLineOfferingMappingBase):
 
 class ServiceLineOfferingMappingUpdate(ServiceLineOfferingMappingBase):
     """Model for updating service line offering mappings."""
-    pass
\ No newline at end of file
+    pass
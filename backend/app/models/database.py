@@ -1,13 +1,153 @@
-from sqlmodel import SQLModel, create_engine
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Field, SQLModel, create_engine
 from app.config import settings
 import structlog
 
 logger = structlog.get_logger()
 
+# Accepted values for the text PRAGMAs, which are interpolated into SQL
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+TEMP_STORES = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """PRAGMAs applied to every SQLite connection, from settings."""
+    journal_mode = settings.sqlite_journal_mode.upper()
+    synchronous = settings.sqlite_synchronous.upper()
+    temp_store = settings.sqlite_temp_store.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported sqlite_journal_mode: {settings.sqlite_journal_mode}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported sqlite_synchronous: {settings.sqlite_synchronous}")
+    if temp_store not in TEMP_STORES:
+        raise ValueError(f"Unsupported sqlite_temp_store: {settings.sqlite_temp_store}")
+    return {
+        # busy_timeout first so the journal_mode switch waits for other connections
+        "busy_timeout": str(int(settings.sqlite_busy_timeout_ms)),
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "cache_size": str(-int(settings.sqlite_cache_size_kib)),
+        "mmap_size": str(int(settings.sqlite_mmap_size)),
+        "temp_store": temp_store,
+    }
+
+
+def configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    """Apply the tuned PRAGMAs to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def _is_memory_database(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.database.startswith("file::memory:")
+
+
+def build_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Create an engine with settings-driven pooling and, for SQLite, tuned connections.
+
+    Args:
+        database_url: Database URL (settings.database_url by default)
+
+    Returns:
+        Engine whose pooled connections all carry the configured PRAGMAs
+    """
+    url = make_url(database_url or settings.database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    options = {"echo": settings.debug}
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": settings.sqlite_check_same_thread}
+    if not (is_sqlite and _is_memory_database(url)):
+        # In-memory SQLite keeps SQLAlchemy's per-thread pool
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=not is_sqlite,
+        )
+    new_engine = create_engine(url, **options)
+    if is_sqlite:
+        event.listen(new_engine, "connect", configure_sqlite_connection)
+    return new_engine
+
+
+def report_database_settings(target: Optional[Engine] = None) -> Dict[str, object]:
+    """
+    Read back the effective connection settings and log them.
+
+    Logs a warning for every PRAGMA that did not take the configured value,
+    e.g. WAL on a filesystem without shared memory support.
+
+    Args:
+        target: Engine to check (the application engine by default)
+
+    Returns:
+        Effective PRAGMA values, pool status and any mismatched PRAGMAs
+    """
+    target = target or engine
+    report: Dict[str, object] = {"dialect": target.dialect.name, "pool": target.pool.status()}
+    if target.dialect.name != "sqlite":
+        logger.info("Database connection settings", **report)
+        return report
+
+    expected = sqlite_pragmas()
+    with target.connect() as connection:
+        for name in expected:
+            report[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    mismatched = {}
+    for name, value in expected.items():
+        effective = report[name]
+        if effective is None:
+            # Not applicable to this database (e.g. mmap_size in memory)
+            continue
+        if name == "synchronous":
+            matches = effective == SYNCHRONOUS_MODES[value]
+        elif name == "temp_store":
+            matches = effective == TEMP_STORES[value]
+        elif name == "journal_mode":
+            matches = str(effective).upper() == value
+        elif name == "mmap_size":
+            # SQLite caps mmap_size at its compile-time maximum
+            matches = int(effective) <= int(value) and (int(value) == 0) == (int(effective) == 0)
+        else:
+            matches = int(effective) == int(value)
+        if not matches:
+            mismatched[name] = {"configured": value, "effective": effective}
+
+    report["mismatched"] = mismatched
+    logger.info("Database connection settings", **report)
+    if mismatched:
+        logger.warning("SQLite PRAGMAs differ from configuration", mismatched=mismatched)
+    return report
+
+
+class DataVersion(SQLModel, table=True):
+    """
+    Named version counter of data cached by every process.
+
+    Bumped in the same transaction as every write to the data it versions
+    (e.g. "config", "timeline_data"), so a process can tell whether its cache
+    is stale with one primary key lookup.
+    """
+    __tablename__ = "data_version"
+
+    name: str = Field(primary_key=True, max_length=50)
+    version: int = 0
+
+
 # Create database engine
-engine = create_engine(settings.database_url, echo=settings.debug)
+engine = build_engine()
 
 def create_db_and_tables():
     """Create database and tables."""
     logger.info("Creating database tables", database_url=settings.database_url)
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
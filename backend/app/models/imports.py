@@ -0,0 +1,43 @@
+"""
+Import job model for tracking Excel imports across processes.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Text
+from sqlmodel import SQLModel, Field
+
+
+class ImportJob(SQLModel, table=True):
+    """
+    Durable record of an Excel import and its progress.
+
+    Rows are written by the API process that accepts the upload and updated by
+    the import worker process, so every uvicorn worker sees the same status and
+    progress survives restarts.
+    """
+    __tablename__ = "import_job"
+
+    task_id: str = Field(primary_key=True, max_length=36)
+    import_type: str = Field(max_length=20)  # opportunities, line_items
+    file_path: str
+
+    # Progress, mirrors ImportTask
+    status: str = Field(default="pending", max_length=20, index=True)  # pending, processing, completed, failed
+    progress: int = 0
+    message: str = ""
+    total_rows: int = 0
+    processed_rows: int = 0
+    successful_rows: int = 0
+    failed_rows: int = 0
+    warnings_count: int = 0
+    errors: str = Field(default="[]", sa_column=Column(Text, nullable=False, default="[]"))  # JSON list
+    inserted_rows: int = 0
+    updated_rows: int = 0
+    unchanged_rows: int = 0
+    # Opportunity ids whose imported data changed, for incremental downstream work
+    changed_ids: str = Field(default="[]", sa_column=Column(Text, nullable=False, default="[]"))  # JSON list
+    start_time: str = ""
+    end_time: str = ""
+
+    # Metadata; updated_at doubles as the worker heartbeat
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -1,3 +1,4 @@
+from sqlalchemy import Index, func, literal_column
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
@@ -70,7 +71,17 @@ class OpportunityBase(SQLModel):
 
 class Opportunity(OpportunityBase, table=True):
     """Opportunity database model."""
+    __table_args__ = (
+        # Stage filters combined with the forecast flag or sorted by decision date
+        Index("idx_opportunity_stage_forecast", "sales_stage", "in_forecast"),
+        Index("idx_opportunity_stage_decision_date", "sales_stage", "decision_date"),
+        # TCV range filters sorted by decision date
+        Index("idx_opportunity_tcv_decision_date", "tcv_millions", "decision_date"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Fingerprint of the imported fields, so re-imports can skip unchanged rows
+    import_hash: Optional[str] = Field(default=None, max_length=32)
     
     # Relationships
     line_items: List["OpportunityLineItem"] = Relationship(back_populates="opportunity")
@@ -111,7 +122,8 @@ class OpportunityRead(OpportunityBase):
 
 class OpportunityLineItemBase(SQLModel):
     """Base opportunity line item model based on Opportunities Items.xlsx columns G-AC."""
-    opportunity_id: str = Field(foreign_key="opportunity.opportunity_id", index=True)
+    # Indexed through the leading column of the natural key index
+    opportunity_id: str = Field(foreign_key="opportunity.opportunity_id")
     offering_tcv: Optional[float] = None
     offering_abr: Optional[float] = None
     offering_iyr: Optional[float] = None
@@ -149,11 +161,31 @@ class OpportunityLineItemBase(SQLModel):
 class OpportunityLineItem(OpportunityLineItemBase, table=True):
     """Opportunity line item database model."""
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Fingerprint of the imported fields, so re-imports can skip unchanged rows
+    import_hash: Optional[str] = Field(default=None, max_length=32)
     
     # Relationship to opportunity
     opportunity: Optional[Opportunity] = Relationship(back_populates="line_items")
 
 
+def line_item_natural_key() -> tuple:
+    """
+    Key identifying an imported line item: opportunity, product and L2 offering.
+
+    Missing product names and offerings are compared as empty strings, so a
+    re-imported row without them matches the existing item instead of being
+    a distinct NULL.
+    """
+    return (
+        OpportunityLineItem.opportunity_id,
+        func.coalesce(OpportunityLineItem.product_name, literal_column("''")),
+        func.coalesce(OpportunityLineItem.lead_offering_l2, literal_column("''")),
+    )
+
+
+Index("ux_opportunitylineitem_natural_key", *line_item_natural_key(), unique=True)
+
+
 class OpportunityLineItemCreate(OpportunityLineItemBase):
     """Model for creating opportunity line items."""
     pass
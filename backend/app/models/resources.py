@@ -1,8 +1,9 @@
 """
 Resource timeline models for storing calculated FTE forecasts.
 """
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
+from sqlalchemy import Column, Index, Text
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -14,29 +15,40 @@ class OpportunityResourceTimeline(SQLModel, table=True):
     enabling efficient querying of resource requirements over time.
     """
     __tablename__ = "opportunity_resource_timeline"
+    __table_args__ = (
+        # Date window reads filtered by service line (portfolio summary, reports,
+        # data bounds); carries every column they aggregate, so they never touch the table
+        Index(
+            "ix_opportunity_resource_timeline_window",
+            "service_line", "stage_start_date", "stage_end_date", "stage_name", "category",
+            "opportunity_id", "total_effort_weeks", "fte_required", "duration_weeks",
+        ),
+        # Per-opportunity lookups and timeline status (existing / predicted) checks
+        Index("ix_opportunity_resource_timeline_opportunity_status", "opportunity_id", "resource_status"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Foreign key relationships
-    opportunity_id: str = Field(foreign_key="opportunity.opportunity_id", index=True)
-    service_line: str = Field(max_length=10, index=True)  # MW, ITOC, etc.
-    stage_name: str = Field(max_length=10, index=True)    # 01, 02, 03, 04A, 04B, 05A, 05B, 06
+    opportunity_id: str = Field(foreign_key="opportunity.opportunity_id")
+    service_line: str = Field(max_length=10)  # MW, ITOC, etc.
+    stage_name: str = Field(max_length=10)    # 01, 02, 03, 04A, 04B, 05A, 05B, 06
     
     # Timeline data
-    stage_start_date: datetime = Field(index=True)
-    stage_end_date: datetime = Field(index=True) 
+    stage_start_date: datetime
+    stage_end_date: datetime
     duration_weeks: float
     fte_required: float
     total_effort_weeks: float  # duration_weeks * fte_required
     
     # Resource status tracking
-    resource_status: str = Field(default="Predicted", max_length=20, index=True)  # Predicted, Forecast, Planned
-    last_updated: datetime = Field(default_factory=datetime.utcnow, index=True)
+    resource_status: str = Field(default="Predicted", max_length=20)  # Predicted, Forecast, Planned
+    last_updated: datetime = Field(default_factory=datetime.utcnow)
     
     # Opportunity context (denormalized for efficient querying)
     opportunity_name: Optional[str] = Field(max_length=200)
-    category: str = Field(max_length=20, index=True)  # Timeline category based on total TCV
-    resource_category: Optional[str] = Field(max_length=20, index=True)  # Resource category based on service line TCV
+    category: str = Field(max_length=20)  # Timeline category based on total TCV
+    resource_category: Optional[str] = Field(max_length=20)  # Resource category based on service line TCV
     tcv_millions: Optional[float]
     decision_date: datetime
     
@@ -47,6 +59,59 @@ class OpportunityResourceTimeline(SQLModel, table=True):
     opportunity: "Opportunity" = Relationship(back_populates="resource_timelines")
 
 
+class PortfolioFteDaily(SQLModel, table=True):
+    """
+    Materialised daily FTE of all stored resource timelines.
+    
+    One row per calendar day and (service_line, category, stage, resource_status)
+    holding the summed concurrent FTE of the matching timeline stages. Maintained
+    incrementally by app.services.portfolio_aggregate whenever timelines change,
+    so portfolio dashboards read a date range instead of every timeline row.
+    """
+    __tablename__ = "portfolio_fte_daily"
+    
+    # Bucket date leads the key so date ranges are a single index range scan
+    bucket_date: date = Field(primary_key=True)
+    service_line: str = Field(primary_key=True, max_length=10)
+    category: str = Field(primary_key=True, max_length=20)
+    stage_name: str = Field(primary_key=True, max_length=10)
+    resource_status: str = Field(primary_key=True, max_length=20)
+    
+    fte: float = 0.0
+
+
+class TimelineRecalculationJob(SQLModel, table=True):
+    """
+    Recalculation of the Predicted timelines of a set of opportunities.
+    
+    Recorded when an import, an opportunity edit or a configuration change
+    affects timeline inputs, and run by app.services.timeline_recalculation.
+    Opportunities with Planned or Forecast timelines are left untouched.
+    """
+    __tablename__ = "timeline_recalculation_job"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    trigger: str = Field(max_length=20)  # import, opportunity, config
+    detail: str = ""
+    status: str = Field(default="pending", max_length=20, index=True)  # pending, processing, completed, failed
+    opportunity_ids: str = Field(default="[]", sa_column=Column(Text, nullable=False, default="[]"))  # JSON list
+    
+    # Progress and outcome counts, in opportunities
+    requested: int = 0
+    processed: int = 0
+    regenerated: int = 0
+    removed: int = 0     # Predicted timelines of opportunities no longer eligible
+    protected: int = 0   # Planned/Forecast timelines, not modified
+    skipped: int = 0     # Not eligible and without a timeline
+    errors: int = 0
+    message: str = ""
+    
+    # Metadata; updated_at doubles as the worker heartbeat
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    finished_at: Optional[datetime] = None
+
+
 class OpportunityEffortPrediction(SQLModel):
     """
     Response model for single opportunity resource predictions.
@@ -0,0 +1,384 @@
+"""
+In-memory configuration snapshot for the resource calculation engine.
+
+Loads every configuration table used by timeline calculation (opportunity
+categories, service line categories, stage efforts, offering mappings and
+offering thresholds) in a single pass and indexes them into immutable
+dictionaries, so that portfolio-wide calculations make no configuration
+queries per opportunity. TCV tiers are compiled into TierCategoriser
+lookups that also categorise whole columns of TCVs at once.
+
+Snapshots are versioned by the "config" data version, which every write to a
+configuration table bumps in the same transaction. ``get_config_snapshot``
+compares the cached snapshot of the session's engine with the stored version
+and rebuilds it when they differ, so configuration changes made by any
+process are picked up and rolled-back writes never are.
+"""
+from dataclasses import dataclass, fields
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, select
+import structlog
+
+from app.models.config import (
+    OpportunityCategory,
+    ServiceLineCategory,
+    ServiceLineStageEffort,
+    ServiceLineOfferingMapping,
+    ServiceLineOfferingThreshold,
+)
+from app.services.data_versions import bump_version, current_version
+from app.services.tcv_tiers import TierCategoriser
+
+logger = structlog.get_logger()
+
+# Configuration tables that feed the calculation engine
+CONFIG_MODELS = (
+    OpportunityCategory,
+    ServiceLineCategory,
+    ServiceLineStageEffort,
+    ServiceLineOfferingMapping,
+    ServiceLineOfferingThreshold,
+)
+
+# Data version bumped by every write to CONFIG_MODELS
+CONFIG_VERSION = "config"
+
+# Maps OpportunityCategory duration columns to sales stage names
+STAGE_DURATION_FIELDS = {
+    "01": "stage_01_duration_weeks",
+    "02": "stage_02_duration_weeks",
+    "03": "stage_03_duration_weeks",
+    "04A": "stage_04a_duration_weeks",
+    "04B": "stage_04b_duration_weeks",
+    "05A": "stage_05a_duration_weeks",
+    "05B": "stage_05b_duration_weeks",
+    "06": "stage_06_duration_weeks",
+}
+
+
+@dataclass(frozen=True)
+class CategoryTier:
+    """A TCV tier (min/max in millions) resolved to a category name."""
+    id: int
+    name: str
+    min_tcv: float
+    max_tcv: Optional[float]
+
+
+@dataclass(frozen=True)
+class OfferingThreshold:
+    """Offering count threshold and per-offering increment for a stage."""
+    threshold_count: int
+    increment_multiplier: float
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable, indexed view of the calculation configuration.
+
+    Attributes:
+        version: Configuration version the snapshot was built from
+        opportunity_categories: Timeline categories ordered by min_tcv
+        service_line_categories: Service line -> resource categories ordered by min_tcv
+        service_line_category_ids: (service_line, category) -> ServiceLineCategory id
+        stage_durations: (category, stage) -> duration in weeks
+        stage_fte: (service_line, resource_category, stage) -> base FTE required
+        offering_mappings: Service line -> {(internal_service, simplified_offering)}
+        offering_thresholds: (service_line, stage) -> OfferingThreshold
+        effort_categories: (service_line, resource_category) pairs with stage efforts
+        internal_service_lines: Internal service -> service line of its last offering mapping
+        first_stage_fte: (service_line, stage) -> base FTE of the first stage effort row,
+            in any resource category
+        timeline_categoriser: Compiled lookup for timeline_category_for
+        resource_categorisers: Service line -> compiled lookup for resource_category_for
+    """
+    version: int
+    opportunity_categories: Tuple[CategoryTier, ...]
+    service_line_categories: Mapping[str, Tuple[CategoryTier, ...]]
+    service_line_category_ids: Mapping[Tuple[str, str], int]
+    stage_durations: Mapping[Tuple[str, str], float]
+    stage_fte: Mapping[Tuple[str, str, str], float]
+    offering_mappings: Mapping[str, FrozenSet[Tuple[str, str]]]
+    offering_thresholds: Mapping[Tuple[str, str], OfferingThreshold]
+    effort_categories: FrozenSet[Tuple[str, str]]
+    internal_service_lines: Mapping[str, str]
+    first_stage_fte: Mapping[Tuple[str, str], float]
+    timeline_categoriser: TierCategoriser
+    resource_categorisers: Mapping[str, TierCategoriser]
+
+    def timeline_category_for(self, tcv_value: float) -> Optional[str]:
+        """Return the timeline category for a total TCV, or None if uncategorised."""
+        return self.timeline_categoriser.categorise(tcv_value)
+
+    def timeline_categories_for(self, tcv_values: Iterable[Optional[float]]) -> np.ndarray:
+        """Return the timeline categories of a column of total TCVs (None if uncategorised)."""
+        return self.timeline_categoriser.categorise_many(tcv_values)
+
+    def resource_category_for(self, service_line: str, service_line_tcv: float) -> Optional[str]:
+        """Return the resource category for a service line TCV, or None if uncategorised."""
+        categoriser = self.resource_categorisers.get(service_line)
+        return categoriser.categorise(service_line_tcv) if categoriser else None
+
+    def has_timeline_category(self, category: str) -> bool:
+        """Check whether a timeline category with this name is configured."""
+        return any(tier.name == category for tier in self.opportunity_categories)
+
+    def has_resource_category(self, service_line: str, category: str) -> bool:
+        """Check whether a resource category is configured for the service line."""
+        return (service_line, category) in self.service_line_category_ids
+
+    def durations_for(self, category: str) -> Dict[str, float]:
+        """Return stage -> duration weeks for a timeline category."""
+        return {
+            stage: self.stage_durations[(category, stage)]
+            for stage in STAGE_DURATION_FIELDS
+            if (category, stage) in self.stage_durations
+        }
+
+    def fte_for(self, service_line: str, resource_category: str) -> Dict[str, float]:
+        """Return stage -> base FTE for a service line and resource category."""
+        return {
+            stage: self.stage_fte[(service_line, resource_category, stage)]
+            for stage in STAGE_DURATION_FIELDS
+            if (service_line, resource_category, stage) in self.stage_fte
+        }
+
+    def has_stage_efforts(self, service_line: str, resource_category: str) -> bool:
+        """Check whether any stage effort rows exist for a service line and resource category."""
+        return (service_line, resource_category) in self.effort_categories
+
+    def __reduce__(self):
+        # Mapping proxies do not pickle; worker processes receive plain dicts
+        values = {
+            f.name: dict(value) if isinstance(value, MappingProxyType) else value
+            for f in fields(self)
+            for value in (getattr(self, f.name),)
+        }
+        return _restore_config_snapshot, (values,)
+
+
+def _restore_config_snapshot(values: Dict) -> ConfigSnapshot:
+    """Rebuild a pickled snapshot with read-only mappings."""
+    return ConfigSnapshot(**{
+        name: MappingProxyType(value) if isinstance(value, dict) else value
+        for name, value in values.items()
+    })
+
+
+def _match_tier(tiers: Iterable[CategoryTier], value: float) -> Optional[str]:
+    """Find the tier with the highest min_tcv whose inclusive range contains the value."""
+    best_match = None
+    for tier in tiers:
+        if value >= tier.min_tcv and (tier.max_tcv is None or value <= tier.max_tcv):
+            best_match = tier
+    return best_match.name if best_match else None
+
+
+def compile_timeline_categoriser(tiers: Tuple[CategoryTier, ...]) -> TierCategoriser:
+    """Compile timeline tiers; negative TCVs are uncategorised."""
+    return TierCategoriser.compile(
+        tiers, lambda value: None if value < 0 else _match_tier(tiers, value)
+    )
+
+
+def compile_resource_categoriser(tiers: Tuple[CategoryTier, ...]) -> TierCategoriser:
+    """Compile a service line's resource tiers; non-positive TCVs are uncategorised."""
+    return TierCategoriser.compile(
+        tiers, lambda value: None if value <= 0 else _match_tier(tiers, value)
+    )
+
+
+def load_config_snapshot(session: Session, version: Optional[int] = None) -> ConfigSnapshot:
+    """
+    Build a configuration snapshot with one query per configuration table.
+
+    Bypasses the cache; use it where a snapshot must reflect the database
+    right now regardless of what this process has cached.
+
+    Args:
+        session: Database session
+        version: Version number to stamp on the snapshot (read from the database by default)
+
+    Returns:
+        ConfigSnapshot with all lookups indexed
+    """
+    if version is None:
+        version = current_version(session, CONFIG_VERSION)
+    opportunity_categories = session.exec(
+        select(OpportunityCategory).order_by(OpportunityCategory.min_tcv, OpportunityCategory.id)
+    ).all()
+    service_line_categories = session.exec(
+        select(ServiceLineCategory).order_by(ServiceLineCategory.min_tcv, ServiceLineCategory.id)
+    ).all()
+    stage_efforts = session.exec(
+        select(ServiceLineStageEffort).order_by(ServiceLineStageEffort.id)
+    ).all()
+    offering_mappings = session.exec(
+        select(ServiceLineOfferingMapping).order_by(ServiceLineOfferingMapping.id)
+    ).all()
+    offering_thresholds = session.exec(
+        select(ServiceLineOfferingThreshold).order_by(ServiceLineOfferingThreshold.id)
+    ).all()
+
+    stage_durations = {}
+    for category in sorted(opportunity_categories, key=lambda c: c.id):
+        for stage, field in STAGE_DURATION_FIELDS.items():
+            # Lowest id wins for duplicate names, as with a .first() lookup
+            stage_durations.setdefault((category.name, stage), getattr(category, field))
+
+    tiers_by_service_line: Dict[str, list] = {}
+    category_ids: Dict[Tuple[str, str], int] = {}
+    category_names: Dict[int, str] = {}
+    for category in service_line_categories:
+        tiers_by_service_line.setdefault(category.service_line, []).append(
+            CategoryTier(category.id, category.name, category.min_tcv, category.max_tcv)
+        )
+        category_names[category.id] = category.name
+    for category in sorted(service_line_categories, key=lambda c: c.id):
+        category_ids.setdefault((category.service_line, category.name), category.id)
+
+    stage_fte: Dict[Tuple[str, str, str], float] = {}
+    first_stage_fte: Dict[Tuple[str, str], float] = {}
+    effort_categories = set()
+    for effort in stage_efforts:
+        first_stage_fte.setdefault((effort.service_line, effort.stage_name), effort.fte_required)
+        category_name = category_names.get(effort.service_line_category_id)
+        # Efforts only apply through the category id resolved for (service_line, name)
+        if category_name is None or category_ids.get((effort.service_line, category_name)) != effort.service_line_category_id:
+            continue
+        # Later rows override earlier ones, matching the previous dict-comprehension lookup
+        stage_fte[(effort.service_line, category_name, effort.stage_name)] = effort.fte_required
+        effort_categories.add((effort.service_line, category_name))
+
+    mappings: Dict[str, set] = {}
+    internal_service_lines: Dict[str, str] = {}
+    for mapping in offering_mappings:
+        mappings.setdefault(mapping.service_line, set()).add(
+            (mapping.internal_service, mapping.simplified_offering)
+        )
+        internal_service_lines[mapping.internal_service] = mapping.service_line
+
+    thresholds: Dict[Tuple[str, str], OfferingThreshold] = {}
+    for threshold in offering_thresholds:
+        thresholds.setdefault(
+            (threshold.service_line, threshold.stage_name),
+            OfferingThreshold(threshold.threshold_count, threshold.increment_multiplier),
+        )
+
+    timeline_tiers = tuple(
+        CategoryTier(c.id, c.name, c.min_tcv, c.max_tcv) for c in opportunity_categories
+    )
+    resource_tiers = {sl: tuple(tiers) for sl, tiers in tiers_by_service_line.items()}
+
+    snapshot = ConfigSnapshot(
+        version=version,
+        opportunity_categories=timeline_tiers,
+        service_line_categories=MappingProxyType(resource_tiers),
+        service_line_category_ids=MappingProxyType(category_ids),
+        stage_durations=MappingProxyType(stage_durations),
+        stage_fte=MappingProxyType(stage_fte),
+        offering_mappings=MappingProxyType(
+            {sl: frozenset(pairs) for sl, pairs in mappings.items()}
+        ),
+        offering_thresholds=MappingProxyType(thresholds),
+        effort_categories=frozenset(effort_categories),
+        internal_service_lines=MappingProxyType(internal_service_lines),
+        first_stage_fte=MappingProxyType(first_stage_fte),
+        timeline_categoriser=compile_timeline_categoriser(timeline_tiers),
+        resource_categorisers=MappingProxyType(
+            {sl: compile_resource_categoriser(tiers) for sl, tiers in resource_tiers.items()}
+        ),
+    )
+
+    logger.info("Loaded configuration snapshot",
+                version=version,
+                categories=len(opportunity_categories),
+                service_line_categories=len(service_line_categories),
+                stage_efforts=len(stage_fte),
+                offering_mappings=len(offering_mappings),
+                offering_thresholds=len(thresholds))
+    return snapshot
+
+
+# Snapshots cached per database engine
+_snapshots: "WeakKeyDictionary[Engine, ConfigSnapshot]" = WeakKeyDictionary()
+_snapshot_lock = Lock()
+
+
+def get_config_snapshot(session: Session) -> ConfigSnapshot:
+    """
+    Return the current configuration snapshot, rebuilding it if configuration changed.
+
+    Costs one primary key lookup of the stored configuration version, so a
+    configuration change committed by any process (another API worker, an
+    import worker) is seen by the next call.
+
+    Args:
+        session: Database session used to check the version and to rebuild
+
+    Returns:
+        ConfigSnapshot for the current configuration version
+    """
+    version = current_version(session, CONFIG_VERSION)
+    if session.info.get("config_changed"):
+        # Uncommitted configuration must not be shared with other sessions
+        return load_config_snapshot(session, version)
+
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    snapshot = _snapshots.get(engine)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = _snapshots.get(engine)
+        if snapshot is None or snapshot.version != version:
+            snapshot = load_config_snapshot(session, version)
+            _snapshots[engine] = snapshot
+        return snapshot
+
+
+def invalidate_config_snapshot() -> None:
+    """
+    Drop every cached snapshot in this process.
+
+    Not needed after configuration writes, which bump the stored version;
+    useful when a database is replaced underneath the process.
+    """
+    with _snapshot_lock:
+        _snapshots.clear()
+    logger.info("Configuration snapshots invalidated")
+
+
+def _touches_config(session: SASession) -> bool:
+    """Check whether a flush is about to write any configuration rows."""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, CONFIG_MODELS):
+            return True
+    return False
+
+
+@event.listens_for(SASession, "before_flush")
+def _track_config_writes(session, flush_context, instances):
+    if _touches_config(session):
+        bump_version(session, CONFIG_VERSION)
+        session.info["config_changed"] = True
+
+
+@event.listens_for(SASession, "after_commit")
+def _clear_after_commit(session):
+    session.info.pop("config_changed", None)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("config_changed", None)
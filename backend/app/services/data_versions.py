@@ -0,0 +1,36 @@
+"""
+Named version counters of data cached by every process.
+
+Each process-wide cache (the configuration snapshot, the missing timeline
+index) records the version it was built from. Writers bump the version in
+their own transaction, so a write committed by any process is seen by the
+next lookup and a rolled-back write by none.
+"""
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from app.models.database import DataVersion
+
+
+def current_version(session: Session, name: str) -> int:
+    """Read a stored version (0 before the first write)."""
+    version = session.execute(select(DataVersion.version).where(DataVersion.name == name)).scalar()
+    return version or 0
+
+
+def bump_version(connection, name: str) -> None:
+    """
+    Increment a stored version.
+
+    Runs in the caller's transaction, so the bump commits or rolls back with
+    the write it versions.
+
+    Args:
+        connection: Session or connection of the writing transaction
+        name: Version to bump, e.g. "config"
+    """
+    statement = sqlite_insert(DataVersion.__table__).values(name=name, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=["name"], set_={"version": DataVersion.__table__.c.version + 1}
+    )
+    connection.execute(statement)
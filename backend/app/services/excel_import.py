@@ -1,17 +1,30 @@
+import hashlib
+import numpy as np
 import pandas as pd
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 import structlog
 from datetime import datetime, date
 import os
 
 from app.models.database import engine
-from app.models.opportunity import Opportunity, OpportunityLineItem
+from app.models.opportunity import Opportunity, OpportunityLineItem, line_item_natural_key
+from app.services.excel_reader import ExcelChunkReader
+from app.services.timeline_recalculation import (
+    load_timeline_inputs,
+    schedule_timeline_recalculation,
+    timeline_inputs_changed,
+)
 
 logger = structlog.get_logger()
 
 
+# Called with the task whenever its progress changes
+ProgressCallback = Callable[["ImportTask"], None]
+
+
 class ImportTask(BaseModel):
     """Import task model for tracking progress."""
     task_id: str
@@ -23,18 +36,28 @@ class ImportTask(BaseModel):
     successful_rows: int = 0
     failed_rows: int = 0
     warnings_count: int = 0
+    inserted_rows: int = 0
+    updated_rows: int = 0
+    unchanged_rows: int = 0
     errors: List[str] = []
+    # Opportunity ids whose imported data changed
+    changed_ids: List[str] = []
     start_time: str = ""
     end_time: str = ""
 
 
-def validate_excel_data(df: pd.DataFrame, required_columns: List[str]) -> None:
-    """Validate Excel data structure and content."""
-    missing_cols = [col for col in required_columns if col not in df.columns]
+def validate_excel_columns(columns: List, required_columns: List[str]) -> None:
+    """Validate that the Excel header row contains the required columns."""
+    missing_cols = [col for col in required_columns if col not in columns]
     if missing_cols:
         # Show available columns for debugging
-        available_cols = list(df.columns)
+        available_cols = list(columns)
         raise ValueError(f"Missing required columns: {missing_cols}. Available columns: {available_cols}")
+
+
+def validate_excel_data(df: pd.DataFrame, required_columns: List[str]) -> None:
+    """Validate Excel data structure and content."""
+    validate_excel_columns(list(df.columns), required_columns)
     
     if df.empty:
         raise ValueError("Excel file is empty")
@@ -99,258 +122,404 @@ def safe_string_clean(value: any) -> Optional[str]:
 
 
 
-async def import_excel_background(file_path: str, task_id: str, import_tasks: Dict[str, ImportTask]) -> None:
+# Rows per upsert transaction during opportunity imports
+IMPORT_CHUNK_SIZE = 1000
+
+# Opportunity Id values that mark summary rows rather than opportunities
+SUMMARY_ROW_IDS = ["total", "sum", "grand total", "nan", "nat"]
+
+# Substrings that mark report filter descriptions exported as rows
+SUMMARY_ROW_MARKERS = ["applied filters", "status is", "masterfy is", "sales org"]
+
+# Opportunity fields overwritten on re-import. User-managed fields are preserved:
+# security_clearance, custom_priority, internal_stage_assessment,
+# custom_tracking_field_1/2/3, internal_notes
+OPPORTUNITY_IMPORT_FIELDS = [
+    "sfdc_url", "account_name", "opportunity_name", "opportunity_type", "tcv_millions",
+    "margin_percentage", "first_year_q1_rev", "first_year_q2_rev", "first_year_q3_rev",
+    "first_year_q4_rev", "first_year_fy_rev", "second_year_q1_rev", "second_year_q2_rev",
+    "second_year_q3_rev", "second_year_q4_rev", "second_year_fy_rev", "fy_rev_beyond_yr2",
+    "sales_stage", "decision_date", "master_period", "contract_length", "in_forecast",
+    "opportunity_owner", "lead_offering_l1", "ces_millions", "ins_millions", "bps_millions",
+    "sec_millions", "itoc_millions", "mw_millions", "sales_org_l1"
+]
+
+# Opportunity field -> Excel column for optional text fields
+OPPORTUNITY_STRING_COLUMNS = {
+    "sfdc_url": "SFDC",
+    "account_name": "Account Name",
+    "opportunity_type": "Opportunity Type",
+    "master_period": "Master Period",
+    "in_forecast": "In Forecast",
+    "opportunity_owner": "Opportunity Owner",
+    "lead_offering_l1": "Lead Offering L1",
+    "sales_org_l1": "Sales Org L1",
+}
+
+# Opportunity field -> Excel column for optional numeric fields
+OPPORTUNITY_FLOAT_COLUMNS = {
+    "margin_percentage": "Opp Margin %",
+    "first_year_q1_rev": "First Year Q1 Rev (M)",
+    "first_year_q2_rev": "First Year Q2 Rev (M)",
+    "first_year_q3_rev": "First Year Q3 Rev (M)",
+    "first_year_q4_rev": "First Year Q4 Rev (M)",
+    "first_year_fy_rev": "First Year FY Rev (M)",
+    "second_year_q1_rev": "2nd Year Q1 Rev (M)",
+    "second_year_q2_rev": "2nd Year Q2 Rev (M)",
+    "second_year_q3_rev": "2nd Year Q3 Rev (M)",
+    "second_year_q4_rev": "2nd Year Q4 Rev (M)",
+    "second_year_fy_rev": "2nd Year FY Rev (M)",
+    "fy_rev_beyond_yr2": "FY Rev Beyond Yr 2 (M)",
+    "contract_length": "Contract Length",
+    "ces_millions": "CES (M)",
+    "ins_millions": "INS (M)",
+    "bps_millions": "BPS (M)",
+    "sec_millions": "SEC (M)",
+    "itoc_millions": "ITOC (M)",
+    "mw_millions": "MW (M)",
+}
+
+
+# Line item fields overwritten on re-import; the natural key fields identify the item
+LINE_ITEM_IMPORT_FIELDS = [
+    "offering_tcv", "offering_abr", "offering_iyr", "offering_iqr",
+    "offering_margin", "offering_margin_percentage", "decision_date", "master_period",
+    "internal_service", "simplified_offering",
+    "first_year_q1_rev", "first_year_q2_rev", "first_year_q3_rev", "first_year_q4_rev",
+    "first_year_fy_rev", "second_year_q1_rev", "second_year_q2_rev", "second_year_q3_rev",
+    "second_year_q4_rev", "second_year_fy_rev", "fy_rev_beyond_yr2"
+]
+
+# Line item field -> Excel column for optional text fields
+LINE_ITEM_STRING_COLUMNS = {
+    "master_period": "Master Period",
+    "lead_offering_l2": "Lead Offering L2",
+    "internal_service": "Internal Service",
+    "simplified_offering": "Simplified Offering",
+    "product_name": "Product Name",
+}
+
+# Line item field -> Excel column for optional numeric fields
+LINE_ITEM_FLOAT_COLUMNS = {
+    "offering_tcv": "Offering TCV (M)",
+    "offering_abr": "Offering ABR (M)",
+    "offering_iyr": "Offering IYR (M)",
+    "offering_iqr": "Offering IQR (M)",
+    "offering_margin": "Offering Margin (M)",
+    "offering_margin_percentage": "Offering Margin %",
+    "first_year_q1_rev": "First Year Q1 Rev (M)",
+    "first_year_q2_rev": "First Year Q2 Rev (M)",
+    "first_year_q3_rev": "First Year Q3 Rev (M)",
+    "first_year_q4_rev": "First Year Q4 Rev (M)",
+    "first_year_fy_rev": "First Year FY Rev (M)",
+    "second_year_q1_rev": "2nd Year Q1 Rev (M)",
+    "second_year_q2_rev": "2nd Year Q2 Rev (M)",
+    "second_year_q3_rev": "2nd Year Q3 Rev (M)",
+    "second_year_q4_rev": "2nd Year Q4 Rev (M)",
+    "second_year_fy_rev": "2nd Year FY Rev (M)",
+    "fy_rev_beyond_yr2": "FY Rev Beyond Yr 2 (M)",
+}
+
+
+def clean_float_column(df: pd.DataFrame, column: str, multiplier: float = 1.0) -> pd.Series:
+    """Vectorised safe_float_convert: unparseable or missing values become NaN."""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=float)
+    return pd.to_numeric(df[column], errors="coerce") * multiplier
+
+
+def clean_string_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Vectorised safe_string_clean: blank, "nan" and "none" values become None."""
+    if column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    values = df[column]
+    cleaned = values.astype(str).str.strip()
+    blank = values.isna() | cleaned.str.lower().isin(["nan", "none", ""])
+    return cleaned.astype(object).where(~blank, None)
+
+
+def parse_date_column(values: pd.Series) -> pd.Series:
+    """Parse each value as a datetime independently; unparseable values become NaT."""
+    return pd.to_datetime(values, errors="coerce", format="mixed")
+
+
+def summary_row_mask(values: pd.Series) -> pd.Series:
+    """Flag Opportunity Id values that are totals, filter descriptions or blank."""
+    ids = values.astype(str)
+    lowered = ids.str.lower()
+    mask = values.isna() | lowered.isin(SUMMARY_ROW_IDS)
+    for marker in SUMMARY_ROW_MARKERS:
+        mask |= lowered.str.contains(marker, regex=False)
+    # Blank ids and multi-line filter descriptions
+    mask |= ids.str.strip().str.len() == 0
+    mask |= ids.str.contains("\n", regex=False)
+    return mask
+
+
+def prepare_opportunity_rows(
+    df: pd.DataFrame,
+    tcv_column: str,
+    task: ImportTask,
+    row_offset: int = 0
+) -> Tuple[List[Dict], int]:
+    """
+    Clean a block of opportunity rows into Opportunity column dicts.
+
+    Warnings and row failures are recorded on the task in row order.
+
+    Args:
+        df: Raw Excel rows
+        tcv_column: Name of the TCV column
+        task: Import task receiving warnings and failures
+        row_offset: Position of the first row in the file, for row numbers
+
+    Returns:
+        Tuple of (column dicts for valid rows, number of skipped rows)
+    """
+    raw_ids = df["Opportunity Id"]
+    raw_names = df["Opportunity Name"]
+    names = raw_names.astype(str).str.strip()
+
+    # Summary rows, mostly-empty rows (<10% of fields) and rows without names are skipped
+    skipped = summary_row_mask(raw_ids)
+    skipped |= df.notna().sum(axis=1) < len(df.columns) * 0.1
+    skipped |= raw_names.isna() | names.str.lower().isin(["nan", "none", "", "null"])
+
+    raw_tcv = df[tcv_column]
+    tcv = pd.to_numeric(raw_tcv, errors="coerce")
+    tcv_missing = raw_tcv.isna()
+    tcv_invalid = ~tcv_missing & tcv.isna()
+    decision_dates = parse_date_column(df["Decision Date"])
+    date_invalid = decision_dates.isna()
+
+    flagged = ~skipped & (tcv_missing | tcv_invalid | (tcv == 0) | date_invalid)
+    for position in np.flatnonzero(flagged.to_numpy()):
+        row_number = row_offset + position + 1
+        if tcv_missing.iat[position]:
+            task.errors.append(f"Row {row_number}: Warning - Missing TCV data for '{raw_names.iat[position]}'")
+            task.warnings_count += 1
+        if date_invalid.iat[position]:
+            raw_date = df["Decision Date"].iat[position]
+            reason = "Missing decision date" if pd.isna(raw_date) else f"Invalid decision date: '{raw_date}'"
+            task.errors.append(f"Row {row_number}: {reason}")
+            task.failed_rows += 1
+            continue
+        if tcv_invalid.iat[position]:
+            task.errors.append(f"Row {row_number}: Warning - Could not parse TCV amount: '{raw_tcv.iat[position]}'")
+            task.warnings_count += 1
+        elif tcv.iat[position] == 0:
+            task.errors.append(f"Row {row_number}: Warning - TCV amount is zero")
+            task.warnings_count += 1
+
+    stages = df["Sales Stage"].astype(str).str.strip().where(df["Sales Stage"].notna(), "Unknown")
+    columns = {
+        "opportunity_id": raw_ids.astype(str),
+        "opportunity_name": names,
+        # Zero TCV is stored as NULL, as with single-row imports
+        "tcv_millions": tcv.where(tcv != 0),
+        "sales_stage": stages,
+        "decision_date": decision_dates,
+    }
+    for field, column in OPPORTUNITY_STRING_COLUMNS.items():
+        columns[field] = clean_string_column(df, column)
+    for field, column in OPPORTUNITY_FLOAT_COLUMNS.items():
+        columns[field] = clean_float_column(df, column)
+
+    valid = ~skipped & ~date_invalid
+    rows = pd.DataFrame(columns)[valid].astype(object)
+    rows = rows.where(rows.notna(), None)
+    return rows.to_dict("records"), int(skipped.sum())
+
+
+def row_fingerprint(row: Dict, fields: List[str]) -> str:
+    """
+    Hash a row's imported field values.
+
+    The hash only depends on the values, so it is stable across processes
+    and runs and can be stored to detect unchanged rows on re-import.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for field in fields:
+        value = row.get(field)
+        if value is None:
+            token = "\x00"
+        elif isinstance(value, (datetime, date)):
+            token = value.isoformat()
+        elif isinstance(value, (float, np.floating)):
+            token = repr(float(value))
+        else:
+            token = str(value)
+        digest.update(token.encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def split_changed_rows(
+    rows: List[Dict],
+    fields: List[str],
+    key: Callable[[Dict], Hashable],
+    existing_hashes: Dict[Hashable, Optional[str]]
+) -> Tuple[List[Dict], List[Dict], int]:
+    """
+    Fingerprint rows and compare them with the stored fingerprints.
+
+    Sets ``import_hash`` on every row. When a key appears more than once,
+    the last row wins.
+
+    Args:
+        rows: Column dicts of one chunk
+        fields: Imported fields covered by the fingerprint
+        key: Natural key of a row
+        existing_hashes: Stored fingerprint by key for rows already in the database
+
+    Returns:
+        Tuple of (new rows, changed rows, number of unchanged rows)
+    """
+    latest = {}
+    for row in rows:
+        row["import_hash"] = row_fingerprint(row, fields)
+        latest[key(row)] = row
+    inserted, updated, unchanged = [], [], 0
+    for row_key, row in latest.items():
+        if row_key not in existing_hashes:
+            inserted.append(row)
+        elif existing_hashes[row_key] != row["import_hash"]:
+            updated.append(row)
+        else:
+            unchanged += 1
+    return inserted, updated, unchanged
+
+
+def opportunity_key(row: Dict) -> str:
+    """Natural key of an opportunity row."""
+    return row["opportunity_id"]
+
+
+def upsert_opportunities(session: Session, rows: List[Dict]) -> None:
+    """
+    Insert or update opportunities by opportunity_id without committing.
+
+    Uses a single INSERT ... ON CONFLICT(opportunity_id) DO UPDATE statement
+    that only overwrites imported fields, so user-managed fields survive.
+    When an opportunity appears more than once, the last row wins.
+
+    Args:
+        session: Database session
+        rows: Column dicts from prepare_opportunity_rows
+    """
+    latest = {opportunity_key(row): row for row in rows}
+    statement = sqlite_insert(Opportunity.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=["opportunity_id"],
+        set_={field: statement.excluded[field] for field in [*OPPORTUNITY_IMPORT_FIELDS, "import_hash"]}
+    )
+    session.execute(statement, list(latest.values()))
+
+
+def schedule_import_recalculation(task: ImportTask, opportunity_ids) -> None:
+    """
+    Recalculate the Predicted timelines of opportunities an import changed.
+
+    Runs in the importing worker; a failure is logged on the task but does not
+    fail the import, whose rows are already committed.
+    """
+    try:
+        schedule_timeline_recalculation(opportunity_ids, "import", task.task_id, bind=engine, run_inline=True)
+    except Exception as e:
+        task.errors.append(f"Timeline recalculation failed: {str(e)}")
+        logger.error("Import timeline recalculation failed", task_id=task.task_id, error=str(e))
+
+
+def import_excel_background(file_path: str, task: ImportTask, on_progress: Optional[ProgressCallback] = None) -> None:
     """Background task for Excel import with progress tracking."""
-    task = import_tasks[task_id]
+    task_id = task.task_id
     
     try:
         task.status = "processing"
         task.message = "Reading Excel file"
         task.start_time = datetime.now().isoformat()
         
-        # Read Excel file
-        df = pd.read_excel(file_path)
-        
-        # Find the TCV column dynamically
-        tcv_column = find_tcv_column(df)
-        if not tcv_column:
-            available_cols = list(df.columns)
-            raise ValueError(f"No TCV column found. Available columns: {available_cols}")
-        
-        # Validate required columns for opportunities (using flexible TCV column)
-        required_columns = ["Opportunity Id", "Opportunity Name", "Sales Stage", "Decision Date"]
-        validate_excel_data(df, required_columns)
-        
-        # Log which TCV column we're using
-        logger.info("Using TCV column", column_name=tcv_column)
-        
-        task.total_rows = len(df)
-        task.message = f"Processing {task.total_rows} opportunities"
-        
-        skipped_rows = 0
-        for idx, (_, row) in enumerate(df.iterrows()):
-            # Process each row in its own transaction to prevent rollback issues
+        # Stream the workbook in chunks; headers are parsed once when it is opened
+        with ExcelChunkReader(file_path, IMPORT_CHUNK_SIZE) as reader:
+            # Find the TCV column dynamically
+            tcv_column = find_tcv_column(pd.DataFrame(columns=reader.headers))
+            if not tcv_column:
+                raise ValueError(f"No TCV column found. Available columns: {reader.headers}")
+            
+            # Validate required columns for opportunities (using flexible TCV column)
+            required_columns = ["Opportunity Id", "Opportunity Name", "Sales Stage", "Decision Date"]
+            validate_excel_columns(reader.headers, required_columns)
+            
+            # Log which TCV column we're using
+            logger.info("Using TCV column", column_name=tcv_column)
+            
+            # Row count from the sheet dimensions; corrected once the file has been read
+            task.total_rows = reader.estimated_rows
+            task.message = f"Processing {task.total_rows} opportunities"
+            
+            skipped_rows = 0
+            changed_ids = set()
+            timeline_ids = set()
             with Session(engine) as session:
-                try:
-                    # Skip summary rows and invalid data
-                    opportunity_id = str(row["Opportunity Id"])
-                    
-                    # Skip various types of summary/filter rows
-                    skip_conditions = [
-                        opportunity_id.lower() in ["total", "sum", "grand total", "nan", "nat"],
-                        pd.isna(row["Opportunity Id"]),
-                        "applied filters" in opportunity_id.lower(),
-                        "status is" in opportunity_id.lower(),
-                        "masterfy is" in opportunity_id.lower(),
-                        "sales org" in opportunity_id.lower(),
-                        len(opportunity_id.strip()) == 0 if isinstance(opportunity_id, str) else False,
-                        # Skip multi-line filter descriptions
-                        '\n' in opportunity_id if isinstance(opportunity_id, str) else False
-                    ]
-                    
-                    if any(skip_conditions):
-                        skipped_rows += 1
-                        continue
-                    
-                    # Simple validation: if row has mostly empty fields, skip it
-                    non_null_count = row.notna().sum()
-                    total_fields = len(row)
-                    
-                    # If less than 10% of fields have data, treat as empty row
-                    if non_null_count < (total_fields * 0.1):
-                        skipped_rows += 1
-                        continue
-                    
-                    # Only require Opportunity Name for processing - make TCV optional but warn
-                    name_missing = pd.isna(row["Opportunity Name"])
-                    if not name_missing:
-                        name_str = str(row["Opportunity Name"]).strip()
-                        name_missing = not name_str or name_str.lower() in ["nan", "none", "", "null"]
-                    
-                    if name_missing:
-                        # Still skip rows without names, but don't count as error
-                        skipped_rows += 1
-                        continue
-                    
-                    # Warn about missing TCV but continue processing
-                    tcv_missing = pd.isna(row[tcv_column])
-                    if tcv_missing:
-                        task.errors.append(f"Row {idx + 1}: Warning - Missing TCV data for '{row['Opportunity Name']}'")
-                        task.warnings_count += 1
-                    
-                    # Parse close date with validation
-                    try:
-                        close_date = pd.to_datetime(row["Decision Date"]).date()
-                    except (ValueError, TypeError) as e:
-                        task.errors.append(f"Row {idx + 1}: Invalid decision date: {str(e)}")
-                        task.failed_rows += 1
-                        continue
-                    
-                    # Parse amount with validation - allow null TCV
-                    amount = None
-                    try:
-                        tcv_value = row[tcv_column]
-                        if not pd.isna(tcv_value):
-                            amount = float(tcv_value) * 1_000_000  # Convert from millions
-                            
-                            # Just warn about zero amounts
-                            if amount == 0:
-                                task.errors.append(f"Row {idx + 1}: Warning - TCV amount is zero")
-                                task.warnings_count += 1
-                        
-                    except (ValueError, TypeError) as e:
-                        task.errors.append(f"Row {idx + 1}: Warning - Could not parse TCV amount: {str(e)}")
-                        task.warnings_count += 1
-                        amount = None
-                    
-                    # Clean string fields
-                    name = str(row["Opportunity Name"]).strip()
-                    stage = str(row["Sales Stage"]).strip() if not pd.isna(row["Sales Stage"]) else "Unknown"
-                    assigned_resource = safe_string_clean(row.get("Opportunity Owner"))
-                    status = safe_string_clean(row.get("Forecast Category Consolidated"))
-                    
-                    # Skip if name is still invalid
-                    if name.lower() in ["nan", "none", ""]:
-                        task.errors.append(f"Row {idx + 1}: Invalid opportunity name")
-                        task.failed_rows += 1
-                        continue
-                    
-                    # Extract all new fields
-                    account_name = safe_string_clean(row.get("Account Name"))
-                    sfdc_url = safe_string_clean(row.get("SFDC"))
-                    opportunity_type = safe_string_clean(row.get("Opportunity Type"))
-                    margin_percentage = safe_float_convert(row.get("Opp Margin %"))
-                    first_year_revenue = safe_float_convert(row.get("First Year Revenue"), 1_000_000)
-                    second_year_revenue = safe_float_convert(row.get("2nd Year Revenue"), 1_000_000)
-                    revenue_beyond_year2 = safe_float_convert(row.get("FY Rev Beyond Yr 2"), 1_000_000)
-                    master_period = safe_string_clean(row.get("Master Period"))
-                    lead_offering = safe_string_clean(row.get("Lead Offering L1"))
-                    sales_org = safe_string_clean(row.get("Sales Org L1"))
-                    deal_size = safe_string_clean(row.get("Deal Size"))
-                    solution_type = safe_string_clean(row.get("Solution Type"))
-                    contract_model = safe_string_clean(row.get("Contract Model"))
-                    
-                    # Extract quarterly revenue fields
-                    first_year_q1_rev = safe_float_convert(row.get("First Year Q1 Rev (M)"))
-                    first_year_q2_rev = safe_float_convert(row.get("First Year Q2 Rev (M)"))
-                    first_year_q3_rev = safe_float_convert(row.get("First Year Q3 Rev (M)"))
-                    first_year_q4_rev = safe_float_convert(row.get("First Year Q4 Rev (M)"))
-                    first_year_fy_rev = safe_float_convert(row.get("First Year FY Rev (M)"))
-                    second_year_q1_rev = safe_float_convert(row.get("2nd Year Q1 Rev (M)"))
-                    second_year_q2_rev = safe_float_convert(row.get("2nd Year Q2 Rev (M)"))
-                    second_year_q3_rev = safe_float_convert(row.get("2nd Year Q3 Rev (M)"))
-                    second_year_q4_rev = safe_float_convert(row.get("2nd Year Q4 Rev (M)"))
-                    second_year_fy_rev = safe_float_convert(row.get("2nd Year FY Rev (M)"))
-                    fy_rev_beyond_yr2 = safe_float_convert(row.get("FY Rev Beyond Yr 2 (M)"))
-                    
-                    # Extract service line revenues
-                    ces_millions = safe_float_convert(row.get("CES (M)"))
-                    ins_millions = safe_float_convert(row.get("INS (M)"))
-                    bps_millions = safe_float_convert(row.get("BPS (M)"))
-                    sec_millions = safe_float_convert(row.get("SEC (M)"))
-                    itoc_millions = safe_float_convert(row.get("ITOC (M)"))
-                    mw_millions = safe_float_convert(row.get("MW (M)"))
-                    
-                    # Parse close date for decision_date field
-                    try:
-                        decision_date = pd.to_datetime(row["Decision Date"]).to_pydatetime()
-                    except (ValueError, TypeError):
-                        decision_date = None
-                        
-                    # Extract other fields
-                    contract_length = safe_float_convert(row.get("Contract Length"))
-                    in_forecast = safe_string_clean(row.get("In Forecast"))
-                    opportunity_owner = safe_string_clean(row.get("Opportunity Owner"))
-
-                    # Create opportunity with new schema fields
-                    opp = Opportunity(
-                        opportunity_id=opportunity_id,
-                        sfdc_url=sfdc_url,
-                        account_name=account_name,
-                        opportunity_name=name,
-                        opportunity_type=opportunity_type,
-                        tcv_millions=amount / 1_000_000 if amount else None,  # Convert back to millions
-                        margin_percentage=margin_percentage,
-                        first_year_q1_rev=first_year_q1_rev,
-                        first_year_q2_rev=first_year_q2_rev,
-                        first_year_q3_rev=first_year_q3_rev,
-                        first_year_q4_rev=first_year_q4_rev,
-                        first_year_fy_rev=first_year_fy_rev,
-                        second_year_q1_rev=second_year_q1_rev,
-                        second_year_q2_rev=second_year_q2_rev,
-                        second_year_q3_rev=second_year_q3_rev,
-                        second_year_q4_rev=second_year_q4_rev,
-                        second_year_fy_rev=second_year_fy_rev,
-                        fy_rev_beyond_yr2=fy_rev_beyond_yr2,
-                        sales_stage=stage,
-                        decision_date=decision_date,
-                        master_period=master_period,
-                        contract_length=contract_length,
-                        in_forecast=in_forecast,
-                        opportunity_owner=opportunity_owner,
-                        lead_offering_l1=lead_offering,
-                        ces_millions=ces_millions,
-                        ins_millions=ins_millions,
-                        bps_millions=bps_millions,
-                        sec_millions=sec_millions,
-                        itoc_millions=itoc_millions,
-                        mw_millions=mw_millions,
-                        sales_org_l1=sales_org
-                    )
-                    
-                    # Check if opportunity already exists
-                    existing = session.exec(
-                        select(Opportunity).where(Opportunity.opportunity_id == opp.opportunity_id)
-                    ).first()
-                    
-                    if existing:
-                        # Update existing opportunity with all fields EXCEPT user-managed fields
-                        # User-managed fields are preserved during imports: security_clearance, custom_priority,
-                        # internal_stage_assessment, custom_tracking_field_1/2/3, internal_notes
-                        update_fields = [
-                            "sfdc_url", "account_name", "opportunity_name", "opportunity_type", "tcv_millions",
-                            "margin_percentage", "first_year_q1_rev", "first_year_q2_rev", "first_year_q3_rev",
-                            "first_year_q4_rev", "first_year_fy_rev", "second_year_q1_rev", "second_year_q2_rev",
-                            "second_year_q3_rev", "second_year_q4_rev", "second_year_fy_rev", "fy_rev_beyond_yr2",
-                            "sales_stage", "decision_date", "master_period", "contract_length", "in_forecast",
-                            "opportunity_owner", "lead_offering_l1", "ces_millions", "ins_millions", "bps_millions",
-                            "sec_millions", "itoc_millions", "mw_millions", "sales_org_l1"
-                        ]
-                        for field in update_fields:
-                            setattr(existing, field, getattr(opp, field))
-                        logger.info("Updated existing opportunity", opportunity_id=opp.opportunity_id)
-                    else:
-                        # Add new opportunity
-                        session.add(opp)
-                        logger.info("Created new opportunity", opportunity_id=opp.opportunity_id)
-                    
-                    # Commit this row's transaction
-                    try:
-                        session.commit()
-                        task.successful_rows += 1
-                        logger.info("Row committed successfully", 
-                                  opportunity_id=opp.opportunity_id,
-                                  opportunity_name=opp.opportunity_name,
-                                  tcv_millions=opp.tcv_millions,
-                                  action="updated" if existing else "created")
-                    except Exception as commit_error:
-                        session.rollback()
-                        error_msg = f"Row {idx + 1}: Database commit failed - {str(commit_error)}"
-                        task.errors.append(error_msg)
-                        task.failed_rows += 1
-                        logger.error("Row commit failed", row_idx=idx, error=str(commit_error), opportunity_id=opp.opportunity_id)
-                    
-                    task.processed_rows = idx + 1
-                    task.progress = int((idx + 1) / task.total_rows * 100)
-                    task.message = f"Processing row {idx + 1} of {task.total_rows}"
-                    
-                except Exception as e:
-                    error_msg = f"Row {idx + 1}: {str(e)}"
-                    task.errors.append(error_msg)
-                    task.failed_rows += 1
-                    logger.error("Row processing error", row_idx=idx, error=str(e))
-                    # Session will auto-rollback when context exits
-                    continue
+                # Stored fingerprints, read once; only new or changed rows are written
+                existing_hashes = dict(session.exec(select(Opportunity.opportunity_id, Opportunity.import_hash)).all())
+                
+                for chunk in reader:
+                    chunk_end = reader.rows_read
+                    chunk_start = chunk_end - len(chunk)
+                    
+                    rows, chunk_skipped = prepare_opportunity_rows(chunk, tcv_column, task, chunk_start)
+                    skipped_rows += chunk_skipped
+                    
+                    if rows:
+                        inserted, updated, unchanged = split_changed_rows(
+                            rows, OPPORTUNITY_IMPORT_FIELDS, opportunity_key, existing_hashes
+                        )
+                        # Updated rows only need new timelines if a timeline input changed
+                        stored_inputs = load_timeline_inputs(session, (row["opportunity_id"] for row in updated))
+                        chunk_timeline_ids = {row["opportunity_id"] for row in inserted} | {
+                            row["opportunity_id"] for row in updated
+                            if timeline_inputs_changed(stored_inputs.get(row["opportunity_id"]), row)
+                        }
+                        # Each chunk commits in its own transaction so one bad chunk doesn't lose the rest
+                        try:
+                            if inserted or updated:
+                                upsert_opportunities(session, inserted + updated)
+                                session.commit()
+                        except Exception as commit_error:
+                            session.rollback()
+                            error_msg = f"Rows {chunk_start + 1}-{chunk_end}: Database commit failed - {str(commit_error)}"
+                            task.errors.append(error_msg)
+                            task.failed_rows += len(rows)
+                            logger.error("Chunk commit failed", first_row=chunk_start + 1, last_row=chunk_end, error=str(commit_error))
+                        else:
+                            for row in inserted + updated:
+                                existing_hashes[opportunity_key(row)] = row["import_hash"]
+                                changed_ids.add(row["opportunity_id"])
+                            timeline_ids.update(chunk_timeline_ids)
+                            task.successful_rows += len(rows)
+                            task.inserted_rows += len(inserted)
+                            task.updated_rows += len(updated)
+                            task.unchanged_rows += unchanged
+                            logger.info("Opportunity chunk committed",
+                                      first_row=chunk_start + 1,
+                                      last_row=chunk_end,
+                                      rows=len(rows),
+                                      inserted=len(inserted),
+                                      updated=len(updated),
+                                      unchanged=unchanged)
+                    
+                    task.total_rows = max(task.total_rows, chunk_end)
+                    task.processed_rows = chunk_end
+                    task.progress = int(chunk_end / task.total_rows * 100)
+                    task.message = f"Processing row {chunk_end} of {task.total_rows}"
+                    if on_progress:
+                        on_progress(task)
+            
+            if reader.rows_read == 0:
+                raise ValueError("Excel file is empty")
+            task.total_rows = reader.rows_read
+            task.changed_ids = sorted(changed_ids)
         
         # Clean up temporary file
         try:
@@ -363,7 +532,10 @@ async def import_excel_background(file_path: str, task_id: str, import_tasks: Di
         task.end_time = datetime.now().isoformat()
         
         # Create detailed completion message
-        success_msg = f"Import completed: {task.successful_rows} successful"
+        success_msg = (
+            f"Import completed: {task.successful_rows} successful "
+            f"({task.inserted_rows} new, {task.updated_rows} updated, {task.unchanged_rows} unchanged)"
+        )
         if task.failed_rows > 0:
             success_msg += f", {task.failed_rows} failed"
         if task.warnings_count > 0:
@@ -373,9 +545,14 @@ async def import_excel_background(file_path: str, task_id: str, import_tasks: Di
             
         task.message = success_msg
         
+        schedule_import_recalculation(task, timeline_ids)
+        
         logger.info("Excel import completed", 
                    task_id=task_id, 
                    successful=task.successful_rows,
+                   inserted=task.inserted_rows,
+                   updated=task.updated_rows,
+                   unchanged=task.unchanged_rows,
                    failed=task.failed_rows,
                    warnings=task.warnings_count,
                    total_errors=len(task.errors))
@@ -394,192 +571,200 @@ async def import_excel_background(file_path: str, task_id: str, import_tasks: Di
         logger.error("Excel import failed", task_id=task_id, error=str(e))
 
 
-async def import_line_items_background(file_path: str, task_id: str, import_tasks: Dict[str, ImportTask]) -> None:
+def prepare_line_item_rows(
+    df: pd.DataFrame,
+    tcv_column: str,
+    task: ImportTask,
+    opportunity_ids: set,
+    row_offset: int = 0
+) -> Tuple[List[Dict], int]:
+    """
+    Clean a block of line item rows into OpportunityLineItem column dicts.
+
+    Rows without TCV data or whose opportunity is not in `opportunity_ids`
+    are recorded on the task as failures, in row order.
+
+    Args:
+        df: Raw Excel rows
+        tcv_column: Name of the TCV column
+        task: Import task receiving failures
+        opportunity_ids: Opportunity ids present in the database
+        row_offset: Position of the first row in the file, for row numbers
+
+    Returns:
+        Tuple of (column dicts for valid rows, number of skipped rows)
+    """
+    raw_ids = df["Opportunity Id"]
+    ids = raw_ids.astype(str)
+    skipped = summary_row_mask(raw_ids)
+    tcv_missing = ~skipped & df[tcv_column].isna()
+    not_found = ~skipped & ~tcv_missing & ~ids.isin(opportunity_ids)
+
+    for position in np.flatnonzero((tcv_missing | not_found).to_numpy()):
+        row_number = row_offset + position + 1
+        if tcv_missing.iat[position]:
+            task.errors.append(f"Row {row_number}: Missing TCV data")
+        else:
+            task.errors.append(f"Row {row_number}: Opportunity {ids.iat[position]} not found")
+        task.failed_rows += 1
+
+    columns = {"opportunity_id": ids}
+    for field, column in LINE_ITEM_FLOAT_COLUMNS.items():
+        columns[field] = clean_float_column(df, column)
+    for field, column in LINE_ITEM_STRING_COLUMNS.items():
+        columns[field] = clean_string_column(df, column)
+    columns["decision_date"] = (
+        parse_date_column(df["Decision Date"]) if "Decision Date" in df.columns
+        else pd.Series(pd.NaT, index=df.index)
+    )
+
+    valid = ~skipped & ~tcv_missing & ~not_found
+    rows = pd.DataFrame(columns)[valid].astype(object)
+    rows = rows.where(rows.notna(), None)
+    return rows.to_dict("records"), int(skipped.sum())
+
+
+def line_item_key(row: Dict) -> Tuple[str, str, str]:
+    """Natural key of a line item row, matching the unique index."""
+    return (row["opportunity_id"], row["product_name"] or "", row["lead_offering_l2"] or "")
+
+
+def upsert_line_items(session: Session, rows: List[Dict]) -> None:
+    """
+    Insert or update line items by natural key without committing.
+
+    Uses a single INSERT ... ON CONFLICT statement against the unique
+    (opportunity_id, product_name, lead_offering_l2) index. When a line item
+    appears more than once, the last row wins.
+
+    Args:
+        session: Database session
+        rows: Column dicts from prepare_line_item_rows
+    """
+    latest = {line_item_key(row): row for row in rows}
+    statement = sqlite_insert(OpportunityLineItem.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(line_item_natural_key()),
+        set_={field: statement.excluded[field] for field in [*LINE_ITEM_IMPORT_FIELDS, "import_hash"]}
+    )
+    session.execute(statement, list(latest.values()))
+
+
+def import_line_items_background(file_path: str, task: ImportTask, on_progress: Optional[ProgressCallback] = None) -> None:
     """Background task for line items import with progress tracking."""
-    task = import_tasks[task_id]
+    task_id = task.task_id
     
     try:
         task.status = "processing"
         task.message = "Reading line items Excel file"
+        task.start_time = datetime.now().isoformat()
         
-        # Read Excel file
-        df = pd.read_excel(file_path)
-        
-        # Find the TCV column dynamically
-        tcv_column = find_tcv_column(df)
-        if not tcv_column:
-            available_cols = list(df.columns)
-            raise ValueError(f"No TCV column found. Available columns: {available_cols}")
-        
-        # Validate required columns for line items (using flexible TCV column)
-        required_columns = ["Opportunity Id"]
-        validate_excel_data(df, required_columns)
-        
-        # Log which TCV column we're using
-        logger.info("Using TCV column for line items", column_name=tcv_column)
-        
-        task.total_rows = len(df)
-        task.message = f"Processing {task.total_rows} line items"
-        
-        with Session(engine) as session:
-            for idx, (_, row) in enumerate(df.iterrows()):
-                try:
-                    opportunity_id = str(row["Opportunity Id"])
-                    
-                    # Skip various types of summary/filter rows (same logic as opportunities import)
-                    skip_conditions = [
-                        opportunity_id.lower() in ["total", "sum", "grand total", "nan", "nat"],
-                        pd.isna(row["Opportunity Id"]),
-                        "applied filters" in opportunity_id.lower(),
-                        "status is" in opportunity_id.lower(),
-                        "masterfy is" in opportunity_id.lower(),
-                        "sales org" in opportunity_id.lower(),
-                        len(opportunity_id.strip()) == 0 if isinstance(opportunity_id, str) else False,
-                        # Skip multi-line filter descriptions
-                        '\n' in opportunity_id if isinstance(opportunity_id, str) else False
-                    ]
-                    
-                    if any(skip_conditions):
-                        continue
-                    
-                    # Skip rows with missing TCV data
-                    if pd.isna(row[tcv_column]):
-                        task.errors.append(f"Row {idx + 1}: Missing TCV data")
-                        continue
-                    
-                    # Check if opportunity exists
-                    existing_opp = session.exec(
-                        select(Opportunity).where(Opportunity.opportunity_id == opportunity_id)
-                    ).first()
-                    
-                    if not existing_opp:
-                        task.errors.append(f"Row {idx + 1}: Opportunity {opportunity_id} not found")
-                        continue
-                    
-                    # Extract line item fields based on columns G-AC from Excel analysis
-                    offering_tcv = safe_float_convert(row.get("Offering TCV (M)"))
-                    offering_abr = safe_float_convert(row.get("Offering ABR (M)"))
-                    offering_iyr = safe_float_convert(row.get("Offering IYR (M)"))
-                    offering_iqr = safe_float_convert(row.get("Offering IQR (M)"))
-                    offering_margin = safe_float_convert(row.get("Offering Margin (M)"))
-                    offering_margin_percentage = safe_float_convert(row.get("Offering Margin %"))
-                    
-                    # Parse decision date
-                    try:
-                        decision_date = pd.to_datetime(row.get("Decision Date")).to_pydatetime()
-                    except (ValueError, TypeError):
-                        decision_date = None
-                        
-                    master_period = safe_string_clean(row.get("Master Period"))
-                    lead_offering_l2 = safe_string_clean(row.get("Lead Offering L2"))
-                    internal_service = safe_string_clean(row.get("Internal Service"))
-                    simplified_offering = safe_string_clean(row.get("Simplified Offering"))
-                    product_name = safe_string_clean(row.get("Product Name"))
-                    
-                    # Extract quarterly revenue fields for line items
-                    first_year_q1_rev = safe_float_convert(row.get("First Year Q1 Rev (M)"))
-                    first_year_q2_rev = safe_float_convert(row.get("First Year Q2 Rev (M)"))
-                    first_year_q3_rev = safe_float_convert(row.get("First Year Q3 Rev (M)"))
-                    first_year_q4_rev = safe_float_convert(row.get("First Year Q4 Rev (M)"))
-                    first_year_fy_rev = safe_float_convert(row.get("First Year FY Rev (M)"))
-                    second_year_q1_rev = safe_float_convert(row.get("2nd Year Q1 Rev (M)"))
-                    second_year_q2_rev = safe_float_convert(row.get("2nd Year Q2 Rev (M)"))
-                    second_year_q3_rev = safe_float_convert(row.get("2nd Year Q3 Rev (M)"))
-                    second_year_q4_rev = safe_float_convert(row.get("2nd Year Q4 Rev (M)"))
-                    second_year_fy_rev = safe_float_convert(row.get("2nd Year FY Rev (M)"))
-                    fy_rev_beyond_yr2 = safe_float_convert(row.get("FY Rev Beyond Yr 2 (M)"))
-                    
-                    # Create line item with new schema fields
-                    line_item = OpportunityLineItem(
-                        opportunity_id=opportunity_id,
-                        offering_tcv=offering_tcv,
-                        offering_abr=offering_abr,
-                        offering_iyr=offering_iyr,
-                        offering_iqr=offering_iqr,
-                        offering_margin=offering_margin,
-                        offering_margin_percentage=offering_margin_percentage,
-                        decision_date=decision_date,
-                        master_period=master_period,
-                        lead_offering_l2=lead_offering_l2,
-                        internal_service=internal_service,
-                        simplified_offering=simplified_offering,
-                        product_name=product_name,
-                        first_year_q1_rev=first_year_q1_rev,
-                        first_year_q2_rev=first_year_q2_rev,
-                        first_year_q3_rev=first_year_q3_rev,
-                        first_year_q4_rev=first_year_q4_rev,
-                        first_year_fy_rev=first_year_fy_rev,
-                        second_year_q1_rev=second_year_q1_rev,
-                        second_year_q2_rev=second_year_q2_rev,
-                        second_year_q3_rev=second_year_q3_rev,
-                        second_year_q4_rev=second_year_q4_rev,
-                        second_year_fy_rev=second_year_fy_rev,
-                        fy_rev_beyond_yr2=fy_rev_beyond_yr2
-                    )
-                    
-                    # Check if this specific line item already exists (match on opportunity_id + product_name + lead_offering_l2)
-                    existing_item = session.exec(
-                        select(OpportunityLineItem).where(
-                            (OpportunityLineItem.opportunity_id == opportunity_id) &
-                            (OpportunityLineItem.product_name == product_name) &
-                            (OpportunityLineItem.lead_offering_l2 == lead_offering_l2)
-                        )
-                    ).first()
-                    
-                    if existing_item:
-                        # Update existing line item with all fields
-                        update_fields = [
-                            "offering_tcv", "offering_abr", "offering_iyr", "offering_iqr",
-                            "offering_margin", "offering_margin_percentage", "decision_date", "master_period",
-                            "internal_service", "simplified_offering",
-                            "first_year_q1_rev", "first_year_q2_rev", "first_year_q3_rev", "first_year_q4_rev",
-                            "first_year_fy_rev", "second_year_q1_rev", "second_year_q2_rev", "second_year_q3_rev",
-                            "second_year_q4_rev", "second_year_fy_rev", "fy_rev_beyond_yr2"
-                        ]
-                        for field in update_fields:
-                            setattr(existing_item, field, getattr(line_item, field))
-                        logger.info("Updated existing line item", opportunity_id=opportunity_id, product_name=product_name)
-                    else:
-                        # Add new line item
-                        session.add(line_item)
-                        logger.info("Created new line item", opportunity_id=opportunity_id, product_name=product_name)
-                    
-                    task.processed_rows = idx + 1
-                    task.progress = int((idx + 1) / task.total_rows * 100)
-                    task.message = f"Processing row {idx + 1} of {task.total_rows}"
-                    
-                except Exception as e:
-                    error_msg = f"Row {idx + 1}: {str(e)}"
-                    task.errors.append(error_msg)
-                    logger.error("Line item processing error", row_idx=idx, error=str(e), opportunity_id=opportunity_id)
-                    # Rollback any partial transaction and continue
-                    session.rollback()
-                    continue
+        # Stream the workbook in chunks; headers are parsed once when it is opened
+        with ExcelChunkReader(file_path, IMPORT_CHUNK_SIZE) as reader:
+            # Find the TCV column dynamically
+            tcv_column = find_tcv_column(pd.DataFrame(columns=reader.headers))
+            if not tcv_column:
+                raise ValueError(f"No TCV column found. Available columns: {reader.headers}")
             
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error("Database commit failed", error=str(e))
-                raise RuntimeError(f"Failed to commit import data to database: {str(e)}") from e
+            # Validate required columns for line items (using flexible TCV column)
+            required_columns = ["Opportunity Id"]
+            validate_excel_columns(reader.headers, required_columns)
             
-            # Clean up temporary file
-            try:
-                os.remove(file_path)
-            except OSError:
-                pass
+            # Log which TCV column we're using
+            logger.info("Using TCV column for line items", column_name=tcv_column)
             
-            task.status = "completed"
-            task.progress = 100
-            task.message = f"Successfully imported {task.processed_rows} line items"
+            # Row count from the sheet dimensions; corrected once the file has been read
+            task.total_rows = reader.estimated_rows
+            task.message = f"Processing {task.total_rows} line items"
             
-            if task.errors:
-                task.message += f" with {len(task.errors)} errors"
+            changed_ids = set()
+            with Session(engine) as session:
+                # Parent ids and stored fingerprints are read once, not per row
+                opportunity_ids = set(session.exec(select(Opportunity.opportunity_id)).all())
+                existing_hashes = {
+                    (opportunity_id, product_name or "", lead_offering_l2 or ""): import_hash
+                    for opportunity_id, product_name, lead_offering_l2, import_hash in session.exec(
+                        select(OpportunityLineItem.opportunity_id, OpportunityLineItem.product_name,
+                               OpportunityLineItem.lead_offering_l2, OpportunityLineItem.import_hash)
+                    ).all()
+                }
+                
+                for chunk in reader:
+                    chunk_end = reader.rows_read
+                    chunk_start = chunk_end - len(chunk)
+                    
+                    rows, _ = prepare_line_item_rows(chunk, tcv_column, task, opportunity_ids, chunk_start)
+                    
+                    if rows:
+                        inserted, updated, unchanged = split_changed_rows(
+                            rows, LINE_ITEM_IMPORT_FIELDS, line_item_key, existing_hashes
+                        )
+                        # Each chunk commits in its own transaction so one bad chunk doesn't lose the rest
+                        try:
+                            if inserted or updated:
+                                upsert_line_items(session, inserted + updated)
+                                session.commit()
+                        except Exception as commit_error:
+                            session.rollback()
+                            error_msg = f"Rows {chunk_start + 1}-{chunk_end}: Database commit failed - {str(commit_error)}"
+                            task.errors.append(error_msg)
+                            task.failed_rows += len(rows)
+                            logger.error("Line item chunk commit failed", first_row=chunk_start + 1, last_row=chunk_end, error=str(commit_error))
+                        else:
+                            for row in inserted + updated:
+                                existing_hashes[line_item_key(row)] = row["import_hash"]
+                                changed_ids.add(row["opportunity_id"])
+                            task.successful_rows += len(rows)
+                            task.inserted_rows += len(inserted)
+                            task.updated_rows += len(updated)
+                            task.unchanged_rows += unchanged
+                            logger.info("Line item chunk committed",
+                                      first_row=chunk_start + 1,
+                                      last_row=chunk_end,
+                                      rows=len(rows),
+                                      inserted=len(inserted),
+                                      updated=len(updated),
+                                      unchanged=unchanged)
+                    
+                    task.total_rows = max(task.total_rows, chunk_end)
+                    task.processed_rows = chunk_end
+                    task.progress = int(chunk_end / task.total_rows * 100)
+                    task.message = f"Processing row {chunk_end} of {task.total_rows}"
+                    if on_progress:
+                        on_progress(task)
             
-            logger.info("Line items import completed", 
-                       task_id=task_id, 
-                       processed=task.processed_rows,
-                       errors=len(task.errors))
+            if reader.rows_read == 0:
+                raise ValueError("Excel file is empty")
+            task.total_rows = reader.rows_read
+            task.changed_ids = sorted(changed_ids)
+        
+        # Clean up temporary file
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        
+        task.status = "completed"
+        task.progress = 100
+        task.end_time = datetime.now().isoformat()
+        task.message = (
+            f"Successfully imported {task.successful_rows} line items "
+            f"({task.inserted_rows} new, {task.updated_rows} updated, {task.unchanged_rows} unchanged)"
+        )
+        
+        if task.errors:
+            task.message += f" with {len(task.errors)} errors"
+        
+        schedule_import_recalculation(task, task.changed_ids)
+        
+        logger.info("Line items import completed", 
+                   task_id=task_id, 
+                   successful=task.successful_rows,
+                   inserted=task.inserted_rows,
+                   updated=task.updated_rows,
+                   unchanged=task.unchanged_rows,
+                   failed=task.failed_rows,
+                   errors=len(task.errors))
                        
     except Exception as e:
         task.status = "failed"
@@ -592,4 +777,4 @@ async def import_line_items_background(file_path: str, task_id: str, import_task
         except OSError:
             pass
         
-        logger.error("Line items import failed", task_id=task_id, error=str(e))
\ No newline at end of file
+        logger.error("Line items import failed", task_id=task_id, error=str(e))
@@ -0,0 +1,166 @@
+"""
+Streaming Excel reader for large Salesforce exports.
+
+Reads .xlsx worksheets with openpyxl in read-only mode and yields fixed-size
+DataFrame chunks, so peak memory stays flat regardless of file size. Cell
+values go through the same conversions as ``pd.read_excel`` (integral floats
+become ints, blank cells and NA strings become NaN, duplicate headers are
+mangled, interior blank rows are kept and trailing ones dropped).
+
+Where the result differs from ``pd.read_excel``, it is so that values never
+depend on which chunk a row landed in; numeric and date cleaning happens in
+the importers:
+
+- Every column has object dtype, where pd.read_excel infers float64 or
+  datetime64 for uniform columns. Values compare equal.
+- Date cells are always ``datetime`` objects and blank cells NaN, where
+  pd.read_excel returns Timestamps (and NaT) for all-date columns.
+- Cells to the right of the last header are ignored so every chunk has the
+  same columns; pd.read_excel adds "Unnamed: N" columns for them.
+
+Legacy .xls files cannot be streamed by openpyxl and fall back to a full
+``pd.read_excel`` (which needs xlrd) that is then sliced into chunks, with
+the same dtype and date conversions.
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+from openpyxl import load_workbook
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+from pandas.io.parsers import TextParser
+
+# Rows per DataFrame chunk yielded to the import pipeline
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _convert_value(value):
+    """Convert a raw openpyxl value the way pandas' openpyxl engine does."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _convert_row(values) -> list:
+    """Convert a row and trim trailing empty cells."""
+    row = [_convert_value(value) for value in values]
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def _as_objects(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cast every column to object dtype, turning inferred datetime64 columns back into datetimes and NaN."""
+    for position, dtype in enumerate(frame.dtypes):
+        if is_datetime64_any_dtype(dtype):
+            frame.isetitem(position, pd.Series(
+                [np.nan if value is pd.NaT else value.to_pydatetime() for value in frame.iloc[:, position]],
+                index=frame.index, dtype=object,
+            ))
+    return frame.astype(object)
+
+
+class ExcelChunkReader:
+    """
+    Iterate over the first worksheet of an Excel file in DataFrame chunks.
+
+    Usage:
+        with ExcelChunkReader(file_path) as reader:
+            reader.headers           # parsed once, before any data rows
+            for chunk in reader:     # DataFrames of at most chunk_size rows
+                ...
+
+    Attributes:
+        headers: Column names, as pd.read_excel would name them
+        estimated_rows: Data row count from the sheet dimensions (0 if unknown);
+            only suitable for progress reporting
+        rows_read: Data rows yielded so far
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.rows_read = 0
+        self._workbook = None
+        self._frame: Optional[pd.DataFrame] = None
+
+        if Path(file_path).suffix.lower() == ".xls":
+            self._frame = _as_objects(pd.read_excel(file_path))
+            self.headers: List = list(self._frame.columns)
+            self.estimated_rows = len(self._frame)
+            return
+
+        self._workbook = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+        sheet = self._workbook.worksheets[0]
+        self.estimated_rows = max((sheet.max_row or 1) - 1, 0)
+        # Declared dimensions can be wrong; read every row actually present
+        sheet.reset_dimensions()
+        self._rows = sheet.iter_rows(values_only=True)
+        self._header_row = _convert_row(next(self._rows, ()))
+        self.headers = list(self._parse([]).columns)
+
+    def _parse(self, rows: List[list]) -> pd.DataFrame:
+        """Build a DataFrame from converted rows with pd.read_excel's parser settings."""
+        width = len(self._header_row)
+        data = [row + [""] * (width - len(row)) for row in [self._header_row] + rows]
+        # The parser still infers datetime64 for columns holding only dates
+        return _as_objects(TextParser(data, header=0, skip_blank_lines=False, dtype=object).read())
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if self._frame is not None:
+            for start in range(0, len(self._frame), self.chunk_size):
+                chunk = self._frame.iloc[start:start + self.chunk_size].reset_index(drop=True)
+                self.rows_read += len(chunk)
+                yield chunk
+            return
+
+        rows: List[list] = []
+        # Empty rows are held back so trailing ones are dropped, as pd.read_excel does
+        pending_empty = 0
+        for values in self._rows:
+            row = _convert_row(values)
+            if not row:
+                pending_empty += 1
+                continue
+            rows.extend([] for _ in range(pending_empty))
+            pending_empty = 0
+            rows.append(row[:len(self._header_row)])
+            while len(rows) >= self.chunk_size:
+                yield self._emit(rows[:self.chunk_size])
+                rows = rows[self.chunk_size:]
+        if rows:
+            yield self._emit(rows)
+
+    def _emit(self, rows: List[list]) -> pd.DataFrame:
+        chunk = self._parse(rows)
+        self.rows_read += len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        """Release the workbook file handle."""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    def __enter__(self) -> "ExcelChunkReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_excel_headers(file_path: str) -> List:
+    """
+    Read only the header row of an Excel file.
+
+    Args:
+        file_path: Path to the Excel file
+
+    Returns:
+        Column names, as pd.read_excel would name them
+    """
+    with ExcelChunkReader(file_path) as reader:
+        return reader.headers
@@ -0,0 +1,306 @@
+"""
+Persistent import job store and worker process pool.
+
+Import jobs are stored in the import_job table so that every API worker can
+report their progress and jobs survive restarts. The Excel parsing and
+database writes run in a ProcessPoolExecutor, outside the web process's
+event loop, so heavy imports do not compete with API requests.
+
+The claim, submit and recovery helpers are shared with the timeline
+recalculation jobs, which run on the same pool.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+import json
+import multiprocessing
+import os
+from threading import Lock
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
+from uuid import uuid4
+
+from sqlalchemy import inspect, update
+from sqlmodel import Session, SQLModel, select
+import structlog
+
+from app.config import settings
+from app.models.database import engine
+from app.models.imports import ImportJob
+from app.services.excel_import import ImportTask, import_excel_background, import_line_items_background
+
+logger = structlog.get_logger()
+
+# Import type -> import function run by the worker process
+IMPORT_RUNNERS: Dict[str, Callable] = {
+    "opportunities": import_excel_background,
+    "line_items": import_line_items_background,
+}
+
+# Minimum seconds between progress writes from a running import
+PROGRESS_SAVE_INTERVAL_SECONDS = 1.0
+
+# Jobs still "processing" without a progress write for this long are treated as lost
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+# ImportTask fields persisted on ImportJob
+TASK_FIELDS = (
+    "status", "progress", "message", "total_rows", "processed_rows", "successful_rows",
+    "failed_rows", "warnings_count", "inserted_rows", "updated_rows", "unchanged_rows",
+    "start_time", "end_time",
+)
+
+
+def job_to_task(job: ImportJob) -> ImportTask:
+    """Convert a stored job into the ImportTask returned by the status API."""
+    return ImportTask(
+        task_id=job.task_id,
+        errors=json.loads(job.errors or "[]"),
+        changed_ids=json.loads(job.changed_ids or "[]"),
+        **{field: getattr(job, field) for field in TASK_FIELDS}
+    )
+
+
+def create_import_job(session: Session, import_type: str, file_path: str, message: str) -> ImportTask:
+    """
+    Record a new pending import job.
+
+    Args:
+        session: Database session
+        import_type: Key of IMPORT_RUNNERS
+        file_path: Path of the uploaded file the worker will read
+        message: Initial status message
+
+    Returns:
+        ImportTask for the new job
+    """
+    job = ImportJob(
+        task_id=str(uuid4()),
+        import_type=import_type,
+        file_path=file_path,
+        status="pending",
+        message=message,
+        start_time=datetime.now().isoformat(),
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job_to_task(job)
+
+
+def get_import_task(session: Session, task_id: str) -> Optional[ImportTask]:
+    """Load an import job's current progress, or None if it does not exist."""
+    job = session.get(ImportJob, task_id)
+    return job_to_task(job) if job else None
+
+
+def save_import_task(session: Session, task: ImportTask) -> None:
+    """Persist an import task's progress to its job row."""
+    values = {field: getattr(task, field) for field in TASK_FIELDS}
+    session.exec(
+        update(ImportJob)
+        .where(ImportJob.task_id == task.task_id)
+        .values(errors=json.dumps(task.errors), changed_ids=json.dumps(task.changed_ids),
+                updated_at=datetime.utcnow(), **values)
+    )
+    session.commit()
+
+
+def claim_job(session: Session, model: Type[SQLModel], job_id: Any, **values) -> Optional[SQLModel]:
+    """
+    Atomically move a pending job to processing.
+
+    Only one worker can claim a job, even if it was submitted more than once
+    (e.g. by several API workers recovering jobs at startup). Shared by the
+    job tables run on the worker pool (ImportJob, TimelineRecalculationJob).
+
+    Args:
+        session: Database session
+        model: Job table
+        job_id: Primary key of the job
+        **values: Further columns to set on the claimed job
+
+    Returns:
+        The claimed job, or None if it was not pending
+    """
+    result = session.exec(
+        update(model)
+        .where(inspect(model).primary_key[0] == job_id, model.status == "pending")
+        .values(status="processing", updated_at=datetime.utcnow(), **values)
+    )
+    session.commit()
+    if result.rowcount != 1:
+        return None
+    return session.get(model, job_id)
+
+
+def claim_import_job(session: Session, task_id: str) -> Optional[ImportJob]:
+    """Claim a pending import job; None if it was not pending."""
+    return claim_job(session, ImportJob, task_id, message="Import started")
+
+
+def run_import_job(task_id: str) -> None:
+    """
+    Run a pending import job to completion. Entry point of the worker processes.
+
+    Args:
+        task_id: Job to run
+    """
+    with Session(engine) as session:
+        job = claim_import_job(session, task_id)
+        if job is None:
+            logger.info("Import job already claimed", task_id=task_id)
+            return
+
+        task = job_to_task(job)
+        runner = IMPORT_RUNNERS[job.import_type]
+        last_saved = time.monotonic()
+
+        def save_progress(current: ImportTask) -> None:
+            nonlocal last_saved
+            now = time.monotonic()
+            if now - last_saved >= PROGRESS_SAVE_INTERVAL_SECONDS:
+                save_import_task(session, current)
+                last_saved = now
+
+        logger.info("Import job started", task_id=task_id, import_type=job.import_type, worker_pid=os.getpid())
+        try:
+            runner(job.file_path, task, save_progress)
+        except Exception as e:
+            # Import functions record their own failures; this covers anything they let escape
+            task.status = "failed"
+            task.message = f"Import failed: {str(e)}"
+            task.errors.append(str(e))
+            logger.error("Import job crashed", task_id=task_id, error=str(e))
+        save_import_task(session, task)
+        logger.info("Import job finished", task_id=task_id, status=task.status)
+
+
+def fail_import_job(task_id: str, reason: str) -> None:
+    """Mark a job as failed when its worker could not run or finish it."""
+    with Session(engine) as session:
+        job = session.get(ImportJob, task_id)
+        if job is None or job.status in ("completed", "failed"):
+            return
+        file_path = job.file_path
+        errors = json.loads(job.errors or "[]") + [reason]
+        session.exec(
+            update(ImportJob)
+            .where(ImportJob.task_id == task_id)
+            .values(status="failed", message=f"Import failed: {reason}", errors=json.dumps(errors),
+                    end_time=datetime.now().isoformat(), updated_at=datetime.utcnow())
+        )
+        session.commit()
+    # The worker normally removes the upload; clean up after jobs it never finished
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+# Process-wide worker pool, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_import_executor() -> ProcessPoolExecutor:
+    """Return the import worker pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers start with fresh database connections instead of
+            # inheriting the web process's pool and threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.import_worker_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Import worker pool started", workers=settings.import_worker_processes)
+        return _executor
+
+
+def submit_job(run: Callable[[Any], None], job_id: Any, fail: Callable[[Any, str], None], name: str) -> Future:
+    """
+    Queue a pending job on the worker pool.
+
+    Args:
+        run: Worker entry point, called with the job id
+        job_id: Job to run
+        fail: Marks the job failed when the worker could not run or finish it
+        name: Job kind for log and failure messages, e.g. "Import"
+
+    Returns:
+        Future of the worker call
+    """
+    future = get_import_executor().submit(run, job_id)
+
+    def _on_done(done: Future) -> None:
+        if done.cancelled():
+            # Left pending; recover_jobs resubmits it on the next start
+            return
+        error = done.exception()
+        if error is not None:
+            # e.g. the worker process was killed (BrokenProcessPool)
+            logger.error(f"{name} worker failed", job_id=job_id, error=str(error))
+            fail(job_id, f"{name} worker failed: {error}")
+
+    future.add_done_callback(_on_done)
+    return future
+
+
+def recover_jobs(
+    model: Type[SQLModel],
+    submit: Callable[[Any], Future],
+    fail: Callable[[Any, str], None],
+    reason: str
+) -> List[Any]:
+    """
+    Resume jobs left behind by a previous run of the server.
+
+    Pending jobs are resubmitted in creation order; processing jobs whose
+    worker has not reported progress within STALE_JOB_TIMEOUT are marked failed.
+
+    Args:
+        model: Job table
+        submit: Queues a job on the worker pool
+        fail: Marks a job failed
+        reason: Failure reason recorded on stale jobs
+
+    Returns:
+        Ids of the jobs resubmitted to the worker pool
+    """
+    key = inspect(model).primary_key[0]
+    stale_before = datetime.utcnow() - STALE_JOB_TIMEOUT
+    with Session(engine) as session:
+        stale_ids = session.exec(
+            select(key).where(model.status == "processing", model.updated_at < stale_before)
+        ).all()
+        pending_ids = session.exec(
+            select(key).where(model.status == "pending").order_by(model.created_at, key)
+        ).all()
+
+    for job_id in stale_ids:
+        fail(job_id, reason)
+    for job_id in pending_ids:
+        submit(job_id)
+
+    if stale_ids or pending_ids:
+        logger.info("Recovered jobs", table=model.__tablename__, resubmitted=len(pending_ids), failed=len(stale_ids))
+    return list(pending_ids)
+
+
+def submit_import_job(task_id: str) -> Future:
+    """Queue a pending import job on the worker pool."""
+    return submit_job(run_import_job, task_id, fail_import_job, "Import")
+
+
+def recover_import_jobs() -> List[str]:
+    """Resubmit pending import jobs and fail stale ones left by a previous run."""
+    return recover_jobs(ImportJob, submit_import_job, fail_import_job, "Import interrupted before completion")
+
+
+def shutdown_import_executor() -> None:
+    """Stop the worker pool, letting running imports finish."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,119 @@
+"""
+Interval sweep helpers for concurrent FTE calculations.
+
+Daily grid arithmetic shared by the portfolio aggregate and the resource
+endpoints, and per-period peak stages: each stage's periods are located with
+a binary search on the period edges, so peaks cost
+O(records log periods + stage-period overlaps) instead of
+O(records x periods).
+
+Stages of the same opportunity/service line group are sequential: in any
+period only the highest-FTE active stage of a group counts.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Sequence, Tuple
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+ONE_DAY = timedelta(days=1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+DAY_MICROSECONDS = ONE_DAY // ONE_MICROSECOND
+
+# Extended precision keeps prefix-sum drift from changing rounded period means
+FTE_DTYPE = np.longdouble
+
+
+def naive(value: datetime) -> datetime:
+    """Strip timezone info for comparison with naive SQLite datetimes."""
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def day_index_range(
+    range_start: datetime,
+    range_end: datetime,
+    start_date: datetime,
+    days: int
+) -> Tuple[int, int]:
+    """
+    Map an inclusive datetime range onto grid day indexes.
+
+    Args:
+        range_start: Inclusive range start
+        range_end: Inclusive range end
+        start_date: Datetime of grid day 0
+        days: Number of grid days
+
+    Returns:
+        (first_index, last_index) clipped to the grid; first > last when empty
+    """
+    start_offset = (range_start - start_date) // ONE_MICROSECOND
+    end_offset = (range_end - start_date) // ONE_MICROSECOND
+    first = max(-(-start_offset // DAY_MICROSECONDS), 0)
+    last = min(end_offset // DAY_MICROSECONDS, days - 1)
+    return first, last
+
+
+def _microseconds(values: Sequence[datetime]) -> np.ndarray:
+    """Naive datetimes as int64 microseconds since the epoch."""
+    return np.fromiter(
+        ((naive(value) - EPOCH) // ONE_MICROSECOND for value in values), dtype=np.int64, count=len(values)
+    )
+
+
+def period_peak_stages(
+    intervals: Sequence[Tuple[Hashable, datetime, datetime, float]],
+    period_starts: Sequence[datetime],
+    period_ends: Sequence[datetime]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the highest-FTE stage of every group in every period it is active in.
+
+    A stage is active in a period when stage_start <= period_end and
+    stage_end >= period_start. Periods must be ordered, with both their
+    starts and their ends ascending.
+
+    Args:
+        intervals: (group_key, stage_start, stage_end, fte) tuples; callers
+            exclude zero-duration stages
+        period_starts: Inclusive period starts
+        period_ends: Inclusive period ends
+
+    Returns:
+        (periods, stages) index arrays with one entry per active group and
+        period. stages holds the first interval, in input order, with the
+        highest FTE among the group's stages active in that period. Entries
+        are ordered by group (in order of first appearance), then period.
+    """
+    count = len(intervals)
+    if count == 0 or len(period_starts) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    group_index: Dict[Hashable, int] = {}
+    groups = np.fromiter(
+        (group_index.setdefault(interval[0], len(group_index)) for interval in intervals),
+        dtype=np.int64, count=count,
+    )
+    starts = _microseconds([interval[1] for interval in intervals])
+    ends = _microseconds([interval[2] for interval in intervals])
+    fte = np.fromiter((interval[3] for interval in intervals), dtype=np.float64, count=count)
+
+    # First period ending at or after the stage start, last starting at or before its end
+    first = np.searchsorted(_microseconds(period_ends), starts, side="left")
+    last = np.searchsorted(_microseconds(period_starts), ends, side="right") - 1
+    spans = np.maximum(last - first + 1, 0)
+
+    # One entry per (stage, period) overlap
+    stages = np.repeat(np.arange(count), spans)
+    run_starts = np.cumsum(spans) - spans
+    periods = first[stages] + np.arange(len(stages)) - np.repeat(run_starts, spans)
+
+    if len(stages) == 0:
+        return periods, stages
+
+    # Highest FTE first within each (group, period), ties to the earliest stage
+    order = np.lexsort((stages, -fte[stages], periods, groups[stages]))
+    stages, periods = stages[order], periods[order]
+    cell_groups = groups[stages]
+    leaders = np.r_[True, (cell_groups[1:] != cell_groups[:-1]) | (periods[1:] != periods[:-1])]
+    return periods[leaders], stages[leaders]
@@ -0,0 +1,234 @@
+"""
+Cached index of opportunities that are eligible for a timeline but have none.
+
+Portfolio dashboards report how many opportunities are missing a timeline on
+every request. Instead of evaluating every opportunity each time, the index is
+built once with the bulk generation loaders and stores counts per category and
+set of service lines, so a lookup only sums a handful of counters.
+
+The index is keyed by two data versions stored in the database: the timeline
+data version, bumped in the same transaction as every session write to the
+opportunity or timeline tables (ORM flushes as well as bulk
+INSERT/UPDATE/DELETE statements), and the configuration version. Writes
+committed by any process, including import and recalculation workers, are
+therefore seen by the next lookup.
+
+Cost per lookup: two primary key reads (the configuration version, checked by
+get_config_snapshot, and the data version) plus summing the counters. The
+index is rebuilt, scanning opportunities and timelines, only on the first
+lookup after a committed write or configuration change.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import FrozenSet, Iterable, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session
+import structlog
+
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline
+from app.services.config_snapshot import ConfigSnapshot, get_config_snapshot
+from app.services.data_versions import bump_version, current_version
+from app.services.resource_calculation import get_service_lines_to_process, is_opportunity_eligible
+from app.services.timeline_generation import load_opportunities_for_generation, load_timeline_status
+
+logger = structlog.get_logger()
+
+# Tables whose writes change which opportunities are missing a timeline
+TRACKED_MODELS = (Opportunity, OpportunityResourceTimeline)
+TRACKED_TABLES = frozenset(model.__tablename__ for model in TRACKED_MODELS)
+
+# Data version bumped by every write to TRACKED_TABLES
+DATA_VERSION = "timeline_data"
+
+
+# A single filter value or any of several
+FilterValues = Union[None, str, Iterable[str]]
+
+
+@dataclass(frozen=True)
+class MissingTimelineIndex:
+    """
+    Counts of eligible opportunities without timelines.
+
+    Attributes:
+        data_version: Timeline data version the index was built from
+        config_version: Configuration snapshot version the index was built from
+        counts: (category, service lines the opportunity would generate) -> count
+    """
+    data_version: int
+    config_version: int
+    counts: Counter
+
+    @property
+    def total(self) -> int:
+        """Number of missing timelines without filters."""
+        return sum(self.counts.values())
+
+    def count(self, service_lines: FilterValues = None, categories: FilterValues = None) -> int:
+        """
+        Return the number of missing timelines matching the filters.
+
+        An opportunity matches when its category is one of `categories` and it
+        would generate at least one of `service_lines`; empty filters match all.
+        """
+        service_lines = _as_set(service_lines)
+        categories = _as_set(categories)
+        return sum(
+            count for (category, opportunity_service_lines), count in self.counts.items()
+            if (not categories or category in categories)
+            and (not service_lines or not service_lines.isdisjoint(opportunity_service_lines))
+        )
+
+
+def _as_set(values: FilterValues) -> FrozenSet[str]:
+    if not values:
+        return frozenset()
+    if isinstance(values, str):
+        return frozenset((values,))
+    return frozenset(values)
+
+
+def build_missing_timeline_counts(session: Session, config: ConfigSnapshot) -> Counter:
+    """
+    Count eligible opportunities without timelines per category and service line.
+
+    Args:
+        session: Database session
+        config: Configuration snapshot used for eligibility and categories
+
+    Returns:
+        Counter keyed by (category, frozenset of service lines)
+    """
+    existing = load_timeline_status(session)
+    missing = [
+        opp for opp in load_opportunities_for_generation(session)
+        if opp.opportunity_id not in existing and is_opportunity_eligible(opp, config)
+    ]
+    categories = config.timeline_categories_for([opp.tcv_millions for opp in missing])
+
+    counts = Counter()
+    for opp, category in zip(missing, categories):
+        service_lines = frozenset(sl for sl, _ in get_service_lines_to_process(opp))
+        counts[(category, service_lines)] += 1
+    return counts
+
+
+# Process-wide index cache
+_cached_index: Optional[MissingTimelineIndex] = None
+_index_lock = Lock()
+
+
+def _is_current(index: Optional[MissingTimelineIndex], data_version: int, config_version: int) -> bool:
+    return index is not None and index.data_version == data_version and index.config_version == config_version
+
+
+def get_missing_timeline_index(session: Session) -> MissingTimelineIndex:
+    """
+    Return the current missing timeline index, rebuilding it if it is stale.
+
+    Args:
+        session: Database session used for the staleness check and rebuilds
+
+    Returns:
+        MissingTimelineIndex for the current data and configuration
+    """
+    global _cached_index
+    config = get_config_snapshot(session)
+    data_version = current_version(session, DATA_VERSION)
+    if session.info.get("timeline_data_changed"):
+        # Uncommitted writes must not be shared with other sessions
+        return MissingTimelineIndex(data_version, config.version, build_missing_timeline_counts(session, config))
+
+    index = _cached_index
+    if _is_current(index, data_version, config.version):
+        return index
+
+    with _index_lock:
+        if _is_current(_cached_index, data_version, config.version):
+            return _cached_index
+        start = time.perf_counter()
+        _cached_index = MissingTimelineIndex(
+            data_version=data_version,
+            config_version=config.version,
+            counts=build_missing_timeline_counts(session, config),
+        )
+        logger.info("Built missing timeline index",
+                    missing=_cached_index.total,
+                    data_version=data_version,
+                    config_version=config.version,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 1))
+        return _cached_index
+
+
+def count_missing_timelines(
+    session: Session,
+    service_lines: FilterValues = None,
+    categories: FilterValues = None
+) -> int:
+    """
+    Count opportunities eligible for timeline generation that have no timeline.
+
+    Args:
+        session: Database session
+        service_lines: Only count opportunities that would generate one of these service lines
+        categories: Only count opportunities in one of these timeline categories
+
+    Returns:
+        Number of missing timelines matching the filters
+    """
+    return get_missing_timeline_index(session).count(service_lines, categories)
+
+
+def invalidate_missing_timelines() -> None:
+    """
+    Drop the cached index.
+
+    Not needed after session writes, which bump the stored data version;
+    useful when a database is replaced underneath the process.
+    """
+    global _cached_index
+    with _index_lock:
+        _cached_index = None
+
+
+def _statement_table(statement) -> Optional[str]:
+    table = getattr(statement, "table", None)
+    return getattr(table, "name", None)
+
+
+def _mark_data_changed(session) -> None:
+    """Bump the data version once per transaction that writes tracked tables."""
+    if not session.info.get("timeline_data_changed"):
+        session.info["timeline_data_changed"] = True
+        bump_version(session.connection(), DATA_VERSION)
+
+
+@event.listens_for(SASession, "before_flush")
+def _track_flushed_writes(session, flush_context, instances):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, TRACKED_MODELS):
+            _mark_data_changed(session)
+            return
+
+
+@event.listens_for(SASession, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    if _statement_table(orm_execute_state.statement) in TRACKED_TABLES:
+        _mark_data_changed(orm_execute_state.session)
+
+
+@event.listens_for(SASession, "after_commit")
+def _clear_after_commit(session):
+    session.info.pop("timeline_data_changed", None)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("timeline_data_changed", None)
@@ -0,0 +1,234 @@
+"""
+Streaming bulk export of opportunity rows.
+
+Rows are read as plain tuples from a ``yield_per`` cursor, one batch at a
+time, and written straight to the output format without building ORM objects
+or Pydantic models. CSV and Arrow IPC are emitted batch by batch as they are
+produced; Parquet is emitted one row group per batch. XLSX is a zip archive
+that can only be finished once all rows are written, so it is spooled to a
+temporary file (in memory while small) and streamed from there.
+
+Parquet and Arrow need the optional pyarrow package.
+"""
+import csv
+from datetime import datetime
+import io
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+import structlog
+
+from app.models.opportunity import Opportunity, OpportunityRead
+
+# Optional columnar formats - gracefully handle missing dependency
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+    pa = None
+    pq = None
+
+logger = structlog.get_logger()
+
+# Rows fetched from the cursor and written per batch
+EXPORT_BATCH_SIZE = 5000
+
+# XLSX output is kept in memory up to this size before spilling to disk
+XLSX_SPOOL_SIZE = 16 * 1024 * 1024
+XLSX_READ_SIZE = 1024 * 1024
+
+# Same columns, in the same order, as the opportunity list endpoint returns
+EXPORT_COLUMNS: List[str] = list(OpportunityRead.model_fields)
+
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    "csv": {"media_type": "text/csv; charset=utf-8", "extension": "csv"},
+    "parquet": {"media_type": "application/vnd.apache.parquet", "extension": "parquet"},
+    "arrow": {"media_type": "application/vnd.apache.arrow.stream", "extension": "arrows"},
+    "xlsx": {
+        "media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "extension": "xlsx",
+    },
+}
+COLUMNAR_FORMATS = {"parquet", "arrow"}
+
+
+def export_columns() -> list:
+    """Opportunity table columns selected for the export."""
+    return [getattr(Opportunity, name) for name in EXPORT_COLUMNS]
+
+
+def iter_row_batches(session: Session, statement: Select, batch_size: Optional[int] = None) -> Iterator[Sequence]:
+    """
+    Yield lists of row tuples from a server-side cursor.
+
+    Args:
+        session: Database session; only its bind is used, so the export keeps
+            its own connection while the response streams
+        statement: SELECT of the export columns with filters and ordering
+        batch_size: Rows fetched per batch (EXPORT_BATCH_SIZE by default)
+
+    Yields:
+        Lists of at most batch_size rows
+    """
+    with Session(session.get_bind()) as export_session:
+        result = export_session.execute(
+            statement.execution_options(yield_per=batch_size or EXPORT_BATCH_SIZE)
+        )
+        yield from result.partitions()
+
+
+def _arrow_schema():
+    """Arrow schema matching the export columns."""
+    fields = []
+    for name in EXPORT_COLUMNS:
+        column_type = getattr(Opportunity, name).type
+        if isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _record_batch(rows: Sequence, schema):
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file that hands out what was written since the last drain.
+
+    Writers such as Parquet record absolute offsets, so tell() keeps counting
+    bytes that were already drained.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def write_csv(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    """Encode batches as CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def write_arrow(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    """Encode batches as an Arrow IPC stream, one record batch per batch."""
+    schema = _arrow_schema()
+    sink = _DrainableSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def write_parquet(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    """Encode batches as a Parquet file, one row group per batch."""
+    schema = _arrow_schema()
+    sink = _DrainableSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _xlsx_value(value):
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+def write_xlsx(batches: Iterator[Sequence]) -> Iterator[bytes]:
+    """Write batches to a write-only workbook and stream the finished file."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Opportunities")
+    sheet.append(EXPORT_COLUMNS)
+    for rows in batches:
+        for row in rows:
+            sheet.append([_xlsx_value(value) for value in row])
+
+    with SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE) as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while chunk := spool.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+WRITERS: Dict[str, Callable[[Iterator[Sequence]], Iterator[bytes]]] = {
+    "csv": write_csv,
+    "parquet": write_parquet,
+    "arrow": write_arrow,
+    "xlsx": write_xlsx,
+}
+
+
+def stream_export(session: Session, statement: Select, export_format: str) -> Iterator[bytes]:
+    """
+    Stream the rows selected by `statement` in the given format.
+
+    Args:
+        session: Database session whose engine the export reads from
+        statement: SELECT of export_columns() with filters and ordering
+        export_format: One of EXPORT_FORMATS
+
+    Yields:
+        Encoded chunks of the output file (empty chunks are skipped)
+    """
+    row_count = 0
+
+    def counted(batches):
+        nonlocal row_count
+        for rows in batches:
+            row_count += len(rows)
+            yield rows
+
+    for chunk in WRITERS[export_format](counted(iter_row_batches(session, statement))):
+        if chunk:
+            yield chunk
+    logger.info("Exported opportunities", format=export_format, rows=row_count)
@@ -0,0 +1,154 @@
+"""
+Full-text search over opportunities with an SQLite FTS5 index.
+
+``opportunity_fts`` is an external-content FTS5 table over the searchable
+opportunity columns; it stores only the inverted index and reads column
+values from the opportunity table by rowid (= opportunity.id). Triggers on
+the opportunity table keep it in sync for every write path, including the
+upserts used by imports; updates that leave the searchable columns
+unchanged (such as re-importing the same opportunity) skip the index.
+
+Search terms are matched as word prefixes ("acc ban" finds "Acme Bank
+Account"), which suits the search box and typeahead. When the index is
+missing (e.g. a database created before the migration, or an SQLite build
+without FTS5) searches fall back to LIKE scans.
+"""
+import re
+from typing import List, Optional
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import DDL, Integer, column, event, or_, text
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session, select
+import structlog
+
+from app.models.opportunity import Opportunity
+
+logger = structlog.get_logger()
+
+SEARCH_TABLE = "opportunity_fts"
+
+# Indexed columns and their bm25 weights for ranking
+SEARCH_COLUMNS = {
+    "opportunity_name": 10.0,
+    "opportunity_id": 5.0,
+    "account_name": 5.0,
+    "lead_offering_l1": 1.0,
+    "sales_org_l1": 1.0,
+}
+
+# Word characters as the unicode61 tokenizer sees them
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+_changed = " OR ".join(f"old.{name} IS NOT new.{name}" for name in ("id", *SEARCH_COLUMNS))
+
+SEARCH_INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    f"{_columns}, content='opportunity', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS opportunity_fts_insert AFTER INSERT ON opportunity BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS opportunity_fts_delete AFTER DELETE ON opportunity BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS opportunity_fts_update AFTER UPDATE OF id, {_columns} ON opportunity "
+    f"WHEN {_changed} BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+]
+
+# Create the index alongside the opportunity table for create_all() databases
+for _statement in SEARCH_INDEX_DDL:
+    event.listen(Opportunity.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# Engine -> whether the search index exists
+_index_available: "WeakKeyDictionary" = WeakKeyDictionary()
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    Turn sanitized search input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match.
+
+    Returns:
+        MATCH expression, or None if the input has no searchable words
+    """
+    tokens = TOKEN_PATTERN.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_index_available(session: Session) -> bool:
+    """Return whether the FTS5 search index exists for the session's engine."""
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    available = _index_available.get(engine)
+    if available is None:
+        available = engine.dialect.name == "sqlite" and session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name").bindparams(name=SEARCH_TABLE)
+        ).first() is not None
+        _index_available[engine] = available
+        if not available:
+            logger.warning("Opportunity search index missing, searching with LIKE", table=SEARCH_TABLE)
+    return available
+
+
+def _like_condition(search: str) -> ColumnElement:
+    return or_(*(getattr(Opportunity, name).contains(search) for name in SEARCH_COLUMNS))
+
+
+def search_condition(session: Session, search: str) -> Optional[ColumnElement]:
+    """
+    WHERE condition restricting opportunities to those matching `search`.
+
+    Args:
+        session: Database session
+        search: Sanitized search input
+
+    Returns:
+        Condition on Opportunity.id, or None if nothing searchable was entered
+    """
+    if not search_index_available(session):
+        return _like_condition(search)
+    match_query = build_match_query(search)
+    if match_query is None:
+        return None
+    matches = text(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match_query"
+    ).bindparams(match_query=match_query).columns(column("rowid", Integer))
+    return Opportunity.id.in_(matches)
+
+
+def search_opportunities(session: Session, search: str, limit: int) -> List[Opportunity]:
+    """
+    Return the best matching opportunities, most relevant first.
+
+    Args:
+        session: Database session
+        search: Sanitized search input
+        limit: Maximum number of results
+
+    Returns:
+        Opportunities ranked by bm25 relevance (by id when searching with LIKE)
+    """
+    if not search_index_available(session):
+        statement = select(Opportunity).where(_like_condition(search)).order_by(Opportunity.id).limit(limit)
+        return list(session.exec(statement).all())
+
+    match_query = build_match_query(search)
+    if match_query is None:
+        return []
+    weights = ", ".join(str(weight) for weight in SEARCH_COLUMNS.values())
+    ranked = text(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match_query "
+        f"ORDER BY bm25({SEARCH_TABLE}, {weights}), rowid LIMIT :limit"
+    ).bindparams(match_query=match_query, limit=limit)
+    ids = session.execute(ranked).scalars().all()
+    if not ids:
+        return []
+    by_id = {opp.id: opp for opp in session.exec(select(Opportunity).where(Opportunity.id.in_(ids))).all()}
+    return [by_id[opp_id] for opp_id in ids if opp_id in by_id]
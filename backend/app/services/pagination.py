@@ -0,0 +1,144 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are ordered by (sort_key, id) and each page continues after the last
+row of the previous one with a WHERE condition on those two columns, instead
+of OFFSET. With an index on the sort column every page costs the same, so
+walking the whole table is linear rather than quadratic.
+
+Cursors are opaque to clients: URL-safe base64 of the sort specification and
+the (sort value, id) of the last row returned.
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+import json
+from typing import Any, Mapping, Optional, Sequence
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.exceptions import ValidationError
+
+
+@dataclass(frozen=True)
+class SortSpec:
+    """A validated sort parameter: column name and direction."""
+    key: str
+    descending: bool = False
+
+    @property
+    def token(self) -> str:
+        return f"-{self.key}" if self.descending else self.key
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last row of a page."""
+    sort: str
+    value: Any
+    id: int
+
+
+def parse_sort(sort: str, columns: Mapping[str, ColumnElement]) -> SortSpec:
+    """
+    Parse a sort parameter such as "tcv_millions" or "-decision_date".
+
+    Raises:
+        ValidationError: If the column is not sortable
+    """
+    descending = sort.startswith("-")
+    key = sort[1:] if descending else sort
+    if key not in columns:
+        raise ValidationError(
+            f"Cannot sort by '{key}'", field="sort", value=sort,
+            details={"allowed": sorted(columns)}
+        )
+    return SortSpec(key, descending)
+
+
+def encode_cursor(sort: SortSpec, value: Any, row_id: int) -> str:
+    """Encode the position after a row as an opaque cursor."""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps([sort.token, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> Cursor:
+    """
+    Decode a cursor produced by encode_cursor for the same sort.
+
+    Raises:
+        ValidationError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        if not isinstance(row_id, int):
+            raise ValueError("cursor id must be an integer")
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise ValidationError("Invalid pagination cursor", field="cursor")
+    if token != sort.token:
+        raise ValidationError(
+            "Pagination cursor was issued for a different sort", field="cursor",
+            details={"cursor_sort": token, "sort": sort.token}
+        )
+    return Cursor(token, value, row_id)
+
+
+def keyset_order(sort_column: ColumnElement, id_column: ColumnElement, sort: SortSpec) -> Sequence:
+    """ORDER BY clauses for (sort_key, id) in the requested direction."""
+    if sort.descending:
+        return (sort_column.desc(), id_column.desc())
+    return (sort_column.asc(), id_column.asc())
+
+
+def keyset_condition(
+    sort_column: ColumnElement,
+    id_column: ColumnElement,
+    sort: SortSpec,
+    cursor: Cursor
+) -> ColumnElement:
+    """
+    WHERE condition selecting the rows after the cursor.
+
+    SQLite sorts NULLs first in ascending and last in descending order, so a
+    NULL sort value sits at the start of an ascending walk and the end of a
+    descending one.
+    """
+    if sort.key == "id":
+        return id_column < cursor.id if sort.descending else id_column > cursor.id
+
+    if cursor.value is None:
+        same_value_after = and_(sort_column.is_(None), id_column < cursor.id if sort.descending else id_column > cursor.id)
+        if sort.descending:
+            return same_value_after
+        return or_(same_value_after, sort_column.is_not(None))
+
+    if sort.descending:
+        return or_(
+            sort_column < cursor.value,
+            and_(sort_column == cursor.value, id_column < cursor.id),
+            sort_column.is_(None),
+        )
+    return or_(
+        sort_column > cursor.value,
+        and_(sort_column == cursor.value, id_column > cursor.id),
+    )
+
+
+def next_cursor(rows: Sequence, limit: Optional[int], sort: SortSpec) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None when it was the last page.
+
+    `rows` must hold up to limit + 1 rows; the extra row only signals that
+    more rows exist and is not returned to the client.
+    """
+    if limit is None or len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(sort, getattr(last, sort.key), last.id)
@@ -0,0 +1,184 @@
+"""
+Parallel timeline computation for bulk generation.
+
+Once opportunities, line items and the configuration snapshot are loaded,
+timeline calculation is pure CPU work. Opportunities are flattened into plain
+named tuples, partitioned into chunks and computed in a spawned
+ProcessPoolExecutor. Workers return the timeline rows of their chunk without
+touching the database; the caller merges them in input order and writes them
+with a single bulk writer (replace_timelines).
+
+Runs smaller than ``settings.parallel_timeline_min_opportunities``, or with a
+single worker, are computed in-process, where starting workers and pickling
+the inputs would cost more than they save.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import repeat
+import math
+import multiprocessing
+import os
+from threading import Lock
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import structlog
+
+from app.config import settings
+from app.services.config_snapshot import ConfigSnapshot
+from app.services.resource_calculation import build_opportunity_resource_timeline
+from app.services.timeline_generation import build_timeline_rows, chunked
+
+logger = structlog.get_logger()
+
+# Chunks queued per worker, so uneven chunks still balance across workers
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_SIZE = 200
+
+
+class OpportunityRecord(NamedTuple):
+    """Opportunity columns used by timeline calculation (OPPORTUNITY_CALCULATION_COLUMNS)."""
+    id: int
+    opportunity_id: str
+    opportunity_name: Optional[str]
+    tcv_millions: Optional[float]
+    decision_date: Optional[datetime]
+    sales_stage: Optional[str]
+    mw_millions: Optional[float]
+    itoc_millions: Optional[float]
+    lead_offering_l1: Optional[str]
+
+
+class LineItemRecord(NamedTuple):
+    """Line item columns used for offering multipliers."""
+    internal_service: Optional[str]
+    simplified_offering: Optional[str]
+
+
+class TimelineResult(NamedTuple):
+    """Calculated timeline rows of one opportunity, or the calculation error."""
+    opportunity_id: str
+    rows: List[Dict]
+    error: Optional[str] = None
+
+
+ChunkItem = Tuple[OpportunityRecord, Tuple[LineItemRecord, ...]]
+
+
+def compute_timeline_chunk(
+    config: ConfigSnapshot,
+    items: Sequence[ChunkItem],
+    resource_status: str,
+    calculated_date: datetime
+) -> List[TimelineResult]:
+    """
+    Calculate the timeline rows of a chunk of opportunities. Runs in the workers.
+
+    Args:
+        config: Configuration snapshot
+        items: (opportunity, line items) pairs
+        resource_status: Status stored on every row
+        calculated_date: Timestamp for calculated_date/last_updated
+
+    Returns:
+        One TimelineResult per opportunity, in input order
+    """
+    results = []
+    for opportunity, line_items in items:
+        try:
+            timeline_data = build_opportunity_resource_timeline(opportunity, line_items, config)
+        except Exception as e:
+            results.append(TimelineResult(opportunity.opportunity_id, [], str(e)))
+            continue
+        results.append(TimelineResult(
+            opportunity.opportunity_id, build_timeline_rows(timeline_data, resource_status, calculated_date)
+        ))
+    return results
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = Lock()
+
+
+def timeline_worker_count() -> int:
+    """Configured compute pool size, defaulting to the number of CPU cores."""
+    return settings.timeline_worker_processes or os.cpu_count() or 1
+
+
+def get_timeline_executor(workers: int) -> ProcessPoolExecutor:
+    """Return the compute pool, creating (or resizing) it on first use."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None and _executor_workers != workers:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _executor is None:
+            # Spawned workers never inherit the web process's connections and threads
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+            logger.info("Timeline compute pool started", workers=workers)
+        return _executor
+
+
+def shutdown_timeline_executor() -> None:
+    """Stop the compute pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def compute_timelines(
+    opportunities: Sequence,
+    line_items: Mapping[str, list],
+    config: ConfigSnapshot,
+    resource_status: str = "Predicted",
+    calculated_date: Optional[datetime] = None,
+    workers: Optional[int] = None
+) -> List[TimelineResult]:
+    """
+    Calculate the timeline rows of many opportunities across CPU cores.
+
+    Args:
+        opportunities: Rows or objects with the OpportunityRecord attributes
+        line_items: opportunity_id -> line items (see load_line_items_by_opportunity)
+        config: Configuration snapshot
+        resource_status: Status stored on every row
+        calculated_date: Timestamp for calculated_date/last_updated (defaults to now)
+        workers: Worker processes (defaults to timeline_worker_count())
+
+    Returns:
+        One TimelineResult per opportunity, in input order
+    """
+    calculated_date = calculated_date or datetime.utcnow()
+    workers = workers or timeline_worker_count()
+    items = [
+        (
+            OpportunityRecord(*(getattr(opp, field) for field in OpportunityRecord._fields)),
+            tuple(
+                LineItemRecord(item.internal_service, item.simplified_offering)
+                for item in line_items.get(opp.opportunity_id, ())
+            ),
+        )
+        for opp in opportunities
+    ]
+    if workers <= 1 or len(items) < settings.parallel_timeline_min_opportunities:
+        return compute_timeline_chunk(config, items, resource_status, calculated_date)
+
+    chunk_size = max(MIN_CHUNK_SIZE, math.ceil(len(items) / (workers * CHUNKS_PER_WORKER)))
+    chunks = list(chunked(items, chunk_size))
+    try:
+        chunk_results = get_timeline_executor(workers).map(
+            compute_timeline_chunk, repeat(config), chunks, repeat(resource_status), repeat(calculated_date)
+        )
+        results = [result for chunk in chunk_results for result in chunk]
+    except BrokenProcessPool as e:
+        # A worker died (e.g. out of memory); the pool is unusable, so finish here
+        logger.error("Timeline compute pool failed, computing in-process", error=str(e))
+        shutdown_timeline_executor()
+        return compute_timeline_chunk(config, items, resource_status, calculated_date)
+
+    logger.info("Computed timelines in parallel", opportunities=len(items), workers=workers, chunks=len(chunks))
+    return results
@@ -0,0 +1,298 @@
+"""
+Materialised portfolio FTE aggregate.
+
+The portfolio_fte_daily table holds the daily concurrent FTE of every stored
+resource timeline, keyed by (bucket_date, service_line, category, stage_name,
+resource_status). Portfolio dashboards sum a date range of these buckets
+instead of re-aggregating every timeline row.
+
+On each calendar day an opportunity/service line group contributes the FTE
+of its highest active stage (a stage is active when
+stage_start <= day <= stage_end), attributed to that stage; ties go to the
+earlier stage. Contributions of different opportunities are additive, so
+timeline writes keep the aggregate current incrementally: wrap the write in
+``portfolio_aggregate_update`` and the affected opportunities' old
+contributions are subtracted and their new ones added in the same
+transaction.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, func, select
+import structlog
+
+from app.models.database import engine
+from app.models.resources import OpportunityResourceTimeline, PortfolioFteDaily
+from app.services.interval_sweep import FTE_DTYPE, naive
+from app.services.timeline_generation import TIMELINE_WRITE_CHUNK_SIZE, chunked
+
+logger = structlog.get_logger()
+
+# Buckets whose FTE cancels out to within this tolerance are removed
+FTE_EPSILON = 1e-9
+
+AggregateKey = Tuple[date, str, str, str, str]
+
+_KEY_COLUMNS = ("bucket_date", "service_line", "category", "stage_name", "resource_status")
+
+
+def _load_intervals(session: Session, opportunity_ids: Optional[Iterable[str]] = None) -> List[tuple]:
+    """
+    Load the stage intervals that feed the aggregate.
+
+    Args:
+        session: Database session
+        opportunity_ids: Restrict to these opportunities; None loads every timeline
+
+    Returns:
+        (opportunity_id, service_line, category, stage_name, resource_status,
+        stage_start_date, stage_end_date, fte_required) tuples in stage order
+    """
+    columns = (
+        OpportunityResourceTimeline.opportunity_id,
+        OpportunityResourceTimeline.service_line,
+        OpportunityResourceTimeline.category,
+        OpportunityResourceTimeline.stage_name,
+        OpportunityResourceTimeline.resource_status,
+        OpportunityResourceTimeline.stage_start_date,
+        OpportunityResourceTimeline.stage_end_date,
+        OpportunityResourceTimeline.fte_required,
+    )
+    order = (
+        OpportunityResourceTimeline.opportunity_id,
+        OpportunityResourceTimeline.service_line,
+        OpportunityResourceTimeline.stage_start_date,
+        OpportunityResourceTimeline.id,
+    )
+    # Zero-duration stages carry no resource demand
+    base_query = select(*columns).where(OpportunityResourceTimeline.duration_weeks > 0)
+
+    if opportunity_ids is None:
+        return list(session.exec(base_query.order_by(*order)).all())
+
+    intervals = []
+    for chunk in chunked(sorted(set(opportunity_ids)), TIMELINE_WRITE_CHUNK_SIZE):
+        intervals.extend(session.exec(
+            base_query.where(OpportunityResourceTimeline.opportunity_id.in_(chunk)).order_by(*order)
+        ).all())
+    return intervals
+
+
+def _first_day(value: datetime) -> int:
+    """Ordinal of the first midnight at or after a datetime."""
+    value = naive(value)
+    return value.toordinal() + (value.time() != time.min)
+
+
+def daily_fte_contributions(intervals: Sequence[tuple]) -> Dict[AggregateKey, float]:
+    """
+    Calculate the aggregate buckets contributed by a set of stage intervals.
+
+    Args:
+        intervals: Tuples as returned by _load_intervals, ordered so that
+            earlier stages of a group come first
+
+    Returns:
+        (bucket_date, service_line, category, stage_name, resource_status) -> FTE
+    """
+    if not intervals:
+        return {}
+
+    group_index: Dict[Tuple[str, str], int] = {}
+    key_index: Dict[Tuple[str, str, str, str], int] = {}
+    count = len(intervals)
+    groups = np.empty(count, dtype=np.int64)
+    keys = np.empty(count, dtype=np.int64)
+    first = np.empty(count, dtype=np.int64)
+    last = np.empty(count, dtype=np.int64)
+    fte = np.empty(count, dtype=FTE_DTYPE)
+    for i, (opportunity_id, service_line, category, stage_name, resource_status,
+            stage_start, stage_end, fte_required) in enumerate(intervals):
+        groups[i] = group_index.setdefault((opportunity_id, service_line), len(group_index))
+        keys[i] = key_index.setdefault(
+            (service_line, category, stage_name, resource_status), len(key_index)
+        )
+        first[i] = _first_day(stage_start)
+        last[i] = naive(stage_end).toordinal()
+        fte[i] = fte_required
+
+    lengths = np.maximum(last - first + 1, 0)
+    total_days = int(lengths.sum())
+    if total_days == 0:
+        return {}
+
+    # Expand every stage into one entry per active day
+    rows = np.repeat(np.arange(count), lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days = first[rows] + np.arange(total_days) - offsets
+
+    # Keep the highest-FTE stage per group and day; ties go to the earlier stage
+    order = np.lexsort((rows, -fte[rows], days, groups[rows]))
+    ordered_groups = groups[rows][order]
+    ordered_days = days[order]
+    leaders = np.ones(total_days, dtype=bool)
+    leaders[1:] = (ordered_groups[1:] != ordered_groups[:-1]) | (ordered_days[1:] != ordered_days[:-1])
+    chosen = order[leaders]
+    chosen_rows = rows[chosen]
+    chosen_days = days[chosen]
+
+    # Sum the chosen stages per (day, key)
+    min_day = int(chosen_days.min())
+    key_count = len(key_index)
+    buckets, inverse = np.unique((chosen_days - min_day) * key_count + keys[chosen_rows], return_inverse=True)
+    sums = np.zeros(len(buckets), dtype=FTE_DTYPE)
+    np.add.at(sums, inverse, fte[chosen_rows])
+
+    key_list = list(key_index)
+    contributions = {}
+    for bucket, value in zip(buckets.tolist(), sums):
+        if value == 0:
+            continue
+        day_offset, key = divmod(bucket, key_count)
+        contributions[(date.fromordinal(min_day + day_offset), *key_list[key])] = float(value)
+    return contributions
+
+
+def _apply_contributions(session: Session, contributions: Dict[AggregateKey, float], sign: float) -> None:
+    """Add (sign=1) or subtract (sign=-1) contributions from the aggregate table."""
+    if not contributions:
+        return
+
+    table = PortfolioFteDaily.__table__
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(_KEY_COLUMNS),
+        set_={"fte": table.c.fte + statement.excluded.fte},
+    )
+    rows = [
+        dict(zip(_KEY_COLUMNS, key), fte=sign * value)
+        for key, value in contributions.items()
+    ]
+    for chunk in chunked(rows, TIMELINE_WRITE_CHUNK_SIZE):
+        session.execute(statement, chunk)
+
+    # Drop buckets that cancelled out, within the touched date range only
+    bucket_dates = [key[0] for key in contributions]
+    session.execute(
+        delete(table).where(
+            table.c.bucket_date >= min(bucket_dates),
+            table.c.bucket_date <= max(bucket_dates),
+            func.abs(table.c.fte) < FTE_EPSILON,
+        )
+    )
+
+
+@contextmanager
+def portfolio_aggregate_update(session: Session, opportunity_ids: Iterable[str]) -> Iterator[None]:
+    """
+    Keep the aggregate in step with timeline writes for some opportunities.
+
+    Enter before the opportunities' timeline rows are modified and leave once
+    the changes are made; the aggregate is updated in the caller's
+    transaction, which the caller commits. Nothing is added back if the block
+    raises, so the caller must roll back.
+
+    Args:
+        session: Database session performing the timeline writes
+        opportunity_ids: Opportunities whose timeline rows the block changes
+    """
+    opportunity_ids = set(opportunity_ids)
+    if opportunity_ids:
+        _apply_contributions(session, daily_fte_contributions(_load_intervals(session, opportunity_ids)), -1.0)
+    yield
+    if opportunity_ids:
+        session.flush()
+        _apply_contributions(session, daily_fte_contributions(_load_intervals(session, opportunity_ids)), 1.0)
+
+
+def rebuild_portfolio_aggregate(session: Session) -> int:
+    """
+    Recompute the whole aggregate from the stored timelines.
+
+    Args:
+        session: Database session; the caller commits
+
+    Returns:
+        Number of aggregate buckets written
+    """
+    session.execute(delete(PortfolioFteDaily))
+    contributions = daily_fte_contributions(_load_intervals(session))
+    rows = [dict(zip(_KEY_COLUMNS, key), fte=value) for key, value in contributions.items()]
+    for chunk in chunked(rows, TIMELINE_WRITE_CHUNK_SIZE):
+        session.execute(insert(PortfolioFteDaily), chunk)
+    logger.info("Rebuilt portfolio FTE aggregate", buckets=len(rows))
+    return len(rows)
+
+
+def ensure_portfolio_aggregate() -> bool:
+    """
+    Backfill the aggregate when it is empty but timelines exist.
+
+    Run at startup to cover databases whose timelines predate the aggregate table.
+
+    Returns:
+        True if the aggregate was rebuilt
+    """
+    with Session(engine) as session:
+        if session.exec(select(PortfolioFteDaily.bucket_date).limit(1)).first() is not None:
+            return False
+        if session.exec(select(OpportunityResourceTimeline.id).limit(1)).first() is None:
+            return False
+        rebuild_portfolio_aggregate(session)
+        session.commit()
+    return True
+
+
+def load_daily_fte(
+    session: Session,
+    start_date: datetime,
+    end_date: datetime,
+    service_lines: Optional[Sequence[str]] = None,
+    categories: Optional[Sequence[str]] = None,
+    stages: Optional[Sequence[str]] = None
+) -> Tuple[datetime, List[str], np.ndarray]:
+    """
+    Read daily concurrent FTE per service line from the aggregate.
+
+    Args:
+        session: Database session
+        start_date: First day of the range (its time of day is ignored)
+        end_date: Last day of the range (its time of day is ignored)
+        service_lines: Optional service line filter
+        categories: Optional timeline category filter
+        stages: Optional stage filter
+
+    Returns:
+        (grid_start, service_lines, daily) where daily[i, k] is the FTE of
+        service_lines[i] on grid_start + k days
+    """
+    first_day = naive(start_date).date()
+    last_day = naive(end_date).date()
+    grid_start = datetime.combine(first_day, time.min)
+    days = max((last_day - first_day).days + 1, 0)
+
+    query = (
+        select(PortfolioFteDaily.bucket_date, PortfolioFteDaily.service_line, func.sum(PortfolioFteDaily.fte))
+        .where(PortfolioFteDaily.bucket_date >= first_day, PortfolioFteDaily.bucket_date <= last_day)
+        .group_by(PortfolioFteDaily.bucket_date, PortfolioFteDaily.service_line)
+    )
+    if service_lines:
+        query = query.where(PortfolioFteDaily.service_line.in_(service_lines))
+    if categories:
+        query = query.where(PortfolioFteDaily.category.in_(categories))
+    if stages:
+        query = query.where(PortfolioFteDaily.stage_name.in_(stages))
+    rows = session.exec(query).all()
+
+    found_service_lines = sorted({service_line for _, service_line, _ in rows})
+    line_index = {service_line: i for i, service_line in enumerate(found_service_lines)}
+    daily = np.zeros((len(found_service_lines), days), dtype=FTE_DTYPE)
+    for bucket_date, service_line, fte in rows:
+        daily[line_index[service_line], (bucket_date - first_day).days] = fte
+    # Incremental updates can leave rounding residue on emptied days
+    daily[np.abs(daily) < FTE_EPSILON] = 0
+    return grid_start, found_service_lines, daily
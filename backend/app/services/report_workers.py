@@ -0,0 +1,99 @@
+"""
+Report worker process pool.
+
+Reports are CPU-bound and build multi-megabyte responses. Run in the API's
+threadpool they hold the GIL for most of their runtime, so the event loop
+and every light endpoint stall behind them. Endpoints wrapped with
+report_endpoint instead build and JSON-encode the report in a worker
+process, with that process's own database session, and the API process only
+relays the encoded body.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, wraps
+import importlib
+import multiprocessing
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anyio.to_thread
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlmodel import Session
+import structlog
+
+from app.config import settings
+from app.models.database import engine
+
+logger = structlog.get_logger()
+
+# Process-wide worker pool, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_report_executor() -> ProcessPoolExecutor:
+    """Return the report worker pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.report_worker_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Report worker pool started", workers=settings.report_worker_processes)
+        return _executor
+
+
+def shutdown_report_executor() -> None:
+    """Stop the report worker pool, abandoning queued reports."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def render_report(handler: Callable, session: Session, params: Dict[str, Any]) -> bytes:
+    """Build a report and encode it as the JSON response body."""
+    return JSONResponse(jsonable_encoder(handler(session=session, **params))).body
+
+
+def build_report(module: str, name: str, params: Dict[str, Any]) -> Tuple[int, Any]:
+    """
+    Worker process entry point: build a report endpoint's response body.
+
+    HTTPException does not survive pickling, so it is returned as
+    (status code, detail) for the API process to raise again.
+
+    Returns:
+        (200, JSON body) or (error status code, error detail)
+    """
+    handler = getattr(importlib.import_module(module), name).__wrapped__
+    try:
+        with Session(engine) as session:
+            return 200, render_report(handler, session, params)
+    except HTTPException as e:
+        return e.status_code, e.detail
+
+
+def report_endpoint(handler: Callable) -> Callable:
+    """
+    Run a sync report handler in the report worker pool.
+
+    The handler keeps its signature, including the session dependency, which
+    is only used when report_worker_processes is 0 and the report is built
+    in-process on the threadpool (as the tests do).
+    """
+    @wraps(handler)
+    async def endpoint(session: Session, **params) -> Response:
+        if not settings.report_worker_processes:
+            body = await anyio.to_thread.run_sync(partial(render_report, handler, session, params))
+            return Response(body, media_type="application/json")
+        future = get_report_executor().submit(build_report, handler.__module__, handler.__name__, params)
+        status_code, result = await asyncio.wrap_future(future)
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=result)
+        return Response(result, media_type="application/json")
+    return endpoint
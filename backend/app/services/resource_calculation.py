@@ -5,13 +5,12 @@ Calculates resource requirements by working backwards from decision dates
 using service line stage effort data.
 """
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from sqlmodel import Session, select
 import structlog
 
 from app.models.opportunity import Opportunity, OpportunityLineItem
-from app.models.config import OpportunityCategory, ServiceLineStageEffort, ServiceLineOfferingThreshold, ServiceLineOfferingMapping
-from app.models.database import engine
+from app.services.config_snapshot import ConfigSnapshot, get_config_snapshot
 
 logger = structlog.get_logger()
 
@@ -31,36 +30,34 @@ SALES_STAGES_ORDER = [
 SUPPORTED_SERVICE_LINES = ["MW", "ITOC"]
 
 
-def determine_opportunity_category(tcv_value: float, session: Session) -> Optional[str]:
+def determine_opportunity_category(
+    tcv_value: float,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None
+) -> Optional[str]:
     """
     Determine opportunity category based on TCV value.
     
     Args:
         tcv_value: Total Contract Value in millions
         session: Database session
+        config: Preloaded configuration snapshot (loaded from session if omitted)
         
     Returns:
         Category name or None if cannot be determined
     """
-    # Handle negative TCV - return None as we don't categorize negative opportunities
-    if tcv_value < 0:
-        return None
-    
-    categories = session.exec(
-        select(OpportunityCategory).order_by(OpportunityCategory.min_tcv)
-    ).all()
-    
-    # Find the category with the highest min_tcv that the tcv_value meets or exceeds
-    best_match = None
-    for category in categories:
-        if tcv_value >= category.min_tcv:
-            if category.max_tcv is None or tcv_value <= category.max_tcv:
-                best_match = category
+    config = config or get_config_snapshot(session)
     
-    return best_match.name if best_match else None
+    # Negative TCV is not categorized; otherwise the highest matching min_tcv wins
+    return config.timeline_category_for(tcv_value)
 
 
-def determine_service_line_resource_category(service_line: str, service_line_tcv: float, session: Session) -> Optional[str]:
+def determine_service_line_resource_category(
+    service_line: str,
+    service_line_tcv: float,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None
+) -> Optional[str]:
     """
     Determine resource category based on service line TCV value using service-line-specific categories.
     This is used to determine which FTE/effort template to use for a specific service line.
@@ -69,30 +66,15 @@ def determine_service_line_resource_category(service_line: str, service_line_tcv
         service_line: Service line name (MW, ITOC)
         service_line_tcv: Service Line TCV value in millions
         session: Database session
+        config: Preloaded configuration snapshot (loaded from session if omitted)
         
     Returns:
         Category name or None if cannot be determined
     """
-    from app.models.config import ServiceLineCategory
-    
-    # Handle negative or zero TCV - return None as we don't categorize these
-    if service_line_tcv <= 0:
-        return None
+    config = config or get_config_snapshot(session)
     
-    categories = session.exec(
-        select(ServiceLineCategory)
-        .where(ServiceLineCategory.service_line == service_line)
-        .order_by(ServiceLineCategory.min_tcv)
-    ).all()
-    
-    # Find the category with the highest min_tcv that the service_line_tcv meets or exceeds
-    best_match = None
-    for category in categories:
-        if service_line_tcv >= category.min_tcv:
-            if category.max_tcv is None or service_line_tcv <= category.max_tcv:
-                best_match = category
-    
-    return best_match.name if best_match else None
+    # Negative or zero TCV is not categorized; otherwise the highest matching min_tcv wins
+    return config.resource_category_for(service_line, service_line_tcv)
 
 
 def get_remaining_stages(current_stage: str) -> List[str]:
@@ -113,11 +95,152 @@ def get_remaining_stages(current_stage: str) -> List[str]:
     return SALES_STAGES_ORDER[current_index:]
 
 
+def get_service_lines_to_process(opportunity: Opportunity) -> List[Tuple[str, float]]:
+    """
+    Determine which service lines an opportunity generates timelines for.
+    
+    Uses MW/ITOC revenue when present, falling back to the lead offering
+    with a nominal TCV of 1.0 when there is no service line revenue.
+    
+    Args:
+        opportunity: Opportunity (or any object with the same attributes)
+        
+    Returns:
+        List of (service_line, service_line_tcv) tuples
+    """
+    service_lines_to_process = []
+    
+    # Check MW service line
+    if opportunity.mw_millions and opportunity.mw_millions > 0:
+        service_lines_to_process.append(("MW", opportunity.mw_millions))
+    
+    # Check ITOC service line
+    if opportunity.itoc_millions and opportunity.itoc_millions > 0:
+        service_lines_to_process.append(("ITOC", opportunity.itoc_millions))
+    
+    # Fallback to lead offering if no service line revenue
+    if not service_lines_to_process and opportunity.lead_offering_l1:
+        if opportunity.lead_offering_l1 in SUPPORTED_SERVICE_LINES:
+            # Use a default small amount for resource category when no specific revenue
+            service_lines_to_process.append((opportunity.lead_offering_l1, 1.0))
+    
+    return service_lines_to_process
+
+
+def is_opportunity_eligible(opportunity: Opportunity, config: ConfigSnapshot) -> bool:
+    """
+    Check if an opportunity is eligible for timeline generation.
+    
+    Criteria:
+    - Has TCV and decision date
+    - Has timeline category (determined from total TCV)
+    - Has service line revenue (mw_millions or itoc_millions > 0) OR lead_offering_l1 in supported service lines
+    - Service line can determine resource category from its TCV
+    - Service line stage effort configuration exists
+    
+    Args:
+        opportunity: Opportunity (or any object with the same attributes)
+        config: Configuration snapshot
+        
+    Returns:
+        True if at least one service line can generate a timeline
+    """
+    # Check basic requirements
+    if not opportunity.tcv_millions or not opportunity.decision_date:
+        return False
+    
+    # Get timeline category from total TCV
+    if not config.timeline_category_for(opportunity.tcv_millions):
+        return False
+    
+    # Check if at least one service line is eligible
+    for service_line, service_line_tcv in get_service_lines_to_process(opportunity):
+        # Determine resource category based on service line TCV
+        resource_category = config.resource_category_for(service_line, service_line_tcv)
+        if not resource_category:
+            continue
+        
+        # Check if stage effort configuration exists for this service line + resource category
+        if config.has_stage_efforts(service_line, resource_category):
+            return True
+    
+    return False
+
+
+def get_mapped_offerings(
+    line_items: List[OpportunityLineItem],
+    service_line: str,
+    config: ConfigSnapshot
+) -> Set[str]:
+    """
+    Collect the unique simplified offerings of an opportunity mapped to a service line.
+    
+    Args:
+        line_items: All line items of the opportunity
+        service_line: Service line (MW, ITOC)
+        config: Configuration snapshot
+        
+    Returns:
+        Set of simplified offering names matching the service line's mappings
+    """
+    offering_mappings = config.offering_mappings.get(service_line, frozenset())
+    
+    unique_offerings = set()
+    for item in line_items:
+        if item.internal_service and item.simplified_offering and item.simplified_offering.strip():
+            simplified_offering = item.simplified_offering.strip()
+            # Check if this combination is mapped to the service line
+            if (item.internal_service, simplified_offering) in offering_mappings:
+                unique_offerings.add(simplified_offering)
+    
+    return unique_offerings
+
+
+def get_offering_multiplier(
+    offering_count: int,
+    service_line: str,
+    stage_name: str,
+    config: ConfigSnapshot
+) -> float:
+    """
+    Calculate the offering-based multiplier for a known mapped offering count.
+    
+    Args:
+        offering_count: Number of unique mapped offerings
+        service_line: Service line (MW, ITOC)
+        stage_name: Sales stage name
+        config: Configuration snapshot
+        
+    Returns:
+        Multiplier value (1.0 if no threshold configured or count below threshold)
+    """
+    if not config.offering_mappings.get(service_line):
+        # No mappings configured, return default multiplier
+        return 1.0
+    
+    # Look up threshold configuration for this service line and stage
+    threshold_config = config.offering_thresholds.get((service_line, stage_name))
+    if not threshold_config:
+        # No threshold configured, return default multiplier
+        return 1.0
+    
+    # Calculate multiplier based on threshold
+    if offering_count <= threshold_config.threshold_count:
+        # At or below threshold, use base multiplier
+        return 1.0
+    
+    # Above threshold, add increment for each additional offering
+    excess_offerings = offering_count - threshold_config.threshold_count
+    return 1.0 + (excess_offerings * threshold_config.increment_multiplier)
+
+
 def calculate_offering_multiplier(
     opportunity_id: str,
     service_line: str,
     stage_name: str,
-    session: Session
+    session: Session,
+    config: Optional[ConfigSnapshot] = None,
+    line_items: Optional[List[OpportunityLineItem]] = None
 ) -> float:
     """
     Calculate the offering-based multiplier for FTE calculations.
@@ -128,91 +251,52 @@ def calculate_offering_multiplier(
         service_line: Service line (MW, ITOC)
         stage_name: Sales stage name
         session: Database session
+        config: Preloaded configuration snapshot (loaded from session if omitted)
+        line_items: Preloaded line items of the opportunity (queried if omitted)
         
     Returns:
         Multiplier value (1.0 if no threshold configured or count below threshold)
     """
-    # Get valid internal service and simplified offering combinations for this service line
-    offering_mappings = session.exec(
-        select(ServiceLineOfferingMapping).where(
-            ServiceLineOfferingMapping.service_line == service_line
-        )
-    ).all()
+    config = config or get_config_snapshot(session)
     
-    if not offering_mappings:
+    if not config.offering_mappings.get(service_line):
         # No mappings configured, return default multiplier
-        logger.info("No offering mappings found for service line", 
-                   service_line=service_line)
+        logger.debug("No offering mappings found for service line", 
+                     service_line=service_line)
         return 1.0
     
-    # Get all opportunity line items
-    all_line_items = session.exec(
-        select(OpportunityLineItem).where(
-            OpportunityLineItem.opportunity_id == opportunity_id
-        )
-    ).all()
-    
-    # Count unique simplified offerings that match the configured mappings
-    unique_offerings = set()
-    for item in all_line_items:
-        if item.internal_service and item.simplified_offering and item.simplified_offering.strip():
-            # Check if this combination is mapped to the service line
-            for mapping in offering_mappings:
-                if (mapping.internal_service == item.internal_service and 
-                    mapping.simplified_offering == item.simplified_offering.strip()):
-                    unique_offerings.add(item.simplified_offering.strip())
-                    break
-    
-    offering_count = len(unique_offerings)
+    if line_items is None:
+        line_items = session.exec(
+            select(OpportunityLineItem).where(
+                OpportunityLineItem.opportunity_id == opportunity_id
+            )
+        ).all()
     
-    # Look up threshold configuration for this service line and stage
-    threshold_config = session.exec(
-        select(ServiceLineOfferingThreshold).where(
-            ServiceLineOfferingThreshold.service_line == service_line,
-            ServiceLineOfferingThreshold.stage_name == stage_name
-        )
-    ).first()
+    unique_offerings = get_mapped_offerings(line_items, service_line, config)
+    multiplier = get_offering_multiplier(len(unique_offerings), service_line, stage_name, config)
     
-    if not threshold_config:
-        # No threshold configured, return default multiplier
-        return 1.0
-    
-    # Calculate multiplier based on threshold
-    if offering_count <= threshold_config.threshold_count:
-        # At or below threshold, use base multiplier
-        multiplier = 1.0
-    else:
-        # Above threshold, add increment for each additional offering
-        excess_offerings = offering_count - threshold_config.threshold_count
-        multiplier = 1.0 + (excess_offerings * threshold_config.increment_multiplier)
-    
-    logger.info("Calculated offering multiplier", 
-                opportunity_id=opportunity_id, 
-                service_line=service_line, 
-                stage_name=stage_name,
-                offering_count=offering_count, 
-                unique_offerings=list(unique_offerings),
-                mapped_combinations_count=len(offering_mappings),
-                threshold=threshold_config.threshold_count,
-                increment=threshold_config.increment_multiplier,
-                multiplier=multiplier)
+    logger.debug("Calculated offering multiplier", 
+                 opportunity_id=opportunity_id, 
+                 service_line=service_line, 
+                 stage_name=stage_name,
+                 offering_count=len(unique_offerings), 
+                 unique_offerings=sorted(unique_offerings),
+                 multiplier=multiplier)
     
     return multiplier
 
 
-def calculate_stage_timeline(
+def build_stage_timeline(
     decision_date: datetime,
     current_stage: str,
     service_line: str,
     timeline_category: str,
     resource_category: str,
-    opportunity_id: str,
-    session: Session
+    offering_count: int,
+    config: ConfigSnapshot
 ) -> List[Dict]:
     """
-    Calculate timeline for remaining stages working backwards from decision date.
-    Uses timeline_category for stage durations and resource_category for FTE requirements.
-    Applies offering-based multipliers to FTE calculations.
+    Calculate timeline for remaining stages from preloaded data without database access.
     
     Args:
         decision_date: Target close/decision date
@@ -220,8 +304,8 @@ def calculate_stage_timeline(
         service_line: Service line (MW, ITOC)
         timeline_category: Category for timeline/duration (based on total TCV)
         resource_category: Category for FTE/effort (based on service line TCV)
-        opportunity_id: Opportunity string ID for offering count lookup
-        session: Database session
+        offering_count: Number of unique offerings mapped to the service line
+        config: Configuration snapshot
         
     Returns:
         List of stage timeline dictionaries with dates and FTE requirements
@@ -229,53 +313,18 @@ def calculate_stage_timeline(
     if service_line not in SUPPORTED_SERVICE_LINES:
         return []
     
-    # Get remaining stages
-    remaining_stages = get_remaining_stages(current_stage)
-    
-    # Get timeline category record for duration (from OpportunityCategory)
-    timeline_category_record = session.exec(
-        select(OpportunityCategory).where(OpportunityCategory.name == timeline_category)
-    ).first()
-    
-    if not timeline_category_record:
+    if not config.has_timeline_category(timeline_category):
         return []
     
-    # Import ServiceLineCategory
-    from app.models.config import ServiceLineCategory
-    
-    # Get resource category record for FTE (using service line categories)
-    resource_category_record = session.exec(
-        select(ServiceLineCategory).where(
-            ServiceLineCategory.service_line == service_line,
-            ServiceLineCategory.name == resource_category
-        )
-    ).first()
-    
-    if not resource_category_record:
+    if not config.has_resource_category(service_line, resource_category):
         return []
     
-    # Create duration lookup from OpportunityCategory
-    duration_lookup = {
-        '01': timeline_category_record.stage_01_duration_weeks,
-        '02': timeline_category_record.stage_02_duration_weeks,
-        '03': timeline_category_record.stage_03_duration_weeks,
-        '04A': timeline_category_record.stage_04a_duration_weeks,
-        '04B': timeline_category_record.stage_04b_duration_weeks,
-        '05A': timeline_category_record.stage_05a_duration_weeks,
-        '05B': timeline_category_record.stage_05b_duration_weeks,
-        '06': timeline_category_record.stage_06_duration_weeks
-    }
-    
-    # Get stage FTE data for this service line and resource category
-    fte_efforts = session.exec(
-        select(ServiceLineStageEffort).where(
-            ServiceLineStageEffort.service_line == service_line,
-            ServiceLineStageEffort.service_line_category_id == resource_category_record.id
-        )
-    ).all()
+    # Get remaining stages
+    remaining_stages = get_remaining_stages(current_stage)
     
-    # Create lookup for FTE
-    fte_lookup = {fe.stage_name: fe.fte_required for fe in fte_efforts}
+    # Stage durations from OpportunityCategory, FTE from service line stage efforts
+    duration_lookup = config.durations_for(timeline_category)
+    fte_lookup = config.fte_for(service_line, resource_category)
     
     # Calculate timeline working backwards
     timeline = []
@@ -290,8 +339,8 @@ def calculate_stage_timeline(
         base_fte_required = fte_lookup[stage]
         
         # Calculate offering-based multiplier for this stage
-        offering_multiplier = calculate_offering_multiplier(
-            opportunity_id, service_line, stage, session
+        offering_multiplier = get_offering_multiplier(
+            offering_count, service_line, stage, config
         )
         
         # Apply multiplier to base FTE
@@ -321,32 +370,82 @@ def calculate_stage_timeline(
     return timeline
 
 
-def calculate_opportunity_resource_timeline(
-    opportunity_id: int,
-    session: Session
-) -> Dict:
+def calculate_stage_timeline(
+    decision_date: datetime,
+    current_stage: str,
+    service_line: str,
+    timeline_category: str,
+    resource_category: str,
+    opportunity_id: str,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None,
+    line_items: Optional[List[OpportunityLineItem]] = None
+) -> List[Dict]:
     """
-    Calculate complete resource timeline for an opportunity.
-    Uses total TCV for timeline/duration and individual service line TCV for FTE/effort.
+    Calculate timeline for remaining stages working backwards from decision date.
+    Uses timeline_category for stage durations and resource_category for FTE requirements.
+    Applies offering-based multipliers to FTE calculations.
     
     Args:
-        opportunity_id: Opportunity database ID (integer)
+        decision_date: Target close/decision date
+        current_stage: Current sales stage
+        service_line: Service line (MW, ITOC)
+        timeline_category: Category for timeline/duration (based on total TCV)
+        resource_category: Category for FTE/effort (based on service line TCV)
+        opportunity_id: Opportunity string ID for offering count lookup
         session: Database session
+        config: Preloaded configuration snapshot (loaded from session if omitted)
+        line_items: Preloaded line items of the opportunity (queried if omitted)
         
     Returns:
-        Dictionary with opportunity info and calculated timeline
+        List of stage timeline dictionaries with dates and FTE requirements
     """
-    # Get opportunity by integer ID
-    opportunity = session.get(Opportunity, opportunity_id)
-    if not opportunity:
-        raise ValueError(f"Opportunity {opportunity_id} not found")
+    if service_line not in SUPPORTED_SERVICE_LINES:
+        return []
     
-    if not opportunity.decision_date:
-        raise ValueError(f"Opportunity {opportunity_id} has no decision date")
+    config = config or get_config_snapshot(session)
+    
+    offering_count = 0
+    if config.offering_mappings.get(service_line):
+        if line_items is None:
+            line_items = session.exec(
+                select(OpportunityLineItem).where(
+                    OpportunityLineItem.opportunity_id == opportunity_id
+                )
+            ).all()
+        offering_count = len(get_mapped_offerings(line_items, service_line, config))
+    
+    return build_stage_timeline(
+        decision_date,
+        current_stage,
+        service_line,
+        timeline_category,
+        resource_category,
+        offering_count,
+        config
+    )
+
+
+def build_opportunity_resource_timeline(
+    opportunity: Opportunity,
+    line_items: List[OpportunityLineItem],
+    config: ConfigSnapshot
+) -> Dict:
+    """
+    Calculate complete resource timeline for a preloaded opportunity without database access.
+    Uses total TCV for timeline/duration and individual service line TCV for FTE/effort.
     
+    Args:
+        opportunity: Opportunity with a decision date
+        line_items: All line items of the opportunity
+        config: Configuration snapshot
+        
+    Returns:
+        Dictionary with opportunity info and calculated timeline
+    """
     # Determine timeline category from total TCV
     tcv_millions = opportunity.tcv_millions or 0
-    timeline_category = determine_opportunity_category(tcv_millions, session)
+    timeline_category = config.timeline_category_for(tcv_millions)
     if not timeline_category:
         # For negative TCV or uncategorized opportunities, return empty timeline
         return {
@@ -366,26 +465,11 @@ def calculate_opportunity_resource_timeline(
     # Calculate timeline for each service line that has revenue or fallback to lead offering
     service_line_timelines = {}
     service_line_categories = {}
-    service_lines_to_process = []
-    
-    # Check MW service line
-    if opportunity.mw_millions and opportunity.mw_millions > 0:
-        service_lines_to_process.append(("MW", opportunity.mw_millions))
-    
-    # Check ITOC service line
-    if opportunity.itoc_millions and opportunity.itoc_millions > 0:
-        service_lines_to_process.append(("ITOC", opportunity.itoc_millions))
-    
-    # Fallback to lead offering if no service line revenue
-    if not service_lines_to_process and opportunity.lead_offering_l1:
-        if opportunity.lead_offering_l1 in SUPPORTED_SERVICE_LINES:
-            # Use a default small amount for resource category when no specific revenue
-            service_lines_to_process.append((opportunity.lead_offering_l1, 1.0))
     
     # Generate timelines for determined service lines
-    for service_line, service_line_tcv in service_lines_to_process:
+    for service_line, service_line_tcv in get_service_lines_to_process(opportunity):
         # Determine resource category based on service line TCV
-        resource_category = determine_service_line_resource_category(service_line, service_line_tcv, session)
+        resource_category = config.resource_category_for(service_line, service_line_tcv)
         if not resource_category:
             logger.warning(f"Could not determine resource category for {service_line} with TCV {service_line_tcv}")
             continue
@@ -396,14 +480,15 @@ def calculate_opportunity_resource_timeline(
             "service_line_tcv": service_line_tcv
         }
         
-        timeline = calculate_stage_timeline(
+        offering_count = len(get_mapped_offerings(line_items, service_line, config))
+        timeline = build_stage_timeline(
             opportunity.decision_date,
             current_stage,
             service_line,
             timeline_category,
             resource_category,
-            opportunity.opportunity_id,  # Pass the string opportunity_id
-            session
+            offering_count,
+            config
         )
         if timeline:
             service_line_timelines[service_line] = timeline
@@ -420,6 +505,43 @@ def calculate_opportunity_resource_timeline(
     }
 
 
+def calculate_opportunity_resource_timeline(
+    opportunity_id: int,
+    session: Session,
+    config: Optional[ConfigSnapshot] = None
+) -> Dict:
+    """
+    Calculate complete resource timeline for an opportunity.
+    Uses total TCV for timeline/duration and individual service line TCV for FTE/effort.
+    
+    Args:
+        opportunity_id: Opportunity database ID (integer)
+        session: Database session
+        config: Preloaded configuration snapshot (loaded from session if omitted)
+        
+    Returns:
+        Dictionary with opportunity info and calculated timeline
+    """
+    # Get opportunity by integer ID
+    opportunity = session.get(Opportunity, opportunity_id)
+    if not opportunity:
+        raise ValueError(f"Opportunity {opportunity_id} not found")
+    
+    if not opportunity.decision_date:
+        raise ValueError(f"Opportunity {opportunity_id} has no decision date")
+    
+    config = config or get_config_snapshot(session)
+    
+    # Load line items once for all service lines and stages
+    line_items = session.exec(
+        select(OpportunityLineItem).where(
+            OpportunityLineItem.opportunity_id == opportunity.opportunity_id
+        )
+    ).all()
+    
+    return build_opportunity_resource_timeline(opportunity, line_items, config)
+
+
 def aggregate_portfolio_resource_forecast(
     opportunities: List[int],
     session: Session,
@@ -446,9 +568,12 @@ def aggregate_portfolio_resource_forecast(
     
     processed_opportunities = []
     
+    # Load configuration once for the whole portfolio
+    config = get_config_snapshot(session)
+    
     for opp_id in opportunities:
         try:
-            timeline_data = calculate_opportunity_resource_timeline(opp_id, session)
+            timeline_data = calculate_opportunity_resource_timeline(opp_id, session, config)
             processed_opportunities.append(timeline_data)
             
             # Aggregate by service line
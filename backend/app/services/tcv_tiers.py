@@ -0,0 +1,138 @@
+"""
+Compiled TCV tier categoriser.
+
+Category tiers are configured as min/max TCV ranges, and each caller has its
+own matching rule (inclusive or half-open bounds, first or highest match,
+fallback names). A rule only compares the value against tier bounds, so its
+result is constant between consecutive bounds. ``TierCategoriser.compile``
+evaluates the rule once on every bound and every gap between bounds and
+stores the results alongside the sorted bound array. Categorising is then a
+binary search: ``bisect`` for a single value, ``np.searchsorted`` for a whole
+column of TCVs at once. ``case_expression`` renders the same lookup as a SQL
+CASE so categories can be filtered and grouped in the database.
+"""
+from bisect import bisect_left
+from typing import Callable, Hashable, Iterable, Optional, Protocol, Sequence
+
+import numpy as np
+from sqlalchemy import case, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class Tier(Protocol):
+    """Anything with a name and min/max TCV bounds in millions."""
+    name: str
+    min_tcv: float
+    max_tcv: Optional[float]
+
+
+class TierCategoriser:
+    """
+    Lookup of a tier rule compiled over sorted bound arrays.
+
+    The bounds b_0 < ... < b_n-1 split the number line into the pieces
+    (-inf, b_0), {b_0}, (b_0, b_1), {b_1}, ..., {b_n-1}, (b_n-1, inf);
+    piece 2i is the open interval below b_i and piece 2i + 1 is b_i itself.
+    """
+
+    def __init__(self, bounds: Sequence[float], labels: Sequence[Hashable], missing_label: Hashable = None):
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.labels = tuple(labels)
+        self.missing_label = missing_label
+        self._bound_list = list(bounds)
+        self._label_array = np.empty(len(self.labels) + 1, dtype=object)
+        self._label_array[:-1] = self.labels
+        self._label_array[-1] = missing_label
+
+    @classmethod
+    def compile(
+        cls,
+        tiers: Iterable[Tier],
+        rule: Callable[[float], Hashable],
+        missing_label: Hashable = None,
+        extra_bounds: Iterable[float] = (0.0,)
+    ) -> "TierCategoriser":
+        """
+        Compile a tier matching rule.
+
+        Args:
+            tiers: Configured tiers; their min/max TCVs become the bounds
+            rule: Scalar rule mapping a TCV to its category
+            missing_label: Category returned for None/NaN values
+            extra_bounds: Further values the rule compares against (e.g. 0 for
+                "non-positive TCVs are uncategorised")
+
+        Returns:
+            TierCategoriser equivalent to `rule`
+        """
+        bound_set = set(extra_bounds)
+        for tier in tiers:
+            bound_set.add(float(tier.min_tcv))
+            if tier.max_tcv is not None:
+                bound_set.add(float(tier.max_tcv))
+        bounds = sorted(bound_set)
+
+        labels = []
+        for index, bound in enumerate(bounds):
+            # The open piece below the bound, then the bound itself
+            below = (bounds[index - 1] + bound) / 2 if index else bound - 1.0
+            labels.append(rule(below))
+            labels.append(rule(bound))
+        labels.append(rule(bounds[-1] + 1.0 if bounds else 0.0))
+        return cls(bounds, labels, missing_label)
+
+    def categorise(self, value: Optional[float]) -> Hashable:
+        """Return the category of a single TCV."""
+        if value is None or value != value:
+            return self.missing_label
+        index = bisect_left(self._bound_list, value)
+        exact = index < len(self._bound_list) and self._bound_list[index] == value
+        return self.labels[2 * index + exact]
+
+    def categorise_many(self, values: Iterable[Optional[float]]) -> np.ndarray:
+        """
+        Categorise a column of TCVs at once.
+
+        Args:
+            values: TCVs in millions; None and NaN map to the missing label
+
+        Returns:
+            Object array of categories, aligned with `values`
+        """
+        tcvs = np.asarray(
+            values if isinstance(values, np.ndarray) else [np.nan if v is None else v for v in values],
+            dtype=float,
+        )
+        index = np.searchsorted(self.bounds, tcvs, side="left")
+        if len(self.bounds):
+            exact = self.bounds[np.minimum(index, len(self.bounds) - 1)] == tcvs
+            pieces = 2 * index + (exact & (index < len(self.bounds)))
+        else:
+            pieces = np.zeros(len(tcvs), dtype=np.intp)
+        pieces[np.isnan(tcvs)] = len(self.labels)
+        return self._label_array[pieces]
+
+    def case_expression(self, column: ColumnElement) -> ColumnElement:
+        """
+        Render the lookup as a SQL CASE over a numeric column.
+
+        Pieces are tested in ascending order, so each condition only needs the
+        piece's upper bound; adjacent pieces with the same category share one
+        condition. NULL values fall through to the last piece, so coalesce the
+        column first if they should be categorised otherwise.
+
+        Args:
+            column: TCV column or expression in millions
+
+        Returns:
+            CASE expression yielding the category
+        """
+        whens = []
+        for piece, label in enumerate(self.labels[:-1]):
+            if self.labels[piece + 1] == label:
+                continue
+            bound = self._bound_list[piece // 2]
+            whens.append((column <= bound if piece % 2 else column < bound, label))
+        if not whens:
+            return literal(self.labels[-1])
+        return case(*whens, else_=self.labels[-1])
@@ -0,0 +1,305 @@
+"""
+Set-based timeline generation helpers for bulk operations.
+
+Loads opportunities, line items and existing timeline status with a few
+grouped queries, and writes calculated timelines with one bulk DELETE and
+one executemany INSERT per chunk instead of per-opportunity round trips.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, insert
+from sqlmodel import Session, select, delete, func
+import structlog
+
+from app.models.opportunity import Opportunity, OpportunityLineItem
+from app.models.resources import OpportunityResourceTimeline
+
+logger = structlog.get_logger()
+
+# Rows per bulk DELETE / INSERT statement (kept below SQLite's bound-parameter limit)
+TIMELINE_WRITE_CHUNK_SIZE = 500
+
+# Opportunity columns needed for eligibility checks and timeline calculation
+OPPORTUNITY_CALCULATION_COLUMNS = (
+    Opportunity.id,
+    Opportunity.opportunity_id,
+    Opportunity.opportunity_name,
+    Opportunity.tcv_millions,
+    Opportunity.decision_date,
+    Opportunity.sales_stage,
+    Opportunity.mw_millions,
+    Opportunity.itoc_millions,
+    Opportunity.lead_offering_l1,
+)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def load_opportunities_for_generation(
+    session: Session,
+    custom_tracking_filter: Optional[List[str]] = None
+) -> list:
+    """
+    Load the opportunity columns used by timeline calculation in one query.
+
+    Args:
+        session: Database session
+        custom_tracking_filter: Optional custom_tracking_field_2 values to restrict to
+
+    Returns:
+        List of rows with attribute access matching Opportunity field names
+    """
+    query = select(*OPPORTUNITY_CALCULATION_COLUMNS).order_by(Opportunity.id)
+    if custom_tracking_filter:
+        query = query.where(Opportunity.custom_tracking_field_2.in_(custom_tracking_filter))
+    return session.exec(query).all()
+
+
+def load_opportunities_by_id(
+    session: Session,
+    opportunity_ids: Sequence[str],
+    chunk_size: int = TIMELINE_WRITE_CHUNK_SIZE
+) -> list:
+    """
+    Load the calculation columns of specific opportunities.
+
+    Args:
+        session: Database session
+        opportunity_ids: Opportunity string IDs to load
+        chunk_size: Maximum IDs per IN (...) query
+
+    Returns:
+        List of rows with attribute access matching Opportunity field names
+    """
+    rows = []
+    for id_chunk in chunked(list(opportunity_ids), chunk_size):
+        rows.extend(session.exec(
+            select(*OPPORTUNITY_CALCULATION_COLUMNS).where(Opportunity.opportunity_id.in_(id_chunk))
+        ).all())
+    return rows
+
+
+def load_timeline_status(
+    session: Session,
+    custom_tracking_filter: Optional[List[str]] = None
+) -> Dict[str, bool]:
+    """
+    Load which opportunities already have timelines, with one grouped query.
+
+    Args:
+        session: Database session
+        custom_tracking_filter: Optional custom_tracking_field_2 values to restrict to
+
+    Returns:
+        Dict of opportunity_id -> True if any of its timeline records is Predicted
+    """
+    has_predicted = func.max(
+        case((OpportunityResourceTimeline.resource_status == "Predicted", 1), else_=0)
+    )
+    query = select(OpportunityResourceTimeline.opportunity_id, has_predicted).group_by(
+        OpportunityResourceTimeline.opportunity_id
+    )
+    if custom_tracking_filter:
+        query = query.where(
+            OpportunityResourceTimeline.opportunity_id.in_(
+                select(Opportunity.opportunity_id).where(
+                    Opportunity.custom_tracking_field_2.in_(custom_tracking_filter)
+                )
+            )
+        )
+    return {opportunity_id: bool(predicted) for opportunity_id, predicted in session.exec(query).all()}
+
+
+def load_eligibility_profiles(
+    session: Session,
+    custom_tracking_filter: Optional[List[str]] = None
+) -> list:
+    """
+    Load the distinct combinations of columns that decide eligibility, with counts.
+
+    Opportunities sharing TCV, service line revenue, lead offering and decision
+    date presence are eligible alike, so one GROUP BY query replaces loading
+    every opportunity.
+
+    Args:
+        session: Database session
+        custom_tracking_filter: Optional custom_tracking_field_2 values to restrict to
+
+    Returns:
+        List of rows with tcv_millions, decision_date, mw_millions, itoc_millions,
+        lead_offering_l1 and opportunity_count attributes
+    """
+    has_decision_date = Opportunity.decision_date.is_not(None)
+    query = select(
+        Opportunity.tcv_millions,
+        func.max(Opportunity.decision_date).label("decision_date"),
+        Opportunity.mw_millions,
+        Opportunity.itoc_millions,
+        Opportunity.lead_offering_l1,
+        func.count().label("opportunity_count"),
+    ).group_by(
+        Opportunity.tcv_millions,
+        has_decision_date,
+        Opportunity.mw_millions,
+        Opportunity.itoc_millions,
+        Opportunity.lead_offering_l1,
+    )
+    if custom_tracking_filter:
+        query = query.where(Opportunity.custom_tracking_field_2.in_(custom_tracking_filter))
+    return session.exec(query).all()
+
+
+def count_timeline_status(
+    session: Session,
+    custom_tracking_filter: Optional[List[str]] = None
+) -> Tuple[int, int]:
+    """
+    Count opportunities with timelines, and those with Predicted records, in one query.
+
+    Args:
+        session: Database session
+        custom_tracking_filter: Optional custom_tracking_field_2 values to restrict to
+
+    Returns:
+        Tuple of (opportunities with timelines, opportunities with a Predicted record)
+    """
+    opportunity_ids = select(Opportunity.opportunity_id)
+    if custom_tracking_filter:
+        opportunity_ids = opportunity_ids.where(
+            Opportunity.custom_tracking_field_2.in_(custom_tracking_filter)
+        )
+    has_predicted = func.max(
+        case((OpportunityResourceTimeline.resource_status == "Predicted", 1), else_=0)
+    ).label("has_predicted")
+    status = (
+        select(OpportunityResourceTimeline.opportunity_id, has_predicted)
+        .where(OpportunityResourceTimeline.opportunity_id.in_(opportunity_ids))
+        .group_by(OpportunityResourceTimeline.opportunity_id)
+        .subquery()
+    )
+    existing, predicted = session.exec(
+        select(func.count(), func.coalesce(func.sum(status.c.has_predicted), 0))
+    ).one()
+    return existing, predicted
+
+
+def load_line_items_by_opportunity(
+    session: Session,
+    opportunity_ids: Sequence[str],
+    chunk_size: int = TIMELINE_WRITE_CHUNK_SIZE
+) -> Dict[str, list]:
+    """
+    Load the line item columns used for offering multipliers, grouped by opportunity.
+
+    Args:
+        session: Database session
+        opportunity_ids: Opportunity string IDs to load line items for
+        chunk_size: Maximum IDs per IN (...) query
+
+    Returns:
+        Dict of opportunity_id -> list of rows with internal_service/simplified_offering
+    """
+    line_items = defaultdict(list)
+    for id_chunk in chunked(list(opportunity_ids), chunk_size):
+        rows = session.exec(
+            select(
+                OpportunityLineItem.opportunity_id,
+                OpportunityLineItem.internal_service,
+                OpportunityLineItem.simplified_offering,
+            ).where(OpportunityLineItem.opportunity_id.in_(id_chunk))
+        ).all()
+        for row in rows:
+            line_items[row.opportunity_id].append(row)
+    return line_items
+
+
+def build_timeline_rows(
+    timeline_data: Dict,
+    resource_status: str = "Predicted",
+    calculated_date: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Flatten calculated timeline data into OpportunityResourceTimeline column dicts.
+
+    Args:
+        timeline_data: Result of build_opportunity_resource_timeline
+        resource_status: Status to store on every row
+        calculated_date: Timestamp for calculated_date/last_updated (defaults to now)
+
+    Returns:
+        List of column dicts ready for a bulk INSERT
+    """
+    calculated_date = calculated_date or datetime.utcnow()
+    service_line_categories = timeline_data.get("service_line_categories") or {}
+
+    rows = []
+    for service_line, stages in timeline_data["service_line_timelines"].items():
+        # Get resource category for this service line
+        resource_category = service_line_categories.get(service_line, {}).get("resource_category")
+
+        for stage_data in stages:
+            rows.append({
+                "opportunity_id": timeline_data["opportunity_id"],
+                "service_line": service_line,
+                "stage_name": stage_data["stage_name"],
+                "stage_start_date": stage_data["stage_start_date"],
+                "stage_end_date": stage_data["stage_end_date"],
+                "duration_weeks": stage_data["duration_weeks"],
+                "fte_required": stage_data["fte_required"],
+                "total_effort_weeks": stage_data["total_effort_weeks"],
+                "resource_status": resource_status,
+                "last_updated": calculated_date,
+                "opportunity_name": timeline_data["opportunity_name"],
+                "category": timeline_data["category"],
+                "resource_category": resource_category or stage_data.get("resource_category"),
+                "tcv_millions": timeline_data["tcv_millions"],
+                "decision_date": timeline_data["decision_date"],
+                "calculated_date": calculated_date,
+            })
+    return rows
+
+
+def replace_timelines(
+    session: Session,
+    opportunity_ids: Iterable[str],
+    rows: List[Dict],
+    chunk_size: int = TIMELINE_WRITE_CHUNK_SIZE,
+    resource_status: Optional[str] = None
+) -> Tuple[int, int]:
+    """
+    Replace the stored timelines of the given opportunities without committing.
+
+    Issues one DELETE ... WHERE opportunity_id IN (...) and one executemany
+    INSERT per chunk.
+
+    Args:
+        session: Database session
+        opportunity_ids: Opportunities whose existing timeline records are removed
+        rows: New timeline rows (see build_timeline_rows)
+        chunk_size: Maximum IDs per DELETE and rows per INSERT
+        resource_status: Only remove existing records with this status
+
+    Returns:
+        Tuple of (deleted_count, inserted_count)
+    """
+    deleted = 0
+    for id_chunk in chunked(list(opportunity_ids), chunk_size):
+        statement = delete(OpportunityResourceTimeline).where(
+            OpportunityResourceTimeline.opportunity_id.in_(id_chunk)
+        )
+        if resource_status is not None:
+            statement = statement.where(OpportunityResourceTimeline.resource_status == resource_status)
+        result = session.exec(statement)
+        deleted += result.rowcount or 0
+
+    timeline_table = OpportunityResourceTimeline.__table__
+    for row_chunk in chunked(rows, chunk_size):
+        session.execute(insert(timeline_table), list(row_chunk))
+
+    return deleted, len(rows)
@@ -0,0 +1,520 @@
+"""
+Incremental recalculation of Predicted timelines.
+
+Instead of the all-opportunities bulk generation pass, changes to timeline
+inputs are tracked and only the affected opportunities are recalculated:
+
+- Opportunity writes that change a timeline input (stage, decision date,
+  TCV, service line TCV or lead offering) and line item writes schedule their
+  opportunities. ORM writes are picked up from the session; the importers,
+  which write with Core statements, pass their change sets explicitly.
+- Configuration writes schedule the opportunities whose timeline category
+  (OpportunityCategory) or service line resource category
+  (ServiceLineCategory, ServiceLineStageEffort) is the changed row, before
+  or after the change, plus those whose stored timelines reference it.
+
+Each trigger records a TimelineRecalculationJob. Depending on
+``settings.timeline_recalculation_mode`` it runs in the import worker pool
+("background"), in the committing thread ("inline") or not at all ("off").
+Opportunities with Planned or Forecast timelines are never modified and only
+Predicted rows are deleted.
+"""
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+import json
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, event, inspect, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, func, select
+import structlog
+
+from app.config import settings
+from app.models.config import OpportunityCategory, ServiceLineCategory, ServiceLineStageEffort
+from app.models.database import engine
+from app.models.opportunity import Opportunity, OpportunityLineItem
+from app.models.resources import OpportunityResourceTimeline, TimelineRecalculationJob
+# Imported for its commit listeners, which must run before ours so that an
+# inline recalculation sees the new configuration
+from app.services.config_snapshot import ConfigSnapshot, get_config_snapshot, load_config_snapshot
+from app.services.portfolio_aggregate import portfolio_aggregate_update
+from app.services.resource_calculation import (
+    build_opportunity_resource_timeline,
+    get_service_lines_to_process,
+    is_opportunity_eligible,
+)
+from app.services.timeline_generation import (
+    TIMELINE_WRITE_CHUNK_SIZE,
+    build_timeline_rows,
+    chunked,
+    load_line_items_by_opportunity,
+    load_opportunities_by_id,
+    replace_timelines,
+)
+
+logger = structlog.get_logger()
+
+# Opportunity fields that feed timeline calculation
+TIMELINE_INPUT_FIELDS = (
+    "sales_stage", "decision_date", "tcv_millions", "mw_millions", "itoc_millions", "lead_offering_l1",
+)
+
+# Line item fields that feed offering multipliers
+LINE_ITEM_INPUT_FIELDS = ("opportunity_id", "internal_service", "simplified_offering")
+
+RECALCULATION_MODES = ("background", "inline", "off")
+
+# Opportunities recalculated per transaction
+RECALCULATION_CHUNK_SIZE = 1000
+
+_SESSION_KEY = "timeline_recalculation"
+
+
+@dataclass(frozen=True)
+class CategoryDependency:
+    """
+    A changed timeline or resource category.
+
+    Attributes:
+        service_line: Service line of a resource category; None for timeline categories
+        names: Category names before and after the change
+        ranges: TCV ranges (min, max) before and after the change; max None is unbounded
+    """
+    service_line: Optional[str]
+    names: FrozenSet[str]
+    ranges: Tuple[Tuple[float, Optional[float]], ...]
+
+    def covers(self, value: Optional[float]) -> bool:
+        """Check whether a TCV falls in any of the ranges."""
+        return value is not None and any(
+            value >= min_tcv and (max_tcv is None or value <= max_tcv) for min_tcv, max_tcv in self.ranges
+        )
+
+
+def recalculation_mode() -> str:
+    mode = settings.timeline_recalculation_mode.lower()
+    if mode not in RECALCULATION_MODES:
+        raise ValueError(f"Unsupported timeline_recalculation_mode: {settings.timeline_recalculation_mode}")
+    return mode
+
+
+def load_timeline_inputs(session: Session, opportunity_ids: Iterable[str]) -> Dict[str, tuple]:
+    """
+    Load the stored timeline inputs of opportunities.
+
+    Returns:
+        Dict of opportunity_id -> values of TIMELINE_INPUT_FIELDS
+    """
+    columns = [getattr(Opportunity, field) for field in TIMELINE_INPUT_FIELDS]
+    inputs = {}
+    for id_chunk in chunked(sorted(set(opportunity_ids)), TIMELINE_WRITE_CHUNK_SIZE):
+        for opportunity_id, *values in session.exec(
+            select(Opportunity.opportunity_id, *columns).where(Opportunity.opportunity_id.in_(id_chunk))
+        ).all():
+            inputs[opportunity_id] = tuple(values)
+    return inputs
+
+
+def timeline_inputs_changed(stored: Optional[tuple], row: Dict) -> bool:
+    """Check whether an imported row changes the stored timeline inputs."""
+    return stored is None or any(
+        old != row.get(field) for field, old in zip(TIMELINE_INPUT_FIELDS, stored)
+    )
+
+
+def resolve_dependent_opportunities(session: Session, dependencies: Iterable[CategoryDependency]) -> Set[str]:
+    """
+    Find the opportunities whose timelines depend on changed categories.
+
+    An opportunity depends on a category if its total TCV (timeline
+    categories) or service line TCV (resource categories) falls in one of the
+    category's ranges, or if its stored timeline records name the category.
+
+    Args:
+        session: Database session
+        dependencies: Changed categories
+
+    Returns:
+        Opportunity ids to recalculate
+    """
+    dependencies = list(dependencies)
+    if not dependencies:
+        return set()
+
+    affected = set()
+    opportunities = session.exec(select(
+        Opportunity.opportunity_id, Opportunity.tcv_millions, Opportunity.mw_millions,
+        Opportunity.itoc_millions, Opportunity.lead_offering_l1,
+    )).all()
+    timeline_dependencies = [dep for dep in dependencies if dep.service_line is None]
+    resource_dependencies = [dep for dep in dependencies if dep.service_line is not None]
+    for opportunity in opportunities:
+        if any(dep.covers(opportunity.tcv_millions) for dep in timeline_dependencies):
+            affected.add(opportunity.opportunity_id)
+            continue
+        service_lines = get_service_lines_to_process(opportunity) if resource_dependencies else []
+        if any(
+            service_line == dep.service_line and dep.covers(service_line_tcv)
+            for service_line, service_line_tcv in service_lines
+            for dep in resource_dependencies
+        ):
+            affected.add(opportunity.opportunity_id)
+
+    for dep in dependencies:
+        query = select(OpportunityResourceTimeline.opportunity_id).distinct()
+        if dep.service_line is None:
+            query = query.where(OpportunityResourceTimeline.category.in_(dep.names))
+        else:
+            query = query.where(
+                OpportunityResourceTimeline.service_line == dep.service_line,
+                OpportunityResourceTimeline.resource_category.in_(dep.names),
+            )
+        affected.update(session.exec(query).all())
+    return affected
+
+
+def _load_non_predicted(session: Session, opportunity_ids: List[str]) -> Dict[str, bool]:
+    """Return opportunity_id -> whether it has non-Predicted records, for those with timelines."""
+    has_other = func.max(case((OpportunityResourceTimeline.resource_status != "Predicted", 1), else_=0))
+    status = {}
+    for id_chunk in chunked(opportunity_ids, TIMELINE_WRITE_CHUNK_SIZE):
+        rows = session.exec(
+            select(OpportunityResourceTimeline.opportunity_id, has_other)
+            .where(OpportunityResourceTimeline.opportunity_id.in_(id_chunk))
+            .group_by(OpportunityResourceTimeline.opportunity_id)
+        ).all()
+        status.update({opportunity_id: bool(other) for opportunity_id, other in rows})
+    return status
+
+
+def recalculate_predicted_timelines(
+    session: Session,
+    opportunity_ids: Iterable[str],
+    config: Optional[ConfigSnapshot] = None
+) -> Counter:
+    """
+    Recalculate the Predicted timelines of some opportunities without committing.
+
+    Eligible opportunities get a fresh Predicted timeline; opportunities that
+    are no longer eligible (or deleted, or calculate to zero FTE) lose their
+    Predicted timeline. Opportunities with any Planned or Forecast record are
+    left untouched.
+
+    Args:
+        session: Database session
+        opportunity_ids: Opportunities to recalculate
+        config: Configuration snapshot (the cached snapshot by default)
+
+    Returns:
+        Counter of regenerated, removed, protected, skipped and errors
+    """
+    ids = sorted(set(opportunity_ids))
+    counts = Counter()
+    existing = _load_non_predicted(session, ids)
+    candidates = [opportunity_id for opportunity_id in ids if not existing.get(opportunity_id)]
+    counts["protected"] = len(ids) - len(candidates)
+
+    config = config or get_config_snapshot(session)
+    eligible = [
+        opp for opp in load_opportunities_by_id(session, candidates) if is_opportunity_eligible(opp, config)
+    ]
+    line_items = load_line_items_by_opportunity(session, [opp.opportunity_id for opp in eligible])
+
+    calculated_date = datetime.utcnow()
+    regenerated, failed, new_rows = set(), set(), []
+    for opp in eligible:
+        try:
+            timeline_data = build_opportunity_resource_timeline(opp, line_items.get(opp.opportunity_id, []), config)
+        except Exception as e:
+            # Keep the current timeline rather than removing it
+            failed.add(opp.opportunity_id)
+            logger.warning("Timeline recalculation failed", opportunity_id=opp.opportunity_id, error=str(e))
+            continue
+        rows = build_timeline_rows(timeline_data, "Predicted", calculated_date)
+        if sum(row["fte_required"] for row in rows) > 0:
+            regenerated.add(opp.opportunity_id)
+            new_rows.extend(rows)
+
+    removed = {
+        opportunity_id for opportunity_id in candidates
+        if opportunity_id in existing and opportunity_id not in regenerated and opportunity_id not in failed
+    }
+    written = regenerated | removed
+    with portfolio_aggregate_update(session, written):
+        replace_timelines(session, written, new_rows, resource_status="Predicted")
+
+    counts["regenerated"] = len(regenerated)
+    counts["removed"] = len(removed)
+    counts["errors"] = len(failed)
+    counts["skipped"] = len(candidates) - len(written) - len(failed)
+    return counts
+
+
+def run_recalculation_job(job_id: int, bind: Optional[Engine] = None) -> None:
+    """
+    Run a pending recalculation job. Entry point of the worker processes.
+
+    Opportunities are recalculated and committed in chunks, so progress is
+    visible and a failure keeps the chunks already written. Every job loads
+    its own configuration snapshot rather than using the worker's cached one,
+    so a job triggered by a configuration change always sees that change.
+
+    Args:
+        job_id: Job to run
+        bind: Engine of the job's database (the application engine by default)
+    """
+    # Imported here: import_jobs imports the importers, which schedule recalculations
+    from app.services.import_jobs import claim_job
+
+    with Session(bind or engine) as session:
+        job = claim_job(session, TimelineRecalculationJob, job_id)
+        if job is None:
+            logger.info("Timeline recalculation job already claimed", job_id=job_id)
+            return
+
+        opportunity_ids = json.loads(job.opportunity_ids)
+        totals = Counter()
+        try:
+            config = load_config_snapshot(session)
+            for id_chunk in chunked(opportunity_ids, RECALCULATION_CHUNK_SIZE):
+                totals += recalculate_predicted_timelines(session, id_chunk, config)
+                job.processed += len(id_chunk)
+                job.updated_at = datetime.utcnow()
+                for field in ("regenerated", "removed", "protected", "skipped", "errors"):
+                    setattr(job, field, totals[field])
+                session.add(job)
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            job.status = "failed"
+            job.message = f"Recalculation failed: {str(e)}"
+            logger.error("Timeline recalculation job failed", job_id=job_id, error=str(e))
+        else:
+            job.status = "completed"
+            job.message = (
+                f"{job.regenerated} regenerated, {job.removed} removed, "
+                f"{job.protected} protected, {job.skipped} skipped, {job.errors} errors"
+            )
+            logger.info("Timeline recalculation job completed", job_id=job_id, trigger=job.trigger,
+                        requested=job.requested, **dict(totals))
+        job.finished_at = job.updated_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+
+
+def _fail_recalculation_job(job_id: int, reason: str) -> None:
+    with Session(engine) as session:
+        session.exec(
+            update(TimelineRecalculationJob)
+            .where(TimelineRecalculationJob.id == job_id,
+                   TimelineRecalculationJob.status.in_(("pending", "processing")))
+            .values(status="failed", message=reason, finished_at=datetime.utcnow(), updated_at=datetime.utcnow())
+        )
+        session.commit()
+
+
+def submit_recalculation_job(job_id: int) -> Future:
+    """Queue a pending job on the import worker pool."""
+    from app.services.import_jobs import submit_job
+
+    return submit_job(run_recalculation_job, job_id, _fail_recalculation_job, "Recalculation")
+
+
+def schedule_timeline_recalculation(
+    opportunity_ids: Iterable[str],
+    trigger: str,
+    detail: str = "",
+    bind: Optional[Engine] = None,
+    run_inline: bool = False
+) -> Optional[int]:
+    """
+    Record a recalculation job for some opportunities and start it.
+
+    Args:
+        opportunity_ids: Opportunities whose timeline inputs changed
+        trigger: What caused the recalculation (import, opportunity, config)
+        detail: Description of the change, e.g. the import task or config rows
+        bind: Engine of the database the change was written to
+        run_inline: Run in this thread even in background mode (for callers
+            that already run in a worker)
+
+    Returns:
+        Job id, or None if recalculation is off or nothing needs recalculating
+    """
+    mode = recalculation_mode()
+    ids = sorted(set(opportunity_ids))
+    if mode == "off" or not ids:
+        return None
+
+    with Session(bind or engine) as session:
+        job = TimelineRecalculationJob(
+            trigger=trigger, detail=detail[:500], opportunity_ids=json.dumps(ids), requested=len(ids)
+        )
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    logger.info("Timeline recalculation scheduled", job_id=job_id, trigger=trigger, opportunities=len(ids))
+
+    if mode == "inline" or run_inline:
+        run_recalculation_job(job_id, bind)
+    else:
+        submit_recalculation_job(job_id)
+    return job_id
+
+
+def recover_recalculation_jobs() -> List[int]:
+    """
+    Resume jobs left behind by a previous run of the server.
+
+    Returns:
+        Job ids resubmitted to the worker pool
+    """
+    from app.services.import_jobs import recover_jobs
+
+    if recalculation_mode() != "background":
+        return []
+    return recover_jobs(
+        TimelineRecalculationJob, submit_recalculation_job, _fail_recalculation_job,
+        "Recalculation interrupted before completion",
+    )
+
+
+def get_recalculation_status(session: Session, limit: int = 10) -> Dict:
+    """
+    Summarise queued and recent recalculation jobs.
+
+    Args:
+        session: Database session
+        limit: Number of recent jobs to include
+
+    Returns:
+        Dict with the mode, active job and opportunity counts and the recent jobs
+    """
+    active = session.exec(
+        select(
+            TimelineRecalculationJob.status,
+            func.count(),
+            func.coalesce(func.sum(TimelineRecalculationJob.requested - TimelineRecalculationJob.processed), 0),
+        )
+        .where(TimelineRecalculationJob.status.in_(("pending", "processing")))
+        .group_by(TimelineRecalculationJob.status)
+    ).all()
+    counts = {status: (jobs, remaining) for status, jobs, remaining in active}
+    recent = session.exec(
+        select(TimelineRecalculationJob).order_by(TimelineRecalculationJob.id.desc()).limit(limit)
+    ).all()
+    return {
+        "mode": recalculation_mode(),
+        "pending_jobs": counts.get("pending", (0, 0))[0],
+        "processing_jobs": counts.get("processing", (0, 0))[0],
+        "queued_opportunities": sum(remaining for _, remaining in counts.values()),
+        "recent_jobs": recent,
+    }
+
+
+# Change tracking: ORM writes collected at flush time, scheduled after commit
+
+def _field_values(instance, field: str) -> Tuple[Optional[object], Optional[object]]:
+    """(value before, value after) of an attribute in the pending flush."""
+    history = inspect(instance).attrs[field].load_history()
+    new = history.added[0] if history.added else (history.unchanged[0] if history.unchanged else None)
+    old = history.deleted[0] if history.deleted else (None if history.added and not history.deleted else new)
+    return old, new
+
+
+def _changed(instance, fields: Iterable[str]) -> bool:
+    state = inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _category_dependency(instance, service_line: Optional[str]) -> CategoryDependency:
+    old_name, new_name = _field_values(instance, "name")
+    old_min, new_min = _field_values(instance, "min_tcv")
+    old_max, new_max = _field_values(instance, "max_tcv")
+    ranges = {(new_min, new_max)}
+    if old_min is not None:
+        ranges.add((old_min, old_max))
+    return CategoryDependency(
+        service_line=service_line,
+        names=frozenset(name for name in (old_name, new_name) if name),
+        ranges=tuple(sorted((low, high) for low, high in ranges if low is not None)),
+    )
+
+
+@event.listens_for(SASession, "before_flush")
+def _track_timeline_inputs(session, flush_context, instances):
+    tracked = None
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, (Opportunity, OpportunityLineItem, OpportunityCategory,
+                                     ServiceLineCategory, ServiceLineStageEffort)):
+            continue
+        is_update = instance in session.dirty and instance not in session.deleted
+        if tracked is None:
+            tracked = session.info.setdefault(
+                _SESSION_KEY, {"opportunity_ids": set(), "dependencies": set(), "efforts": set()}
+            )
+
+        if isinstance(instance, Opportunity):
+            if not is_update or _changed(instance, (*TIMELINE_INPUT_FIELDS, "opportunity_id")):
+                tracked["opportunity_ids"].update(v for v in _field_values(instance, "opportunity_id") if v)
+        elif isinstance(instance, OpportunityLineItem):
+            if not is_update or _changed(instance, LINE_ITEM_INPUT_FIELDS):
+                tracked["opportunity_ids"].update(v for v in _field_values(instance, "opportunity_id") if v)
+        elif not is_update or session.is_modified(instance, include_collections=False):
+            # Every column of a configuration row (ranges, durations, FTE) feeds timelines
+            if isinstance(instance, OpportunityCategory):
+                tracked["dependencies"].add(_category_dependency(instance, None))
+            elif isinstance(instance, ServiceLineCategory):
+                for service_line in set(_field_values(instance, "service_line")):
+                    tracked["dependencies"].add(_category_dependency(instance, service_line))
+            else:
+                # Resolved to the category's name and range after commit
+                for service_line in set(_field_values(instance, "service_line")):
+                    for category_id in set(_field_values(instance, "service_line_category_id")):
+                        tracked["efforts"].add((service_line, category_id))
+
+
+def _resolve_effort_dependencies(session: Session, efforts: Set[Tuple[str, int]]) -> Set[CategoryDependency]:
+    dependencies = set()
+    for service_line, category_id in efforts:
+        category = session.get(ServiceLineCategory, category_id)
+        if category is not None:
+            dependencies.add(CategoryDependency(
+                service_line=service_line, names=frozenset([category.name]),
+                ranges=((category.min_tcv, category.max_tcv),),
+            ))
+    return dependencies
+
+
+@event.listens_for(SASession, "after_commit")
+def _schedule_after_commit(session):
+    tracked = session.info.pop(_SESSION_KEY, None)
+    if not tracked or recalculation_mode() == "off":
+        return
+    bind = session.get_bind()
+    bind = getattr(bind, "engine", bind)
+    try:
+        opportunity_ids = set(tracked["opportunity_ids"])
+        if opportunity_ids:
+            schedule_timeline_recalculation(
+                opportunity_ids, "opportunity", f"{len(opportunity_ids)} opportunities changed", bind
+            )
+        if tracked["dependencies"] or tracked["efforts"]:
+            with Session(bind) as lookup:
+                dependencies = tracked["dependencies"] | _resolve_effort_dependencies(lookup, tracked["efforts"])
+                affected = resolve_dependent_opportunities(lookup, dependencies)
+            detail = ", ".join(sorted(
+                f"{dep.service_line or 'timeline'}:{'/'.join(sorted(dep.names))}" for dep in dependencies
+            ))
+            schedule_timeline_recalculation(affected, "config", detail, bind)
+    except Exception as e:
+        # The change itself is committed; a failed schedule only delays timelines
+        logger.error("Scheduling timeline recalculation failed", error=str(e))
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
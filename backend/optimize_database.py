@@ -74,25 +74,8 @@ INDEXES = [
         "description": "Optimize filtering by opportunity owner"
     },
     
-    # Composite indexes for common filter combinations
-    {
-        "name": "idx_opportunity_stage_forecast",
-        "table": "opportunity",
-        "columns": ["sales_stage", "in_forecast"],
-        "description": "Optimize combined stage and forecast filtering"
-    },
-    {
-        "name": "idx_opportunity_stage_decision_date",
-        "table": "opportunity",
-        "columns": ["sales_stage", "decision_date"],
-        "description": "Optimize stage filtering with date sorting"
-    },
-    {
-        "name": "idx_opportunity_tcv_decision_date",
-        "table": "opportunity",
-        "columns": ["tcv_millions", "decision_date"],
-        "description": "Optimize TCV range filtering with date sorting"
-    },
+    # Composite stage and TCV indexes are managed by Alembic migrations
+    # (see app/models/opportunity.py)
     
     # Service line amount indexes for service line filtering
     {
@@ -132,13 +115,8 @@ INDEXES = [
         "description": "Optimize MW service line filtering"
     },
     
-    # Opportunity Line Items indexes
-    {
-        "name": "idx_opportunitylineitem_opportunity_id",
-        "table": "opportunitylineitem",
-        "columns": ["opportunity_id"],
-        "description": "Optimize line item lookups by opportunity"
-    },
+    # Opportunity Line Items indexes; lookups by opportunity use the leading
+    # column of ux_opportunitylineitem_natural_key (Alembic migration)
     {
         "name": "idx_opportunitylineitem_service_line",
         "table": "opportunitylineitem",
@@ -152,37 +130,8 @@ INDEXES = [
         "description": "Optimize filtering by internal service"
     },
     
-    # Resource Timeline indexes
-    {
-        "name": "idx_opportunityresourcetimeline_opportunity_id",
-        "table": "opportunityresourcetimeline",
-        "columns": ["opportunity_id"],
-        "description": "Optimize resource timeline lookups by opportunity"
-    },
-    {
-        "name": "idx_opportunityresourcetimeline_service_line",
-        "table": "opportunityresourcetimeline",
-        "columns": ["service_line"],
-        "description": "Optimize resource timeline filtering by service line"
-    },
-    {
-        "name": "idx_opportunityresourcetimeline_stage_name",
-        "table": "opportunityresourcetimeline",
-        "columns": ["stage_name"],
-        "description": "Optimize resource timeline filtering by stage"
-    },
-    {
-        "name": "idx_opportunityresourcetimeline_stage_start_date",
-        "table": "opportunityresourcetimeline",
-        "columns": ["stage_start_date"],
-        "description": "Optimize resource timeline filtering by start date"
-    },
-    {
-        "name": "idx_opportunityresourcetimeline_stage_end_date",
-        "table": "opportunityresourcetimeline", 
-        "columns": ["stage_end_date"],
-        "description": "Optimize resource timeline filtering by end date"
-    },
+    # Resource timeline indexes are managed by Alembic migrations (composite
+    # covering indexes on opportunity_resource_timeline, see app/models/resources.py)
     
     # Configuration table indexes
     {
@@ -205,6 +154,14 @@ INDEXES = [
     },
 ]
 
+# Indexes created by earlier versions of this script and since superseded
+SUPERSEDED_INDEXES = [
+    "idx_opportunitylineitem_opportunity_id",  # ux_opportunitylineitem_natural_key
+]
+
+# Full-text search index over opportunities (see app/services/opportunity_search.py)
+SEARCH_TABLE = "opportunity_fts"
+
 # Database optimization queries
 OPTIMIZATIONS = [
     "PRAGMA cache_size = 10000;",  # Increase cache size to 10MB
@@ -299,6 +256,18 @@ def create_index(conn: sqlite3.Connection, index_info: dict) -> bool:
         return False
 
 
+def drop_superseded_indexes(conn: sqlite3.Connection) -> int:
+    """Drop indexes that other indexes now cover; returns the number dropped."""
+    dropped = 0
+    for index_name in SUPERSEDED_INDEXES:
+        if check_index_exists(conn, index_name):
+            conn.execute(f"DROP INDEX {index_name}")
+            logger.info("Dropped superseded index", index=index_name)
+            dropped += 1
+    conn.commit()
+    return dropped
+
+
 def apply_optimizations(conn: sqlite3.Connection) -> None:
     """Apply SQLite performance optimizations."""
     cursor = conn.cursor()
@@ -315,6 +284,30 @@ def apply_optimizations(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
+def maintain_search_index(conn: sqlite3.Connection) -> None:
+    """
+    Rebuild the opportunity search index from the opportunity table and merge its segments.
+
+    Triggers keep the index in sync; the rebuild repairs an index that drifted
+    (e.g. rows written while the triggers were missing).
+    """
+    if not check_table_exists(conn, SEARCH_TABLE):
+        logger.warning("Search index does not exist, skipping", table=SEARCH_TABLE)
+        return
+    try:
+        start_time = time.time()
+        conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+        conn.commit()
+        end_time = time.time()
+        
+        logger.info("Search index rebuilt",
+                   table=SEARCH_TABLE,
+                   duration_ms=round((end_time - start_time) * 1000, 2))
+    except sqlite3.Error as e:
+        logger.error("Failed to rebuild search index", error=str(e))
+
+
 def analyze_database(conn: sqlite3.Connection) -> None:
     """Run ANALYZE to update SQLite statistics."""
     try:
@@ -385,6 +378,11 @@ def main():
                 created_count += 1
             else:
                 skipped_count += 1
+        dropped_count = drop_superseded_indexes(conn)
+        
+        # Rebuild the full-text search index
+        logger.info("Rebuilding search index")
+        maintain_search_index(conn)
         
         # Run database analysis
         logger.info("Running database analysis")
@@ -398,6 +396,7 @@ def main():
         logger.info("Database optimization completed",
                    indexes_created=created_count,
                    indexes_skipped=skipped_count,
+                   indexes_dropped=dropped_count,
                    total_indexes=len(INDEXES))
         
     except Exception as e:
@@ -0,0 +1,101 @@
+"""
+Shared test configuration.
+
+Every request made through the TestClient runs under a query budget, so an
+endpoint that starts issuing queries per row fails the suite with
+QueryBudgetExceeded. Use the ``query_budget`` fixture to tighten the budget
+for a single test.
+
+Incremental timeline recalculation is off unless a test turns it on, so
+writes in other tests do not spawn recalculation jobs.
+
+The ``engine`` fixture provides an empty in-memory database wired into every
+router and every service that opens its own sessions; test modules seed it
+with their own data. ``count_queries`` counts the statements a GET request
+issues against it.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.api import config, forecasts, imports, opportunities, reports, resources
+from app.config import settings
+from app.main import app
+from app.services import excel_import, import_jobs, portfolio_aggregate, timeline_recalculation
+from app.services.config_snapshot import invalidate_config_snapshot
+from app.services.missing_timelines import invalidate_missing_timelines
+
+ROUTERS = (config, forecasts, imports, opportunities, reports, resources)
+# Services that open sessions on the application engine outside a request
+ENGINE_USERS = (excel_import, import_jobs, portfolio_aggregate, timeline_recalculation)
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budget(monkeypatch):
+    monkeypatch.setattr(settings, "enforce_query_budget", True)
+
+
+@pytest.fixture(autouse=True)
+def disable_timeline_recalculation(monkeypatch):
+    monkeypatch.setattr(settings, "timeline_recalculation_mode", "off")
+
+
+@pytest.fixture(autouse=True)
+def build_reports_in_process(monkeypatch):
+    # Report workers would open the configured database, not the test engine
+    monkeypatch.setattr(settings, "report_worker_processes", 0)
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """Set the per-request query budget for the current test."""
+    def set_budget(max_queries):
+        monkeypatch.setattr(settings, "request_query_budget", max_queries)
+    return set_budget
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Empty in-memory database used by every endpoint and importer."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    def get_test_session():
+        with Session(engine) as session:
+            yield session
+
+    for module in ROUTERS:
+        app.dependency_overrides[module.get_session] = get_test_session
+    for module in ENGINE_USERS:
+        monkeypatch.setattr(module, "engine", engine)
+    # Caches built from another test's database must not leak into this one
+    invalidate_config_snapshot()
+    invalidate_missing_timelines()
+    yield engine
+    for module in ROUTERS:
+        app.dependency_overrides.pop(module.get_session, None)
+    invalidate_config_snapshot()
+    invalidate_missing_timelines()
+    engine.dispose()
+
+
+@pytest.fixture
+def count_queries(engine):
+    """Make a GET request and return (statements executed, response JSON)."""
+    def count(client, path):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.get(path)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert response.status_code == 200
+        return len(statements), response.json()
+    return count
@@ -0,0 +1,190 @@
+"""
+Concurrency benchmark: light endpoints must stay responsive while heavy
+reports run.
+
+Starts the API with uvicorn against a seeded temporary SQLite database,
+keeps several report requests in flight and compares the p99 latency of
+/api/health and /api/opportunities with and without that load.
+
+Run with: RUN_BENCHMARKS=1 pytest tests/test_concurrency_benchmark.py -s
+"""
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"),
+]
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+OPPORTUNITY_COUNT = 1500
+HEAVY_REPORTS = [
+    "/api/reports/top-average-headcount",
+    "/api/reports/top-itoc-mw-revenue-with-status",
+    "/api/reports/service-line-activity-timeline",
+    "/api/reports/resource-gap-analysis",
+]
+HEAVY_CLIENTS = 2
+LIGHT_ENDPOINTS = ["/api/health", "/api/opportunities/?limit=20"]
+SAMPLES_PER_ENDPOINT = 200
+
+# A light request blocked behind a report would take as long as the report;
+# under load its p99 must stay a small fraction of the report latency
+MAX_P99_TO_REPORT_RATIO = 0.1
+
+STAGES = ["01", "02", "03", "04A", "04B", "05A", "05B", "06"]
+
+
+def seed_database(database_url: str) -> None:
+    """Create the schema and fill it with opportunities and resource timelines."""
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(7)
+    opportunities, timelines = [], []
+    for i in range(OPPORTUNITY_COUNT):
+        opportunity_id = f"OPP-{i:06d}"
+        decision_date = datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 700))
+        opportunities.append(dict(
+            opportunity_id=opportunity_id,
+            opportunity_name=f"Opportunity {i}",
+            account_name=f"Account {i % 80}",
+            sales_stage=rng.choice(STAGES),
+            tcv_millions=rng.uniform(0, 100),
+            mw_millions=rng.uniform(0, 20),
+            itoc_millions=rng.uniform(0, 20),
+            decision_date=decision_date,
+            lead_offering_l1=rng.choice(["MW", "ITOC"]),
+            custom_tracking_field_2=rng.choice(["GREEN", "AMBER", "RED"]),
+            opportunity_owner=f"Owner {i % 9}",
+        ))
+        stage_end = decision_date
+        for stage in STAGES[:rng.randint(2, len(STAGES))]:
+            stage_start = stage_end - timedelta(weeks=rng.randint(1, 8))
+            for service_line in ("MW", "ITOC"):
+                timelines.append(dict(
+                    opportunity_id=opportunity_id,
+                    service_line=service_line,
+                    stage_name=stage,
+                    stage_start_date=stage_start,
+                    stage_end_date=stage_end,
+                    duration_weeks=(stage_end - stage_start).days / 7,
+                    fte_required=round(rng.uniform(0.5, 4), 1),
+                    total_effort_weeks=rng.uniform(1, 20),
+                    resource_status="Predicted",
+                    opportunity_name=f"Opportunity {i}",
+                    category=rng.choice(["Cat A", "Cat B", "Cat C"]),
+                    resource_category=None,
+                    tcv_millions=rng.uniform(0, 100),
+                    decision_date=decision_date,
+                ))
+            stage_end = stage_start
+    with Session(engine) as session:
+        session.execute(insert(Opportunity), opportunities)
+        session.execute(insert(OpportunityResourceTimeline), timelines)
+        session.commit()
+    engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def server_url(tmp_path_factory):
+    """Run the API in a uvicorn subprocess against a seeded database."""
+    database_url = f"sqlite:///{tmp_path_factory.mktemp('bench') / 'bench.db'}"
+    seed_database(database_url)
+
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, LOG_LEVEL="WARNING", AUTH_ENABLED="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{url}/api/health", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("API server did not start")
+                time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def measure(client: httpx.Client, path: str) -> list:
+    """Latencies in seconds of sequential requests to one endpoint."""
+    latencies = []
+    for _ in range(SAMPLES_PER_ENDPOINT):
+        started = time.perf_counter()
+        client.get(path).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def test_light_endpoint_p99_stays_flat_under_report_load(server_url):
+    with httpx.Client(base_url=server_url, timeout=120) as client:
+        for path in HEAVY_REPORTS:
+            client.get(path).raise_for_status()
+        idle = {path: p99(measure(client, path)) for path in LIGHT_ENDPOINTS}
+
+        stop = threading.Event()
+        report_times = []
+
+        def run_reports(offset: int) -> None:
+            with httpx.Client(base_url=server_url, timeout=120) as report_client:
+                i = offset
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    report_client.get(HEAVY_REPORTS[i % len(HEAVY_REPORTS)])
+                    report_times.append(time.perf_counter() - started)
+                    i += 1
+
+        workers = [threading.Thread(target=run_reports, args=(i,)) for i in range(HEAVY_CLIENTS)]
+        for worker in workers:
+            worker.start()
+        try:
+            time.sleep(0.5)
+            loaded = {path: p99(measure(client, path)) for path in LIGHT_ENDPOINTS}
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    mean_report_time = sum(report_times) / max(len(report_times), 1)
+    print(f"\nreports completed under load: {len(report_times)}, "
+          f"mean report latency {mean_report_time * 1000:.0f} ms")
+    for path in LIGHT_ENDPOINTS:
+        print(f"{path}: idle p99 {idle[path] * 1000:.1f} ms, loaded p99 {loaded[path] * 1000:.1f} ms")
+
+    for path in LIGHT_ENDPOINTS:
+        assert loaded[path] < mean_report_time * MAX_P99_TO_REPORT_RATIO, path
@@ -0,0 +1,102 @@
+"""
+Configuration snapshot cache tests: configuration writes committed through any
+engine (standing in for another process) invalidate every cached snapshot,
+and rolled-back writes invalidate none.
+"""
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.config import OpportunityCategory
+from app.services.config_snapshot import CONFIG_VERSION, get_config_snapshot
+from app.services.data_versions import current_version
+
+
+@pytest.fixture
+def shared_database(tmp_path):
+    """A database file opened by a writer and a reader engine, as two processes would."""
+    url = f"sqlite:///{tmp_path / 'config.db'}"
+    writer = create_engine(url)
+    SQLModel.metadata.create_all(writer)
+    reader = create_engine(url)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def category_names(engine):
+    with Session(engine) as session:
+        return [tier.name for tier in get_config_snapshot(session).opportunity_categories]
+
+
+def test_committed_config_writes_invalidate_other_engines(shared_database):
+    writer, reader = shared_database
+    assert category_names(reader) == []
+
+    with Session(writer) as session:
+        session.add(OpportunityCategory(name="Small", min_tcv=0, max_tcv=20))
+        session.commit()
+    assert category_names(reader) == ["Small"]
+
+    with Session(writer) as session:
+        category = session.exec(select(OpportunityCategory)).one()
+        category.name = "Sub $20M"
+        session.add(category)
+        session.commit()
+    assert category_names(reader) == ["Sub $20M"]
+
+    with Session(writer) as session:
+        session.delete(session.exec(select(OpportunityCategory)).one())
+        session.commit()
+    assert category_names(reader) == []
+
+    with Session(reader) as session:
+        assert current_version(session, CONFIG_VERSION) == 3
+
+
+def test_unchanged_config_reuses_the_cached_snapshot(shared_database):
+    _, reader = shared_database
+    with Session(reader) as session:
+        first = get_config_snapshot(session)
+    with Session(reader) as session:
+        assert get_config_snapshot(session) is first
+
+
+def test_rolled_back_config_write_keeps_the_snapshot(shared_database):
+    writer, reader = shared_database
+    with Session(writer) as session:
+        session.add(OpportunityCategory(name="Small", min_tcv=0, max_tcv=20))
+        session.commit()
+    with Session(reader) as session:
+        before = get_config_snapshot(session)
+
+    with Session(writer) as session:
+        session.add(OpportunityCategory(name="Large", min_tcv=20, max_tcv=None))
+        session.flush()
+        # The writing session sees its own uncommitted configuration...
+        assert [tier.name for tier in get_config_snapshot(session).opportunity_categories] == ["Small", "Large"]
+        session.rollback()
+
+    # ...but it is never cached, and the stored version is unchanged
+    with Session(writer) as session:
+        assert current_version(session, CONFIG_VERSION) == before.version
+        assert [tier.name for tier in get_config_snapshot(session).opportunity_categories] == ["Small"]
+    with Session(reader) as session:
+        assert get_config_snapshot(session) is before
+
+
+def test_snapshots_are_cached_per_engine():
+    engines = [
+        create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        for _ in range(2)
+    ]
+    for engine, name in zip(engines, ("First", "Second")):
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(OpportunityCategory(name=name, min_tcv=0, max_tcv=None))
+            session.commit()
+
+    # Both databases are at version 1, but neither sees the other's snapshot
+    assert [category_names(engine) for engine in engines] == [["First"], ["Second"]]
+    for engine in engines:
+        engine.dispose()
@@ -0,0 +1,45 @@
+"""
+Database engine configuration tests.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.models.database import build_engine, report_database_settings
+
+
+def test_every_pooled_connection_is_tuned(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 3)
+    monkeypatch.setattr(settings, "db_max_overflow", 2)
+    monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 1234)
+    engine = build_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+
+    def read_pragmas(_):
+        with engine.connect() as connection:
+            return tuple(
+                connection.execute(text(f"PRAGMA {name}")).scalar()
+                for name in ("journal_mode", "synchronous", "cache_size", "temp_store", "busy_timeout")
+            )
+
+    # Several threads at once so the pool opens more than one connection
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = set(executor.map(read_pragmas, range(16)))
+    assert results == {("wal", 1, -settings.sqlite_cache_size_kib, 2, 1234)}
+
+    report = report_database_settings(engine)
+    assert report["journal_mode"] == "wal"
+    assert report["mismatched"] == {}
+    engine.dispose()
+
+
+def test_report_flags_pragmas_that_did_not_apply(monkeypatch):
+    """In-memory databases cannot use WAL, which the startup check reports."""
+    engine = build_engine("sqlite://")
+    report = report_database_settings(engine)
+    assert report["mismatched"]["journal_mode"] == {"configured": "WAL", "effective": "memory"}
+    assert "synchronous" not in report["mismatched"]
+    engine.dispose()
@@ -0,0 +1,271 @@
+"""
+Excel import tests: natural key upserts, per-chunk query counts,
+fingerprint-based skipping of unchanged rows and opportunity row validation.
+"""
+import numpy as np
+from openpyxl import Workbook
+import pandas as pd
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.opportunity import Opportunity, OpportunityLineItem
+from app.services import excel_import
+from app.services.excel_import import (
+    ImportTask, import_excel_background, import_line_items_background, prepare_opportunity_rows, row_fingerprint,
+)
+
+HEADERS = ["Opportunity Id", "Offering TCV (M)", "Product Name", "Lead Offering L2", "Decision Date", "Offering ABR (M)"]
+OPPORTUNITY_HEADERS = ["Opportunity Id", "Opportunity Name", "Sales Stage", "Decision Date", "TCV (M)"]
+
+
+@pytest.fixture
+def import_engine(engine):
+    """Three opportunities for line items to attach to."""
+    with Session(engine) as session:
+        for i in range(3):
+            session.add(Opportunity(opportunity_id=f"OPP-{i}", opportunity_name=f"Opportunity {i}"))
+        session.commit()
+    return engine
+
+
+def write_workbook(path, rows, headers=HEADERS):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def run_import(path, runner=import_line_items_background):
+    task = ImportTask(task_id="test", status="pending", progress=0, message="")
+    runner(path, task)
+    assert task.status == "completed", task.errors
+    return task
+
+
+def stored_items(engine):
+    with Session(engine) as session:
+        items = session.exec(select(OpportunityLineItem).order_by(OpportunityLineItem.id)).all()
+        return [(item.opportunity_id, item.product_name, item.lead_offering_l2, item.offering_abr) for item in items]
+
+
+def test_reimport_updates_items_by_natural_key(import_engine, tmp_path):
+    first = write_workbook(tmp_path / "first.xlsx", [
+        ["OPP-0", 1.0, "Cloud", "Hosting", "2026-01-01", 1.0],
+        ["OPP-0", 1.0, "Cloud", None, "2026-01-01", 2.0],
+        ["OPP-1", 1.0, None, None, "2026-01-01", 3.0],
+        ["OPP-9", 1.0, "Cloud", None, "2026-01-01", 4.0],
+        ["OPP-2", None, "Cloud", None, "2026-01-01", 5.0],
+        ["Grand Total", 4.0, None, None, None, None],
+    ])
+    task = run_import(first)
+    assert task.successful_rows == 3
+    assert task.failed_rows == 2
+    assert task.errors == ["Row 4: Opportunity OPP-9 not found", "Row 5: Missing TCV data"]
+
+    second = write_workbook(tmp_path / "second.xlsx", [
+        ["OPP-1", 1.0, None, None, "2026-01-01", 30.0],
+        ["OPP-0", 1.0, "Cloud", None, "2026-01-01", 20.0],
+        ["OPP-0", 1.0, "Cloud", None, "2026-01-01", 21.0],
+        ["OPP-0", 1.0, "Security", None, "not a date", 6.0],
+    ])
+    run_import(second)
+    assert stored_items(import_engine) == [
+        ("OPP-0", "Cloud", "Hosting", 1.0),
+        ("OPP-0", "Cloud", None, 21.0),
+        ("OPP-1", None, None, 30.0),
+        ("OPP-0", "Security", None, 6.0),
+    ]
+
+
+def test_natural_key_is_unique_with_missing_values(import_engine):
+    with Session(import_engine) as session:
+        session.add(OpportunityLineItem(opportunity_id="OPP-0"))
+        session.add(OpportunityLineItem(opportunity_id="OPP-0"))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+
+def test_import_queries_do_not_grow_with_rows(import_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_import, "IMPORT_CHUNK_SIZE", 100)
+    rows = [[f"OPP-{i % 3}", 1.0, f"Product {i}", None, "2026-01-01", float(i)] for i in range(250)]
+    path = write_workbook(tmp_path / "items.xlsx", rows)
+
+    statements = []
+    event.listen(import_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    task = run_import(path)
+
+    # Two prefetch queries and one upsert per chunk, whatever the row count
+    assert sum(statement.lstrip().upper().startswith("INSERT") for statement in statements) == 3
+    assert sum(statement.lstrip().upper().startswith("SELECT") for statement in statements) == 2
+    assert task.successful_rows == 250
+    assert len(stored_items(import_engine)) == 250
+
+
+def count_writes(engine, action):
+    """Run action and return the number of INSERT/UPDATE statements it executed."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = action()
+    return result, sum(statement.lstrip().upper().startswith(("INSERT", "UPDATE")) for statement in statements)
+
+
+def test_reimport_skips_unchanged_opportunities(import_engine, tmp_path):
+    rows = [[f"OPP-{i}", f"Opportunity {i}", "02", "2026-03-01", 10.0 + i] for i in range(5)]
+    first = write_workbook(tmp_path / "first.xlsx", rows, OPPORTUNITY_HEADERS)
+    task = run_import(first, import_excel_background)
+    # OPP-0..2 exist without fingerprints, so they are rewritten once
+    assert (task.inserted_rows, task.updated_rows, task.unchanged_rows) == (2, 3, 0)
+    assert task.changed_ids == [f"OPP-{i}" for i in range(5)]
+
+    with Session(import_engine) as session:
+        opportunity = session.exec(select(Opportunity).where(Opportunity.opportunity_id == "OPP-1")).one()
+        opportunity.custom_priority = "High"
+        session.commit()
+
+    same = write_workbook(tmp_path / "same.xlsx", rows, OPPORTUNITY_HEADERS)
+    task, writes = count_writes(import_engine, lambda: run_import(same, import_excel_background))
+    assert (task.inserted_rows, task.updated_rows, task.unchanged_rows) == (0, 0, 5)
+    assert task.successful_rows == 5
+    assert task.changed_ids == []
+    assert writes == 0
+
+    rows[3][4] = 99.0
+    changed = write_workbook(tmp_path / "changed.xlsx", rows, OPPORTUNITY_HEADERS)
+    task = run_import(changed, import_excel_background)
+    assert (task.inserted_rows, task.updated_rows, task.unchanged_rows) == (0, 1, 4)
+    assert task.changed_ids == ["OPP-3"]
+    with Session(import_engine) as session:
+        stored = {opp.opportunity_id: opp for opp in session.exec(select(Opportunity)).all()}
+    assert stored["OPP-3"].tcv_millions == 99.0
+    assert stored["OPP-1"].custom_priority == "High"
+
+
+def test_reimport_skips_unchanged_line_items(import_engine, tmp_path):
+    rows = [[f"OPP-{i % 3}", 1.0, f"Product {i}", None, "2026-01-01", float(i)] for i in range(6)]
+    run_import(write_workbook(tmp_path / "first.xlsx", rows))
+
+    rows[4][5] = 40.0
+    task, writes = count_writes(import_engine, lambda: run_import(write_workbook(tmp_path / "second.xlsx", rows)))
+    assert (task.inserted_rows, task.updated_rows, task.unchanged_rows) == (0, 1, 5)
+    assert task.changed_ids == ["OPP-1"]
+    assert writes == 1
+    assert ("OPP-1", "Product 4", None, 40.0) in stored_items(import_engine)
+
+
+def test_row_fingerprint_depends_only_on_values():
+    fields = ["name", "amount", "date"]
+    row = {"name": "Cloud", "amount": 1.5, "date": None}
+    assert row_fingerprint(row, fields) == row_fingerprint({**row, "amount": np.float64(1.5), "extra": 1}, fields)
+    assert row_fingerprint(row, fields) != row_fingerprint({**row, "amount": 1.25}, fields)
+    assert row_fingerprint(row, fields) != row_fingerprint({**row, "name": None}, fields)
+
+
+USER_MANAGED_FIELDS = {
+    "security_clearance": "SC",
+    "custom_priority": "High",
+    "internal_stage_assessment": "On track",
+    "custom_tracking_field_1": "Bid team",
+    "custom_tracking_field_2": "GREEN",
+    "custom_tracking_field_3": "Q3",
+    "internal_notes": "Renewal of the 2021 contract",
+}
+
+
+def stored_opportunities(engine):
+    with Session(engine) as session:
+        return {opp.opportunity_id: opp for opp in session.exec(select(Opportunity)).all()}
+
+
+def test_reimport_preserves_user_managed_fields(import_engine, tmp_path):
+    rows = [["OPP-0", "Opportunity 0", "02", "2026-03-01", 10.0]]
+    run_import(write_workbook(tmp_path / "first.xlsx", rows, OPPORTUNITY_HEADERS), import_excel_background)
+    with Session(import_engine) as session:
+        opportunity = session.exec(select(Opportunity).where(Opportunity.opportunity_id == "OPP-0")).one()
+        for field, value in USER_MANAGED_FIELDS.items():
+            setattr(opportunity, field, value)
+        session.add(opportunity)
+        session.commit()
+
+    rows[0][1:] = ["Renamed", "03", "2026-04-01", 12.0]
+    task = run_import(write_workbook(tmp_path / "second.xlsx", rows, OPPORTUNITY_HEADERS), import_excel_background)
+
+    assert task.updated_rows == 1
+    opportunity = stored_opportunities(import_engine)["OPP-0"]
+    assert (opportunity.opportunity_name, opportunity.sales_stage, opportunity.tcv_millions) == ("Renamed", "03", 12.0)
+    assert {field: getattr(opportunity, field) for field in USER_MANAGED_FIELDS} == USER_MANAGED_FIELDS
+
+
+def test_zero_tcv_is_stored_as_null(import_engine, tmp_path):
+    rows = [["OPP-0", "Opportunity 0", "02", "2026-03-01", 0], ["OPP-1", "Opportunity 1", "02", "2026-03-01", None]]
+    task = run_import(write_workbook(tmp_path / "zero.xlsx", rows, OPPORTUNITY_HEADERS), import_excel_background)
+
+    assert task.successful_rows == 2
+    assert task.errors == [
+        "Row 1: Warning - TCV amount is zero",
+        "Row 2: Warning - Missing TCV data for 'Opportunity 1'",
+    ]
+    assert task.warnings_count == 2
+    stored = stored_opportunities(import_engine)
+    assert stored["OPP-0"].tcv_millions is None and stored["OPP-1"].tcv_millions is None
+
+
+def test_bad_decision_dates_fail_the_row(import_engine, tmp_path):
+    rows = [
+        ["OPP-0", "Opportunity 0", "02", "not a date", 1.0],
+        ["OPP-1", "Opportunity 1", "02", None, 1.0],
+        ["OPP-5", "Opportunity 5", "02", "2026-03-01", 1.0],
+    ]
+    task = run_import(write_workbook(tmp_path / "dates.xlsx", rows, OPPORTUNITY_HEADERS), import_excel_background)
+
+    assert task.errors == ["Row 1: Invalid decision date: 'not a date'", "Row 2: Missing decision date"]
+    assert (task.successful_rows, task.failed_rows) == (1, 2)
+    stored = stored_opportunities(import_engine)
+    assert stored["OPP-0"].decision_date is None
+    assert stored["OPP-5"].decision_date.isoformat() == "2026-03-01T00:00:00"
+
+
+def test_summary_and_filter_rows_are_skipped():
+    df = pd.DataFrame(
+        [
+            ["OPP-0", "Opportunity 0", "02", "2026-03-01", 1.0],
+            ["Grand Total", "All", None, None, 10.0],
+            ["Applied filters:\nStatus is Open", "Filters", None, None, None],
+            ["Sales Org is UK", "Filters", None, None, None],
+            [None, "No id", "02", "2026-03-01", 1.0],
+            ["OPP-1", None, "02", "2026-03-01", 1.0],
+            ["OPP-2", "Opportunity 2", None, "2026-03-01", 1.0],
+        ],
+        columns=OPPORTUNITY_HEADERS,
+    )
+    task = ImportTask(task_id="test", status="processing", progress=0, message="")
+
+    rows, skipped = prepare_opportunity_rows(df, "TCV (M)", task)
+
+    assert [row["opportunity_id"] for row in rows] == ["OPP-0", "OPP-2"]
+    assert rows[1]["sales_stage"] == "Unknown"
+    assert skipped == 5
+    assert task.errors == [] and task.failed_rows == 0
+
+
+def test_failed_chunk_commit_fails_every_row_of_the_chunk(import_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_import, "IMPORT_CHUNK_SIZE", 2)
+    upsert = excel_import.upsert_opportunities
+
+    def fail_second_chunk(session, rows):
+        if any(row["opportunity_id"] == "OPP-12" for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("disk full"))
+        upsert(session, rows)
+
+    monkeypatch.setattr(excel_import, "upsert_opportunities", fail_second_chunk)
+    rows = [[f"OPP-1{i}", f"Opportunity {i}", "02", "2026-03-01", 1.0] for i in range(5)]
+    task = run_import(write_workbook(tmp_path / "chunks.xlsx", rows, OPPORTUNITY_HEADERS), import_excel_background)
+
+    assert (task.successful_rows, task.failed_rows) == (3, 2)
+    [error] = task.errors
+    assert error.startswith("Rows 3-4: Database commit failed - ")
+    assert sorted(stored_opportunities(import_engine)) == ["OPP-0", "OPP-1", "OPP-10", "OPP-11", "OPP-14", "OPP-2"]
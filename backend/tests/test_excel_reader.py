@@ -0,0 +1,102 @@
+"""
+Streaming Excel reader tests: chunks concatenate to what pd.read_excel reads,
+apart from the documented dtype and trailing-column differences.
+"""
+from datetime import datetime
+
+import numpy as np
+from openpyxl import Workbook
+import pandas as pd
+import pytest
+
+from app.services.excel_reader import ExcelChunkReader, read_excel_headers
+
+HEADERS = ["Opportunity Id", "Decision Date", "Created", None, "Opportunity Id", "TCV (M)", "Notes"]
+ROWS = [
+    ["OPP-0", datetime(2026, 1, 1), datetime(2025, 1, 1), None, "A", 1.0, "N/A"],
+    ["OPP-1", "not a date", datetime(2025, 1, 2), "stray", "B", 2.5, None],
+    [],
+    ["OPP-2", None, datetime(2025, 1, 3), None, "C", 3, "", "past the headers", None, "far"],
+    ["OPP-3", datetime(2026, 1, 4), datetime(2025, 1, 4), None, 4.0, None, "  padded  "],
+    [None, None, None, None, None, None, None],
+    ["Grand Total", None, None, None, None, 6.5],
+    [],
+    [],
+]
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """Workbook with interior and trailing blank rows, duplicate headers and unnamed columns."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    for row in ROWS:
+        sheet.append(row)
+    path = tmp_path / "export.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def as_objects(frame):
+    """pd.read_excel's frame with the reader's object dtype and NaN for missing dates."""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), np.nan)
+
+
+def read_all(path, chunk_size):
+    with ExcelChunkReader(path, chunk_size) as reader:
+        chunks = list(reader)
+        assert reader.rows_read == sum(len(chunk) for chunk in chunks)
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    return pd.concat(chunks, ignore_index=True)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_chunks_match_read_excel(workbook_path, chunk_size):
+    expected = pd.read_excel(workbook_path)
+    result = read_all(workbook_path, chunk_size)
+
+    assert list(result.columns) == [
+        "Opportunity Id", "Decision Date", "Created", "Unnamed: 3", "Opportunity Id.1", "TCV (M)", "Notes",
+    ]
+    # Cells right of the last header are dropped rather than becoming Unnamed columns
+    assert list(expected.columns[len(result.columns):]) == ["Unnamed: 7", "Unnamed: 8", "Unnamed: 9"]
+    pd.testing.assert_frame_equal(result, as_objects(expected.iloc[:, :len(result.columns)]))
+
+    # Values never depend on the chunk a row landed in
+    assert set(result.dtypes) == {np.dtype(object)}
+    assert [type(value) for value in result["Created"].dropna()] == [datetime] * 4
+    assert pd.isna(result.loc[2, "Decision Date"]) and result.loc[2, "Decision Date"] is not pd.NaT
+
+
+def test_headers_are_parsed_before_the_rows(workbook_path):
+    with ExcelChunkReader(workbook_path) as reader:
+        assert reader.rows_read == 0
+        # Rows appended without cells are not stored, so only the blank row of Nones counts
+        assert reader.estimated_rows == len(pd.read_excel(workbook_path))
+        assert reader.headers == list(pd.read_excel(workbook_path, nrows=0).columns[:7])
+    assert read_excel_headers(workbook_path) == reader.headers
+
+
+def test_xls_files_are_read_whole_and_sliced(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.xls"
+    path.write_bytes(b"")
+    frame = pd.DataFrame({
+        "Opportunity Id": [f"OPP-{i}" for i in range(5)],
+        "Decision Date": pd.to_datetime(["2026-01-01", None, "2026-01-03", "2026-01-04", "2026-01-05"]),
+    })
+    reads = []
+    monkeypatch.setattr(pd, "read_excel", lambda file_path: reads.append(file_path) or frame.copy())
+
+    with ExcelChunkReader(str(path), chunk_size=2) as reader:
+        assert reader.headers == ["Opportunity Id", "Decision Date"]
+        assert reader.estimated_rows == 5
+        chunks = list(reader)
+
+    assert reads == [str(path)]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [0, 1], [0]]
+    result = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(result, as_objects(frame))
+    assert type(result.loc[0, "Decision Date"]) is datetime and pd.isna(result.loc[1, "Decision Date"])
@@ -0,0 +1,94 @@
+"""
+Forecast endpoint tests.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api import forecasts
+from app.main import app
+from app.models.config import OpportunityCategory
+from app.models.opportunity import Opportunity
+
+CATEGORIES = [("Sub $5M", 0, 5), ("Cat C", 5, 25), ("Cat B", 25, 50), ("Cat A", 50, None)]
+STAGES = ["01", "02", "03", "04A", None]
+
+
+@pytest.fixture
+def forecast_engine(engine):
+    """Forecast categories and 80 opportunities."""
+    with Session(engine) as session:
+        for name, min_tcv, max_tcv in CATEGORIES:
+            session.add(OpportunityCategory(name=name, min_tcv=min_tcv, max_tcv=max_tcv))
+        for i in range(80):
+            session.add(Opportunity(
+                opportunity_id=f"OPP-{i:04d}", opportunity_name=f"Opportunity {i}",
+                sales_stage=STAGES[i % len(STAGES)],
+                tcv_millions=[None, -2.0, 5.0, 25.0, 3.0 * i][i % 5],
+                mw_millions=[0.0, 1.5, None][i % 3], itoc_millions=[2.0, 0.0][i % 2],
+                lead_offering_l1=["MW", "ITOC", None, ""][i % 4],
+            ))
+        session.commit()
+    return engine
+
+
+def filtered_opportunities(engine, categories=(), service_lines=()):
+    with Session(engine) as session:
+        category_rows = session.exec(select(OpportunityCategory)).all()
+        opportunities = session.exec(select(Opportunity)).all()
+    result = []
+    for opp in opportunities:
+        category = forecasts.get_opportunity_category(opp.tcv_millions or 0, category_rows)
+        if categories and category not in categories:
+            continue
+        revenue = {"MW": opp.mw_millions or 0, "ITOC": opp.itoc_millions or 0}
+        if service_lines and not any(revenue.get(sl, 0) > 0 for sl in service_lines):
+            continue
+        result.append((opp, category))
+    return result
+
+
+def test_summary_filters_and_breakdowns(forecast_engine):
+    """Filters and breakdowns computed in SQL match evaluating each opportunity."""
+    client = TestClient(app)
+    response = client.get(
+        "/api/forecast/summary",
+        params={"category": ["Cat C", "Uncategorized", "Cat A"], "service_line": ["MW", "SEC"]},
+    )
+    assert response.status_code == 200
+    summary = response.json()
+
+    expected = filtered_opportunities(forecast_engine, ["Cat C", "Uncategorized", "Cat A"], ["MW", "SEC"])
+    assert summary["total_opportunities"] == len(expected)
+    assert summary["total_value"] == pytest.approx(sum(opp.tcv_millions or 0 for opp, _ in expected))
+    assert list(summary["category_counts"]) == ["Cat A", "Cat C", "Uncategorized"]
+    for name, count in summary["category_counts"].items():
+        assert count == sum(1 for _, category in expected if category == name)
+    assert list(summary["stage_counts"]) == [
+        stage for stage in STAGES[:-1] if any(opp.sales_stage == stage for opp, _ in expected)
+    ]
+    for stage, count in summary["stage_counts"].items():
+        assert count == sum(1 for opp, _ in expected if opp.sales_stage == stage)
+
+
+def test_service_line_and_lead_offering_totals(forecast_engine):
+    client = TestClient(app)
+    response = client.get("/api/forecast/service-lines", params={"category": "Cat A"})
+    assert response.status_code == 200
+    forecast = response.json()
+
+    expected = filtered_opportunities(forecast_engine, ["Cat A"])
+    assert forecast["service_line_counts"]["MW"] == sum(1 for opp, _ in expected if (opp.mw_millions or 0) > 0)
+    assert forecast["service_line_totals"]["ITOC"] == pytest.approx(
+        sum(opp.itoc_millions or 0 for opp, _ in expected)
+    )
+    assert forecast["service_line_totals"]["CES"] == 0
+
+    response = client.get("/api/forecast/lead-offerings", params={"service_line": "MW"})
+    assert response.status_code == 200
+    lead_offerings = response.json()
+    expected = filtered_opportunities(forecast_engine, service_lines=["MW"])
+    assert list(lead_offerings["lead_offering_totals"]) == ["ITOC", "MW"]
+    assert lead_offerings["lead_offering_data"]["MW"]["opportunities"] == sum(
+        1 for opp, _ in expected if opp.lead_offering_l1 == "MW"
+    )
@@ -0,0 +1,150 @@
+"""
+Import job store tests: single-winner claims, failure handling, recovery at
+startup and the status endpoint, with the worker pool replaced by an
+in-process executor.
+"""
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+import pytest
+from sqlmodel import Session
+
+from app.main import app
+from app.models.imports import ImportJob
+from app.models.opportunity import Opportunity
+from app.services import import_jobs
+from app.services.excel_import import ImportTask
+from app.services.import_jobs import (
+    STALE_JOB_TIMEOUT, claim_import_job, create_import_job, fail_import_job, recover_import_jobs, save_import_task,
+)
+
+
+class InlineExecutor:
+    """Runs submitted calls immediately in the calling thread."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@pytest.fixture
+def executor(engine, monkeypatch):
+    executor = InlineExecutor()
+    monkeypatch.setattr(import_jobs, "get_import_executor", lambda: executor)
+    return executor
+
+
+def upload(tmp_path, name="upload.xlsx"):
+    """Write a one-opportunity workbook, as saved by the upload endpoint."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Opportunity Id", "Opportunity Name", "Sales Stage", "Decision Date", "TCV (M)"])
+    sheet.append(["OPP-1", "Opportunity 1", "02", datetime(2026, 6, 1), 5.0])
+    path = tmp_path / name
+    workbook.save(path)
+    return path
+
+
+def new_job(engine, file_path, status="pending", updated_at=None):
+    with Session(engine) as session:
+        task_id = create_import_job(session, "opportunities", str(file_path), "Excel import queued").task_id
+        job = session.get(ImportJob, task_id)
+        job.status = status
+        job.updated_at = updated_at or datetime.utcnow()
+        session.add(job)
+        session.commit()
+    return task_id
+
+
+def job(engine, task_id):
+    with Session(engine) as session:
+        return session.get(ImportJob, task_id)
+
+
+def test_claim_has_a_single_winner(engine, tmp_path):
+    task_id = new_job(engine, upload(tmp_path))
+
+    with Session(engine) as first, Session(engine) as second:
+        claimed = claim_import_job(first, task_id)
+        assert claimed is not None and claimed.status == "processing"
+        assert claim_import_job(second, task_id) is None
+    assert job(engine, task_id).message == "Import started"
+
+
+def test_fail_marks_unfinished_jobs_and_removes_the_upload(engine, tmp_path):
+    path = upload(tmp_path)
+    task_id = new_job(engine, path, status="processing")
+
+    fail_import_job(task_id, "Import worker failed: killed")
+
+    failed = job(engine, task_id)
+    assert (failed.status, failed.message) == ("failed", "Import failed: Import worker failed: killed")
+    assert failed.errors == '["Import worker failed: killed"]'
+    assert failed.end_time
+    assert not path.exists()
+
+
+def test_fail_leaves_finished_jobs_alone(engine, tmp_path):
+    path = upload(tmp_path)
+    task_id = new_job(engine, path, status="completed")
+
+    fail_import_job(task_id, "Import worker failed: late callback")
+
+    assert job(engine, task_id).status == "completed"
+    assert path.exists()
+    fail_import_job("missing", "no such job")
+
+
+def test_recover_resubmits_pending_and_fails_stale_jobs(engine, executor, tmp_path):
+    pending = new_job(engine, upload(tmp_path, "pending.xlsx"))
+    stale_path = upload(tmp_path, "stale.xlsx")
+    stale = new_job(engine, stale_path, status="processing",
+                    updated_at=datetime.utcnow() - STALE_JOB_TIMEOUT - timedelta(minutes=1))
+    running = new_job(engine, upload(tmp_path, "running.xlsx"), status="processing")
+
+    assert recover_import_jobs() == [pending]
+
+    assert executor.submitted == [(pending,)]
+    assert job(engine, pending).status == "completed"
+    with Session(engine) as session:
+        assert session.get(Opportunity, 1).opportunity_id == "OPP-1"
+    assert (job(engine, stale).status, job(engine, stale).message) == (
+        "failed", "Import failed: Import interrupted before completion"
+    )
+    assert not stale_path.exists()
+    # A job still reporting progress belongs to a live worker
+    assert job(engine, running).status == "processing"
+
+    # Nothing is left to recover on the next start
+    assert recover_import_jobs() == []
+
+
+def test_status_endpoint_reads_the_job_store(engine, tmp_path):
+    task_id = new_job(engine, upload(tmp_path), status="processing")
+    with Session(engine) as session:
+        save_import_task(session, ImportTask(
+            task_id=task_id, status="processing", progress=40, message="Processing rows",
+            total_rows=10, processed_rows=4, successful_rows=3, failed_rows=1,
+            errors=["Row 2: Missing TCV data"], changed_ids=["OPP-1", "OPP-2"],
+        ))
+
+    client = TestClient(app)
+    response = client.get(f"/api/import/status/{task_id}")
+    assert response.status_code == 200, response.text
+    status = response.json()
+    assert (status["status"], status["progress"], status["processed_rows"]) == ("processing", 40, 4)
+    assert status["errors"] == ["Row 2: Missing TCV data"]
+    assert status["changed_count"] == 2
+    assert "changed_ids" not in status
+
+    assert client.get("/api/import/status/missing").status_code == 404
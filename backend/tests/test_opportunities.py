@@ -0,0 +1,166 @@
+"""
+Opportunity list pagination, export and search tests.
+"""
+import csv
+from datetime import datetime, timedelta
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlmodel import Session, select
+
+from app.main import app
+from app.models.opportunity import Opportunity
+from app.services import opportunity_export, opportunity_search
+
+
+@pytest.fixture
+def opportunity_engine(engine):
+    """53 opportunities with repeated and missing sort values."""
+    with Session(engine) as session:
+        for i in range(53):
+            session.add(Opportunity(
+                opportunity_id=f"OPP-{i:04d}", opportunity_name=f"Opportunity {i % 7}",
+                # Repeated and missing sort values exercise the id tie-break
+                tcv_millions=[None, 1.5, 10.0, 2.25][i % 4],
+                decision_date=None if i % 5 == 0 else datetime(2025, 1, 1) + timedelta(days=i % 6),
+                sales_stage=["01", "02", "03"][i % 3],
+                mw_millions=1.0 if i % 2 else 0.0,
+            ))
+        session.commit()
+    return engine
+
+
+def walk_pages(client, params, limit):
+    """Follow X-Next-Cursor until the last page and return the ids in order."""
+    ids, cursor = [], None
+    while True:
+        response = client.get(
+            "/api/opportunities/", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        ids.extend(opp["id"] for opp in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["id", "-id", "tcv_millions", "-tcv_millions", "decision_date", "-decision_date"])
+def test_cursor_pages_cover_sorted_rows_once(opportunity_engine, sort):
+    """Walking cursor pages returns every row exactly once in (sort, id) order."""
+    client = TestClient(app)
+    everything = client.get("/api/opportunities/", params={"sort": sort}).json()
+    assert len(everything) == 53
+
+    key = sort.lstrip("-")
+    descending = sort.startswith("-")
+    # SQLite places NULLs first ascending and last descending
+    expected = sorted(
+        everything,
+        key=lambda opp: (opp[key] is not None, opp[key] or 0, opp["id"]),
+        reverse=descending,
+    )
+    assert [opp["id"] for opp in everything] == [opp["id"] for opp in expected]
+    assert walk_pages(client, {"sort": sort}, limit=4) == [opp["id"] for opp in expected]
+
+
+def test_cursor_pages_respect_filters_and_total(opportunity_engine):
+    client = TestClient(app)
+    params = {"stage": ["01", "03"], "service_line": "MW", "sort": "-tcv_millions"}
+    response = client.get("/api/opportunities/", params={**params, "limit": 5, "include_total": True})
+    expected_total = sum(1 for i in range(53) if i % 3 != 1 and i % 2)
+    assert response.headers["X-Total-Count"] == str(expected_total)
+
+    ids = walk_pages(client, params, limit=5)
+    assert len(ids) == len(set(ids)) == expected_total
+    assert "X-Total-Count" not in client.get("/api/opportunities/", params=params).headers
+
+
+def test_invalid_sort_and_cursor_are_rejected(opportunity_engine):
+    client = TestClient(app)
+    assert client.get("/api/opportunities/", params={"sort": "internal_notes"}).status_code == 422
+    assert client.get("/api/opportunities/", params={"cursor": "not-a-cursor"}).status_code == 422
+
+    cursor = client.get("/api/opportunities/", params={"sort": "tcv_millions", "limit": 3}).headers["X-Next-Cursor"]
+    response = client.get("/api/opportunities/", params={"sort": "-tcv_millions", "cursor": cursor})
+    assert response.status_code == 422
+
+
+def test_csv_export_matches_list_endpoint(opportunity_engine, monkeypatch):
+    """The export streams the same filtered, sorted rows as the list endpoint."""
+    monkeypatch.setattr(opportunity_export, "EXPORT_BATCH_SIZE", 7)
+    client = TestClient(app)
+    params = {"stage": ["01", "02"], "sort": "-decision_date"}
+    listed = client.get("/api/opportunities/", params=params).json()
+
+    response = client.get("/api/opportunities/export", params={**params, "format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == opportunity_export.EXPORT_COLUMNS
+    assert [int(row["id"]) for row in rows] == [opp["id"] for opp in listed]
+    assert [row["decision_date"] or None for row in rows] == [opp["decision_date"] for opp in listed]
+
+
+def test_columnar_and_xlsx_exports(opportunity_engine):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    client = TestClient(app)
+    expected_ids = [opp["id"] for opp in client.get("/api/opportunities/", params={"sort": "tcv_millions"}).json()]
+
+    response = client.get("/api/opportunities/export", params={"format": "arrow", "sort": "tcv_millions"})
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("id").to_pylist() == expected_ids
+    assert table.schema.field("decision_date").type == pa.timestamp("us")
+
+    response = client.get("/api/opportunities/export", params={"format": "parquet", "sort": "tcv_millions"})
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == expected_ids
+    assert table.column("tcv_millions").null_count == 14
+
+    response = client.get("/api/opportunities/export", params={"format": "xlsx"})
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == opportunity_export.EXPORT_COLUMNS
+    assert len(rows) == 54
+
+    assert client.get("/api/opportunities/export", params={"format": "json"}).status_code == 422
+
+
+def test_search_uses_prefix_index_and_stays_in_sync(opportunity_engine):
+    """Word-prefix search through the FTS index follows inserts, updates and deletes."""
+    client = TestClient(app)
+    with Session(opportunity_engine) as session:
+        assert opportunity_search.search_index_available(session)
+        session.add(Opportunity(opportunity_id="OPP-9001", opportunity_name="Cloud Migration Wave",
+                                account_name="Acme Bank", sales_stage="02"))
+        session.add(Opportunity(opportunity_id="OPP-9002", opportunity_name="Data Centre Exit",
+                                account_name="Acme Bank Cloud Services", sales_stage="02"))
+        session.commit()
+
+    def search_ids(query, **params):
+        response = client.get("/api/opportunities/", params={"search": query, **params})
+        assert response.status_code == 200
+        return [opp["opportunity_id"] for opp in response.json()]
+
+    assert search_ids("clou acm") == ["OPP-9001", "OPP-9002"]
+    assert search_ids("Migration", stage="01") == []
+    assert search_ids("OPP-9002") == ["OPP-9002"]
+    assert len(search_ids("Opportunity")) == 53
+
+    ranked = client.get("/api/opportunities/search", params={"q": "cloud", "limit": 5}).json()
+    # The name match outranks the account match
+    assert [opp["opportunity_id"] for opp in ranked] == ["OPP-9001", "OPP-9002"]
+
+    with Session(opportunity_engine) as session:
+        first = session.exec(select(Opportunity).where(Opportunity.opportunity_id == "OPP-9001")).one()
+        first.opportunity_name = "Network Refresh"
+        session.delete(session.exec(select(Opportunity).where(Opportunity.opportunity_id == "OPP-9002")).one())
+        session.commit()
+    assert search_ids("cloud") == []
+    assert search_ids("netw") == ["OPP-9001"]
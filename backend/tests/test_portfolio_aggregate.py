@@ -0,0 +1,171 @@
+"""
+Portfolio FTE aggregate tests.
+"""
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api import resources
+from app.main import app
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline, PortfolioFteDaily
+from app.services.interval_sweep import period_peak_stages
+from app.services.portfolio_aggregate import (
+    daily_fte_contributions,
+    _load_intervals,
+    rebuild_portfolio_aggregate,
+)
+
+STAGES = ["02", "03", "04A"]
+
+
+def seed_timelines(engine, count):
+    with Session(engine) as session:
+        for i in range(count):
+            opportunity_id = f"OPP-{i:04d}"
+            decision_date = datetime(2025, 3, 1) + timedelta(days=9 * i, hours=i % 5)
+            session.add(Opportunity(
+                opportunity_id=opportunity_id, opportunity_name=f"Opportunity {i}",
+                sales_stage="02", tcv_millions=10.0 + i, decision_date=decision_date,
+            ))
+            for service_line in ("MW", "ITOC"):
+                stage_end = decision_date
+                for stage in reversed(STAGES):
+                    # Consecutive stages share their boundary day
+                    stage_start = stage_end - timedelta(weeks=2 + i % 3)
+                    session.add(OpportunityResourceTimeline(
+                        opportunity_id=opportunity_id, service_line=service_line, stage_name=stage,
+                        stage_start_date=stage_start, stage_end_date=stage_end,
+                        duration_weeks=(stage_end - stage_start).days / 7,
+                        fte_required=0.5 * (1 + (i + len(stage)) % 4), total_effort_weeks=4.0,
+                        category=["Cat A", "Cat B"][i % 2], decision_date=decision_date,
+                    ))
+                    stage_end = stage_start
+        session.flush()
+        rebuild_portfolio_aggregate(session)
+        session.commit()
+
+
+def stored_aggregate(engine):
+    with Session(engine) as session:
+        rows = session.exec(select(PortfolioFteDaily)).all()
+    return {
+        (row.bucket_date, row.service_line, row.category, row.stage_name, row.resource_status): row.fte
+        for row in rows
+    }
+
+
+def rebuilt_aggregate(engine):
+    with Session(engine) as session:
+        return daily_fte_contributions(_load_intervals(session))
+
+
+def assert_aggregate_consistent(engine):
+    stored = stored_aggregate(engine)
+    expected = rebuilt_aggregate(engine)
+    assert stored.keys() == expected.keys()
+    for key, value in expected.items():
+        assert stored[key] == pytest.approx(value, abs=1e-9), key
+
+
+def test_incremental_updates_match_full_rebuild(engine):
+    """Every timeline write path leaves the aggregate equal to a rebuild."""
+    client = TestClient(app)
+    seed_timelines(engine, 12)
+    assert_aggregate_consistent(engine)
+
+    response = client.patch(
+        "/api/resources/opportunity/2/timeline/status?service_line=MW",
+        json={"resource_status": "Planned"},
+    )
+    assert response.status_code == 200
+    assert_aggregate_consistent(engine)
+
+    response = client.patch(
+        "/api/resources/opportunity/3/timeline/data?service_line=ITOC&stage_name=03",
+        json={
+            "stage_start_date": "2025-01-10T12:00:00", "stage_end_date": "2025-04-02T00:00:00",
+            "duration_weeks": 11.6, "fte_required": 3.5, "resource_status": "Forecast",
+        },
+    )
+    assert response.status_code == 200
+    assert_aggregate_consistent(engine)
+
+    response = client.delete("/api/resources/opportunity/4/timeline")
+    assert response.status_code == 200
+    assert_aggregate_consistent(engine)
+
+    response = client.delete("/api/resources/timeline-generation/clear-predicted")
+    assert response.status_code == 200
+    assert_aggregate_consistent(engine)
+    statuses = {key[4] for key in stored_aggregate(engine)}
+    assert statuses == {"Planned", "Forecast"}
+
+
+def reference_daily_fte(records, start, end):
+    """Daily concurrent FTE per service line, checking every stage on every day."""
+    service_lines = sorted({record.service_line for record in records})
+    groups = {}
+    for record in records:
+        groups.setdefault((record.opportunity_id, record.service_line), []).append(record)
+    days = (end - start).days + 1
+    daily = np.zeros((len(service_lines), days))
+    for (_, service_line), stages in groups.items():
+        for k in range(days):
+            day = start + timedelta(days=k)
+            active = [stage.fte_required for stage in stages if stage.stage_start_date <= day <= stage.stage_end_date]
+            if active:
+                daily[service_lines.index(service_line), k] += max(active)
+    return service_lines, daily
+
+
+def test_resource_forecast_matches_per_day_reference(engine):
+    """Series read from the aggregate equal a per-day scan of the timeline rows."""
+    client = TestClient(app)
+    seed_timelines(engine, 20)
+    start, end = datetime(2024, 12, 1), datetime(2025, 9, 30)
+
+    response = client.get(
+        "/api/resources/portfolio/resource-forecast",
+        params={"start_date": start.isoformat(), "end_date": end.isoformat(), "time_period": "week"},
+    )
+    assert response.status_code == 200
+    forecast = response.json()
+    assert forecast["total_opportunities_processed"] == 20
+
+    with Session(engine) as session:
+        records = session.exec(select(OpportunityResourceTimeline)).all()
+    service_lines, daily = reference_daily_fte(records, start, end)
+    expected = resources._generate_time_period_forecast(service_lines, daily, start, end, "week")
+    assert forecast["monthly_forecast"] == expected
+    assert max(period["total_fte"] for period in expected) > 0
+
+
+def test_period_peak_stages_match_per_period_scan():
+    """The period sweep picks the same stage per group and period as scanning every period."""
+    rng = random.Random(5)
+    period_starts = [datetime(2025, 1, 6) + timedelta(weeks=k) for k in range(60)]
+    period_ends = [start + timedelta(days=6) for start in period_starts]
+    intervals = []
+    for i in range(150):
+        group = f"OPP-{i % 40}"
+        start = datetime(2024, 11, 1) + timedelta(days=rng.randrange(500), hours=rng.choice([0, 9]))
+        end = start + timedelta(days=rng.choice([0, 3, 13, 40]))
+        intervals.append((group, start, end, rng.choice([0.0, 0.5, 1.0, 1.0, 2.0])))
+
+    expected = []
+    for group in dict.fromkeys(interval[0] for interval in intervals):
+        for period, (period_start, period_end) in enumerate(zip(period_starts, period_ends)):
+            active = [
+                index for index, (key, start, end, _) in enumerate(intervals)
+                if key == group and start <= period_end and end >= period_start
+            ]
+            if active:
+                expected.append((period, max(active, key=lambda index: intervals[index][3])))
+
+    periods, stages = period_peak_stages(intervals, period_starts, period_ends)
+    assert list(zip(periods.tolist(), stages.tolist())) == expected
@@ -0,0 +1,119 @@
+"""
+Query plan regression tests for the resource timeline table.
+
+Runs the portfolio, report and stats endpoints, captures every statement that
+reads opportunity_resource_timeline and checks with EXPLAIN QUERY PLAN that the
+table is only ever read through a covering index.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.models.config import OpportunityCategory
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline
+
+TIMELINE_TABLE = OpportunityResourceTimeline.__tablename__
+
+
+@pytest.fixture
+def plan_engine(engine):
+    """200 opportunities with timelines and fresh table statistics."""
+    with Session(engine) as session:
+        session.add(OpportunityCategory(name="Small", min_tcv=0, max_tcv=None))
+        for i in range(200):
+            opportunity_id = f"OPP-{i:04d}"
+            session.add(Opportunity(
+                opportunity_id=opportunity_id, opportunity_name=f"Opportunity {i}",
+                sales_stage="02", tcv_millions=5.0, mw_millions=2.0, itoc_millions=1.0,
+                decision_date=datetime(2026, 1, 1) + timedelta(days=i),
+                custom_tracking_field_2=["GREEN", "AMBER"][i % 2],
+            ))
+            for service_line in ("MW", "ITOC"):
+                for stage_index, stage in enumerate(("02", "03", "04A")):
+                    start = datetime(2025, 6, 1) + timedelta(days=i + 30 * stage_index)
+                    session.add(OpportunityResourceTimeline(
+                        opportunity_id=opportunity_id, service_line=service_line, stage_name=stage,
+                        stage_start_date=start, stage_end_date=start + timedelta(days=30),
+                        duration_weeks=4.0, fte_required=1.0, total_effort_weeks=4.0,
+                        category="Small", decision_date=datetime(2026, 1, 1),
+                        resource_status=["Predicted", "Planned"][i % 2],
+                    ))
+        session.commit()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def timeline_reads(engine, requests):
+    """Run requests and return the (sql, parameters) that read the timeline table."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and TIMELINE_TABLE in statement:
+            statements.append((statement, parameters))
+
+    client = TestClient(app)
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for path, params in requests:
+            response = client.get(path, params=params)
+            assert response.status_code == 200, response.text
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def timeline_plan_steps(engine, statement, parameters):
+    """EXPLAIN QUERY PLAN details of the steps that read the timeline table."""
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [detail for *_, detail in plan if f" {TIMELINE_TABLE} " in f" {detail} "]
+
+
+@pytest.mark.parametrize("requests", [
+    pytest.param([
+        ("/api/resources/portfolio/resource-forecast", {}),
+        ("/api/resources/portfolio/resource-forecast", {"service_line": ["MW"], "start_date": "2025-07-01T00:00:00",
+                                              "end_date": "2025-09-30T00:00:00"}),
+        ("/api/resources/portfolio/resource-forecast", {"category": ["Small"], "stage": ["03"]}),
+        ("/api/resources/timeline-data-bounds", {}),
+    ], id="portfolio"),
+    pytest.param([
+        ("/api/reports/resource-utilization", {"start_date": "2025-06-01T00:00:00", "end_date": "2025-12-31T00:00:00"}),
+        ("/api/reports/resource-utilization", {"start_date": "2025-06-01T00:00:00", "end_date": "2025-12-31T00:00:00",
+                                       "service_line": "ITOC"}),
+    ], id="reports"),
+    pytest.param([
+        ("/api/resources/timeline-generation/stats", {}),
+        ("/api/resources/timeline-generation/stats", {"custom_tracking_filter": "GREEN"}),
+    ], id="stats"),
+])
+def test_timeline_reads_use_covering_indexes(plan_engine, requests):
+    statements = timeline_reads(plan_engine, requests)
+    assert statements, "expected the endpoints to read the timeline table"
+    for statement, parameters in statements:
+        steps = timeline_plan_steps(plan_engine, statement, parameters)
+        assert steps, statement
+        for step in steps:
+            assert "COVERING INDEX" in step, f"{step}\n{statement}"
+
+
+def test_service_line_window_is_an_index_range(plan_engine):
+    """A service line and date window is a range search, not a full index scan."""
+    statements = timeline_reads(plan_engine, [
+        ("/api/reports/resource-utilization", {"start_date": "2025-06-01T00:00:00", "end_date": "2025-07-01T00:00:00",
+                                       "service_line": "MW"}),
+    ])
+    steps = [step for statement, parameters in statements
+             for step in timeline_plan_steps(plan_engine, statement, parameters)]
+    assert steps
+    assert all(
+        step.startswith("SEARCH") and "ix_opportunity_resource_timeline_window" in step
+        and "service_line=?" in step and "stage_start_date<?" in step
+        for step in steps
+    ), steps
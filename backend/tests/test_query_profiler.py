@@ -0,0 +1,65 @@
+"""
+Per-request query profiling tests.
+"""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.middleware import QueryBudgetExceeded
+from app.middleware.query_profiler import SLOWEST_STATEMENTS, QueryStats
+from app.models.opportunity import Opportunity
+
+SERVER_TIMING = re.compile(r'db;dur=(?P<db>[\d.]+);desc="(?P<count>\d+) queries", app;dur=(?P<app>[\d.]+)')
+
+
+@pytest.fixture
+def profiled_engine(engine):
+    """Five opportunities."""
+    with Session(engine) as session:
+        for i in range(5):
+            session.add(Opportunity(opportunity_id=f"OPP-{i:04d}", opportunity_name=f"Opportunity {i}"))
+        session.commit()
+    return engine
+
+
+def test_server_timing_reports_request_queries(profiled_engine):
+    executed = []
+    event.listen(profiled_engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+
+    response = TestClient(app).get("/api/opportunities/", params={"include_total": True})
+
+    assert response.status_code == 200
+    timing = SERVER_TIMING.fullmatch(response.headers["Server-Timing"])
+    assert timing, response.headers["Server-Timing"]
+    assert int(timing["count"]) == len(executed) > 0
+    assert float(timing["db"]) <= float(timing["app"])
+
+
+def test_requests_without_queries_report_zero():
+    response = TestClient(app).get("/api/health")
+    assert SERVER_TIMING.fullmatch(response.headers["Server-Timing"])["count"] == "0"
+
+
+def test_exceeding_the_query_budget_fails_the_request(profiled_engine, query_budget):
+    client = TestClient(app)
+    query_budget(1)
+    with pytest.raises(QueryBudgetExceeded, match="GET /api/opportunities/"):
+        client.get("/api/opportunities/", params={"include_total": True})
+
+    # Queries outside a request are never counted against a budget
+    with Session(profiled_engine) as session:
+        for _ in range(3):
+            session.get(Opportunity, 1)
+
+
+def test_query_stats_keep_the_slowest_statements():
+    stats = QueryStats(label="GET /")
+    for ms in (5.0, 1.0, 9.0, 3.0, 7.0):
+        stats.count += 1
+        stats.record(ms, f"SELECT {ms}")
+    assert stats.total_ms == 25.0
+    assert [ms for ms, _ in stats.slowest_statements()] == [9.0, 7.0, 5.0][:SLOWEST_STATEMENTS]
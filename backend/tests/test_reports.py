@@ -0,0 +1,140 @@
+"""
+Report endpoint tests.
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.models.config import (
+    OpportunityCategory,
+    ServiceLineCategory,
+    ServiceLineOfferingMapping,
+    ServiceLineOfferingThreshold,
+    ServiceLineStageEffort,
+)
+from app.models.opportunity import Opportunity, OpportunityLineItem
+from app.models.resources import OpportunityResourceTimeline
+
+STAGES = ["02", "03", "04A"]
+CATEGORIES = ["Cat A", "Cat B", "Cat C"]
+RAG_STATUSES = ["RED", "AMBER", "GREEN"]
+
+
+def seed_config(engine):
+    with Session(engine) as session:
+        for name, min_tcv, max_tcv in (("Cat C", 0, 20), ("Cat B", 20, 40), ("Cat A", 40, None)):
+            session.add(OpportunityCategory(name=name, min_tcv=min_tcv, max_tcv=max_tcv))
+        for service_line in ("MW", "ITOC"):
+            category = ServiceLineCategory(service_line=service_line, name="Small", min_tcv=0, max_tcv=None)
+            session.add(category)
+            session.flush()
+            for stage in STAGES:
+                session.add(ServiceLineStageEffort(
+                    service_line=service_line, service_line_category_id=category.id,
+                    stage_name=stage, fte_required=1.0,
+                ))
+                session.add(ServiceLineOfferingThreshold(
+                    service_line=service_line, stage_name=stage, threshold_count=1, increment_multiplier=0.5,
+                ))
+        session.add(ServiceLineOfferingMapping(
+            service_line="MW", internal_service="Modern Workplace", simplified_offering="Collaboration",
+        ))
+        session.add(ServiceLineOfferingMapping(
+            service_line="ITOC", internal_service="Cloud", simplified_offering="Azure",
+        ))
+        session.commit()
+
+
+def seed_opportunities(engine, start, count):
+    with Session(engine) as session:
+        for i in range(start, start + count):
+            opportunity_id = f"OPP-{i:04d}"
+            decision_date = datetime(2026, 1, 1) + timedelta(days=i)
+            session.add(Opportunity(
+                opportunity_id=opportunity_id, opportunity_name=f"Opportunity {i}",
+                account_name="Account", sales_stage="02", tcv_millions=10.0 + i,
+                mw_millions=5.0, itoc_millions=3.0, decision_date=decision_date,
+                custom_tracking_field_2=RAG_STATUSES[i % len(RAG_STATUSES)],
+            ))
+            for service_line in ("MW", "ITOC"):
+                for stage in STAGES:
+                    session.add(OpportunityResourceTimeline(
+                        opportunity_id=opportunity_id, service_line=service_line, stage_name=stage,
+                        stage_start_date=decision_date - timedelta(weeks=4), stage_end_date=decision_date,
+                        duration_weeks=4.0, fte_required=1.0 + i / 100, total_effort_weeks=4.0,
+                        category=CATEGORIES[i % len(CATEGORIES)], decision_date=decision_date,
+                    ))
+            session.add(OpportunityLineItem(
+                opportunity_id=opportunity_id, product_name="Collaboration", internal_service="Modern Workplace",
+                simplified_offering="Collaboration", offering_tcv=2.0,
+            ))
+            session.add(OpportunityLineItem(
+                opportunity_id=opportunity_id, product_name="Azure", internal_service="Cloud",
+                simplified_offering="Azure", offering_tcv=1.0,
+            ))
+        session.commit()
+
+
+def test_top_average_headcount_query_count_is_constant(engine, count_queries):
+    """The report must not issue queries per opportunity."""
+    client = TestClient(app)
+    path = "/api/reports/top-average-headcount"
+    seed_config(engine)
+    seed_opportunities(engine, 0, 3)
+    # Load the configuration snapshot before counting
+    client.get(path)
+
+    few_queries, few = count_queries(client, path)
+    seed_opportunities(engine, 3, 27)
+    many_queries, many = count_queries(client, path)
+
+    assert few["summary"]["total_opportunities"] == 3
+    assert many["summary"]["total_opportunities"] == 30
+    assert many_queries == few_queries
+
+    opportunity = many["category_data"]["Cat A"][0]
+    assert [offering["simplified_offering"] for offering in opportunity["mapped_offerings"]] == ["Collaboration", "Azure"]
+    assert opportunity["calculation_breakdown"]["MW"]["resource_category"] == "Small"
+    assert opportunity["calculation_breakdown"]["MW"]["offering_threshold"] == 1
+
+
+def test_rag_status_report_query_count_is_constant(engine, count_queries):
+    """The report must not issue queries per RAG-tracked opportunity."""
+    client = TestClient(app)
+    path = "/api/reports/top-itoc-mw-revenue-with-status"
+    seed_config(engine)
+    seed_opportunities(engine, 0, 3)
+    client.get(path)
+
+    few_queries, few = count_queries(client, path)
+    seed_opportunities(engine, 3, 57)
+    many_queries, many = count_queries(client, path)
+
+    assert few["summary"]["total_opportunities"] == 3
+    assert many["summary"]["total_opportunities"] == 60
+    assert many["summary"]["rag_status_distribution"] == {"RED": 20, "AMBER": 20, "GREEN": 20}
+    assert many_queries == few_queries
+
+    opportunity = many["category_data"]["Cat A"][0]
+    assert opportunity["rag_status"] == "RED"
+    assert opportunity["calculation_breakdown"]["ITOC"]["resource_category"] == "Small"
+
+
+def test_configuration_summary_samples_one_opportunity_per_category(engine):
+    """Samples are the lowest id in each category, picked by SQLite rather than by loading every candidate."""
+    seed_config(engine)
+    seed_opportunities(engine, 0, 40)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    response = TestClient(app).get("/api/reports/configuration-summary")
+
+    assert response.status_code == 200
+    examples = [example["opportunity_id"] for example in response.json()["calculation_examples"]]
+    # TCV is 10 + i: Cat C from OPP-0000, Cat B from OPP-0010, Cat A from OPP-0030, then the MW+ITOC sample
+    assert examples == ["OPP-0000", "OPP-0010", "OPP-0030", "OPP-0000"]
+    [sample_query] = [statement for statement in statements if "min(opportunity.id)" in statement]
+    assert "GROUP BY" in sample_query
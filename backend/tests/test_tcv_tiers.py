@@ -0,0 +1,72 @@
+"""
+TCV tier categoriser tests.
+"""
+import numpy as np
+from sqlalchemy import Column, Float, Integer, MetaData, Table, create_engine, insert, select
+
+from app.api.forecasts import compile_opportunity_categoriser, get_opportunity_category
+from app.services.config_snapshot import (
+    CategoryTier,
+    _match_tier,
+    compile_resource_categoriser,
+    compile_timeline_categoriser,
+)
+
+# Contiguous tiers plus an overlapping one and a gap above 100
+TIERS = (
+    CategoryTier(1, "Sub $5M", 0.0, 5.0),
+    CategoryTier(2, "Cat C", 5.0, 20.0),
+    CategoryTier(3, "Overlap", 15.0, 30.0),
+    CategoryTier(4, "Cat B", 20.0, 100.0),
+    CategoryTier(5, "Cat A", 150.0, None),
+)
+
+
+def sample_values():
+    bounds = [0.0, 5.0, 15.0, 20.0, 30.0, 100.0, 150.0]
+    values = [b + offset for b in bounds for offset in (-0.5, -1e-9, 0.0, 1e-9, 0.5)]
+    rng = np.random.default_rng(7)
+    return values + list(rng.uniform(-10, 250, 500))
+
+
+def test_compiled_categorisers_match_linear_rules():
+    """Vectorised and scalar lookups equal the linear scans they replace."""
+    values = sample_values()
+    rules = [
+        (compile_timeline_categoriser(TIERS), lambda v: None if v < 0 else _match_tier(TIERS, v)),
+        (compile_resource_categoriser(TIERS), lambda v: None if v <= 0 else _match_tier(TIERS, v)),
+        (compile_opportunity_categoriser(list(TIERS)), lambda v: get_opportunity_category(v, list(TIERS))),
+        (compile_opportunity_categoriser([]), lambda v: get_opportunity_category(v, [])),
+    ]
+    for categoriser, rule in rules:
+        expected = [rule(v) for v in values]
+        assert list(categoriser.categorise_many(values)) == expected
+        assert [categoriser.categorise(v) for v in values] == expected
+
+
+def test_missing_values_use_missing_label():
+    categoriser = compile_timeline_categoriser(TIERS)
+    assert list(categoriser.categorise_many([None, float("nan"), 10.0])) == [None, None, "Cat C"]
+    assert categoriser.categorise(None) is None
+    assert list(categoriser.categorise_many([])) == []
+
+
+def test_case_expression_matches_lookup():
+    """The SQL CASE rendering categorises like the compiled lookup."""
+    values = sample_values()
+    engine = create_engine("sqlite://")
+    table = Table("tcvs", MetaData(), Column("id", Integer, primary_key=True), Column("tcv", Float))
+    table.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(table), [{"tcv": float(v)} for v in values])
+
+    for categoriser in (
+        compile_timeline_categoriser(TIERS),
+        compile_opportunity_categoriser(list(TIERS)),
+        compile_opportunity_categoriser([]),
+    ):
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(categoriser.case_expression(table.c.tcv)).order_by(table.c.id)
+            ).scalars().all()
+        assert rows == [categoriser.categorise(v) for v in values]
@@ -0,0 +1,121 @@
+"""
+Timeline computation benchmark: bulk generation throughput must scale with
+CPU cores.
+
+Computes the timelines of a synthetic portfolio in-process and with the
+parallel compute pool, checks both produce the same rows and reports the
+speedup.
+
+Run with: RUN_BENCHMARKS=1 pytest tests/test_timeline_benchmark.py -s
+"""
+from datetime import datetime, timedelta
+import os
+import random
+import time
+
+import pytest
+from sqlmodel import Session
+
+from app.config import settings
+from app.models.config import (
+    OpportunityCategory, ServiceLineCategory, ServiceLineOfferingMapping,
+    ServiceLineOfferingThreshold, ServiceLineStageEffort,
+)
+from app.services.config_snapshot import load_config_snapshot
+from app.services.parallel_timelines import (
+    LineItemRecord, OpportunityRecord, compute_timelines, shutdown_timeline_executor,
+)
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"),
+]
+
+OPPORTUNITY_COUNT = 60000
+STAGES = ["01", "02", "03", "04A", "04B", "05A", "05B", "06"]
+OFFERINGS = [("Cloud", "Hosting"), ("Cloud", "Backup"), ("Modern Workplace", "Devices"), ("Modern Workplace", "Service Desk")]
+
+# Parallel efficiency expected of each core, up to this many cores. Receiving
+# the rows in the single writer process is serial (about 1s per 400k rows),
+# which caps the speedup of this compute-light workload
+MIN_EFFICIENCY = 0.5
+MAX_SCALED_CORES = 4
+
+
+def benchmark_config(engine):
+    with Session(engine) as session:
+        for name, low, high in (("Sub $5M", 0, 5), ("$5M-$50M", 5, 50), ("$50M+", 50, None)):
+            session.add(OpportunityCategory(
+                name=name, min_tcv=low, max_tcv=high,
+                **{f"stage_{stage.lower()}_duration_weeks": 2.0 + i for i, stage in enumerate(STAGES)},
+            ))
+        for service_line in ("MW", "ITOC"):
+            for name, low, high in (("Small", 0, 10), ("Large", 10, None)):
+                category = ServiceLineCategory(service_line=service_line, name=name, min_tcv=low, max_tcv=high)
+                session.add(category)
+                session.flush()
+                for i, stage in enumerate(STAGES):
+                    session.add(ServiceLineStageEffort(
+                        service_line=service_line, service_line_category_id=category.id,
+                        stage_name=stage, fte_required=0.5 + i / 4,
+                    ))
+            for stage in STAGES:
+                session.add(ServiceLineOfferingThreshold(
+                    service_line=service_line, stage_name=stage, threshold_count=2, increment_multiplier=0.1,
+                ))
+        for internal_service, offering in OFFERINGS:
+            session.add(ServiceLineOfferingMapping(
+                service_line="ITOC" if internal_service == "Cloud" else "MW",
+                internal_service=internal_service, simplified_offering=offering,
+            ))
+        session.commit()
+        return load_config_snapshot(session)
+
+
+def benchmark_portfolio():
+    rng = random.Random(11)
+    opportunities, line_items = [], {}
+    for i in range(OPPORTUNITY_COUNT):
+        opportunity_id = f"OPP-{i:06d}"
+        opportunities.append(OpportunityRecord(
+            id=i + 1, opportunity_id=opportunity_id, opportunity_name=f"Opportunity {i}",
+            tcv_millions=rng.uniform(0.5, 120.0),
+            decision_date=datetime(2025, 1, 1) + timedelta(days=rng.randrange(730)),
+            sales_stage=rng.choice(STAGES), mw_millions=rng.choice([0.0, rng.uniform(0.5, 40.0)]),
+            itoc_millions=rng.uniform(0.5, 40.0), lead_offering_l1=rng.choice(["MW", "ITOC"]),
+        ))
+        line_items[opportunity_id] = [LineItemRecord(*rng.choice(OFFERINGS)) for _ in range(rng.randrange(6))]
+    return opportunities, line_items
+
+
+def timed(workers, opportunities, line_items, config, calculated_date):
+    start = time.perf_counter()
+    results = compute_timelines(opportunities, line_items, config, "Predicted", calculated_date, workers=workers)
+    return time.perf_counter() - start, results
+
+
+def test_parallel_timeline_computation_scales_with_cores(engine, monkeypatch):
+    config = benchmark_config(engine)
+    opportunities, line_items = benchmark_portfolio()
+    calculated_date = datetime(2025, 1, 1)
+    cores = os.cpu_count() or 1
+    monkeypatch.setattr(settings, "parallel_timeline_min_opportunities", 0)
+
+    serial_seconds, serial = timed(1, opportunities, line_items, config, calculated_date)
+    try:
+        # Warm the pool so the measurement excludes worker start-up
+        timed(cores, opportunities[:cores * 1000], line_items, config, calculated_date)
+        parallel_seconds, parallel = timed(cores, opportunities, line_items, config, calculated_date)
+    finally:
+        shutdown_timeline_executor()
+
+    rows = sum(len(result.rows) for result in serial)
+    speedup = serial_seconds / parallel_seconds
+    print(f"\n{OPPORTUNITY_COUNT} opportunities, {rows} timeline rows")
+    print(f"in-process: {serial_seconds:.2f}s ({OPPORTUNITY_COUNT / serial_seconds:,.0f} opportunities/s)")
+    print(f"{cores} workers: {parallel_seconds:.2f}s ({OPPORTUNITY_COUNT / parallel_seconds:,.0f} opportunities/s)")
+    print(f"speedup: {speedup:.2f}x")
+
+    assert parallel == serial
+    if cores > 1:
+        assert speedup >= MIN_EFFICIENCY * min(cores, MAX_SCALED_CORES)
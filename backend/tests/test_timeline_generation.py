@@ -0,0 +1,228 @@
+"""
+Timeline generation endpoint tests.
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.config import settings
+from app.main import app
+from app.models.config import OpportunityCategory, ServiceLineCategory, ServiceLineStageEffort
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline
+from app.services.config_snapshot import get_config_snapshot
+from app.services.missing_timelines import get_missing_timeline_index
+from app.services.parallel_timelines import shutdown_timeline_executor
+from app.services.resource_calculation import get_service_lines_to_process, is_opportunity_eligible
+
+RAG_STATUSES = ["RED", "AMBER", "GREEN", None]
+
+
+def seed_config(engine):
+    with Session(engine) as session:
+        session.add(OpportunityCategory(name="Small", min_tcv=0, max_tcv=20))
+        session.add(OpportunityCategory(name="Large", min_tcv=30, max_tcv=None))
+        # Only MW has stage efforts, so ITOC-only opportunities are not eligible
+        for service_line in ("MW", "ITOC"):
+            category = ServiceLineCategory(service_line=service_line, name="Any", min_tcv=0, max_tcv=None)
+            session.add(category)
+            session.flush()
+            if service_line == "MW":
+                session.add(ServiceLineStageEffort(
+                    service_line=service_line, service_line_category_id=category.id,
+                    stage_name="02", fte_required=1.0,
+                ))
+        session.commit()
+
+
+def seed_opportunities(engine, start, count):
+    with Session(engine) as session:
+        for i in range(start, start + count):
+            opportunity_id = f"OPP-{i:04d}"
+            decision_date = None if i % 7 == 0 else datetime(2026, 1, 1) + timedelta(days=i)
+            session.add(Opportunity(
+                opportunity_id=opportunity_id, opportunity_name=f"Opportunity {i}",
+                sales_stage="02", tcv_millions=[5.0, 25.0, 40.0, None][i % 4],
+                mw_millions=[2.0, 0.0, None][i % 3], itoc_millions=[0.0, 3.0][i % 2],
+                lead_offering_l1=["MW", "ITOC", None][i % 3],
+                decision_date=decision_date,
+                custom_tracking_field_2=RAG_STATUSES[i % len(RAG_STATUSES)],
+            ))
+            if i % 5 == 0:
+                for stage, status in (("02", "Planned"), ("03", "Predicted" if i % 2 else "Planned")):
+                    session.add(OpportunityResourceTimeline(
+                        opportunity_id=opportunity_id, service_line="MW", stage_name=stage,
+                        stage_start_date=datetime(2025, 6, 1), stage_end_date=datetime(2025, 7, 1),
+                        duration_weeks=4.0, fte_required=1.0, total_effort_weeks=4.0,
+                        category="Small", decision_date=datetime(2025, 7, 1), resource_status=status,
+                    ))
+        session.commit()
+
+
+def expected_stats(engine, tracking_values=None):
+    with Session(engine) as session:
+        config = get_config_snapshot(session)
+        opportunities = session.exec(select(Opportunity)).all()
+        timelines = session.exec(select(OpportunityResourceTimeline)).all()
+    if tracking_values:
+        opportunities = [o for o in opportunities if o.custom_tracking_field_2 in tracking_values]
+    ids = {o.opportunity_id for o in opportunities}
+    return {
+        "total_opportunities": len(opportunities),
+        "eligible_for_generation": sum(is_opportunity_eligible(o, config) for o in opportunities),
+        "existing_timelines": len({t.opportunity_id for t in timelines if t.opportunity_id in ids}),
+        "predicted_timelines": len({
+            t.opportunity_id for t in timelines
+            if t.opportunity_id in ids and t.resource_status == "Predicted"
+        }),
+    }
+
+
+def expected_missing(engine, service_lines=(), categories=()):
+    with Session(engine) as session:
+        config = get_config_snapshot(session)
+        opportunities = session.exec(select(Opportunity)).all()
+        with_timelines = set(session.exec(select(OpportunityResourceTimeline.opportunity_id)).all())
+    missing = 0
+    for opp in opportunities:
+        if opp.opportunity_id in with_timelines or not is_opportunity_eligible(opp, config):
+            continue
+        category = config.timeline_category_for(opp.tcv_millions)
+        if categories and category not in categories:
+            continue
+        if service_lines and not {sl for sl, _ in get_service_lines_to_process(opp)} & set(service_lines):
+            continue
+        missing += 1
+    return missing
+
+
+def test_generation_stats_match_per_opportunity_checks(engine, count_queries):
+    """Grouped stats equal evaluating every opportunity individually."""
+    client = TestClient(app)
+    path = "/api/resources/timeline-generation/stats"
+    seed_config(engine)
+    seed_opportunities(engine, 0, 12)
+    client.get(path)
+
+    few_queries, _ = count_queries(client, path)
+    seed_opportunities(engine, 12, 72)
+    many_queries, stats = count_queries(client, path)
+
+    assert many_queries == few_queries
+    expected = expected_stats(engine)
+    assert {key: stats[key] for key in expected} == expected
+    assert 0 < stats["eligible_for_generation"] < stats["total_opportunities"]
+    assert 0 < stats["predicted_timelines"] < stats["existing_timelines"]
+
+    response = client.get(path, params={"custom_tracking_filter": "RED, GREEN"})
+    assert response.status_code == 200
+    filtered = response.json()
+    expected = expected_stats(engine, ["RED", "GREEN"])
+    assert {key: filtered[key] for key in expected} == expected
+
+
+def test_missing_timelines_index_tracks_writes(engine, count_queries):
+    """The cached missing timeline count follows timeline writes and is reused between them."""
+    client = TestClient(app)
+    path = "/api/resources/portfolio/resource-forecast"
+    seed_config(engine)
+    seed_opportunities(engine, 0, 60)
+
+    def missing(**params):
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        return response.json()["forecast_period"]["missing_timelines"]
+
+    assert missing() == expected_missing(engine) > 0
+    assert missing(category=["Large"]) == expected_missing(engine, categories=["Large"]) > 0
+    assert missing(service_line=["MW", "ITOC"], category=["Small", "Large"]) == expected_missing(
+        engine, ["MW", "ITOC"], ["Small", "Large"]
+    )
+    assert missing(service_line=["ITOC"]) == expected_missing(engine, ["ITOC"])
+
+    # A cached index costs no opportunity or timeline scans
+    few_queries, _ = count_queries(client, path)
+    seed_opportunities(engine, 60, 30)
+    assert missing() == expected_missing(engine)
+    many_queries, _ = count_queries(client, path)
+    assert many_queries == few_queries
+
+    response = client.post("/api/resources/timeline-generation/bulk", json={})
+    assert response.status_code == 200
+    assert response.json()["stats"]["generated"] > 0
+    assert missing() == expected_missing(engine) == 0
+
+
+def test_missing_timelines_index_sees_other_processes_writes(tmp_path):
+    """Writes committed through another engine invalidate the index; rolled-back writes do not."""
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    writer = create_engine(url)
+    SQLModel.metadata.create_all(writer)
+    reader = create_engine(url)
+    seed_config(writer)
+    seed_opportunities(writer, 0, 20)
+
+    def index():
+        with Session(reader) as session:
+            return get_missing_timeline_index(session)
+
+    before = index()
+    assert before.total == expected_missing(reader) > 0
+
+    # A current index costs two version lookups
+    statements = []
+    event.listen(reader, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert index() is before
+    assert len(statements) == 2
+
+    with Session(writer) as session:
+        session.add(Opportunity(
+            opportunity_id="OPP-9999", opportunity_name="Rolled back", sales_stage="02", tcv_millions=5.0,
+            mw_millions=2.0, decision_date=datetime(2026, 6, 1),
+        ))
+        session.flush()
+        session.rollback()
+    assert index() is before
+
+    seed_opportunities(writer, 20, 10)
+    after = index()
+    assert after.data_version > before.data_version
+    assert after.total == expected_missing(reader) > before.total
+    writer.dispose()
+    reader.dispose()
+
+
+def stored_timelines(engine):
+    with Session(engine) as session:
+        rows = session.exec(select(OpportunityResourceTimeline)).all()
+    return sorted(
+        (row.opportunity_id, row.service_line, row.stage_name, row.resource_status, row.stage_start_date,
+         row.stage_end_date, row.fte_required, row.total_effort_weeks, row.category, row.resource_category)
+        for row in rows
+    )
+
+
+def test_parallel_bulk_generation_matches_in_process(engine, monkeypatch):
+    """Worker processes produce exactly the timelines computed in-process."""
+    client = TestClient(app)
+    seed_config(engine)
+    seed_opportunities(engine, 0, 120)
+
+    response = client.post("/api/resources/timeline-generation/bulk", json={"regenerateAll": True})
+    assert response.status_code == 200
+    in_process = response.json()
+    expected = stored_timelines(engine)
+
+    monkeypatch.setattr(settings, "parallel_timeline_min_opportunities", 0)
+    monkeypatch.setattr(settings, "timeline_worker_processes", 2)
+    try:
+        response = client.post("/api/resources/timeline-generation/bulk", json={"regenerateAll": True})
+    finally:
+        shutdown_timeline_executor()
+    assert response.status_code == 200
+    parallel = response.json()
+
+    assert parallel["stats"]["updated"] == in_process["stats"]["generated"] > 0
+    assert stored_timelines(engine) == expected
@@ -0,0 +1,189 @@
+"""
+Incremental timeline recalculation tests: opportunity, configuration and
+import change sets recalculate only the affected Predicted timelines.
+"""
+from datetime import datetime
+import json
+
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.main import app
+from app.models.config import OpportunityCategory, ServiceLineCategory, ServiceLineStageEffort
+from app.models.opportunity import Opportunity
+from app.models.resources import OpportunityResourceTimeline, TimelineRecalculationJob
+from app.services.config_snapshot import get_config_snapshot
+from app.services.excel_import import ImportTask, import_excel_background
+from app.services.timeline_recalculation import schedule_timeline_recalculation
+
+
+@pytest.fixture
+def recalculation_engine(engine, monkeypatch):
+    """Two timeline categories, three opportunities and inline recalculation."""
+    with Session(engine) as session:
+        session.add(OpportunityCategory(name="Small", min_tcv=0, max_tcv=20, stage_02_duration_weeks=4))
+        session.add(OpportunityCategory(name="Large", min_tcv=30, max_tcv=None, stage_02_duration_weeks=8))
+        for service_line in ("MW", "ITOC"):
+            category = ServiceLineCategory(service_line=service_line, name="Any", min_tcv=0, max_tcv=None)
+            session.add(category)
+            session.flush()
+            session.add(ServiceLineStageEffort(
+                service_line=service_line, service_line_category_id=category.id, stage_name="02", fte_required=1.0,
+            ))
+        # OPP-0 small MW, OPP-1 large MW, OPP-2 large ITOC
+        for i, (tcv, mw, itoc) in enumerate(((5.0, 5.0, 0.0), (40.0, 40.0, 0.0), (40.0, 0.0, 40.0))):
+            session.add(Opportunity(
+                opportunity_id=f"OPP-{i}", opportunity_name=f"Opportunity {i}", sales_stage="02",
+                tcv_millions=tcv, mw_millions=mw, itoc_millions=itoc, decision_date=datetime(2026, 6, 1),
+            ))
+        session.commit()
+    monkeypatch.setattr(settings, "timeline_recalculation_mode", "inline")
+    return engine
+
+
+def timelines(engine):
+    """opportunity_id -> sorted (service_line, stage, status, duration) of its timeline rows."""
+    with Session(engine) as session:
+        rows = session.exec(select(OpportunityResourceTimeline)).all()
+    result = {}
+    for row in rows:
+        result.setdefault(row.opportunity_id, []).append(
+            (row.service_line, row.stage_name, row.resource_status, row.duration_weeks)
+        )
+    return {opportunity_id: sorted(values) for opportunity_id, values in result.items()}
+
+
+def jobs(engine):
+    with Session(engine) as session:
+        return session.exec(select(TimelineRecalculationJob).order_by(TimelineRecalculationJob.id)).all()
+
+
+def job_ids(job):
+    return json.loads(job.opportunity_ids)
+
+
+def update_opportunity(engine, opportunity_id, **values):
+    with Session(engine) as session:
+        opportunity = session.exec(select(Opportunity).where(Opportunity.opportunity_id == opportunity_id)).one()
+        for field, value in values.items():
+            setattr(opportunity, field, value)
+        session.add(opportunity)
+        session.commit()
+
+
+def test_opportunity_edit_recalculates_only_that_opportunity(recalculation_engine):
+    update_opportunity(recalculation_engine, "OPP-0", decision_date=datetime(2026, 9, 1))
+
+    stored = timelines(recalculation_engine)
+    assert set(stored) == {"OPP-0"}
+    assert ("MW", "02", "Predicted", 4.0) in stored["OPP-0"]
+    [job] = jobs(recalculation_engine)
+    assert (job.trigger, job.status, job.requested, job.regenerated) == ("opportunity", "completed", 1, 1)
+
+    # A field that does not feed timelines schedules nothing
+    update_opportunity(recalculation_engine, "OPP-0", opportunity_name="Renamed")
+    assert len(jobs(recalculation_engine)) == 1
+
+    # Dropping below every category removes the Predicted timeline
+    update_opportunity(recalculation_engine, "OPP-0", tcv_millions=25.0)
+    assert timelines(recalculation_engine) == {}
+    assert jobs(recalculation_engine)[-1].removed == 1
+
+
+def test_planned_timelines_are_not_modified(recalculation_engine):
+    with Session(recalculation_engine) as session:
+        session.add(OpportunityResourceTimeline(
+            opportunity_id="OPP-1", service_line="MW", stage_name="02",
+            stage_start_date=datetime(2026, 1, 1), stage_end_date=datetime(2026, 2, 1),
+            duration_weeks=3.0, fte_required=2.0, total_effort_weeks=6.0,
+            category="Large", decision_date=datetime(2026, 6, 1), resource_status="Planned",
+        ))
+        session.commit()
+    before = timelines(recalculation_engine)
+
+    update_opportunity(recalculation_engine, "OPP-1", sales_stage="03", tcv_millions=50.0)
+
+    assert timelines(recalculation_engine) == before
+    job = jobs(recalculation_engine)[-1]
+    assert (job.protected, job.regenerated) == (1, 0)
+
+
+def test_config_change_recalculates_dependent_opportunities(recalculation_engine):
+    with Session(recalculation_engine) as session:
+        large = session.exec(select(OpportunityCategory).where(OpportunityCategory.name == "Large")).one()
+        large.stage_02_duration_weeks = 10
+        session.add(large)
+        session.commit()
+
+    stored = timelines(recalculation_engine)
+    assert set(stored) == {"OPP-1", "OPP-2"}
+    assert ("MW", "02", "Predicted", 10.0) in stored["OPP-1"]
+    job = jobs(recalculation_engine)[-1]
+    assert (job.trigger, job.requested) == ("config", 2)
+    assert "timeline:Large" in job.detail
+
+    # A stage effort change only reaches opportunities with that service line
+    with Session(recalculation_engine) as session:
+        effort = session.exec(
+            select(ServiceLineStageEffort).where(ServiceLineStageEffort.service_line == "ITOC")
+        ).one()
+        effort.fte_required = 2.0
+        session.add(effort)
+        session.commit()
+    job = jobs(recalculation_engine)[-1]
+    assert (job.trigger, job.requested, job.regenerated) == ("config", 1, 1)
+    assert job_ids(job) == ["OPP-2"]
+
+
+def test_config_job_ignores_the_worker_cached_snapshot(recalculation_engine):
+    with Session(recalculation_engine) as session:
+        assert get_config_snapshot(session).stage_durations[("Large", "02")] == 8
+    # Written outside the ORM, so the cached snapshot of this "worker" is now stale
+    with recalculation_engine.begin() as connection:
+        connection.execute(
+            update(OpportunityCategory).where(OpportunityCategory.name == "Large").values(stage_02_duration_weeks=10)
+        )
+    with Session(recalculation_engine) as session:
+        assert get_config_snapshot(session).stage_durations[("Large", "02")] == 8
+
+    schedule_timeline_recalculation(["OPP-1"], "config", "timeline:Large", bind=recalculation_engine)
+
+    assert ("MW", "02", "Predicted", 10.0) in timelines(recalculation_engine)["OPP-1"]
+
+
+def test_import_recalculates_changed_timeline_inputs(recalculation_engine, tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Opportunity Id", "Opportunity Name", "Sales Stage", "Decision Date", "TCV (M)", "MW (M)", "ITOC (M)"])
+    sheet.append(["OPP-0", "Opportunity 0", "02", datetime(2026, 6, 1), 5.0, 5.0, 0.0])
+    sheet.append(["OPP-1", "Renamed", "02", datetime(2026, 6, 1), 40.0, 40.0, 0.0])
+    sheet.append(["OPP-9", "New", "02", datetime(2026, 6, 1), 5.0, 5.0, 0.0])
+    path = tmp_path / "opportunities.xlsx"
+    workbook.save(path)
+
+    task = ImportTask(task_id="import-1", status="pending", progress=0, message="")
+    import_excel_background(str(path), task)
+    assert task.status == "completed", task.errors
+
+    job = jobs(recalculation_engine)[-1]
+    assert (job.trigger, job.detail, job.status) == ("import", "import-1", "completed")
+    # OPP-1 only changed its name; OPP-2 was not in the file
+    assert job_ids(job) == ["OPP-9"]
+    assert set(timelines(recalculation_engine)) == {"OPP-9"}
+
+
+def test_status_endpoint_reports_recent_jobs(recalculation_engine):
+    update_opportunity(recalculation_engine, "OPP-0", decision_date=datetime(2026, 9, 1))
+
+    response = TestClient(app).get("/api/resources/timeline-recalculation/status", params={"limit": 5})
+    assert response.status_code == 200, response.text
+    status = response.json()
+    assert status["mode"] == "inline"
+    assert (status["pending_jobs"], status["processing_jobs"], status["queued_opportunities"]) == (0, 0, 0)
+    [job] = status["recent_jobs"]
+    assert job["trigger"] == "opportunity" and job["regenerated"] == 1
+    assert "opportunity_ids" not in job
@@ -139,6 +139,15 @@ const ImportProgressModal: React.FC<ImportProgressModalProps> = ({
                   <span className="ml-2 text-red-600">{task.failed_rows.toLocaleString()}</span>
                 </div>
               )}
+              {task.status === 'completed' && task.unchanged_rows !== undefined && (
+                <div className="col-span-2">
+                  <span className="font-medium">Changes:</span>
+                  <span className="ml-2">
+                    {(task.inserted_rows ?? 0).toLocaleString()} new, {(task.updated_rows ?? 0).toLocaleString()} updated,{' '}
+                    {task.unchanged_rows.toLocaleString()} unchanged
+                  </span>
+                </div>
+              )}
               {task.warnings_count !== undefined && task.warnings_count > 0 && (
                 <div>
                   <span className="font-medium text-amber-600">Warnings:</span>
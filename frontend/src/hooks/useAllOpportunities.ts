@@ -13,29 +13,25 @@ export function useAllOpportunities(filters?: OpportunityFilters) {
     queryKey: OPPORTUNITY_KEYS.allWithFilters(filters),
     queryFn: async (): Promise<Opportunity[]> => {
       const allOpportunities: Opportunity[] = [];
-      let skip = 0;
       const limit = 1000; // Use maximum allowed limit per request
-      let hasMore = true;
+      let cursor: string | undefined;
 
-      while (hasMore) {
-        const batch = await api.getOpportunities({
+      do {
+        const page = await api.getOpportunitiesPage({
           ...filters,
-          skip,
+          cursor,
           limit,
         });
 
-        allOpportunities.push(...batch);
-
-        // If we got fewer records than requested, we've reached the end
-        hasMore = batch.length === limit;
-        skip += limit;
+        allOpportunities.push(...page.items);
+        cursor = page.nextCursor ?? undefined;
 
         // Safety break to prevent infinite loops (adjust based on expected data size)
-        if (skip > 50000) {
+        if (allOpportunities.length >= 50000) {
           // console.warn('useAllOpportunities: Hit safety limit of 50,000 records');
           break;
         }
-      }
+      } while (cursor);
 
       return allOpportunities;
     },
@@ -3,6 +3,7 @@ import type {
   OpportunityLineItem,
   OpportunityUpdate,
   OpportunityFilters,
+  OpportunityPage,
   OpportunityCategory,
   ServiceLineCategory,
   ServiceLineStageEffort,
@@ -13,6 +14,7 @@ import type {
   ServiceLineForecast,
   ActiveServiceLines,
   ImportTask,
+  TimelineRecalculationStatus,
   APIError,
   // OpportunityResourceTimeline,
   OpportunityEffortPrediction
@@ -30,10 +32,18 @@ class ApiClient {
   }
 
   private async request<T>(
+    endpoint: string,
+    options: RequestInit = {}
+  ): Promise<T> {
+    const { data } = await this.requestWithHeaders<T>(endpoint, options);
+    return data;
+  }
+
+  private async requestWithHeaders<T>(
     endpoint: string,
     options: RequestInit = {},
     retryCount: number = 0
-  ): Promise<T> {
+  ): Promise<{ data: T; headers: Headers }> {
     const url = `${this.baseUrl}${endpoint}`;
     const config: RequestInit = {
       headers: {
@@ -61,19 +71,19 @@ class ApiClient {
         // Retry on 5xx errors (server errors)
         if (response.status >= 500 && retryCount < this.maxRetries) {
           await this.delay(this.retryDelay * Math.pow(2, retryCount)); // Exponential backoff
-          return this.request<T>(endpoint, options, retryCount + 1);
+          return this.requestWithHeaders<T>(endpoint, options, retryCount + 1);
         }
         
         throw new Error(errorData.detail || 'An error occurred');
       }
 
-      return await response.json();
+      return { data: await response.json(), headers: response.headers };
     } catch (error) {
       if (error instanceof Error) {
         // Retry on network errors
         if (retryCount < this.maxRetries && this.isRetryableError(error)) {
           await this.delay(this.retryDelay * Math.pow(2, retryCount));
-          return this.request<T>(endpoint, options, retryCount + 1);
+          return this.requestWithHeaders<T>(endpoint, options, retryCount + 1);
         }
         throw error;
       }
@@ -102,6 +112,23 @@ class ApiClient {
 
   // Opportunities API
   async getOpportunities(filters?: OpportunityFilters): Promise<Opportunity[]> {
+    return this.request(`/api/opportunities/${this.opportunityQuery(filters)}`);
+  }
+
+  // Fetch one keyset page; pass nextCursor back as filters.cursor for the next one
+  async getOpportunitiesPage(filters?: OpportunityFilters): Promise<OpportunityPage> {
+    const { data, headers } = await this.requestWithHeaders<Opportunity[]>(
+      `/api/opportunities/${this.opportunityQuery(filters)}`
+    );
+    const total = headers.get('X-Total-Count');
+    return {
+      items: data,
+      nextCursor: headers.get('X-Next-Cursor'),
+      total: total === null ? null : Number(total),
+    };
+  }
+
+  private opportunityQuery(filters?: OpportunityFilters): string {
     const params = new URLSearchParams();
     if (filters) {
       Object.entries(filters).forEach(([key, value]) => {
@@ -116,8 +143,33 @@ class ApiClient {
       });
     }
     
-    const query = params.toString() ? `?${params.toString()}` : '';
-    return this.request(`/api/opportunities/${query}`);
+    return params.toString() ? `?${params.toString()}` : '';
+  }
+
+  // Best matches for a search, most relevant first (for typeahead)
+  async searchOpportunities(q: string, limit: number = 10): Promise<Opportunity[]> {
+    const params = new URLSearchParams({ q, limit: String(limit) });
+    return this.request(`/api/opportunities/search?${params.toString()}`);
+  }
+
+  // Download every opportunity matching the filters as one file built server-side
+  async exportOpportunities(
+    filters?: OpportunityFilters,
+    format: 'csv' | 'parquet' | 'arrow' | 'xlsx' = 'xlsx'
+  ): Promise<Blob> {
+    const query = this.opportunityQuery({ ...filters, skip: undefined, limit: undefined, cursor: undefined });
+    const separator = query ? '&' : '?';
+    const response = await fetch(
+      `${this.baseUrl}/api/opportunities/export${query}${separator}format=${format}`
+    );
+    if (!response.ok) {
+      const errorData: APIError = await response.json().catch(() => ({
+        detail: `HTTP ${response.status}: ${response.statusText}`,
+        status: response.status,
+      }));
+      throw new Error(errorData.detail || 'Export failed');
+    }
+    return response.blob();
   }
 
   async getOpportunity(id: number): Promise<Opportunity> {
@@ -573,6 +625,10 @@ class ApiClient {
     return this.request(`/api/resources/timeline-generation/stats${query}`);
   }
 
+  async getTimelineRecalculationStatus(limit: number = 10): Promise<TimelineRecalculationStatus> {
+    return this.request(`/api/resources/timeline-recalculation/status?limit=${limit}`);
+  }
+
   // Get date bounds of actual timeline data
   async getTimelineDataBounds(): Promise<{earliest_date: string | null, latest_date: string | null}> {
     return this.request('/api/resources/timeline-data-bounds');
@@ -139,11 +139,40 @@ export interface ImportTask {
   successful_rows?: number;
   failed_rows?: number;
   warnings_count?: number;
+  inserted_rows?: number;
+  updated_rows?: number;
+  unchanged_rows?: number;
+  changed_count?: number;
   errors?: string[];
   start_time?: string;
   end_time?: string;
 }
 
+export interface TimelineRecalculationJob {
+  id: number;
+  trigger: 'import' | 'opportunity' | 'config';
+  detail: string;
+  status: 'pending' | 'processing' | 'completed' | 'failed';
+  requested: number;
+  processed: number;
+  regenerated: number;
+  removed: number;
+  protected: number;
+  skipped: number;
+  errors: number;
+  message: string;
+  created_at: string;
+  finished_at?: string;
+}
+
+export interface TimelineRecalculationStatus {
+  mode: 'background' | 'inline' | 'off';
+  pending_jobs: number;
+  processing_jobs: number;
+  queued_opportunities: number;
+  recent_jobs: TimelineRecalculationJob[];
+}
+
 // Request Types
 export interface OpportunityUpdate {
   sfdc_url?: string;
@@ -169,6 +198,9 @@ export interface OpportunityUpdate {
 export interface OpportunityFilters {
   skip?: number;
   limit?: number;
+  cursor?: string;
+  sort?: string;
+  include_total?: boolean;
   stage?: string | string[];
   search?: string;
   service_line?: string | string[];
@@ -177,6 +209,12 @@ export interface OpportunityFilters {
   custom_tracking_field_2?: string | string[];
 }
 
+export interface OpportunityPage {
+  items: Opportunity[];
+  nextCursor: string | null;
+  total: number | null;
+}
+
 // Response Types
 export interface ForecastSummary {
   total_opportunities: number;